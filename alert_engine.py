@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Event-driven Alert Engine für Bitwise Lead Tracker
+Statt alle 4h die ganze Pipeline zu scannen, werden nur Leads ausgewertet,
+die sich geändert haben oder deren Zeit-Schwelle abgelaufen ist:
+
+- change_log:    SQLite-Trigger auf leads / activities / meddpicc_scores
+                 schreiben (lead_id, source) — egal welcher Writer (Importer,
+                 Bot, Dashboard, Skripte)
+- alert_timers:  Timer pro (lead, rule) — "feuert 7/14/30/... Tage nach der
+                 letzten Activity"; fällige Timer per Index auf due_at
+- alert_state:   gleiche Delta-Logik wie der Stale-Cron (neu / eskaliert / erledigt)
+- Abos:          Treffer werden einmal berechnet und per invertiertem Index
+                 auf die Empfänger verteilt (alert_subscriptions.py)
+- Versand:       Cursor rückt immer vor; fehlgeschlagene Empfänger landen mit
+                 ihren Leads in alert_engine_retry und werden im nächsten Tick
+                 erneut ausgewertet. Endgültig abgelehnt (403 Bot blockiert) oder
+                 MAX_DELIVERY_ATTEMPTS erreicht → als erledigt markiert
+
+Kosten pro Tick: O(Änderungen + fällige Timer) statt O(Pipeline).
+
+Usage:
+  python3 alert_engine.py install            → Tabellen + Trigger, initialer Stand (ohne Versand)
+  python3 alert_engine.py run [--interval 5] → Daemon: pollt change_log + Timer
+  python3 alert_engine.py once               → ein Tick (z.B. per Cron jede Minute)
+  python3 alert_engine.py status
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from alert_service import AlertService, SnapshotLead, deliver_telegram_message
+from alert_state import AlertDelta, AlertItem, AlertStateStore, INACTIVITY_LEVELS, inactivity_severity
+from alert_subscriptions import SubscriptionIndex, subscription_index
+from database import TIMESTAMP_FORMAT
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+POLL_INTERVAL_SECONDS = float(os.environ.get("ALERT_ENGINE_INTERVAL", "5"))
+CHANGE_BATCH = 5000   # max. change_log-Zeilen pro Tick
+MAX_DELIVERY_ATTEMPTS = 5   # Fehlversuche pro (Chat, Regel), danach geparkt
+
+# (Tabelle, Event, lead_id-Ausdruck) → ein Trigger pro Zeile
+CHANGE_TRIGGERS = [
+    ('leads', 'INSERT', 'NEW.id'),
+    ('leads', 'UPDATE', 'NEW.id'),
+    ('leads', 'DELETE', 'OLD.id'),
+    ('activities', 'INSERT', 'NEW.lead_id'),
+    ('activities', 'UPDATE', 'NEW.lead_id'),
+    ('activities', 'DELETE', 'OLD.lead_id'),
+    ('meddpicc_scores', 'INSERT', 'NEW.lead_id'),
+    ('meddpicc_scores', 'UPDATE', 'NEW.lead_id'),
+]
+
+CLOSED_STAGES = ('closed_won', 'closed_lost')
+
+
+def utc_now() -> datetime:
+    """Naive UTC — gleiche Basis wie CURRENT_TIMESTAMP / julianday('now')"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Kanonisch, ISO mit 'T'/Bruchteilen/TZ ('2026-01-05T09:30:00.123Z') → naive UTC;
+    unparsebar → None (ein kaputter Altbestand darf den Tick nicht abbrechen)
+    """
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# ============================================
+# Regeln
+# ============================================
+
+@dataclass(frozen=True)
+class EngineRule:
+    """
+    Inaktivitäts-Regel: aktiver Lead, MEDDPICC >= min_meddpicc, keine Activity
+    seit min_days. Severity = Inaktivitäts-Stufe (7/14/30/60/90).
+    sources: change_log-Quellen, nach denen die Regel neu ausgewertet wird.
+    """
+    name: str
+    title: str
+    sources: FrozenSet[str]
+    min_meddpicc: int = 0
+    min_days: int = 7
+
+    def _eligible(self, lead: SnapshotLead) -> bool:
+        return lead.stage not in CLOSED_STAGES and lead.meddpicc_score >= self.min_meddpicc
+
+    def matches(self, lead: SnapshotLead) -> bool:
+        return self._eligible(lead) and lead.days_since_activity >= self.min_days
+
+    def to_item(self, lead: SnapshotLead) -> AlertItem:
+        return AlertItem(
+            lead_id=lead.lead_id,
+            severity=inactivity_severity(lead.days_since_activity),
+            data={
+                'company': lead.company,
+                'region': lead.region,
+                'stage': lead.stage,
+                'meddpicc': lead.meddpicc_score,
+                'days_inactive': lead.days_since_activity
+            }
+        )
+
+    def next_due(self, lead: Optional[SnapshotLead]) -> Optional[str]:
+        """Zeitpunkt der nächsten Schwelle (Match oder Eskalation), None = kein Timer nötig"""
+        if lead is None or not self._eligible(lead) or not lead.last_activity_date:
+            return None
+        thresholds = sorted({self.min_days, *(l for l in INACTIVITY_LEVELS if l > self.min_days)})
+        upcoming = [t for t in thresholds if t > lead.days_since_activity]
+        if not upcoming:
+            return None
+        last = parse_timestamp(lead.last_activity_date)
+        if last is None:
+            return None
+        return (last + timedelta(days=upcoming[0])).strftime(TIMESTAMP_FORMAT)
+
+
+# alert_type 'stale' teilt den Stand mit dem Stale-Cron → keine Doppelmeldungen
+RULES = [
+    EngineRule(
+        name='stale',
+        title="😴 *Schlummernde Deals — Update*",
+        sources=frozenset({'leads', 'activities'}),
+        min_days=7
+    ),
+    EngineRule(
+        name='churn_risk',
+        title="🚨 *Churn Risk — Update*",
+        sources=frozenset({'leads', 'activities', 'meddpicc_scores'}),
+        min_meddpicc=50,
+        min_days=7
+    ),
+]
+
+
+# ============================================
+# Engine
+# ============================================
+
+class AlertEngine:
+    def __init__(self, db_path: str = DB_PATH, chat_id: Optional[str] = None,
+                 rules: List[EngineRule] = None,
+                 sender: Callable[[str, str], object] = deliver_telegram_message):
+        """
+        chat_id gesetzt → nur dieser Empfänger, sonst alle Abos (pro Tick neu geladen).
+        sender → bool oder Status von deliver_telegram_message ('sent' | 'queued' |
+        'rejected' | 'failed')
+        """
+        self.db_path = db_path
+        self.chat_id = chat_id
+        self.rules = rules or RULES
+        self.sender = sender
+        self.service = AlertService(db_path)
+        self.state = AlertStateStore(db_path)
+        self.init_tables()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_tables(self):
+        """change_log + Trigger, Timer und Cursor (idempotent)"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lead_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_timers (
+                    lead_id INTEGER NOT NULL,
+                    rule TEXT NOT NULL,
+                    due_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (lead_id, rule)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alert_timers_due ON alert_timers(due_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_engine_cursor (
+                    name TEXT PRIMARY KEY,
+                    last_seq INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO alert_engine_cursor (name, last_seq) VALUES ('engine', 0)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_engine_retry (
+                    chat_id TEXT NOT NULL,
+                    rule TEXT NOT NULL,
+                    lead_id INTEGER NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    PRIMARY KEY (rule, lead_id, chat_id)
+                )
+            """)
+
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table, event, lead_expr in CHANGE_TRIGGERS:
+                if table not in tables:
+                    continue
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_changelog_{table}_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        INSERT INTO change_log (lead_id, source) VALUES ({lead_expr}, '{table}');
+                    END
+                """)
+            conn.commit()
+
+    # ── Eingänge: Änderungen + fällige Timer ─────────────────────────────────
+
+    def _cursor(self, conn) -> int:
+        return conn.execute("SELECT last_seq FROM alert_engine_cursor WHERE name = 'engine'").fetchone()[0]
+
+    def _pending_changes(self, conn, after_seq: int):
+        """→ (höchste gelesene seq, {lead_id: {source, ...}})"""
+        rows = conn.execute("""
+            SELECT seq, lead_id, source FROM change_log
+            WHERE seq > ? ORDER BY seq LIMIT ?
+        """, (after_seq, CHANGE_BATCH)).fetchall()
+        changes: Dict[int, Set[str]] = {}
+        for r in rows:
+            changes.setdefault(r['lead_id'], set()).add(r['source'])
+        return (rows[-1]['seq'] if rows else after_seq), changes
+
+    def _retries(self, conn) -> Dict[str, Set[int]]:
+        """Leads, deren Delta an mindestens einen Empfänger noch aussteht"""
+        retries: Dict[str, Set[int]] = {}
+        for r in conn.execute("SELECT DISTINCT rule, lead_id FROM alert_engine_retry"):
+            retries.setdefault(r['rule'], set()).add(r['lead_id'])
+        return retries
+
+    def _due_timers(self, conn, now: str) -> Dict[str, Set[int]]:
+        due: Dict[str, Set[int]] = {}
+        for r in conn.execute("SELECT lead_id, rule FROM alert_timers WHERE due_at <= ?", (now,)):
+            due.setdefault(r['rule'], set()).add(r['lead_id'])
+        return due
+
+    # ── Tick ─────────────────────────────────────────────────────────────────
+
+    def process_once(self) -> Dict:
+        """
+        Ein Tick: betroffene (Regel, Lead)-Paare auswerten, Deltas senden,
+        Timer neu setzen, Cursor vorrücken. Der Stand wird pro Empfänger nur
+        nach erfolgreichem Versand gespeichert; wer fehlschlägt, kommt mit
+        seinen Leads in alert_engine_retry — die anderen Abos warten nicht.
+        """
+        now_ts = utc_now().strftime(TIMESTAMP_FORMAT)
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            max_seq, changes = self._pending_changes(conn, cursor)
+            due = self._due_timers(conn, now_ts)
+            retries = self._retries(conn)
+
+        affected: Dict[str, Set[int]] = {}
+        for rule in self.rules:
+            ids = {lead_id for lead_id, sources in changes.items() if sources & rule.sources}
+            ids |= due.get(rule.name, set()) | retries.get(rule.name, set())
+            if ids:
+                affected[rule.name] = ids
+
+        stats = {'changes': len(changes), 'due_timers': sum(len(v) for v in due.values()),
+                 'evaluated': 0, 'new': 0, 'escalated': 0, 'resolved': 0, 'sent': 0, 'retry': 0}
+        if not affected:
+            self._advance(max_seq, [])
+            return stats
+
+        leads = self.service.leads_by_id(set().union(*affected.values()))
+        router = self.router()
+        timer_updates, retry_updates = [], []
+        for rule in self.rules:
+            ids = affected.get(rule.name)
+            if not ids:
+                continue
+            stats['evaluated'] += len(ids)
+            # Treffer einmal berechnen, dann pro Abo nur verteilen
+            items = [rule.to_item(leads[i]) for i in ids if i in leads and rule.matches(leads[i])]
+            deltas = self.state.diff_many(rule.name, router.route_items(rule.name, items), scope=ids)
+            timer_updates.extend((i, rule.name, rule.next_due(leads.get(i))) for i in ids)
+
+            sent, failed = self._deliver(rule, deltas.values())
+            stats['sent'] += sent
+            stats['retry'] += len(failed)
+            retry_updates.append((rule.name, ids, failed))
+            for delta in deltas.values():
+                stats['new'] += len(delta.new)
+                stats['escalated'] += len(delta.escalated)
+                stats['resolved'] += len(delta.resolved)
+            if failed:
+                print(f"❌ Alert engine: Versand '{rule.name}' an {', '.join(failed)} fehlgeschlagen "
+                      f"— Retry im nächsten Tick")
+
+        self._advance(max_seq, timer_updates, retry_updates)
+        return stats
+
+    def router(self) -> SubscriptionIndex:
+        return subscription_index(self.db_path, self.chat_id)
+
+    def _attempts(self, rule_name: str) -> Dict[str, int]:
+        with self.get_connection() as conn:
+            return {r['chat_id']: r['n'] for r in conn.execute(
+                "SELECT chat_id, MAX(attempts) AS n FROM alert_engine_retry WHERE rule = ? GROUP BY chat_id",
+                (rule_name,))}
+
+    def _deliver(self, rule: EngineRule, deltas: Iterable[AlertDelta]):
+        """
+        Sendet jedem Abo sein Delta. Der Stand wird für alle erledigten
+        Empfänger in einer Transaktion gespeichert. Erledigt = zugestellt/eingereiht,
+        endgültig abgelehnt oder nach MAX_DELIVERY_ATTEMPTS geparkt.
+        → (gesendet, {chat_id: (Versuche, lead_ids)} für den nächsten Tick)
+        """
+        deltas = [d for d in deltas if d.has_changes]
+        names = self.state.company_names(sorted({i for d in deltas for i in d.resolved}))
+        attempts = self._attempts(rule.name) if deltas else {}
+        done, failed, sent = [], {}, 0
+        for delta in deltas:
+            message = self.service.format_stale_delta(delta, names, title=rule.title)
+            result = self.sender(message, delta.chat_id)
+            if result is True or result in ('sent', 'queued'):
+                sent += 1
+                done.append(delta)
+            elif result == 'rejected':
+                print(f"⚠️ Alert engine: {delta.chat_id} lehnt '{rule.name}' endgültig ab — übersprungen")
+                done.append(delta)
+            elif attempts.get(delta.chat_id, 0) + 1 >= MAX_DELIVERY_ATTEMPTS:
+                print(f"⚠️ Alert engine: '{rule.name}' an {delta.chat_id} nach "
+                      f"{MAX_DELIVERY_ATTEMPTS} Versuchen geparkt")
+                done.append(delta)
+            else:
+                lead_ids = {i.lead_id for i in delta.new + delta.escalated} | set(delta.resolved)
+                failed[delta.chat_id] = (attempts.get(delta.chat_id, 0) + 1, lead_ids)
+        self.state.commit_many(done)
+        return sent, failed
+
+    def _advance(self, max_seq: int, timer_updates, retry_updates=()):
+        """
+        Timer setzen/löschen, Retry-Einträge der ausgewerteten Leads ersetzen,
+        Cursor vorrücken, verarbeitetes change_log aufräumen
+        """
+        with self.get_connection() as conn:
+            for rule_name, ids, failed in retry_updates:
+                conn.executemany("DELETE FROM alert_engine_retry WHERE rule = ? AND lead_id = ?",
+                                 [(rule_name, i) for i in ids])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO alert_engine_retry (chat_id, rule, lead_id, attempts) VALUES (?, ?, ?, ?)",
+                    [(chat_id, rule_name, i, n) for chat_id, (n, lead_ids) in failed.items() for i in lead_ids]
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO alert_timers (lead_id, rule, due_at) VALUES (?, ?, ?)",
+                [(i, rule, due_at) for i, rule, due_at in timer_updates if due_at]
+            )
+            conn.executemany(
+                "DELETE FROM alert_timers WHERE lead_id = ? AND rule = ?",
+                [(i, rule) for i, rule, due_at in timer_updates if not due_at]
+            )
+            conn.execute("UPDATE alert_engine_cursor SET last_seq = ? WHERE name = 'engine'", (max_seq,))
+            conn.execute("DELETE FROM change_log WHERE seq <= ?", (max_seq,))
+            conn.commit()
+
+    # ── Bootstrap ────────────────────────────────────────────────────────────
+
+    def seed(self, send: bool = False) -> Dict:
+        """
+        Einmaliger Voll-Scan: Timer für alle aktiven Leads setzen und den
+        aktuellen Alert-Stand übernehmen (send=False → ohne Versand).
+        """
+        with self.get_connection() as conn:
+            max_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        snapshot = self.service.snapshot()
+        router = self.router()
+        timer_updates, stats = [], {}
+        for rule in self.rules:
+            items = [rule.to_item(l) for l in snapshot.leads if rule.matches(l)]
+            deltas = self.state.diff_many(rule.name, router.route_items(rule.name, items))
+            if send:
+                _, failed = self._deliver(rule, deltas.values())
+                if failed:
+                    raise RuntimeError(f"Versand '{rule.name}' an {', '.join(failed)} fehlgeschlagen")
+            else:
+                self.state.commit_many(list(deltas.values()))
+            timer_updates.extend((l.lead_id, rule.name, rule.next_due(l)) for l in snapshot.leads)
+            stats[rule.name] = len(items)
+        self._advance(max_seq, timer_updates)
+        return stats
+
+    def status(self) -> Dict:
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            return {
+                'pending_changes': conn.execute(
+                    "SELECT COUNT(*) FROM change_log WHERE seq > ?", (cursor,)).fetchone()[0],
+                'timers': conn.execute("SELECT COUNT(*) FROM alert_timers").fetchone()[0],
+                'next_due': conn.execute("SELECT MIN(due_at) FROM alert_timers").fetchone()[0],
+                'retry_chats': conn.execute(
+                    "SELECT COUNT(DISTINCT chat_id) FROM alert_engine_retry").fetchone()[0],
+            }
+
+    def run(self, interval: float = POLL_INTERVAL_SECONDS):
+        """Daemon-Loop: pollt alle `interval` Sekunden (change_log + fällige Timer)"""
+        print(f"🔔 Alert engine läuft (Intervall {interval}s, Regeln: {', '.join(r.name for r in self.rules)})")
+        try:
+            while True:
+                started = time.monotonic()
+                stats = self.process_once()
+                if stats['evaluated']:
+                    print(f"[{datetime.now():%H:%M:%S}] {stats}")
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("Alert engine gestoppt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-driven Alert Engine")
+    parser.add_argument("command", choices=["install", "run", "once", "status"])
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur SQLite DB")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS, help="Poll-Intervall (Sekunden)")
+    parser.add_argument("--send", action="store_true", help="install: aktuellen Stand direkt senden")
+    parser.add_argument("--chat-id", help="nur an diesen Chat statt an alle Abos")
+    args = parser.parse_args()
+
+    engine = AlertEngine(args.db, args.chat_id)
+    if args.command == "install":
+        counts = engine.seed(send=args.send)
+        print("✅ Alert engine installiert — aktuell: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+        print(f"   {engine.status()}")
+    elif args.command == "run":
+        engine.run(args.interval)
+    elif args.command == "once":
+        print(engine.process_once())
+    else:
+        for key, value in engine.status().items():
+            print(f"{key}: {value}")
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Deklarative Alert-Regeln für Bitwise Lead Tracker
+Regeln sind Konjunktionen (AND) von Bedingungen über Lead-Felder — als
+Python-Builder oder YAML/JSON — und werden zu parametrisiertem SQL über
+den Snapshot-Joins (alert_service) kompiliert.
+
+    rule('high_priority', F('meddpicc') >= 60, F('days_inactive') >= 3,
+         order_by=['-meddpicc', '-days_inactive'], limit=3)
+
+    # alert_rules.yaml
+    rules:
+      - name: big_tickets_dach
+        title: "💰 Große Tickets DACH"
+        when:
+          region: [DE, CH]            # Liste = IN, Skalar = eq
+          deal_size: {gte: 20}
+          days_inactive: {gte: 5}
+        order_by: [-deal_size]
+        limit: 5
+
+- Felder: meddpicc, days_inactive, deal_size, stage, region, qualification
+- Ops: gte, gt, lte, lt, eq, ne, in, not_in
+- Aktive Stages sind implizit (include_closed: true hebt das auf) und werden
+  als positives IN geschrieben, damit idx_leads_stage_updated greift
+- Regeln mit gleichen kategorialen Bedingungen laufen als ein Batch-Query:
+  numerische Schwellen werden auf die lockerste gemeinsame Schwelle gehoben,
+  pro Regel gibt es eine Flag-Spalte
+- validate(): EXPLAIN QUERY PLAN über den eigenen Bedingungen der Regel
+  (ohne den impliziten Stage-Filter — der deckt fast alle Leads ab und würde
+  jeden Plan "indexiert" aussehen lassen). Regeln, die einen Full Table Scan
+  brauchen, werden abgelehnt, z.B. nur F('deal_size') >= 20 oder
+  F('stage').not_in(...). Bewusst scannende Regeln: allow_scan=True
+
+Usage:
+  python3 alert_rules.py check [rules.yaml]   → validieren + Query-Plan
+  python3 alert_rules.py run [rules.yaml]     → Treffer pro Regel ausgeben
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from alert_service import SNAPSHOT_COLUMNS, SNAPSHOT_JOINS, SnapshotLead
+from database import ensure_timestamp_normalization
+from models import Stage
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+ALERT_RULES_FILE = os.environ.get("ALERT_RULES_FILE", "")
+
+ACTIVE_STAGES = tuple(s.value for s in Stage if s not in (Stage.CLOSED_WON, Stage.CLOSED_LOST))
+
+# Zusätzliche Indexe für Regel-Filter (neben TIMESTAMP_INDEXES aus database.py)
+RULE_INDEXES = [
+    ('idx_leads_region_stage', 'leads(region, stage)'),
+]
+
+LAST_TOUCH_SQL = "COALESCE(a.created_at, l.updated_at, l.created_at)"
+
+OPS = {'gte': '>=', 'gt': '>', 'lte': '<=', 'lt': '<', 'eq': '=', 'ne': '!=', 'in': 'IN', 'not_in': 'NOT IN'}
+LOWER_OPS = ('gte', 'gt')
+UPPER_OPS = ('lte', 'lt')
+
+
+@dataclass(frozen=True)
+class FieldDef:
+    sql: str                  # SQL-Ausdruck über den Snapshot-Joins
+    attr: str                 # SnapshotLead-Attribut (für order_by)
+    numeric: bool
+    index_sql: Optional[str] = None   # indexierbare Variante für Untergrenzen > 0 (NULL fällt raus)
+
+
+FIELDS = {
+    'meddpicc': FieldDef("COALESCE(m.total_score, 0)", 'meddpicc_score', True, index_sql="m.total_score"),
+    'days_inactive': FieldDef(LAST_TOUCH_SQL, 'idle_days', True),
+    'deal_size': FieldDef("COALESCE(l.expected_deal_size_millions, 0)", 'deal_size', True),
+    'stage': FieldDef("l.stage", 'stage', False),
+    'region': FieldDef("l.region", 'region', False),
+    'qualification': FieldDef("COALESCE(m.qualification_status, 'UNQUALIFIED')", 'qualification', False),
+}
+
+
+# ============================================
+# Bedingungen + Builder
+# ============================================
+
+@dataclass(frozen=True)
+class Predicate:
+    field: str
+    op: str
+    value: Any     # Tuple bei in / not_in
+
+    def to_sql(self) -> Tuple[str, List]:
+        f = FIELDS[self.field]
+        if self.op in ('in', 'not_in'):
+            return f"{f.sql} {OPS[self.op]} ({','.join('?' * len(self.value))})", list(self.value)
+        if self.field == 'days_inactive':
+            return self._days_sql()
+        column = f.index_sql if f.index_sql and self.op in LOWER_OPS and self.value > 0 else f.sql
+        return f"{column} {OPS[self.op]} ?", [self.value]
+
+    def _days_sql(self) -> Tuple[str, List]:
+        """
+        days_inactive ist CAST(julianday-Differenz AS INTEGER) — als Vergleich
+        auf dem letzten Touch formuliert (kein julianday() pro Zeile im Filter):
+        days >= N  ⇔  last_touch <= now - N Tage
+        """
+        n = int(self.value)
+        bounds = {
+            'gte': ('<=', n), 'gt': ('<=', n + 1),
+            'lte': ('>', n + 1), 'lt': ('>', n),
+        }
+        if self.op in bounds:
+            cmp, days = bounds[self.op]
+            return f"{LAST_TOUCH_SQL} {cmp} datetime('now', ?)", [f"-{days} days"]
+        expr = f"CAST(julianday('now') - julianday({LAST_TOUCH_SQL}) AS INTEGER)"
+        return f"{expr} {OPS[self.op]} ?", [n]
+
+
+class F:
+    """Feld-Referenz für den Builder: F('meddpicc') >= 60, F('region').in_('DE', 'CH')"""
+
+    __hash__ = None
+
+    def __init__(self, name: str):
+        if name not in FIELDS:
+            raise ValueError(f"Unbekanntes Feld '{name}' — erlaubt: {', '.join(FIELDS)}")
+        self.name = name
+
+    def _numeric(self, op: str, value) -> Predicate:
+        if not FIELDS[self.name].numeric:
+            raise ValueError(f"'{op}' nur für numerische Felder, nicht für '{self.name}'")
+        return Predicate(self.name, op, value)
+
+    def __ge__(self, value): return self._numeric('gte', value)
+    def __gt__(self, value): return self._numeric('gt', value)
+    def __le__(self, value): return self._numeric('lte', value)
+    def __lt__(self, value): return self._numeric('lt', value)
+    def __eq__(self, value): return Predicate(self.name, 'eq', value)
+    def __ne__(self, value): return Predicate(self.name, 'ne', value)
+
+    def in_(self, *values) -> Predicate:
+        return Predicate(self.name, 'in', tuple(values))
+
+    def not_in(self, *values) -> Predicate:
+        return Predicate(self.name, 'not_in', tuple(values))
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    title: str
+    where: Tuple[Predicate, ...]
+    order_by: Tuple[str, ...] = ('-meddpicc',)
+    limit: Optional[int] = None
+    include_closed: bool = False
+    allow_scan: bool = False   # bewusst über die ganze aktive Pipeline (kein Index möglich)
+
+    @property
+    def predicates(self) -> Tuple[Predicate, ...]:
+        """where + implizite Einschränkung auf aktive Stages"""
+        if self.include_closed or any(p.field == 'stage' and p.op in ('eq', 'in') for p in self.where):
+            return self.where
+        return (Predicate('stage', 'in', ACTIVE_STAGES),) + self.where
+
+    def sort(self, leads: List[SnapshotLead]) -> List[SnapshotLead]:
+        """order_by rückwärts als stabile Sorts, danach limit"""
+        for key in reversed(self.order_by):
+            desc = key.startswith('-')
+            attr = FIELDS[key.lstrip('-')].attr
+            leads = sorted(leads, key=lambda l: getattr(l, attr), reverse=desc)
+        return leads[:self.limit] if self.limit else leads
+
+
+def rule(name: str, *where: Predicate, title: str = None, order_by: Sequence[str] = ('-meddpicc',),
+         limit: Optional[int] = None, include_closed: bool = False, allow_scan: bool = False) -> AlertRule:
+    for key in order_by:
+        if key.lstrip('-') not in FIELDS:
+            raise ValueError(f"Regel '{name}': unbekanntes order_by-Feld '{key}'")
+    return AlertRule(name=name, title=title or name, where=tuple(where), order_by=tuple(order_by),
+                     limit=limit, include_closed=include_closed, allow_scan=allow_scan)
+
+
+# Die bisherigen Alert-Views als Regeln
+DEFAULT_RULES = [
+    rule('high_priority', F('meddpicc') >= 60, F('days_inactive') >= 3,
+         title="🔥 *Top Prioritäten*", order_by=['-meddpicc', '-days_inactive'], limit=3),
+    rule('churn_risk', F('meddpicc') >= 50, F('days_inactive') >= 7,
+         title="⚠️ *Churn Risk*", order_by=['-days_inactive']),
+    rule('stale', F('days_inactive') >= 7,
+         title="😴 *Schlummernde Deals*", order_by=['-days_inactive'], limit=10, allow_scan=True),
+]
+
+
+# ============================================
+# YAML / JSON
+# ============================================
+
+def rule_from_dict(spec: Dict) -> AlertRule:
+    name = spec.get('name')
+    if not name:
+        raise ValueError(f"Regel ohne 'name': {spec}")
+    predicates = []
+    for field_name, condition in (spec.get('when') or {}).items():
+        if field_name not in FIELDS:
+            raise ValueError(f"Regel '{name}': unbekanntes Feld '{field_name}'")
+        if not isinstance(condition, dict):
+            condition = {'in': condition} if isinstance(condition, list) else {'eq': condition}
+        for op, value in condition.items():
+            if op not in OPS:
+                raise ValueError(f"Regel '{name}': unbekannter Operator '{op}' — erlaubt: {', '.join(OPS)}")
+            if op in ('in', 'not_in'):
+                value = tuple(value if isinstance(value, list) else [value])
+            elif op in LOWER_OPS + UPPER_OPS and not FIELDS[field_name].numeric:
+                raise ValueError(f"Regel '{name}': '{op}' nur für numerische Felder, nicht für '{field_name}'")
+            predicates.append(Predicate(field_name, op, value))
+    return rule(name, *predicates, title=spec.get('title'),
+                order_by=spec.get('order_by') or ['-meddpicc'], limit=spec.get('limit'),
+                include_closed=bool(spec.get('include_closed', False)),
+                allow_scan=bool(spec.get('allow_scan', False)))
+
+
+def load_rules(path: str) -> List[AlertRule]:
+    """Regeln aus .yaml/.yml (PyYAML) oder .json — Liste oder {'rules': [...]}"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML not installed. Run: pip install pyyaml --break-system-packages")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    specs = data.get('rules', []) if isinstance(data, dict) else data
+    rules = [rule_from_dict(spec) for spec in specs or []]
+    names = [r.name for r in rules]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Doppelte Regelnamen: {', '.join(duplicates)}")
+    return rules
+
+
+# ============================================
+# Kompilieren, Batchen, Validieren
+# ============================================
+
+def _bound_key(p: Predicate):
+    """Sortierschlüssel 'wie locker ist die Schwelle' (kleiner = lockerer)"""
+    if p.op in LOWER_OPS:
+        return (p.value, p.op == 'gt')
+    return (-p.value, p.op == 'lt')
+
+
+def envelope(rules: List[AlertRule]) -> List[Predicate]:
+    """
+    Gemeinsame Bedingungen einer Gruppe: identische Prädikate direkt,
+    numerische Unter-/Obergrenzen, die jede Regel hat, als lockerste Schwelle.
+    Jede Zeile, die irgendeine Regel erfüllt, erfüllt auch die Hülle.
+    """
+    common = set(rules[0].predicates)
+    for r in rules[1:]:
+        common &= set(r.predicates)
+    result = [p for p in rules[0].predicates if p in common]
+
+    for field_name, f in FIELDS.items():
+        if not f.numeric:
+            continue
+        for ops in (LOWER_OPS, UPPER_OPS):
+            bounds = []
+            for r in rules:
+                own = [p for p in r.predicates if p.field == field_name and p.op in ops]
+                if not own:
+                    break
+                bounds.append(min(own, key=_bound_key))
+            else:
+                loosest = min(bounds, key=_bound_key)
+                if loosest not in result:
+                    result.append(loosest)
+    return result
+
+
+def compile_batch(rules: List[AlertRule]) -> Tuple[str, List]:
+    """Ein Query für eine Gruppe: Hülle im WHERE, eine Flag-Spalte pro Regel"""
+    flags, flag_params = [], []
+    for r in rules:
+        parts = [p.to_sql() for p in r.predicates]
+        flags.append("(" + " AND ".join(sql for sql, _ in parts) + ")" if parts else "1")
+        flag_params.extend(v for _, params in parts for v in params)
+
+    where = [p.to_sql() for p in envelope(rules)]
+    query = f"""
+        SELECT {SNAPSHOT_COLUMNS},
+            {', '.join(f'{flag} AS rule_{i}' for i, flag in enumerate(flags))}
+        {SNAPSHOT_JOINS}
+        WHERE {' AND '.join(sql for sql, _ in where) or '1'}
+    """
+    return query, flag_params + [v for _, params in where for v in params]
+
+
+def compile_check(r: AlertRule) -> Tuple[str, List]:
+    """Nur die eigenen Bedingungen der Regel — Grundlage für validate()"""
+    parts = [p.to_sql() for p in r.where]
+    query = f"SELECT l.id {SNAPSHOT_JOINS} WHERE {' AND '.join(sql for sql, _ in parts) or '1'}"
+    return query, [v for _, params in parts for v in params]
+
+
+def _group_key(r: AlertRule):
+    """Regeln mit denselben kategorialen Bedingungen teilen sich einen Query"""
+    return frozenset(p for p in r.predicates if not FIELDS[p.field].numeric)
+
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def full_scans(conn: sqlite3.Connection, query: str, params: List) -> List[str]:
+    """Tabellen, die der Query-Plan komplett scannt (auch 'SCAN ... USING INDEX')"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return [row[3] for row in plan if _SCAN.match(row[3]) and not row[3].startswith("SCAN CONSTANT ROW")]
+
+
+class RuleSet:
+    """
+    Validierte, gebatchte Regeln gegen eine DB.
+    Wirft ValueError, wenn eine Regel einen Full Table Scan bräuchte.
+    """
+
+    def __init__(self, rules: List[AlertRule], db_path: str = DB_PATH):
+        self.rules = list(rules)
+        self.db_path = db_path
+        with self.get_connection() as conn:
+            ensure_timestamp_normalization(conn)
+            for index, definition in RULE_INDEXES:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {definition}")
+            conn.commit()
+            errors = self.validate(conn)
+            if errors:
+                raise ValueError("Regeln abgelehnt (Full Table Scan):\n" + "\n".join(errors))
+            self.batches = self._plan(conn)
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+    def validate(self, conn: sqlite3.Connection) -> List[str]:
+        errors = []
+        for r in self.rules:
+            if r.allow_scan:
+                continue
+            scans = full_scans(conn, *compile_check(r))
+            if scans:
+                errors.append(f"  {r.name}: {'; '.join(scans)} — Bedingung auf stage, region oder meddpicc ergänzen")
+        return errors
+
+    def _plan(self, conn: sqlite3.Connection) -> List[List[AlertRule]]:
+        """Gruppen nach kategorialen Bedingungen; scannt die Hülle, laufen die Regeln einzeln"""
+        groups: Dict[frozenset, List[AlertRule]] = {}
+        for r in self.rules:
+            groups.setdefault(_group_key(r), []).append(r)
+        batches = []
+        for group in groups.values():
+            if len(group) > 1 and full_scans(conn, *compile_batch(group)):
+                batches.extend([r] for r in group)
+            else:
+                batches.append(group)
+        return batches
+
+    def evaluate(self) -> Dict[str, List[SnapshotLead]]:
+        """Treffer pro Regel (sortiert + limitiert), ein Query pro Batch"""
+        results: Dict[str, List[SnapshotLead]] = {r.name: [] for r in self.rules}
+        n_cols = len(SnapshotLead.__dataclass_fields__)
+        with self.get_connection() as conn:
+            for batch in self.batches:
+                for row in conn.execute(*compile_batch(batch)):
+                    lead = SnapshotLead(*row[:n_cols])
+                    for r, flag in zip(batch, row[n_cols:]):
+                        if flag:
+                            results[r.name].append(lead)
+        return {r.name: r.sort(results[r.name]) for r in self.rules}
+
+    def explain(self) -> List[Tuple[List[str], List[str]]]:
+        """(Regelnamen, Query-Plan) pro Batch"""
+        plans = []
+        with self.get_connection() as conn:
+            for batch in self.batches:
+                query, params = compile_batch(batch)
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+                plans.append(([r.name for r in batch], [row[3] for row in plan]))
+        return plans
+
+
+def configured_rules() -> List[AlertRule]:
+    """ALERT_RULES_FILE wenn gesetzt, sonst DEFAULT_RULES"""
+    return load_rules(ALERT_RULES_FILE) if ALERT_RULES_FILE else DEFAULT_RULES
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "run"):
+        print("Usage: python alert_rules.py [check|run] [rules.yaml|rules.json]")
+        sys.exit(1)
+
+    rules = load_rules(sys.argv[2]) if len(sys.argv) > 2 else configured_rules()
+    try:
+        ruleset = RuleSet(rules)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if sys.argv[1] == "check":
+        print(f"✅ {len(rules)} Regeln gültig, {len(ruleset.batches)} Query(s)")
+        for names, plan in ruleset.explain():
+            print(f"\n[{', '.join(names)}]")
+            for detail in plan:
+                print(f"   {detail}")
+    else:
+        for name, leads in ruleset.evaluate().items():
+            print(f"\n{name}: {len(leads)} Treffer")
+            for l in leads[:10]:
+                print(f"   {l.company} ({l.region}) — MEDDPICC {l.meddpicc_score} | "
+                      f"{l.days_since_activity} Tage | {l.stage}")
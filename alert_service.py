@@ -3,12 +3,17 @@ EMEA Sales Alert System
 Telegram Alert Service für Bitwise Lead Tracker
 """
 
+import heapq
 import sqlite3
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 from dataclasses import dataclass
 
+from alert_state import AlertDelta, AlertItem, AlertStateStore, INACTIVITY_LEVELS, inactivity_severity
+from database import ensure_timestamp_normalization
+from outbox import get_outbox
+
 # Configuration
 DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "671208506")
@@ -34,302 +39,287 @@ class ChurnRiskLead:
     contact_person: str
     last_activity_type: str
 
+@dataclass
+class SnapshotLead:
+    lead_id: int
+    company: str
+    region: str
+    stage: str
+    contact_person: Optional[str]
+    linkedin: Optional[str]
+    deal_size: float
+    meddpicc_score: int
+    qualification: str
+    last_activity_date: Optional[str]
+    idle_days: float
+    days_since_activity: int
+    last_activity_type: str
+    activity_count: int
+
+@dataclass
+class AlertSnapshot:
+    """
+    Aktive Leads eines Alert-Laufs (ggf. per Schwelle vorgefiltert) — die Views
+    werden daraus abgeleitet. stats gilt immer für die gesamte Pipeline.
+    """
+    leads: List[SnapshotLead]
+    stats: Dict
+    taken_at: datetime
+
+# Übersicht für den Morning Alert: ein Aggregat-Scan über die ganze Pipeline
+PIPELINE_STATS_QUERY = """
+    SELECT
+        COUNT(*) as total,
+        SUM(CASE WHEN l.stage NOT IN ('closed_won', 'closed_lost')
+                  AND m.qualification_status = 'QUALIFIED' THEN 1 ELSE 0 END) as qualified,
+        SUM(CASE WHEN l.stage NOT IN ('closed_won', 'closed_lost')
+                  AND m.qualification_status = 'PROBABLE' THEN 1 ELSE 0 END) as probable,
+        SUM(CASE WHEN l.stage NOT IN ('closed_won', 'closed_lost')
+                 THEN COALESCE(l.expected_deal_size_millions, 0) ELSE 0 END) as pipeline_value
+    FROM leads l
+    LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+"""
+STATS_KEYS = ('total', 'qualified', 'probable', 'pipeline_value')
+
+# Spalten in SnapshotLead-Reihenfolge + Joins — geteilt von snapshot() und leads_by_id()
+SNAPSHOT_COLUMNS = """
+            l.id,
+            l.company,
+            l.region,
+            l.stage,
+            l.contact_person,
+            l.linkedin,
+            COALESCE(l.expected_deal_size_millions, 0) as deal_size,
+            COALESCE(m.total_score, 0) as meddpicc_total,
+            COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification,
+            COALESCE(a.created_at, l.updated_at, l.created_at) as last_activity_date,
+            COALESCE(julianday('now') - julianday(COALESCE(a.created_at, l.updated_at, l.created_at)), 999) as idle_days,
+            CAST(COALESCE(julianday('now') - julianday(COALESCE(a.created_at, l.updated_at, l.created_at)), 999)
+                 AS INTEGER) as days_inactive,
+            COALESCE(a.activity_type, 'No Activity') as last_activity_type,
+            (SELECT COUNT(*) FROM activities WHERE lead_id = l.id) as activity_count"""
+SNAPSHOT_JOINS = """
+        FROM leads l
+        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+        -- Letzte Activity: Index-Seek pro Lead (idx_activities_lead_created),
+        -- nur für Leads die die Schwellen passieren
+        LEFT JOIN activities a ON a.id = (
+            SELECT id FROM activities WHERE lead_id = l.id ORDER BY created_at DESC LIMIT 1
+        )"""
+
 class AlertService:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, persistent: bool = False):
+        """persistent=True: eine offene Connection für alle Queries (langlebige Prozesse wie bot_daemon)"""
         self.db_path = db_path
+        self.persistent = persistent
+        self._conn = None
+        # Kanonische Timestamps + Indexe → Inaktivität direkt in SQL filterbar
+        with self.get_connection() as conn:
+            ensure_timestamp_normalization(conn)
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        if self._conn is not None:
+            return self._conn
+        # persistent: Connection wird nur von einem Thread zur Zeit benutzt (z.B. Server-Thread)
+        conn = sqlite3.connect(self.db_path, check_same_thread=not self.persistent)
         conn.row_factory = sqlite3.Row
+        if self.persistent:
+            self._conn = conn
         return conn
     
     # ============================================
-    # SQL QUERIES für Alert-Logik
+    # Snapshot: ein Scan für alle Alert-Views
     # ============================================
     
-    def get_high_priority_leads(self, min_meddpicc: int = 60, stale_days: int = 3) -> List[PriorityLead]:
+    def snapshot(self, min_meddpicc: int = 0, min_days_inactive: int = 0) -> AlertSnapshot:
         """
-        Top Prioritäten: MEDDPICC >= 60 UND keine Activity seit X Tagen
+        Lädt alle aktiven Leads mit Score, letzter Activity und Inaktivität
+        in einem einzigen Query.
         
         SQL Logik:
-        1. Join leads + meddpicc_scores
-        2. LEFT JOIN mit letzter Activity pro Lead
-        3. Filter: MEDDPICC >= 60, Stage nicht closed
-        4. Sortiert nach MEDDPICC (höchste zuerst), dann Aktivität (älteste zuerst)
+        1. Join leads + meddpicc_scores + letzte Activity (Index-Seek pro Lead)
+        2. Inaktivität in Tagen direkt in SQL (julianday, Timestamps sind kanonisch UTC)
+        3. Optionale Schwellen im WHERE (für einzelne Views wie /stale)
+        4. Pipeline-Stats als einmal materialisierte CTE (unabhängig von den Schwellen)
         """
-        query = """
-        SELECT 
-            l.id,
-            l.company,
-            l.region,
-            l.stage,
-            l.contact_person,
-            COALESCE(m.total_score, 0) as meddpicc_total,
-            COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification,
-            COALESCE(
-                (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
-                l.updated_at,
-                l.created_at
-            ) as last_activity_date,
-            COALESCE(
-                (SELECT activity_type FROM activities 
-                 WHERE lead_id = l.id 
-                 ORDER BY created_at DESC LIMIT 1),
-                'No Activity'
-            ) as last_activity_type
-        FROM leads l
-        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
-        WHERE COALESCE(m.total_score, 0) >= ?
-          AND l.stage NOT IN ('closed_won', 'closed_lost')
-        ORDER BY meddpicc_total DESC, last_activity_date ASC
-        LIMIT 10
+        query = f"""
+        WITH pipeline_stats AS ({PIPELINE_STATS_QUERY})
+        SELECT {SNAPSHOT_COLUMNS},
+            s.total, s.qualified, s.probable, s.pipeline_value
+        {SNAPSHOT_JOINS}
+        CROSS JOIN pipeline_stats s
+        WHERE l.stage NOT IN ('closed_won', 'closed_lost')
         """
-        
-        cutoff_date = datetime.now() - timedelta(days=stale_days)
+        params = []
+        # Schwellen nur wenn gesetzt — so kann SQLite idx_meddpicc_total nutzen
+        if min_meddpicc > 0:
+            query += "  AND m.total_score >= ?\n"
+            params.append(min_meddpicc)
+        if min_days_inactive > 0:
+            query += "  AND COALESCE(a.created_at, l.updated_at, l.created_at) <= datetime('now', ?)\n"
+            params.append(f"-{int(min_days_inactive)} days")
         
         with self.get_connection() as conn:
-            rows = conn.execute(query, (min_meddpicc,)).fetchall()
-        
-        results = []
-        for row in rows:
-            last_activity = self._parse_datetime(row['last_activity_date'])
-            days_since = (datetime.now() - last_activity).days if last_activity else 999
-            
-            # Nur wenn stale (keine Activity seit X Tagen)
-            if days_since >= stale_days:
-                results.append(PriorityLead(
-                    company=row['company'],
-                    meddpicc_score=row['meddpicc_total'],
-                    qualification=row['qualification'],
-                    region=row['region'],
-                    stage=row['stage'],
-                    days_since_activity=days_since,
-                    next_action=self._determine_next_action(row['stage']),
-                    contact_person=row['contact_person'] or 'N/A',
-                    last_activity_type=row['last_activity_type']
-                ))
-        
-        return results[:3]  # Top 3
+            # Tupel statt sqlite3.Row: Spalten-Reihenfolge = SnapshotLead-Felder + Stats
+            cur = conn.cursor()
+            cur.row_factory = None
+            rows = cur.execute(query, params).fetchall()
+            stats_row = rows[0][-len(STATS_KEYS):] if rows else conn.execute(PIPELINE_STATS_QUERY).fetchone()
+        
+        leads = [SnapshotLead(*row[:-len(STATS_KEYS)]) for row in rows]
+        stats = dict(zip(STATS_KEYS, (v or 0 for v in stats_row)))
+        return AlertSnapshot(leads=leads, stats=stats, taken_at=datetime.now())
     
-    def get_churn_risk_leads(self, min_meddpicc: int = 50, max_inactive_days: int = 7) -> List[ChurnRiskLead]:
+    def leads_by_id(self, lead_ids: Iterable[int]) -> Dict[int, SnapshotLead]:
         """
-        Churn Risk Alert: MEDDPICC > 50 aber keine Activity seit 7 Tagen
+        Snapshot-Zeilen nur für die angegebenen Leads (auch closed) — für
+        inkrementelle Auswertung ohne Pipeline-Scan. Gelöschte Leads fehlen im Ergebnis.
         """
-        query = """
-        SELECT 
-            l.id,
-            l.company,
-            l.region,
-            l.contact_person,
-            COALESCE(m.total_score, 0) as meddpicc_total,
-            COALESCE(
-                (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
-                l.updated_at,
-                l.created_at
-            ) as last_activity_date,
-            COALESCE(
-                (SELECT activity_type FROM activities 
-                 WHERE lead_id = l.id 
-                 ORDER BY created_at DESC LIMIT 1),
-                'No Activity'
-            ) as last_activity_type
-        FROM leads l
-        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
-        WHERE COALESCE(m.total_score, 0) >= ?
-          AND l.stage NOT IN ('closed_won', 'closed_lost')
-        ORDER BY last_activity_date ASC
+        lead_ids = list(lead_ids)
+        result = {}
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            for start in range(0, len(lead_ids), 500):
+                chunk = lead_ids[start:start + 500]
+                rows = cur.execute(f"""
+                    SELECT {SNAPSHOT_COLUMNS}
+                    {SNAPSHOT_JOINS}
+                    WHERE l.id IN ({','.join('?' * len(chunk))})
+                """, chunk).fetchall()
+                result.update({row[0]: SnapshotLead(*row) for row in rows})
+        return result
+    
+    # ============================================
+    # Alert-Views (aus dem Snapshot abgeleitet)
+    # ============================================
+    
+    def get_high_priority_leads(self, min_meddpicc: int = 60, stale_days: int = 3,
+                                snapshot: Optional[AlertSnapshot] = None) -> List[PriorityLead]:
+        """
+        Top Prioritäten: MEDDPICC >= 60 UND keine Activity seit X Tagen
+        Sortiert nach MEDDPICC (höchste zuerst), dann Aktivität (älteste zuerst)
         """
+        snapshot = snapshot or self.snapshot(min_meddpicc, stale_days)
+        leads = [
+            l for l in snapshot.leads
+            if l.meddpicc_score >= min_meddpicc and l.days_since_activity >= stale_days
+        ]
+        leads.sort(key=lambda l: (-l.meddpicc_score, -l.idle_days))
         
-        with self.get_connection() as conn:
-            rows = conn.execute(query, (min_meddpicc,)).fetchall()
+        return [
+            PriorityLead(
+                company=l.company,
+                meddpicc_score=l.meddpicc_score,
+                qualification=l.qualification,
+                region=l.region,
+                stage=l.stage,
+                days_since_activity=l.days_since_activity,
+                next_action=self._determine_next_action(l.stage),
+                contact_person=l.contact_person or 'N/A',
+                last_activity_type=l.last_activity_type
+            )
+            for l in leads[:3]  # Top 3
+        ]
+    
+    def get_churn_risk_leads(self, min_meddpicc: int = 50, max_inactive_days: int = 7,
+                             snapshot: Optional[AlertSnapshot] = None) -> List[ChurnRiskLead]:
+        """
+        Churn Risk Alert: MEDDPICC > 50 aber keine Activity seit 7 Tagen
+        """
+        snapshot = snapshot or self.snapshot(min_meddpicc, max_inactive_days)
+        leads = [
+            l for l in snapshot.leads
+            if l.meddpicc_score >= min_meddpicc and l.days_since_activity >= max_inactive_days
+        ]
+        leads.sort(key=lambda l: -l.idle_days)
         
-        results = []
-        for row in rows:
-            last_activity = self._parse_datetime(row['last_activity_date'])
-            days_since = (datetime.now() - last_activity).days if last_activity else 999
-            
-            if days_since >= max_inactive_days:
-                results.append(ChurnRiskLead(
-                    company=row['company'],
-                    meddpicc_score=row['meddpicc_total'],
-                    days_since_activity=days_since,
-                    region=row['region'],
-                    contact_person=row['contact_person'] or 'N/A',
-                    last_activity_type=row['last_activity_type']
-                ))
-        
-        return results
+        return [
+            ChurnRiskLead(
+                company=l.company,
+                meddpicc_score=l.meddpicc_score,
+                days_since_activity=l.days_since_activity,
+                region=l.region,
+                contact_person=l.contact_person or 'N/A',
+                last_activity_type=l.last_activity_type
+            )
+            for l in leads
+        ]
     
-    def get_next_activity(self) -> Optional[Dict]:
+    def get_next_activity(self, snapshot: Optional[AlertSnapshot] = None) -> Optional[Dict]:
         """
         Empfiehlt nächste Aktivität basierend auf:
         1. Höchster MEDDPICC Score mit längster Inaktivität
         2. Oder Leads ohne jede Activity
         """
-        query = """
-        SELECT 
-            l.id,
-            l.company,
-            l.region,
-            l.stage,
-            l.contact_person,
-            l.linkedin,
-            COALESCE(m.total_score, 0) as meddpicc_total,
-            COALESCE(
-                (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
-                l.created_at
-            ) as last_activity_date,
-            COALESCE(
-                (SELECT activity_type FROM activities 
-                 WHERE lead_id = l.id 
-                 ORDER BY created_at DESC LIMIT 1),
-                'No Activity'
-            ) as last_activity_type,
-            (SELECT COUNT(*) FROM activities WHERE lead_id = l.id) as activity_count
-        FROM leads l
-        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
-        WHERE l.stage NOT IN ('closed_won', 'closed_lost')
-        ORDER BY 
-            COALESCE(m.total_score, 0) DESC,
-            last_activity_date ASC
-        LIMIT 1
-        """
-        
-        with self.get_connection() as conn:
-            row = conn.execute(query).fetchone()
+        snapshot = snapshot or self.snapshot()
+        if not snapshot.leads:
+            return None
         
-        if row:
-            last_activity = self._parse_datetime(row['last_activity_date'])
-            days_since = (datetime.now() - last_activity).days if last_activity else 999
-            
-            return {
-                'lead_id': row['id'],
-                'company': row['company'],
-                'region': row['region'],
-                'stage': row['stage'],
-                'contact': row['contact_person'],
-                'linkedin': row['linkedin'],
-                'meddpicc': row['meddpicc_total'],
-                'last_activity': row['last_activity_type'],
-                'days_inactive': days_since,
-                'activity_count': row['activity_count'],
-                'next_action': self._determine_next_action(row['stage'])
-            }
-        return None
+        l = min(snapshot.leads, key=lambda l: (-l.meddpicc_score, -l.idle_days))
+        return {
+            'lead_id': l.lead_id,
+            'company': l.company,
+            'region': l.region,
+            'stage': l.stage,
+            'contact': l.contact_person,
+            'linkedin': l.linkedin,
+            'meddpicc': l.meddpicc_score,
+            'last_activity': l.last_activity_type,
+            'days_inactive': l.days_since_activity,
+            'activity_count': l.activity_count,
+            'next_action': self._determine_next_action(l.stage)
+        }
     
-    def get_top_opportunities(self, limit: int = 5) -> List[Dict]:
+    def get_top_opportunities(self, limit: int = 5,
+                              snapshot: Optional[AlertSnapshot] = None) -> List[Dict]:
         """
         Top 5 Opportunities nach MEDDPICC Score
         """
-        query = """
-        SELECT 
-            l.company,
-            l.region,
-            l.stage,
-            l.contact_person,
-            l.expected_deal_size_millions,
-            COALESCE(m.total_score, 0) as meddpicc_total,
-            COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification,
-            COALESCE(
-                (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
-                l.updated_at
-            ) as last_activity_date
-        FROM leads l
-        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
-        WHERE l.stage NOT IN ('closed_won', 'closed_lost')
-        ORDER BY meddpicc_total DESC
-        LIMIT ?
-        """
-        
-        with self.get_connection() as conn:
-            rows = conn.execute(query, (limit,)).fetchall()
+        snapshot = snapshot or self.snapshot()
+        leads = sorted(snapshot.leads, key=lambda l: -l.meddpicc_score)[:limit]
         
         return [
             {
-                'company': row['company'],
-                'region': row['region'],
-                'stage': row['stage'],
-                'contact': row['contact_person'],
-                'deal_size': row['expected_deal_size_millions'],
-                'meddpicc': row['meddpicc_total'],
-                'qualification': row['qualification'],
-                'last_activity': self._parse_datetime(row['last_activity_date'])
+                'company': l.company,
+                'region': l.region,
+                'stage': l.stage,
+                'contact': l.contact_person,
+                'deal_size': l.deal_size,
+                'meddpicc': l.meddpicc_score,
+                'qualification': l.qualification,
+                'last_activity': l.last_activity_date,
+                'days_inactive': l.days_since_activity
             }
-            for row in rows
+            for l in leads
         ]
     
-    def get_stale_deals(self, days: int = 7) -> List[Dict]:
+    def get_stale_deals(self, days: int = 7, snapshot: Optional[AlertSnapshot] = None) -> List[Dict]:
         """
         Deals die schlummern - keine Activity seit X Tagen
         """
-        query = """
-        SELECT 
-            l.company,
-            l.region,
-            l.stage,
-            l.contact_person,
-            COALESCE(m.total_score, 0) as meddpicc_total,
-            COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification,
-            COALESCE(
-                (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
-                l.updated_at,
-                l.created_at
-            ) as last_activity_date,
-            COALESCE(
-                (SELECT activity_type FROM activities 
-                 WHERE lead_id = l.id 
-                 ORDER BY created_at DESC LIMIT 1),
-                'No Activity'
-            ) as last_activity_type
-        FROM leads l
-        LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
-        WHERE l.stage NOT IN ('closed_won', 'closed_lost')
-        ORDER BY last_activity_date ASC
-        LIMIT 50
-        """
+        snapshot = snapshot or self.snapshot(min_days_inactive=days)
+        leads = [l for l in snapshot.leads if l.days_since_activity >= days]
+        leads.sort(key=lambda l: -l.idle_days)
         
-        with self.get_connection() as conn:
-            rows = conn.execute(query).fetchall()
-        
-        results = []
-        for row in rows:
-            last_activity = self._parse_datetime(row['last_activity_date'])
-            days_since = (datetime.now() - last_activity).days if last_activity else 999
-            
-            if days_since >= days:
-                results.append({
-                    'company': row['company'],
-                    'region': row['region'],
-                    'stage': row['stage'],
-                    'contact': row['contact_person'],
-                    'meddpicc': row['meddpicc_total'],
-                    'qualification': row['qualification'],
-                    'days_inactive': days_since,
-                    'last_activity': row['last_activity_type']
-                })
-        
-        return results[:10]
+        return [
+            {
+                'company': l.company,
+                'region': l.region,
+                'stage': l.stage,
+                'contact': l.contact_person,
+                'meddpicc': l.meddpicc_score,
+                'qualification': l.qualification,
+                'days_inactive': l.days_since_activity,
+                'last_activity': l.last_activity_type
+            }
+            for l in leads[:10]
+        ]
     
     # ============================================
     # Helper Methods
     # ============================================
     
-    def _parse_datetime(self, value) -> Optional[datetime]:
-        """Parst verschiedene Datetime-Formate aus SQLite"""
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        try:
-            # ISO format mit oder ohne timezone
-            return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
-        except:
-            try:
-                # SQLite default format
-                return datetime.strptime(str(value), '%Y-%m-%d %H:%M:%S')
-            except:
-                return None
-    
     def _determine_next_action(self, stage: str) -> str:
         """Empfiehlt nächsten Schritt basierend auf Stage"""
         actions = {
@@ -347,11 +337,13 @@ class AlertService:
     # Telegram Message Formatting
     # ============================================
     
-    def format_morning_alert(self) -> str:
+    def format_morning_alert(self, snapshot: Optional[AlertSnapshot] = None) -> str:
         """Formatiert die 9:00 Uhr Morgen-Alert Nachricht"""
-        priorities = self.get_high_priority_leads()
-        churn_risks = self.get_churn_risk_leads()
-        stats = self._get_stats()
+        # Beide Views brauchen MEDDPICC >= 50 → Schwelle direkt im WHERE
+        snapshot = snapshot or self.snapshot(min_meddpicc=50)
+        priorities = self.get_high_priority_leads(snapshot=snapshot)
+        churn_risks = self.get_churn_risk_leads(snapshot=snapshot)
+        stats = snapshot.stats
         
         message = f"🎯 *EMEA Sales Alert - {datetime.now().strftime('%d.%m.%Y')}*\n\n"
         
@@ -392,16 +384,16 @@ class AlertService:
         
         return message
     
-    def format_next_activity(self) -> str:
+    def format_next_activity(self, snapshot: Optional[AlertSnapshot] = None) -> str:
         """Formatiert /next Command Response"""
-        activity = self.get_next_activity()
+        activity = self.get_next_activity(snapshot=snapshot)
         
         if not activity:
             return "✅ Alle Leads sind aktiv! Zeit für neues Prospecting. 🎯"
         
         status_emoji = "🟢" if activity['meddpicc'] >= 70 else "🟡" if activity['meddpicc'] >= 50 else "⚪"
         
-        message = f"🎯 *Nächste Priorität*\n\n"
+        message = "🎯 *Nächste Priorität*\n\n"
         message += f"*{activity['company']}* ({activity['region']})\n"
         message += f"{status_emoji} MEDDPICC: {activity['meddpicc']}/80 | Stage: {activity['stage']}\n"
         message += f"👤 {activity['contact']}\n\n"
@@ -415,9 +407,9 @@ class AlertService:
         
         return message
     
-    def format_hot_opportunities(self) -> str:
+    def format_hot_opportunities(self, snapshot: Optional[AlertSnapshot] = None) -> str:
         """Formatiert /hot Command Response"""
-        opportunities = self.get_top_opportunities(5)
+        opportunities = self.get_top_opportunities(5, snapshot=snapshot)
         
         if not opportunities:
             return "📊 Keine Opportunities gefunden."
@@ -428,7 +420,7 @@ class AlertService:
             status_emoji = "🟢" if opp['meddpicc'] >= 70 else "🟡" if opp['meddpicc'] >= 50 else "⚪"
             deal_size = f"€{opp['deal_size']:.0f}M" if opp['deal_size'] else "TBD"
             
-            days_since = (datetime.now() - opp['last_activity']).days if opp['last_activity'] else 999
+            days_since = opp['days_inactive']
             urgency = "🔥" if days_since > 7 else ""
             
             message += (
@@ -441,14 +433,14 @@ class AlertService:
         
         return message
     
-    def format_stale_deals(self) -> str:
+    def format_stale_deals(self, snapshot: Optional[AlertSnapshot] = None) -> str:
         """Formatiert /stale Command Response"""
-        stale = self.get_stale_deals(7)
+        stale = self.get_stale_deals(7, snapshot=snapshot)
         
         if not stale:
             return "✅ Alle Deals sind aktiv! Keine schlummernden Opportunities."
         
-        message = f"😴 *Schlummernde Deals* (>7 Tage inaktiv)\n\n"
+        message = "😴 *Schlummernde Deals* (>7 Tage inaktiv)\n\n"
         message += f"_{len(stale)} Deals benötigen Attention:_\n\n"
         
         for deal in stale:
@@ -462,74 +454,141 @@ class AlertService:
         
         return message
     
+    # ============================================
+    # Delta-Alerts (nur Änderungen seit dem letzten Lauf)
+    # ============================================
+    
+    def get_stale_alert_items(self, days: int = 7,
+                              snapshot: Optional[AlertSnapshot] = None) -> List[AlertItem]:
+        """Alle schlummernden Deals als AlertItems (Severity = Inaktivitäts-Stufe)"""
+        snapshot = snapshot or self.snapshot(min_days_inactive=days)
+        return [
+            AlertItem(
+                lead_id=l.lead_id,
+                severity=inactivity_severity(l.days_since_activity),
+                data={
+                    'company': l.company,
+                    'region': l.region,
+                    'stage': l.stage,
+                    'meddpicc': l.meddpicc_score,
+                    'days_inactive': l.days_since_activity
+                }
+            )
+            for l in snapshot.leads if l.days_since_activity >= days
+        ]
+    
+    def format_stale_delta(self, delta: AlertDelta, resolved_names: Dict[int, str],
+                           digest: bool = False, max_items: int = 10,
+                           title: str = "😴 *Schlummernde Deals — Update*") -> str:
+        """Formatiert nur neue, eskalierte und erledigte schlummernde Deals"""
+        # Nur die Top-N werden angezeigt → nsmallest statt komplett sortieren (pro Abo)
+        by_priority = lambda i: (-i.data['meddpicc'], -i.data['days_inactive'])
+        message = f"{title}\n\n"
+        
+        if delta.new:
+            message += f"🆕 *Neu ({len(delta.new)}):*\n"
+            for item in heapq.nsmallest(max_items, delta.new, key=by_priority):
+                d = item.data
+                status_emoji = "🚨" if d['meddpicc'] >= 50 else "⚪"
+                message += (
+                    f"{status_emoji} *{d['company']}* ({d['region']}) — "
+                    f"{d['days_inactive']} Tage | MEDDPICC {d['meddpicc']}/80 | {d['stage']}\n"
+                )
+            if len(delta.new) > max_items:
+                message += f"   _+{len(delta.new) - max_items} weitere_\n"
+            message += "\n"
+        
+        if delta.escalated:
+            message += f"⬆️ *Eskaliert ({len(delta.escalated)}):*\n"
+            for item in heapq.nsmallest(max_items, delta.escalated, key=by_priority):
+                d = item.data
+                level = INACTIVITY_LEVELS[item.severity - 1]
+                message += f"• *{d['company']}* — jetzt {level}+ Tage inaktiv ({d['days_inactive']})\n"
+            if len(delta.escalated) > max_items:
+                message += f"   _+{len(delta.escalated) - max_items} weitere_\n"
+            message += "\n"
+        
+        if delta.resolved:
+            names = [resolved_names.get(lead_id, f"Lead #{lead_id}") for lead_id in delta.resolved]
+            message += f"✅ *Wieder aktiv / erledigt ({len(names)}):* "
+            message += ", ".join(names[:max_items])
+            if len(names) > max_items:
+                message += f" _+{len(names) - max_items} weitere_"
+            message += "\n\n"
+        
+        if digest and delta.repeats:
+            top = heapq.nsmallest(3, delta.repeats, key=by_priority)
+            message += (
+                f"📋 _{len(delta.repeats)} weiterhin schlummernd (bereits gemeldet), "
+                f"u.a. {', '.join(i.data['company'] for i in top)}_\n"
+            )
+        
+        return message.rstrip() + "\n"
+    
+    # ============================================
+    # Deklarative Regeln (alert_rules.py)
+    # ============================================
+    
+    def format_rule_alerts(self, results: Dict[str, List[SnapshotLead]], rules) -> str:
+        """Generisches Format für Regel-Treffer: ein Abschnitt pro Regel mit Treffern"""
+        message = "📋 *Regel-Alerts*\n\n"
+        for rule in rules:
+            leads = results.get(rule.name) or []
+            if not leads:
+                continue
+            message += f"{rule.title} ({len(leads)})\n"
+            for l in leads[:10]:
+                message += (
+                    f"• *{l.company}* ({l.region}) — MEDDPICC {l.meddpicc_score}/80 | "
+                    f"{l.days_since_activity} Tage | {l.stage}\n"
+                )
+            if len(leads) > 10:
+                message += f"   _+{len(leads) - 10} weitere_\n"
+            message += "\n"
+        return message.rstrip() + "\n" if any(results.values()) else message + "✅ Keine Treffer\n"
+    
     # ============================================
     # Stats Helpers
     # ============================================
     
-    def _get_stats(self) -> Dict:
+    def _get_stats(self, snapshot: Optional[AlertSnapshot] = None) -> Dict:
         """Gesamtstatistiken für Dashboard"""
+        if snapshot:
+            return snapshot.stats
         with self.get_connection() as conn:
-            total = conn.execute("SELECT COUNT(*) as count FROM leads").fetchone()['count']
-            
-            qualified = conn.execute("""
-                SELECT COUNT(*) as count FROM leads l
-                JOIN meddpicc_scores m ON l.id = m.lead_id
-                WHERE m.qualification_status = 'QUALIFIED'
-                AND l.stage NOT IN ('closed_won', 'closed_lost')
-            """).fetchone()['count']
-            
-            probable = conn.execute("""
-                SELECT COUNT(*) as count FROM leads l
-                JOIN meddpicc_scores m ON l.id = m.lead_id
-                WHERE m.qualification_status = 'PROBABLE'
-                AND l.stage NOT IN ('closed_won', 'closed_lost')
-            """).fetchone()['count']
-            
-            pipeline = conn.execute("""
-                SELECT COALESCE(SUM(expected_deal_size_millions), 0) as total 
-                FROM leads 
-                WHERE stage NOT IN ('closed_won', 'closed_lost')
-            """).fetchone()['total']
-        
-        return {
-            'total': total,
-            'qualified': qualified,
-            'probable': probable,
-            'pipeline_value': pipeline
-        }
+            row = conn.execute(PIPELINE_STATS_QUERY).fetchone()
+        return dict(zip(STATS_KEYS, (v or 0 for v in row)))
 
 
 # ============================================
-# Telegram Integration via OpenClaw
+# Telegram Integration (Outbox, Fallback OpenClaw)
 # ============================================
 
-def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> bool:
+def deliver_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> str:
     """
-    Sendet Nachricht via direkter Telegram HTTP API (primär).
-    Fallback: OpenClaw Gateway.
-    Gateway-unabhängig — funktioniert auch wenn OpenClaw down ist.
+    Sendet Nachricht über die Telegram Outbox (primär): persistente Queue,
+    Rate Limits, Split > 4096 Zeichen, Retry mit Backoff, Keep-Alive-Verbindung.
+    Fallback: OpenClaw Gateway (kein Bot-Token oder endgültiger Fehler).
+
+    → 'sent' | 'queued' (Outbox stellt später zu) | 'rejected' (Telegram lehnt
+      endgültig ab, z.B. 403 Bot blockiert, und der Fallback klappt auch nicht)
+      | 'failed' (kein Versandweg erreichbar — später erneut versuchen)
     """
     bot_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+    outbox_rejected = False
 
-    # Primary: Direkte HTTP API (kein OpenClaw nötig)
+    # Primary: Outbox → Telegram HTTP API (kein OpenClaw nötig)
     if bot_token:
-        try:
-            import urllib.request
-            import json
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            payload = json.dumps({
-                "chat_id": chat_id,
-                "text": message,
-                "parse_mode": "Markdown"
-            }).encode("utf-8")
-            req = urllib.request.Request(url, data=payload,
-                                         headers={"Content-Type": "application/json"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                if resp.status == 200:
-                    print(f"✅ Message sent via Telegram API (direct)")
-                    return True
-        except Exception as e:
-            print(f"⚠️ Direct Telegram API failed: {e} — trying OpenClaw fallback")
+        status = get_outbox().send(chat_id, message, parse_mode="Markdown")
+        if status == "sent":
+            print("✅ Message sent via Telegram outbox")
+            return "sent"
+        if status == "queued":
+            # Persistiert — wird beim nächsten Drain / vom Outbox-Worker zugestellt
+            print("⏳ Message queued in Telegram outbox (retry pending)")
+            return "queued"
+        outbox_rejected = True
+        print("⚠️ Telegram outbox failed — trying OpenClaw fallback")
 
     # Fallback: OpenClaw Gateway
     try:
@@ -539,55 +598,153 @@ def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> bool
             capture_output=True, text=True, timeout=30
         )
         if result.returncode == 0:
-            print(f"✅ Message sent via OpenClaw (fallback)")
-            return True
+            print("✅ Message sent via OpenClaw (fallback)")
+            return "sent"
         else:
             print(f"❌ OpenClaw fallback error: {result.stderr}")
-            return False
     except Exception as e:
         print(f"❌ All send methods failed: {e}")
-        return False
+    return "rejected" if outbox_rejected else "failed"
+
+
+def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> bool:
+    """deliver_telegram_message() als bool: zugestellt oder sicher eingereiht"""
+    return deliver_telegram_message(message, chat_id) in ("sent", "queued")
 
 
 # ============================================
 # Main Entry Points für Cron/Commands
 # ============================================
 
-def run_morning_alert():
-    """9:00 CET Daily Alert"""
+def run_morning_alert(chat_id: Optional[str] = None):
+    """9:00 CET Daily Alert — ein Snapshot, jedes Abo bekommt seinen Ausschnitt"""
+    from alert_subscriptions import subscription_index
+    
     service = AlertService()
-    message = service.format_morning_alert()
-    success = send_telegram_message(message)
-    print(f"Morning alert: {'✅ Sent' if success else '❌ Failed'}")
+    snapshot = service.snapshot(min_meddpicc=50)
+    router = subscription_index(service.db_path, chat_id)
+    results = []
+    for chat, leads in router.route_leads('morning', snapshot.leads).items():
+        message = service.format_morning_alert(
+            AlertSnapshot(leads=leads, stats=snapshot.stats, taken_at=snapshot.taken_at)
+        )
+        results.append(send_telegram_message(message, chat))
+    success = all(results)
+    print(f"Morning alert ({len(results)} Empfänger): {'✅ Sent' if success else '❌ Failed'}")
     return success
 
+HELP_TEXT = """🎯 *EMEA Sales Alert System*
+
+Verfügbare Commands:
+/next - Wichtigste nächste Aktivität
+/hot - Top 5 Opportunities (MEDDPICC)
+/stale - Schlummernde Deals (>7 Tage)
+/help - Diese Hilfe
+
+Dashboard: https://pipo-bitwise-lead-tracker.streamlit.app
+"""
+
+
+def render_command(command_text: str, service: Optional[AlertService] = None,
+                   snapshot: Optional[AlertSnapshot] = None) -> Optional[str]:
+    """
+    Antwort-Text für einen Bot-Command (ohne Versand — OpenClaw schickt die
+    Ausgabe zurück). None = nicht behandelter Command.
+    """
+    command = command_text.strip().lower()
+    if command in ["/help", "/start", "help"]:
+        return HELP_TEXT
+    formatters = {
+        "/next": AlertService.format_next_activity,
+        "/hot": AlertService.format_hot_opportunities,
+        "/stale": AlertService.format_stale_deals,
+    }
+    if command not in formatters:
+        return None
+    if service is None and snapshot is None:
+        # Kein warmer Service (Kaltstart): gerenderte Antwort aus dem Response Cache
+        from response_cache import get_response_cache
+        return get_response_cache(DB_PATH).render(command)
+    return formatters[command](service or AlertService(), snapshot)
+
+
 def cmd_next():
     """/next Command Handler"""
-    service = AlertService()
-    message = service.format_next_activity()
+    message = render_command("/next")
     success = send_telegram_message(message)
     return message, success
 
 def cmd_hot():
     """/hot Command Handler"""
-    service = AlertService()
-    message = service.format_hot_opportunities()
+    message = render_command("/hot")
     success = send_telegram_message(message)
     return message, success
 
 def cmd_stale():
     """/stale Command Handler"""
-    service = AlertService()
-    message = service.format_stale_deals()
+    message = render_command("/stale")
     success = send_telegram_message(message)
     return message, success
 
 
+def run_stale_alert(full: bool = False, digest: bool = False, chat_id: Optional[str] = None) -> bool:
+    """
+    Cron Stale-Check: sendet nur neue / eskalierte / erledigte Deals.
+    full=True sendet die komplette Liste (wie /stale), digest=True fasst
+    unveränderte Wiederholungen in einer Zeile zusammen.
+    Ein Snapshot für alle Abos (alert_subscriptions), chat_id → nur dieser Empfänger.
+    """
+    from alert_subscriptions import subscription_index
+    
+    service = AlertService()
+    state = AlertStateStore(service.db_path)
+    snapshot = service.snapshot(min_days_inactive=7)
+    router = subscription_index(service.db_path, chat_id)
+    deltas = state.diff_many('stale', router.route_items('stale', service.get_stale_alert_items(7, snapshot=snapshot)))
+    leads_by_chat = router.route_leads('stale', snapshot.leads) if full else {}
+    names = state.company_names(sorted({i for d in deltas.values() for i in d.resolved}))
+    
+    delivered, results = [], []
+    for chat, delta in deltas.items():
+        if full:
+            message = service.format_stale_deals(
+                AlertSnapshot(leads=leads_by_chat[chat], stats=snapshot.stats, taken_at=snapshot.taken_at)
+            )
+        elif delta.has_changes or (digest and delta.repeats):
+            message = service.format_stale_delta(delta, names, digest=digest)
+        else:
+            print(f"Stale alert → {chat}: keine Änderungen ({len(delta.repeats)} bereits gemeldet) — nichts gesendet")
+            continue
+        
+        success = send_telegram_message(message, chat)
+        results.append(success)
+        if success:
+            delivered.append(delta)
+        print(f"Stale alert → {chat}: {len(delta.new)} neu, {len(delta.escalated)} eskaliert, "
+              f"{len(delta.resolved)} erledigt, {len(delta.repeats)} unterdrückt — "
+              f"{'✅ Sent' if success else '❌ Failed'}")
+    state.commit_many(delivered)
+    return all(results)
+
+
+def run_rule_alerts(rules_file: Optional[str] = None) -> bool:
+    """Deklarative Regeln (ALERT_RULES_FILE oder Datei-Argument) auswerten und senden"""
+    from alert_rules import RuleSet, configured_rules, load_rules
+    
+    service = AlertService()
+    rules = load_rules(rules_file) if rules_file else configured_rules()
+    results = RuleSet(rules, service.db_path).evaluate()
+    success = send_telegram_message(service.format_rule_alerts(results, rules))
+    print(f"Rule alerts ({len(rules)} Regeln): {'✅ Sent' if success else '❌ Failed'}")
+    return success
+
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1:
         command = sys.argv[1]
+        flags = sys.argv[2:]
         
         if command == "morning":
             run_morning_alert()
@@ -596,10 +753,13 @@ if __name__ == "__main__":
         elif command == "hot":
             cmd_hot()
         elif command == "stale":
-            cmd_stale()
+            # Cron: nur Deltas — --full für die komplette Liste, --digest für Wiederholungen
+            run_stale_alert(full="--full" in flags, digest="--digest" in flags)
+        elif command == "rules":
+            run_rule_alerts(flags[0] if flags else None)
         else:
             print(f"Unknown command: {command}")
-            print("Usage: python alert_service.py [morning|next|hot|stale]")
+            print("Usage: python alert_service.py [morning|next|hot|stale [--full] [--digest]|rules [rules.yaml]]")
     else:
         # Test mode - zeige alle Formatierungen
         print("=" * 60)
@@ -607,23 +767,24 @@ if __name__ == "__main__":
         print("=" * 60)
         
         service = AlertService()
+        snapshot = service.snapshot()
         
         print("\n" + "=" * 60)
         print("MORNING ALERT")
         print("=" * 60)
-        print(service.format_morning_alert())
+        print(service.format_morning_alert(snapshot))
         
         print("\n" + "=" * 60)
         print("NEXT ACTIVITY")
         print("=" * 60)
-        print(service.format_next_activity())
+        print(service.format_next_activity(snapshot))
         
         print("\n" + "=" * 60)
         print("HOT OPPORTUNITIES")
         print("=" * 60)
-        print(service.format_hot_opportunities())
+        print(service.format_hot_opportunities(snapshot))
         
         print("\n" + "=" * 60)
         print("STALE DEALS")
         print("=" * 60)
-        print(service.format_stale_deals())
+        print(service.format_stale_deals(snapshot))
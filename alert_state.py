@@ -0,0 +1,187 @@
+"""
+Alert State Store für Bitwise Lead Tracker
+Merkt sich pro (chat_id, lead_id, alert_type), was bereits gemeldet wurde —
+Cron-Läufe senden dann nur noch die Differenz:
+
+- new:       Lead ist neu im Alert (oder war zwischenzeitlich resolved)
+- escalated: Severity-Stufe ist gestiegen (z.B. 7 → 14 Tage inaktiv)
+- resolved:  Lead war gemeldet, ist aber nicht mehr im Alert
+- repeats:   unverändert — werden unterdrückt (optional als Digest-Zeile)
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from database import to_db_timestamp
+
+# Severity-Stufen für Inaktivität (Tage) — Eskalation beim Überschreiten der nächsten Stufe
+INACTIVITY_LEVELS = [7, 14, 30, 60, 90]
+
+
+def inactivity_severity(days_inactive: int) -> int:
+    """0 = unter der ersten Stufe, 1 = ≥7 Tage, 2 = ≥14 Tage, ..."""
+    return sum(1 for level in INACTIVITY_LEVELS if days_inactive >= level)
+
+
+@dataclass
+class AlertItem:
+    lead_id: int
+    severity: int
+    data: Dict = field(default_factory=dict)   # Anzeige-Daten (company, days, ...)
+
+
+@dataclass
+class AlertDelta:
+    alert_type: str
+    chat_id: str
+    new: List[AlertItem] = field(default_factory=list)
+    escalated: List[AlertItem] = field(default_factory=list)
+    resolved: List[int] = field(default_factory=list)     # lead_ids
+    repeats: List[AlertItem] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.new or self.escalated or self.resolved)
+
+
+class AlertStateStore:
+    """
+    `alert_state` in SQLite. diff() berechnet die Mengen-Differenz zwischen
+    dem aktuellen Alert-Set und dem gespeicherten Stand, commit() schreibt
+    nach erfolgreichem Versand zurück (nur geänderte Zeilen).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_state (
+                    chat_id TEXT NOT NULL,
+                    lead_id INTEGER NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    severity INTEGER NOT NULL DEFAULT 0,
+                    first_notified_at TIMESTAMP NOT NULL,
+                    last_notified_at TIMESTAMP NOT NULL,
+                    notify_count INTEGER NOT NULL DEFAULT 1,
+                    resolved_at TIMESTAMP,
+                    PRIMARY KEY (chat_id, alert_type, lead_id)
+                )
+            """)
+            conn.commit()
+
+    def _active_state(self, conn, chat_id: str, alert_type: str) -> Dict[int, int]:
+        rows = conn.execute("""
+            SELECT lead_id, severity FROM alert_state
+            WHERE chat_id = ? AND alert_type = ? AND resolved_at IS NULL
+        """, (chat_id, alert_type)).fetchall()
+        return {r['lead_id']: r['severity'] for r in rows}
+
+    def diff(self, chat_id: str, alert_type: str, items: List[AlertItem],
+             scope: Optional[Iterable[int]] = None) -> AlertDelta:
+        """
+        Vergleicht das aktuelle Alert-Set mit dem zuletzt gemeldeten Stand.
+        scope: nur diese Leads wurden neu ausgewertet (inkrementell) — bekannte
+        Leads außerhalb des Scopes gelten dann nicht als resolved.
+        """
+        with self.get_connection() as conn:
+            known = self._active_state(conn, chat_id, alert_type)
+        return self._diff(chat_id, alert_type, items, known, scope)
+
+    def diff_many(self, alert_type: str, items_by_chat: Dict[str, List[AlertItem]],
+                  scope: Optional[Iterable[int]] = None) -> Dict[str, AlertDelta]:
+        """diff() für mehrere Empfänger (Abos) — der gemeldete Stand kommt aus einem Query"""
+        known_by_chat: Dict[str, Dict[int, int]] = {chat_id: {} for chat_id in items_by_chat}
+        if not known_by_chat:
+            return {}
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None   # Tupel — bei vielen Abos sind das (Abos × Treffer) Zeilen
+            rows = cur.execute(f"""
+                SELECT chat_id, lead_id, severity FROM alert_state
+                WHERE chat_id IN ({','.join('?' * len(known_by_chat))})
+                  AND alert_type = ? AND resolved_at IS NULL
+            """, [*known_by_chat, alert_type])
+            for chat_id, lead_id, severity in rows:
+                known_by_chat[chat_id][lead_id] = severity
+        scope = set(scope) if scope is not None else None
+        return {chat_id: self._diff(chat_id, alert_type, items, known_by_chat[chat_id], scope)
+                for chat_id, items in items_by_chat.items()}
+
+    def _diff(self, chat_id: str, alert_type: str, items: List[AlertItem],
+              known: Dict[int, int], scope: Optional[Iterable[int]]) -> AlertDelta:
+        if scope is not None:
+            scope = set(scope)
+            known = {lead_id: sev for lead_id, sev in known.items() if lead_id in scope}
+
+        delta = AlertDelta(alert_type=alert_type, chat_id=chat_id)
+        current = set()
+        for item in items:
+            current.add(item.lead_id)
+            previous = known.get(item.lead_id)
+            if previous is None:
+                delta.new.append(item)
+            elif item.severity > previous:
+                delta.escalated.append(item)
+            else:
+                delta.repeats.append(item)
+        delta.resolved = sorted(set(known) - current)
+        return delta
+
+    def commit(self, delta: AlertDelta, now: Optional[datetime] = None):
+        """Markiert new/escalated als gemeldet und resolved als erledigt"""
+        self.commit_many([delta], now)
+
+    def commit_many(self, deltas: List[AlertDelta], now: Optional[datetime] = None):
+        """commit() für mehrere Deltas in einer Transaktion"""
+        ts = to_db_timestamp(now)
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO alert_state
+                    (chat_id, lead_id, alert_type, severity, first_notified_at, last_notified_at, notify_count)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT (chat_id, alert_type, lead_id) DO UPDATE SET
+                    severity = excluded.severity,
+                    last_notified_at = excluded.last_notified_at,
+                    notify_count = alert_state.notify_count + 1,
+                    resolved_at = NULL,
+                    first_notified_at = CASE WHEN alert_state.resolved_at IS NOT NULL
+                                             THEN excluded.first_notified_at
+                                             ELSE alert_state.first_notified_at END
+            """, [(delta.chat_id, item.lead_id, delta.alert_type, item.severity, ts, ts)
+                  for delta in deltas for item in delta.new + delta.escalated])
+            conn.executemany("""
+                UPDATE alert_state SET resolved_at = ?
+                WHERE chat_id = ? AND alert_type = ? AND lead_id = ?
+            """, [(ts, delta.chat_id, delta.alert_type, lead_id)
+                  for delta in deltas for lead_id in delta.resolved])
+            conn.commit()
+
+    def reset(self, chat_id: str, alert_type: str):
+        """Vergisst den Stand (nächster Lauf meldet wieder alles)"""
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM alert_state WHERE chat_id = ? AND alert_type = ?", (chat_id, alert_type))
+            conn.commit()
+
+    def company_names(self, lead_ids: List[int]) -> Dict[int, str]:
+        """Firmennamen für resolved Leads (die nicht mehr im Alert-Set sind)"""
+        if not lead_ids:
+            return {}
+        with self.get_connection() as conn:
+            names = {}
+            for start in range(0, len(lead_ids), 500):
+                chunk = lead_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT id, company FROM leads WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                names.update({r['id']: r['company'] for r in rows})
+        return names
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Alert-Abos für Bitwise Lead Tracker
+Statt eines fest verdrahteten TELEGRAM_CHAT_ID bekommt jeder Empfänger
+(Rep, Manager, Gruppe) seinen Ausschnitt: Regionen, Mindest-MEDDPICC,
+Stages und Alert-Typen. Leere Filter = alles.
+
+Routing ohne Query pro Abonnent: die Alert-Views werden einmal berechnet,
+danach wird jedes Ergebnis über einen invertierten Index (Attributwert →
+Bitmaske der Abonnenten) verteilt. Pro Lead ist das ein paar AND-Operationen,
+für gleiche Attribut-Kombinationen gecacht — 100 Abos kosten praktisch
+dasselbe wie eines.
+
+Ohne Einträge in `alert_subscriptions` gilt wie bisher TELEGRAM_CHAT_ID (ohne Filter).
+
+Usage:
+  python3 alert_subscriptions.py list
+  python3 alert_subscriptions.py add <chat_id> [--name Anna] [--regions DE,CH] [--min-meddpicc 50]
+                                              [--stages validation,negotiation] [--types stale,churn_risk]
+  python3 alert_subscriptions.py remove <chat_id>
+"""
+
+import argparse
+import os
+import sqlite3
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from database import to_db_timestamp
+from models import Region, Stage
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "671208506")
+
+
+def _split(value: Optional[str]) -> FrozenSet[str]:
+    """'DE, CH' → {'DE', 'CH'}; leer/None → frozenset() (= alle)"""
+    return frozenset(v.strip() for v in (value or "").split(",") if v.strip())
+
+
+def _enum_list(enum_cls, normalize):
+    """argparse-type: Komma-Liste gegen models.Region / models.Stage prüfen"""
+    def parse(value: str) -> FrozenSet[str]:
+        values = frozenset(normalize(v) for v in _split(value))
+        unknown = sorted(v for v in values if v not in {e.value for e in enum_cls})
+        if unknown:
+            raise argparse.ArgumentTypeError(
+                f"unbekannt: {', '.join(unknown)} — erlaubt: {', '.join(e.value for e in enum_cls)}")
+        return values
+    return parse
+
+
+@dataclass(frozen=True)
+class Subscription:
+    chat_id: str
+    name: str = ""
+    regions: FrozenSet[str] = field(default_factory=frozenset)
+    stages: FrozenSet[str] = field(default_factory=frozenset)
+    alert_types: FrozenSet[str] = field(default_factory=frozenset)
+    min_meddpicc: int = 0
+
+    def matches(self, alert_type: str, region: str, stage: str, meddpicc: int) -> bool:
+        """Direkte Prüfung ohne Index (Referenz-Semantik für SubscriptionIndex.route)"""
+        return ((not self.alert_types or alert_type in self.alert_types)
+                and (not self.regions or region in self.regions)
+                and (not self.stages or stage in self.stages)
+                and meddpicc >= self.min_meddpicc)
+
+    def describe(self) -> str:
+        parts = [
+            f"Regionen {','.join(sorted(self.regions))}" if self.regions else "alle Regionen",
+            f"MEDDPICC ≥{self.min_meddpicc}" if self.min_meddpicc else None,
+            f"Stages {','.join(sorted(self.stages))}" if self.stages else None,
+            f"Alerts {','.join(sorted(self.alert_types))}" if self.alert_types else "alle Alerts",
+        ]
+        return " | ".join(p for p in parts if p)
+
+
+# ============================================
+# Invertierter Index
+# ============================================
+
+class _AttributeIndex:
+    """Wert → Bitmaske der Abos, die den Wert zulassen (+ Maske der Abos ohne Filter)"""
+
+    def __init__(self):
+        self.by_value: Dict[str, int] = {}
+        self.wildcard = 0
+
+    def add(self, bit: int, values: FrozenSet[str]):
+        if not values:
+            self.wildcard |= bit
+        for value in values:
+            self.by_value[value] = self.by_value.get(value, 0) | bit
+
+    def mask(self, value: str) -> int:
+        return self.by_value.get(value, 0) | self.wildcard
+
+
+class SubscriptionIndex:
+    """
+    Verteilt Alert-Ergebnisse auf Abonnenten. Abo i = Bit i; pro Dimension
+    liefert der Index die Maske der passenden Abos, das Ergebnis ist das AND.
+    MEDDPICC-Schwellen: sortiert, Präfix-Masken → bisect.
+    """
+
+    def __init__(self, subscriptions: List[Subscription]):
+        self.subscriptions = list(subscriptions)
+        self.alert_types = _AttributeIndex()
+        self.regions = _AttributeIndex()
+        self.stages = _AttributeIndex()
+        thresholds: Dict[int, int] = {}
+        for i, sub in enumerate(self.subscriptions):
+            bit = 1 << i
+            self.alert_types.add(bit, sub.alert_types)
+            self.regions.add(bit, sub.regions)
+            self.stages.add(bit, sub.stages)
+            thresholds[sub.min_meddpicc] = thresholds.get(sub.min_meddpicc, 0) | bit
+        # _score_masks[k] = alle Abos mit Schwelle <= _thresholds[k]
+        self._thresholds = sorted(thresholds)
+        self._score_masks = []
+        acc = 0
+        for t in self._thresholds:
+            acc |= thresholds[t]
+            self._score_masks.append(acc)
+        self._memo: Dict[Tuple, Tuple[str, ...]] = {}
+
+    def __len__(self):
+        return len(self.subscriptions)
+
+    def route(self, alert_type: str, region: str, stage: str, meddpicc: int) -> Tuple[str, ...]:
+        """chat_ids der Abos, die dieses Ergebnis bekommen"""
+        key = (alert_type, region, stage, meddpicc)
+        chats = self._memo.get(key)
+        if chats is None:
+            k = bisect_right(self._thresholds, meddpicc)
+            mask = (self.alert_types.mask(alert_type) & self.regions.mask(region)
+                    & self.stages.mask(stage) & (self._score_masks[k - 1] if k else 0))
+            chats = tuple(sub.chat_id for i, sub in enumerate(self.subscriptions) if mask >> i & 1)
+            self._memo[key] = chats
+        return chats
+
+    def route_leads(self, alert_type: str, leads: Iterable) -> Dict[str, List]:
+        """SnapshotLeads → {chat_id: [leads]} (Reihenfolge bleibt erhalten)"""
+        routed = self.recipients(alert_type)
+        for lead in leads:
+            for chat_id in self.route(alert_type, lead.region, lead.stage, lead.meddpicc_score):
+                routed[chat_id].append(lead)
+        return routed
+
+    def route_items(self, alert_type: str, items: Iterable) -> Dict[str, List]:
+        """AlertItems (data: region, stage, meddpicc) → {chat_id: [items]}"""
+        routed = self.recipients(alert_type)
+        for item in items:
+            d = item.data
+            for chat_id in self.route(alert_type, d['region'], d['stage'], d['meddpicc']):
+                routed[chat_id].append(item)
+        return routed
+
+    def recipients(self, alert_type: str) -> Dict[str, List]:
+        """{chat_id: []} für alle Abos dieses Alert-Typs — auch wer nichts bekommt, ist drin"""
+        return {sub.chat_id: [] for sub in self.subscriptions
+                if not sub.alert_types or alert_type in sub.alert_types}
+
+
+# ============================================
+# Store
+# ============================================
+
+class SubscriptionStore:
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alert_subscriptions (
+                    chat_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL DEFAULT '',
+                    regions TEXT NOT NULL DEFAULT '',
+                    stages TEXT NOT NULL DEFAULT '',
+                    alert_types TEXT NOT NULL DEFAULT '',
+                    min_meddpicc INTEGER NOT NULL DEFAULT 0,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    created_at TIMESTAMP NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def subscriptions(self) -> List[Subscription]:
+        """Aktive Abos; ohne Einträge der Default-Empfänger TELEGRAM_CHAT_ID ohne Filter"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT * FROM alert_subscriptions WHERE active = 1 ORDER BY created_at, chat_id
+            """).fetchall()
+        if not rows:
+            return [Subscription(chat_id=TELEGRAM_CHAT_ID, name="default")]
+        return [
+            Subscription(chat_id=r['chat_id'], name=r['name'], regions=_split(r['regions']),
+                         stages=_split(r['stages']), alert_types=_split(r['alert_types']),
+                         min_meddpicc=r['min_meddpicc'])
+            for r in rows
+        ]
+
+    def index(self) -> SubscriptionIndex:
+        return SubscriptionIndex(self.subscriptions())
+
+    def add(self, sub: Subscription):
+        """Anlegen oder Filter ersetzen (gleiche chat_id)"""
+        now = to_db_timestamp()
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO alert_subscriptions
+                    (chat_id, name, regions, stages, alert_types, min_meddpicc, active, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (chat_id) DO UPDATE SET
+                    name = excluded.name, regions = excluded.regions, stages = excluded.stages,
+                    alert_types = excluded.alert_types, min_meddpicc = excluded.min_meddpicc, active = 1
+            """, (sub.chat_id, sub.name, ",".join(sorted(sub.regions)), ",".join(sorted(sub.stages)),
+                  ",".join(sorted(sub.alert_types)), sub.min_meddpicc, now))
+            conn.commit()
+
+    def remove(self, chat_id: str) -> bool:
+        with self.get_connection() as conn:
+            deleted = conn.execute("DELETE FROM alert_subscriptions WHERE chat_id = ?", (chat_id,)).rowcount
+            conn.commit()
+        return bool(deleted)
+
+
+def subscription_index(db_path: str = DB_PATH, chat_id: Optional[str] = None) -> SubscriptionIndex:
+    """chat_id gesetzt → nur dieser Empfänger ohne Filter (manueller Lauf), sonst alle Abos"""
+    if chat_id:
+        return SubscriptionIndex([Subscription(chat_id=chat_id)])
+    return SubscriptionStore(db_path).index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alert-Abos verwalten")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    add = sub.add_parser("add")
+    add.add_argument("chat_id")
+    add.add_argument("--name", default="")
+    add.add_argument("--regions", type=_enum_list(Region, str.upper), default=frozenset(),
+                     help="z.B. DE,CH (leer = alle)")
+    add.add_argument("--stages", type=_enum_list(Stage, str.lower), default=frozenset(),
+                     help="z.B. validation,negotiation (leer = alle aktiven)")
+    add.add_argument("--types", default="", help="Alert-Typen, z.B. morning,stale,churn_risk (leer = alle)")
+    add.add_argument("--min-meddpicc", type=int, default=0)
+    remove = sub.add_parser("remove")
+    remove.add_argument("chat_id")
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur SQLite DB")
+    args = parser.parse_args()
+
+    store = SubscriptionStore(args.db)
+    if args.command == "add":
+        if args.min_meddpicc < 0 or args.min_meddpicc > 80:
+            raise ValueError(f"--min-meddpicc muss zwischen 0 und 80 liegen: {args.min_meddpicc}")
+        store.add(Subscription(chat_id=args.chat_id, name=args.name, regions=args.regions,
+                               stages=args.stages, alert_types=_split(args.types),
+                               min_meddpicc=args.min_meddpicc))
+        print(f"✅ Abo für {args.chat_id} gespeichert")
+    elif args.command == "remove":
+        print("✅ Entfernt" if store.remove(args.chat_id) else f"Kein Abo für {args.chat_id}")
+    else:
+        for s in store.subscriptions():
+            print(f"{s.chat_id:>14}  {s.name or '-':<12} {s.describe()}")
@@ -0,0 +1,6 @@
+"""
+Benchmarks für den Bitwise Lead Tracker
+Synthetische Daten (synthetic.py) + Suites für Scoring, Alerts und Import.
+
+  python3 -m benchmarks.run --sizes 10k,100k,1m
+"""
@@ -0,0 +1,245 @@
+"""
+Alert-Suite: alle AlertService-Queries gegen die synthetische DB
+
+Morning-Alert-Vergleich:
+- bench_morning_alert_legacy: die früheren Einzel-Queries (2× leads⋈scores⋈activities
+  mit korrelierten Subqueries + 4 Stats-Queries), hier als SQL-Kopie konserviert
+- bench_morning_alert_snapshot: ein CTE-Query (MEDDPICC-Schwelle im WHERE), Rest in Memory
+
+Stale-Erkennung:
+- bench_stale_cron_full_scan: Cron-Pfad (Snapshot + Diff gegen alert_state über alle Leads)
+- bench_engine_tick: AlertEngine-Tick nach ENGINE_CHANGES neuen Activities (nur betroffene Leads)
+
+Abo-Fan-out (Stale-Cron nach dem ersten Lauf: Snapshot + Routing + Diff + Formatieren, ohne Versand):
+- bench_stale_fanout_1: ein Empfänger ohne Filter
+- bench_stale_fanout_100: 100 Abos mit Regionen/Stages/MEDDPICC-Filtern — gleicher Snapshot,
+  Verteilung über den invertierten Index, gemeldeter Stand aus einem Query
+
+Regel-DSL (DEFAULT_RULES):
+- bench_rules_batched: ein Query für alle Regeln (Hülle + Flag-Spalten)
+- bench_rules_separate: ein Query pro Regel
+- bench_rules_validate: RuleSet-Aufbau (Indexe + EXPLAIN je Regel); prüft vorab, dass
+  Regeln ohne indexierbare Bedingung (UNINDEXED_RULES) abgelehnt werden
+"""
+
+import os
+import shutil
+import sqlite3
+
+from alert_engine import AlertEngine
+from alert_rules import DEFAULT_RULES, F, RuleSet, rule
+
+from alert_service import AlertService
+from alert_state import AlertStateStore
+from alert_subscriptions import Subscription, SubscriptionIndex
+
+# Stand vor dem Snapshot-Umbau — nur für den Vorher/Nachher-Vergleich
+LEGACY_LEAD_QUERY = """
+    SELECT 
+        l.id, l.company, l.region, l.stage, l.contact_person,
+        COALESCE(m.total_score, 0) as meddpicc_total,
+        COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification,
+        COALESCE(
+            (SELECT MAX(created_at) FROM activities WHERE lead_id = l.id),
+            l.updated_at,
+            l.created_at
+        ) as last_activity_date,
+        COALESCE(
+            (SELECT activity_type FROM activities 
+             WHERE lead_id = l.id 
+             ORDER BY created_at DESC LIMIT 1),
+            'No Activity'
+        ) as last_activity_type
+    FROM leads l
+    LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+    WHERE COALESCE(m.total_score, 0) >= ?
+      AND l.stage NOT IN ('closed_won', 'closed_lost')
+    ORDER BY {order}
+    {limit}
+"""
+LEGACY_STATS_QUERIES = [
+    "SELECT COUNT(*) FROM leads",
+    """SELECT COUNT(*) FROM leads l JOIN meddpicc_scores m ON l.id = m.lead_id
+       WHERE m.qualification_status = 'QUALIFIED' AND l.stage NOT IN ('closed_won', 'closed_lost')""",
+    """SELECT COUNT(*) FROM leads l JOIN meddpicc_scores m ON l.id = m.lead_id
+       WHERE m.qualification_status = 'PROBABLE' AND l.stage NOT IN ('closed_won', 'closed_lost')""",
+    """SELECT COALESCE(SUM(expected_deal_size_millions), 0) FROM leads
+       WHERE stage NOT IN ('closed_won', 'closed_lost')""",
+]
+
+
+ENGINE_CHANGES = 100
+FANOUT_REGIONS = ['DE', 'CH', 'UK', 'NORDICS', 'UAE']
+FANOUT_STAGES = ['prospecting', 'discovery', 'solutioning', 'validation', 'negotiation']
+
+
+def _legacy_morning_queries(db_path: str) -> int:
+    """Führt die Queries eines Morning-Alerts im alten Stil aus, gibt die Query-Anzahl zurück"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(LEGACY_LEAD_QUERY.format(order="meddpicc_total DESC, last_activity_date ASC",
+                                              limit="LIMIT 10"), (60,)).fetchall()
+        conn.execute(LEGACY_LEAD_QUERY.format(order="last_activity_date ASC", limit=""), (50,)).fetchall()
+        for q in LEGACY_STATS_QUERIES:
+            conn.execute(q).fetchone()
+    finally:
+        conn.close()
+    return 2 + len(LEGACY_STATS_QUERIES)
+
+
+def bench_snapshot(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).snapshot)
+
+
+def bench_high_priority_leads(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).get_high_priority_leads)
+
+
+def bench_churn_risk_leads(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).get_churn_risk_leads)
+
+
+def bench_next_activity(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).get_next_activity)
+
+
+def bench_top_opportunities(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).get_top_opportunities)
+
+
+def bench_stale_deals(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).get_stale_deals)
+
+
+def bench_stats(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"])._get_stats)
+
+
+def bench_format_morning_alert(benchmark, ctx):
+    benchmark(AlertService(ctx["db_path"]).format_morning_alert)
+
+
+def bench_morning_alert_legacy(benchmark, ctx):
+    benchmark.extra_info["queries"] = benchmark(_legacy_morning_queries, ctx["db_path"])
+
+
+def bench_morning_alert_snapshot(benchmark, ctx):
+    service = AlertService(ctx["db_path"])
+
+    def run():
+        snapshot = service.snapshot(min_meddpicc=50)
+        service.get_high_priority_leads(snapshot=snapshot)
+        service.get_churn_risk_leads(snapshot=snapshot)
+        snapshot.stats
+        return 1
+
+    benchmark.extra_info["queries"] = benchmark(run)
+
+
+def bench_stale_cron_full_scan(benchmark, ctx):
+    service = AlertService(ctx["db_path"])
+    state = AlertStateStore(ctx["db_path"])
+
+    def run():
+        snapshot = service.snapshot(min_days_inactive=7)
+        return len(state.diff("bench", "stale", service.get_stale_alert_items(7, snapshot=snapshot)).new)
+
+    benchmark.extra_info["items"] = benchmark(run)
+
+
+def bench_engine_tick(benchmark, ctx):
+    target = os.path.join(ctx["scratch_dir"], "engine_target.db")
+    shutil.copyfile(ctx["db_path"], target)
+    engine = AlertEngine(target, chat_id="bench", sender=lambda message, chat_id: True)
+    engine.seed()
+    with sqlite3.connect(target) as conn:
+        lead_ids = [r[0] for r in conn.execute(
+            "SELECT id FROM leads WHERE stage NOT IN ('closed_won', 'closed_lost') LIMIT ?", (ENGINE_CHANGES,)
+        )]
+
+    def setup():
+        with sqlite3.connect(target) as conn:
+            conn.executemany(
+                "INSERT INTO activities (lead_id, activity_type, created_at) VALUES (?, 'call', datetime('now'))",
+                [(i,) for i in lead_ids]
+            )
+
+    stats = benchmark.pedantic(engine.process_once, setup=setup, rounds=benchmark.rounds)
+    benchmark.extra_info.update(stats)
+    os.remove(target)
+
+
+def bench_rules_batched(benchmark, ctx):
+    ruleset = RuleSet(DEFAULT_RULES, ctx["db_path"])
+    benchmark.extra_info["queries"] = len(ruleset.batches)
+    benchmark(ruleset.evaluate)
+
+
+def bench_rules_separate(benchmark, ctx):
+    rulesets = [RuleSet([r], ctx["db_path"]) for r in DEFAULT_RULES]
+    benchmark.extra_info["queries"] = len(rulesets)
+    benchmark(lambda: [rs.evaluate() for rs in rulesets])
+
+
+# Ohne den impliziten Stage-Filter ein Full Scan — müssen abgelehnt werden
+UNINDEXED_RULES = [
+    rule('big_tickets', F('deal_size') >= 20),
+    rule('qualified', F('qualification') == 'QUALIFIED'),
+    rule('not_won', F('stage').not_in('closed_won')),
+]
+
+
+def bench_rules_validate(benchmark, ctx):
+    for r in UNINDEXED_RULES:
+        try:
+            RuleSet([r], ctx["db_path"])
+        except ValueError:
+            continue
+        raise RuntimeError(f"Regel '{r.name}' ohne Index wurde akzeptiert")
+    benchmark.extra_info["rejected"] = len(UNINDEXED_RULES)
+    benchmark(lambda: RuleSet(DEFAULT_RULES, ctx["db_path"]))
+
+
+def _fanout_subscriptions(n: int):
+    """Deterministische Abo-Mischung: jedes 4. ohne Regionsfilter, Stages/Schwellen rotierend"""
+    subs = []
+    for i in range(n):
+        subs.append(Subscription(
+            chat_id=f"bench-{i}",
+            regions=frozenset() if i % 4 == 0 else frozenset(FANOUT_REGIONS[i % 5:i % 5 + 2]),
+            stages=frozenset() if i % 3 == 0 else frozenset(FANOUT_STAGES[i % 5:i % 5 + 3]),
+            min_meddpicc=(i % 5) * 10,
+        ))
+    return subs
+
+
+def _bench_stale_fanout(benchmark, ctx, subscriptions):
+    """Eingeschwungener Cron: der aktuelle Stand ist bereits gemeldet (wie nach dem ersten Lauf)"""
+    target = os.path.join(ctx["scratch_dir"], "fanout_target.db")
+    shutil.copyfile(ctx["db_path"], target)
+    service = AlertService(target)
+    state = AlertStateStore(target)
+
+    def run():
+        router = SubscriptionIndex(subscriptions)
+        snapshot = service.snapshot(min_days_inactive=7)
+        items = service.get_stale_alert_items(7, snapshot=snapshot)
+        deltas = state.diff_many("stale", router.route_items("stale", items))
+        names = state.company_names(sorted({i for d in deltas.values() for i in d.resolved}))
+        messages = [service.format_stale_delta(d, names) for d in deltas.values() if d.has_changes]
+        return deltas, messages
+
+    deltas, messages = run()
+    state.commit_many(list(deltas.values()))
+    benchmark.extra_info["first_run_messages"] = len(messages)
+    benchmark.extra_info["subscriptions"] = len(subscriptions)
+    benchmark(run)
+    os.remove(target)
+
+
+def bench_stale_fanout_1(benchmark, ctx):
+    _bench_stale_fanout(benchmark, ctx, [Subscription(chat_id="bench-0")])
+
+
+def bench_stale_fanout_100(benchmark, ctx):
+    _bench_stale_fanout(benchmark, ctx, _fanout_subscriptions(100))
@@ -0,0 +1,436 @@
+"""
+Bot-Command-Suite: Latenz von /hot (p50 = median, p99) über die Einstiegswege
+
+- bench_bot_handler_cold: `python bot_handler.py /hot` ohne Daemon, Response Cache veraltet
+  (Interpreter-Start + alert_service-Import + DB öffnen + Snapshot pro Command).
+  Der frühere Weg hat zusätzlich noch selbst per Telegram gesendet — hier nicht mitgemessen.
+- bench_bot_handler_daemon: `python bot_handler.py /hot` als Client gegen den warmen Daemon
+- bench_bot_daemon_roundtrip: nur Socket-Roundtrip (ohne Interpreter-Start)
+- bench_bot_handler_cached: `python bot_handler.py /hot` ohne Daemon, Response Cache vorgewärmt
+- bench_response_cache_hit / bench_response_cache_render: Cache-Lookup vs. Snapshot + Rendern
+  (ohne Interpreter-Start, auf einer Kopie der DB — der Cache installiert Trigger)
+- bench_bot_help_during_card_async / _sequential: pipo_telegram_bot gegen den lokalen
+  Telegram-Stub (getUpdates + sendMessage). Gemessen: "/card X" und direkt danach "/help"
+  im selben Chat → bis die /help-Antwort beim Stub ankommt. pipo_battlecard.py ist ein
+  Fake, der CARD_SECONDS schläft. Sequenziell = früherer run_bot-Loop (Battle Card blockiert).
+- bench_bot_webhook_ack: POST eines Updates an den Webhook-Server bis zum 200 (Keep-Alive)
+- bench_bot_webhook_help / bench_bot_polling_help: "/help" rein (Webhook-POST bzw. getUpdates
+  vom Stub) bis die Antwort beim Stub ankommt. Jedes Webhook-Update geht zweimal raus —
+  extra_info.duplicates zählt die verworfenen Zweitzustellungen. Inklusive Update-Journal
+  (bot_updates, ein Commit vor dem Ack / vor dem Offset).
+- bench_intent_router_local: Freitext-Korpus durch den lokalen Intent-Router (Regex + TF-IDF),
+  eine Runde = der ganze Korpus. extra_info: LLM-Call-Rate vorher (jede Nachricht → Claude)
+  und nachher, p95 pro Nachricht in µs. Vorher kostete jede Nachricht einen Haiku-Call (~0.5–1.5 s).
+  Vorab geprüft: ROUTER_EXPECTED wird lokal richtig geroutet, ROUTER_FALLTHROUGH geht an Claude.
+- bench_llm_cache_hit_memory / _sqlite: claude_route_intent-Prompt, der schon im LLM Cache liegt —
+  Treffer aus dem In-Memory-LRU bzw. direkt aus SQLite (neuer Prozess). Ohne Cache: ein Haiku-Call.
+- bench_lead_index_lookup: db_find_by_company / _by_name / _by_linkedin gegen den lokalen Lead-Index
+  (exakt + Tippfehler, eine Runde = ein Lookup). Vorher: 1–2 Supabase-REST-Roundtrips pro Lookup.
+  extra_info: Aufbau des Index aus der Bench-DB in ms.
+"""
+
+import asyncio
+import http.client
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import outbox
+import pipo_telegram_bot as bot
+from benchmarks.telegram_stub import TelegramStub
+from bot_daemon import BotDaemon
+from bot_updates import UpdateStore
+from context_store import ContextStore
+from bot_handler import query_daemon
+from intent_router import IntentRouter
+from lead_index import LeadIndex, load_leads_sqlite
+from llm_cache import LLMCache
+from outbox import Outbox, TelegramClient
+from response_cache import ResponseCache, cached_response
+
+HANDLER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bot_handler.py")
+LATENCY_ROUNDS = 30
+CARD_SECONDS = 1.0
+_chat_ids = itertools.count(1000)
+
+# Freitext wie er im Bot ankommt (Slash-Befehle gehen am Router vorbei)
+ROUTER_MESSAGES = [
+    "haben wir Sygnum?", "sind wir bei Taurus drin", "wer ist der CTO bei Sygnum", "finde den CFO von Lykke",
+    "entscheider bei Bitcoin Suisse", "top 10 leads", "zeig mir die top leads", "was sind unsere besten leads",
+    "forecast", "wie sieht der forecast aus", "prognose Q4", "ähnliche leads zu Sygnum", "lookalikes",
+    "battle card für Taurus", "strategie", "status Sygnum", "wie läuft es bei Bitpanda", "wie steht es da",
+    "https://www.linkedin.com/in/max-muster-123", "füge https://linkedin.com/in/anna-b hinzu mit strategie",
+    "hilfe", "was kannst du", "Tangany", "kannst du mir sagen ob die schon mal angefragt wurden",
+    "schreib dem CEO eine nachricht", "was meinst du zu dem deal", "wann war der letzte call mit denen",
+    "ist Sygnum in der db?", "gib mir die besten 3 leads", "erzähl mir was über Crypto Finance",
+]
+# Lokal eindeutig: Nachricht → (action, params)
+ROUTER_EXPECTED = {
+    "haben wir Sygnum?": ("db_check", {"query": "Sygnum"}),
+    "haben wir Sygnum schon drin?": ("db_check", {"query": "Sygnum"}),
+    "ist Sygnum schon in der db?": ("db_check", {"query": "Sygnum"}),
+    "wer ist der CTO bei Sygnum": ("find_contacts", {"role": "CTO", "company": "Sygnum"}),
+    "top 10 leads": ("top_leads", {"n": 10}),
+}
+# Normale Fragen, die wie ein Command anfangen → kein lokaler Treffer, Claude entscheidet
+ROUTER_FALLTHROUGH = [
+    "ist das sinnvoll?", "ist heute jemand in Zürich?", "sind wir bereit für das meeting?",
+    "ist Sygnum schon drin?", "was denkst du über Bitpanda?", "was hältst du davon",
+    "wie findest du Sygnum",
+]
+
+
+def _run_handler(env):
+    result = subprocess.run([sys.executable, HANDLER, "/hot"], env=env, capture_output=True, text=True)
+    if "Hot Opportunities" not in result.stdout:
+        raise RuntimeError(f"bot_handler ohne Antwort: {result.stderr[-300:]}")
+    return len(result.stdout)
+
+
+def _daemon(ctx):
+    socket_path = os.path.join(ctx["scratch_dir"], "bot_bench.sock")
+    server = BotDaemon(socket_path, ctx["db_path"])
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True)
+    thread.start()
+    return server, socket_path
+
+
+def _cache(ctx):
+    db_path = os.path.join(ctx["scratch_dir"], "response_cache.db")
+    shutil.copyfile(ctx["db_path"], db_path)
+    cache = ResponseCache(db_path)
+    cache.warm()
+    return cache, db_path
+
+
+def _stop(server):
+    server.shutdown()
+    server.server_close()
+
+
+def bench_bot_handler_cold(benchmark, ctx):
+    # Vor jeder Runde ein Write → Response Cache veraltet, der Handler rendert selbst
+    cache, db_path = _cache(ctx)
+    env = {**os.environ, "DB_PATH": db_path, "BOT_DAEMON_SOCKET": os.path.join(ctx["scratch_dir"], "none.sock")}
+
+    def invalidate():
+        with cache.get_connection() as conn:
+            conn.execute("UPDATE leads SET stage = stage WHERE id = (SELECT MIN(id) FROM leads)")
+
+    benchmark.pedantic(_run_handler, args=(env,), setup=invalidate,
+                       rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+
+
+def bench_bot_handler_daemon(benchmark, ctx):
+    server, socket_path = _daemon(ctx)
+    env = {**os.environ, "DB_PATH": ctx["db_path"], "BOT_DAEMON_SOCKET": socket_path}
+    try:
+        benchmark.pedantic(_run_handler, args=(env,), rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+    finally:
+        _stop(server)
+
+
+def bench_bot_daemon_roundtrip(benchmark, ctx):
+    server, socket_path = _daemon(ctx)
+    try:
+        benchmark.pedantic(query_daemon, args=("/hot", socket_path),
+                           rounds=max(benchmark.rounds, LATENCY_ROUNDS * 10), warmup_rounds=1)
+    finally:
+        _stop(server)
+
+
+def bench_bot_handler_cached(benchmark, ctx):
+    cache, db_path = _cache(ctx)
+    env = {**os.environ, "DB_PATH": db_path, "BOT_DAEMON_SOCKET": os.path.join(ctx["scratch_dir"], "none.sock")}
+    benchmark.pedantic(_run_handler, args=(env,), rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+
+
+def bench_response_cache_hit(benchmark, ctx):
+    cache, db_path = _cache(ctx)
+
+    def hit():
+        body = cached_response("/hot", db_path)
+        if body is None:
+            raise RuntimeError("Response Cache Miss")
+        return body
+
+    benchmark.pedantic(hit, rounds=max(benchmark.rounds, LATENCY_ROUNDS * 10), warmup_rounds=1)
+
+
+def bench_response_cache_render(benchmark, ctx):
+    cache, db_path = _cache(ctx)
+    service = cache.service
+    benchmark.pedantic(lambda: service.format_hot_opportunities(service.snapshot()),
+                       rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+
+
+# ── pipo_telegram_bot gegen den Telegram-Stub ──────────────────────────────────
+
+class _BotHarness:
+    """Stub + Outbox auf den Stub + Fake-Battle-Card; stellt Modul-Globals am Ende zurück"""
+
+    def __init__(self, ctx):
+        self.stub = TelegramStub().start()
+        workdir = os.path.join(ctx["scratch_dir"], "bot_bench")
+        os.makedirs(workdir, exist_ok=True)
+        open(os.path.join(workdir, ".env"), "w").close()
+        with open(os.path.join(workdir, "pipo_battlecard.py"), "w") as f:
+            f.write(f"import time; time.sleep({CARD_SECONDS})\n")
+        outbox_db = os.path.join(ctx["scratch_dir"], "bot_bench_outbox.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(outbox_db + suffix):
+                os.remove(outbox_db + suffix)
+        self.store = UpdateStore(outbox_db)   # Update-Journal in derselben Datei wie die Outbox
+        self._saved = (bot.TELEGRAM_API_BASE, bot.TELEGRAM_TOKEN, bot.ALLOWED_CHATS, bot.LEADTRACKER, bot.log,
+                       outbox._outbox, bot._intent_router, bot._context_store)
+        bot.TELEGRAM_API_BASE, bot.TELEGRAM_TOKEN, bot.ALLOWED_CHATS = self.stub.url, "bench", set()
+        bot.LEADTRACKER = Path(workdir)
+        outbox._outbox = Outbox(outbox_db, client=TelegramClient("bench", self.stub.url), global_rate=1e9,
+                                global_burst=1e9, chat_rate=1e9, chat_burst=1e9)
+        bot.log = lambda msg: None
+        bot._intent_router = IntentRouter(outbox_db)
+        bot._context_store = ContextStore(outbox_db)
+        self.last_chat = None
+
+    def ask_help(self, send_update):
+        """/help in einem neuen Chat über send_update(chat, text) → Sekunden bis zur Antwort"""
+        chat = next(_chat_ids)
+        t0 = time.perf_counter()
+        send_update(chat, "/help")
+        self.stub.wait_for(lambda m: str(m.get("chat_id")) == str(chat) and "Befehle" in m.get("text", ""),
+                           timeout=10)
+        return time.perf_counter() - t0
+
+    def ask_help_after_card(self):
+        """/card + /help im selben (neuen) Chat → Sekunden bis zur /help-Antwort"""
+        chat = next(_chat_ids)
+        self.last_chat = chat
+        self.stub.push_update(chat, "/card BenchCo")
+        t0 = time.perf_counter()
+        self.stub.push_update(chat, "/help")
+        self.stub.wait_for(lambda m: str(m.get("chat_id")) == str(chat) and "Befehle" in m.get("text", ""),
+                           timeout=CARD_SECONDS * 10)
+        return time.perf_counter() - t0
+
+    def wait_card_done(self):
+        chat = self.last_chat
+        self.stub.wait_for(lambda m: str(m.get("chat_id")) == str(chat) and "gesendet" in m.get("text", ""),
+                           timeout=CARD_SECONDS * 10)
+
+    def close(self):
+        (bot.TELEGRAM_API_BASE, bot.TELEGRAM_TOKEN, bot.ALLOWED_CHATS, bot.LEADTRACKER, bot.log,
+         outbox._outbox, bot._intent_router, bot._context_store) = self._saved
+        self.stub.stop()
+
+
+def _start_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+def _stop_loop(loop):
+    """Alle Tasks (Polling, Chat-Worker, Webhook-Verbindungen) abbrechen, dann Loop anhalten"""
+    async def cancel_all():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    asyncio.run_coroutine_threadsafe(cancel_all(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def bench_bot_help_during_card_async(benchmark, ctx):
+    harness = _BotHarness(ctx)
+    core = bot.BotCore(store=harness.store)
+    loop = _start_loop()
+    asyncio.run_coroutine_threadsafe(core.poll(), loop)
+    try:
+        benchmark.pedantic(harness.ask_help_after_card, rounds=benchmark.rounds, warmup_rounds=1)
+        harness.wait_card_done()
+        benchmark.extra_info["card_seconds"] = CARD_SECONDS
+    finally:
+        _stop_loop(loop)
+        harness.close()
+
+
+def bench_bot_help_during_card_sequential(benchmark, ctx):
+    # Früherer run_bot: ein Update nach dem anderen, Battle Card synchron im Loop
+    harness = _BotHarness(ctx)
+    stop = threading.Event()
+    saved_card = bot.handle_battle_card
+
+    def blocking_card(chat_id, company_query):
+        bot.tg_send(chat_id, f"⚔️ Starte Battle Card für <b>{company_query}</b>...")
+        bot.run_battle_card(chat_id, company_query)
+
+    def loop():
+        offset = 0
+        while not stop.is_set():
+            for update in bot.tg_get_updates(offset).get("result", []):
+                offset = update["update_id"] + 1
+                msg = update["message"]
+                bot.process_message(msg["chat"]["id"], msg["text"])
+
+    bot.handle_battle_card = blocking_card
+    threading.Thread(target=loop, daemon=True).start()
+    try:
+        benchmark.pedantic(harness.ask_help_after_card, rounds=benchmark.rounds, warmup_rounds=1)
+        benchmark.extra_info["card_seconds"] = CARD_SECONDS
+    finally:
+        stop.set()
+        bot.handle_battle_card = saved_card
+        harness.close()
+
+
+class _WebhookClient:
+    """Spielt Telegram: POST /telegram mit Secret Token über eine Keep-Alive-Verbindung"""
+
+    def __init__(self, port, secret):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port)
+        self.secret = secret
+        self.update_ids = itertools.count(1)
+
+    def post(self, update):
+        self.conn.request("POST", bot.WEBHOOK_PATH, json.dumps(update).encode(),
+                          {"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": self.secret})
+        resp = self.conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"Webhook antwortet {resp.status}")
+
+    def send(self, chat, text):
+        update = {"update_id": next(self.update_ids),
+                  "message": {"message_id": 1, "text": text, "chat": {"id": chat}, "from": {"id": chat}}}
+        self.post(update)
+        self.post(update)   # Zweitzustellung (Telegram-Retry) → muss verworfen werden
+
+
+def _run_webhook(benchmark, ctx, measure):
+    harness = _BotHarness(ctx)
+    core = bot.BotCore(store=harness.store)
+    loop = _start_loop()
+    server = asyncio.run_coroutine_threadsafe(
+        bot.WebhookServer(core, "bench-secret", "127.0.0.1", 0).start(), loop).result()
+    client = _WebhookClient(server.port, "bench-secret")
+    try:
+        benchmark.pedantic(measure, args=(harness, client), rounds=max(benchmark.rounds, LATENCY_ROUNDS),
+                           warmup_rounds=1)
+        benchmark.extra_info.update(received=server.received, duplicates=core.duplicates)
+    finally:
+        client.conn.close()
+        loop.call_soon_threadsafe(server.close)
+        _stop_loop(loop)
+        harness.close()
+
+
+def bench_bot_webhook_ack(benchmark, ctx):
+    def ack(harness, client):
+        client.post({"update_id": next(client.update_ids), "message": {}})   # leeres Update: nur Ack
+    _run_webhook(benchmark, ctx, ack)
+
+
+def bench_bot_webhook_help(benchmark, ctx):
+    _run_webhook(benchmark, ctx, lambda harness, client: harness.ask_help(client.send))
+
+
+def bench_bot_polling_help(benchmark, ctx):
+    harness = _BotHarness(ctx)
+    core = bot.BotCore(store=harness.store)
+    loop = _start_loop()
+    asyncio.run_coroutine_threadsafe(core.poll(), loop)
+    try:
+        benchmark.pedantic(harness.ask_help, args=(harness.stub.push_update,),
+                           rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+    finally:
+        _stop_loop(loop)
+        harness.close()
+
+
+def bench_intent_router_local(benchmark, ctx):
+    db_path = os.path.join(ctx["scratch_dir"], "intent_router_bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    router = IntentRouter(db_path)   # nur Seeds, kein geloggtes Claude-Training
+    for text, (action, params) in ROUTER_EXPECTED.items():
+        route = router.route(text, has_context=True)
+        if route is None or (route.action, route.params) != (action, params):
+            raise RuntimeError(f"{text!r} → {route.as_intent() if route else None}, erwartet {action} {params}")
+    for text in ROUTER_FALLTHROUGH:
+        route = router.route(text, has_context=True)
+        if route is not None:
+            raise RuntimeError(f"{text!r} lokal als {route.action} geroutet ({route.source}), erwartet Claude")
+    latencies = []
+
+    def route_all():
+        local = 0
+        for text in ROUTER_MESSAGES:
+            t0 = time.perf_counter()
+            route = router.route(text, has_context=True)
+            latencies.append(time.perf_counter() - t0)
+            local += route is not None
+        return local
+
+    local = benchmark.pedantic(route_all, rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+    latencies.sort()
+    benchmark.extra_info.update(
+        messages=len(ROUTER_MESSAGES),
+        llm_call_rate_before=1.0,
+        llm_call_rate_after=round(1 - local / len(ROUTER_MESSAGES), 3),
+        p95_us=round(latencies[int(len(latencies) * 0.95)] * 1e6, 1),
+    )
+
+
+def _llm_cache_hits(benchmark, ctx, memory_entries):
+    db_path = os.path.join(ctx["scratch_dir"], "llm_cache_bench.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    cache = LLMCache(db_path, memory_entries=memory_entries)
+    prompts = [f"Kontext: \nNachricht: {text}" for text in ROUTER_MESSAGES]
+    for prompt in prompts:
+        cache.put("intent", bot.CLAUDE_MODEL, bot._INTENT_SYSTEM, prompt, '{"action":"unknown","params":{}}')
+    lookups = itertools.cycle(prompts)
+
+    def hit():
+        if cache.get("intent", bot.CLAUDE_MODEL, bot._INTENT_SYSTEM, next(lookups)) is None:
+            raise RuntimeError("LLM Cache: unerwarteter Miss")
+
+    benchmark.pedantic(hit, rounds=max(benchmark.rounds, LATENCY_ROUNDS), warmup_rounds=1)
+    benchmark.extra_info.update(cache.stats().get("intent", {}))
+
+
+def bench_llm_cache_hit_memory(benchmark, ctx):
+    _llm_cache_hits(benchmark, ctx, memory_entries=len(ROUTER_MESSAGES))
+
+
+def bench_llm_cache_hit_sqlite(benchmark, ctx):
+    _llm_cache_hits(benchmark, ctx, memory_entries=0)
+
+
+def bench_lead_index_lookup(benchmark, ctx):
+    leads = load_leads_sqlite(ctx["db_path"])
+    t0 = time.perf_counter()
+    index = LeadIndex()
+    index.rebuild(leads)
+    build_ms = (time.perf_counter() - t0) * 1000
+    sample = leads[::max(1, len(leads) // 50)]
+    lookups = []
+    for lead in sample:
+        company, person = lead["company"], lead["contact_person"]
+        lookups += [
+            lambda c=company: index.find_by_company(c),
+            lambda c=company: index.find_by_company(c[:-2] if len(c) > 6 else c),   # Tippfehler / abgeschnitten
+            lambda p=person, c=company: index.find_by_name(p, c),
+            lambda p=person: index.find_by_name(p.replace("e", "", 1)),
+            lambda u=lead["linkedin"]: index.find_by_linkedin(u or ""),
+        ]
+    queries = itertools.cycle(lookups)
+    benchmark.pedantic(lambda: next(queries)(), rounds=max(benchmark.rounds, len(lookups)), warmup_rounds=1)
+    benchmark.extra_info.update(leads=len(index), build_ms=round(build_ms, 1))
@@ -0,0 +1,60 @@
+"""
+Import-Suite: csv_importer.import_rows in eine frische Kopie der DB
+(Dedup gegen alle bestehenden Leads + 10% Duplikate im File)
+
+- bench_import_rows: kompletter Import (Fingerprints + EntityResolver.match/assign pro Zeile)
+- bench_entity_match: nur EntityResolver.match() für alle Import-Zeilen gegen den Key-Index
+  (Regression: unbegrenzte Blöcke im inkrementellen Pfad, Über-Merges bei "Firma 17" ↔ "Firma 1234")
+"""
+
+import contextlib
+import io
+import os
+import shutil
+
+import csv_importer
+from benchmarks.synthetic import synthetic_csv_rows
+from entity_resolution import EntityResolver
+
+IMPORT_ROWS = 5_000
+DUP_RATE = 0.1
+# Mehr als DUP_RATE + Toleranz als Duplikat erkannt → Resolver merged verschiedene Firmen
+MAX_DUP_RATIO = DUP_RATE * 1.5
+
+
+def bench_import_rows(benchmark, ctx):
+    headers, rows = synthetic_csv_rows(IMPORT_ROWS, dup_rate=DUP_RATE)
+    target = os.path.join(ctx["scratch_dir"], "import_target.db")
+
+    def setup():
+        shutil.copyfile(ctx["db_path"], target)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return csv_importer.import_rows(rows, headers, "benchmark", db_path=target)
+
+    stats = benchmark.pedantic(run, setup=setup, rounds=min(benchmark.rounds, 3))
+    benchmark.extra_info.update(stats)
+    os.remove(target)
+    if stats["skipped_dup"] > IMPORT_ROWS * MAX_DUP_RATIO:
+        raise RuntimeError(f"{stats['skipped_dup']} von {IMPORT_ROWS} Zeilen als Duplikat verworfen")
+
+
+def bench_entity_match(benchmark, ctx):
+    headers, rows = synthetic_csv_rows(IMPORT_ROWS, dup_rate=0.0)
+    target = os.path.join(ctx["scratch_dir"], "match_target.db")
+    shutil.copyfile(ctx["db_path"], target)
+    resolver = EntityResolver(target)
+    resolver.resolve_pending()
+    company = headers.index("Company")
+
+    def run():
+        with resolver.get_connection() as conn:
+            return sum(resolver.match(conn, row[company])[0] is not None for row in rows)
+
+    matched = benchmark(run)
+    benchmark.extra_info["rows"] = len(rows)
+    benchmark.extra_info["matched"] = matched
+    os.remove(target)
+    if matched > IMPORT_ROWS * (MAX_DUP_RATIO - DUP_RATE):
+        raise RuntimeError(f"{matched} von {IMPORT_ROWS} neuen Firmen einem bestehenden Account zugeordnet")
@@ -0,0 +1,70 @@
+"""
+Outbox-Suite: Versand-Durchsatz gegen den lokalen Telegram-Stub
+(Rate Limits aufgehoben — gemessen wird nur der Transport)
+
+- bench_outbox_drain: OUTBOX_MESSAGES Nachrichten über OUTBOX_CHATS Chats,
+  eine Keep-Alive-Verbindung
+- bench_urllib_per_message: früherer Stil (urllib.request.urlopen pro Nachricht,
+  neue Verbindung pro Request)
+"""
+
+import json
+import os
+import urllib.request
+
+from benchmarks.telegram_stub import TelegramStub
+from outbox import Outbox, TelegramClient
+
+OUTBOX_MESSAGES = 500
+OUTBOX_CHATS = 20
+
+
+def _messages():
+    return [(str(i % OUTBOX_CHATS), f"🔥 *Lead {i}* — MEDDPICC 60/80 | 7 Tage | discovery")
+            for i in range(OUTBOX_MESSAGES)]
+
+
+def bench_outbox_drain(benchmark, ctx):
+    stub = TelegramStub().start()
+    db_path = os.path.join(ctx["scratch_dir"], "outbox_bench.db")
+    client = TelegramClient("bench", stub.url)
+    outbox = None
+
+    def setup():
+        nonlocal outbox
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        outbox = Outbox(db_path, client=client, global_rate=1e9, global_burst=1e9,
+                        chat_rate=1e9, chat_burst=1e9)
+        for chat_id, text in _messages():
+            outbox.enqueue(chat_id, text, parse_mode="Markdown")
+
+    try:
+        stats = benchmark.pedantic(lambda: outbox.drain(), setup=setup, rounds=min(benchmark.rounds, 3))
+        benchmark.extra_info.update(stats)
+        benchmark.extra_info["connections"] = client.connections_opened
+    finally:
+        client.close()
+        stub.stop()
+
+
+def bench_urllib_per_message(benchmark, ctx):
+    stub = TelegramStub().start()
+
+    def run():
+        for chat_id, text in _messages():
+            req = urllib.request.Request(
+                f"{stub.url}/botbench/sendMessage",
+                data=json.dumps({"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}).encode(),
+                headers={"Content-Type": "application/json"}
+            )
+            with urllib.request.urlopen(req, timeout=15) as r:
+                json.loads(r.read())
+        return OUTBOX_MESSAGES
+
+    try:
+        benchmark.pedantic(run, rounds=min(benchmark.rounds, 3))
+        benchmark.extra_info["connections"] = stub.connections
+    finally:
+        stub.stop()
@@ -0,0 +1,95 @@
+"""
+Scoring-Suite: Priority Score, Daily Picks, Top-Leads-Score, Morning Briefing
+
+Morning Briefing (auf einer Kopie der DB — briefing_cache installiert Trigger):
+- bench_morning_briefing_top5: Pipeline scoren (= Precompute-Phase)
+- bench_morning_briefing_send_cached: Send-Phase, liest nur die briefing_cache-Zeile
+"""
+
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import get_top_leads
+from morning_briefing import SmartMorningBriefing
+from scoring import get_pipo_daily_picks
+
+
+def _lead_rows(ctx):
+    """Einmal pro Größe: alle Leads inkl. MEDDPICC + letzter Aktivität"""
+    if "lead_rows" not in ctx:
+        conn = sqlite3.connect(ctx["db_path"])
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("""
+            SELECT l.id, l.company, l.region, l.tier, l.stage, l.updated_at,
+                   l.expected_deal_size_millions,
+                   COALESCE(m.total_score, 0) as meddpicc,
+                   COALESCE(m.qualification_status, 'UNQUALIFIED') as qualification
+            FROM leads l
+            LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+        """).fetchall()
+        conn.close()
+        now = datetime.now()
+        ctx["lead_rows"] = [
+            {**dict(r), "days_inactive": (now - datetime.strptime(r["updated_at"], "%Y-%m-%d %H:%M:%S")).days}
+            for r in rows
+        ]
+    return ctx["lead_rows"]
+
+
+def _briefing(ctx) -> SmartMorningBriefing:
+    target = os.path.join(ctx["scratch_dir"], "briefing_target.db")
+    shutil.copyfile(ctx["db_path"], target)
+    briefing = SmartMorningBriefing(target)
+    briefing.init_tables()
+    return briefing
+
+
+def bench_calculate_priority_score(benchmark, ctx):
+    briefing = _briefing(ctx)
+    inputs = [
+        (r["meddpicc"], r["expected_deal_size_millions"] or 0, r["days_inactive"], r["stage"], r["region"])
+        for r in _lead_rows(ctx)
+    ]
+
+    def run():
+        for args in inputs:
+            briefing.calculate_priority_score(*args)
+
+    benchmark(run)
+    benchmark.extra_info["calls"] = len(inputs)
+
+
+def bench_get_pipo_daily_picks(benchmark, ctx):
+    df = pd.DataFrame(_lead_rows(ctx)).rename(columns={"expected_deal_size_millions": "deal_size"})
+    picks = benchmark(get_pipo_daily_picks, df, 5)
+    benchmark.extra_info["rows"] = len(df)
+    assert len(picks) == min(5, len(df))
+
+
+def bench_score_lead(benchmark, ctx):
+    rows = _lead_rows(ctx)
+    leads = [{**r, "updated_at": r["updated_at"].replace(" ", "T") + "+00:00"} for r in rows]
+    meddpicc_map = {r["id"]: {"total_score": r["meddpicc"]} for r in rows}
+
+    def run():
+        for lead in leads:
+            get_top_leads.score_lead(lead, meddpicc_map)
+
+    benchmark(run)
+    benchmark.extra_info["calls"] = len(leads)
+
+
+def bench_morning_briefing_top5(benchmark, ctx):
+    briefing = _briefing(ctx)
+    benchmark(briefing.get_top_5_leads)
+
+
+def bench_morning_briefing_send_cached(benchmark, ctx):
+    briefing = _briefing(ctx)
+    briefing.precompute()
+    briefing._send_telegram = lambda message: True
+    benchmark(briefing.check_and_send)
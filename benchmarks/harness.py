@@ -0,0 +1,159 @@
+"""
+Mini-Benchmark-Harness im Stil von pytest-benchmark
+(ohne Abhängigkeit — läuft überall wo die Tracker-Skripte laufen).
+
+Eine Suite ist ein Modul mit Funktionen `bench_<name>(benchmark, ctx)`.
+`benchmark(fn, *args)` misst fn über mehrere Runden und gibt das
+Ergebnis des letzten Aufrufs zurück; `benchmark.pedantic(...)` erlaubt
+ein Setup pro Runde (z.B. frische DB-Kopie für Imports).
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+REGRESSION_THRESHOLD = 1.25   # Median > 125% des letzten Laufs = Regression
+
+
+class Benchmark:
+    """Fixture-artiges Mess-Objekt für eine einzelne Benchmark-Funktion"""
+
+    def __init__(self, name: str, rounds: int = 5, warmup: int = 1, max_seconds: float = 60.0):
+        self.name = name
+        self.rounds = rounds
+        self.warmup = warmup
+        self.max_seconds = max_seconds
+        self.timings: List[float] = []
+        self.extra_info: Dict[str, Any] = {}
+
+    def __call__(self, fn: Callable, *args, **kwargs):
+        return self.pedantic(fn, args=args, kwargs=kwargs, rounds=self.rounds, warmup_rounds=self.warmup)
+
+    def pedantic(
+        self,
+        fn: Callable,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        setup: Optional[Callable] = None,
+        rounds: Optional[int] = None,
+        warmup_rounds: int = 0,
+    ):
+        kwargs = kwargs or {}
+        rounds = rounds or self.rounds
+        result = None
+
+        for _ in range(warmup_rounds):
+            if setup:
+                setup()
+            fn(*args, **kwargs)
+
+        budget_start = time.perf_counter()
+        for _ in range(rounds):
+            if setup:
+                setup()
+            gc.collect()
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.timings.append(time.perf_counter() - t0)
+            # Langsame Pfade (z.B. 1M Leads) nicht endlos wiederholen
+            if time.perf_counter() - budget_start > self.max_seconds:
+                break
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        t = self.timings
+        if not t:
+            return {}
+        return {
+            "min": min(t),
+            "max": max(t),
+            "mean": statistics.mean(t),
+            "stddev": statistics.stdev(t) if len(t) > 1 else 0.0,
+            "median": statistics.median(t),
+            "p99": statistics.quantiles(t, n=100, method="inclusive")[98] if len(t) > 1 else t[0],
+            "rounds": len(t),
+            "ops": 1.0 / statistics.mean(t) if statistics.mean(t) else 0.0,
+        }
+
+
+def run_suite(module, ctx: Dict[str, Any], rounds: int, max_seconds: float,
+              only: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Führt alle bench_* Funktionen eines Moduls aus"""
+    results = []
+    for attr in sorted(dir(module)):
+        if not attr.startswith("bench_"):
+            continue
+        name = f"{module.__name__.rsplit('.', 1)[-1]}::{attr}"
+        if only and only not in name:
+            continue
+        bench = Benchmark(name, rounds=rounds, max_seconds=max_seconds)
+        try:
+            getattr(module, attr)(bench, ctx)
+            stats = bench.stats()
+            error = None
+        except Exception as e:
+            stats, error = {}, f"{type(e).__name__}: {e}"
+        results.append({"name": name, "stats": stats, "extra_info": bench.extra_info, "error": error})
+        if error:
+            print(f"   ❌ {name:<60} {error}")
+        else:
+            print(f"   ✅ {name:<60} median {stats['median'] * 1000:10.2f} ms  p99 {stats['p99'] * 1000:10.2f} ms  ({stats['rounds']} rounds)")
+    return results
+
+
+# ── History ───────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(HISTORY_FILE), timeout=5,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def load_history(path: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
+        return []
+
+
+def append_history(size_label: str, results: List[Dict[str, Any]], path: str = HISTORY_FILE) -> Dict[str, Any]:
+    """Hängt einen Lauf an die JSON-History an"""
+    entry = {
+        "datetime": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "size": size_label,
+        "benchmarks": results,
+    }
+    history = load_history(path)
+    history.append(entry)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+    return entry
+
+
+def find_regressions(entry: Dict[str, Any], history: List[Dict[str, Any]],
+                     threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Vergleicht Medians mit dem letzten Lauf derselben Größe"""
+    previous = next((h for h in reversed(history) if h["size"] == entry["size"] and h is not entry), None)
+    if not previous:
+        return []
+    before = {b["name"]: b["stats"].get("median") for b in previous["benchmarks"] if b["stats"]}
+    regressions = []
+    for b in entry["benchmarks"]:
+        old, new = before.get(b["name"]), b["stats"].get("median")
+        if old and new and new > old * threshold:
+            regressions.append(f"{b['name']}: {old * 1000:.2f} ms → {new * 1000:.2f} ms ({new / old:.2f}×)")
+    return regressions
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+Generiert (bzw. wiederverwendet) synthetische DBs pro Größe, führt alle
+Suites aus und hängt die Ergebnisse an benchmarks/history.json an.
+
+Usage:
+  python3 -m benchmarks.run                       → 10k
+  python3 -m benchmarks.run --sizes 10k,100k,1m   → inkl. 1M Leads
+  python3 -m benchmarks.run --only alerts         → nur Alert-Suite
+  python3 -m benchmarks.run --rounds 10 --max-seconds 30
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_alerts, bench_bot, bench_import, bench_outbox, bench_scoring
+from benchmarks.harness import HISTORY_FILE, append_history, find_regressions, load_history, run_suite
+from benchmarks.synthetic import SIZES, generate
+
+SUITES = [bench_scoring, bench_alerts, bench_import, bench_outbox, bench_bot]
+DATA_DIR = os.environ.get("BENCH_DATA_DIR", os.path.join(tempfile.gettempdir(), "pipo_bench"))
+
+
+def ensure_db(size_label: str, seed: int) -> str:
+    """Synthetische DB pro Größe/Seed/Tag cachen — 1M Leads zu erzeugen dauert"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"bench_{size_label}_s{seed}_{date.today():%Y%m%d}.db")
+    if not os.path.exists(path):
+        print(f"🏗  Generiere {size_label} Leads → {path}")
+        started = datetime.now()
+        counts = generate(path + ".tmp", SIZES[size_label], seed=seed)
+        os.replace(path + ".tmp", path)
+        print("   " + ", ".join(f"{t}={c:,}" for t, c in counts.items())
+              + f" ({(datetime.now() - started).total_seconds():.1f}s)")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead Tracker Benchmarks")
+    parser.add_argument("--sizes", default="10k", help="Komma-Liste aus 10k, 100k, 1m")
+    parser.add_argument("--seed", type=int, default=42, help="Seed für synthetische Daten")
+    parser.add_argument("--rounds", type=int, default=5, help="Runden pro Benchmark")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="Zeitbudget pro Benchmark")
+    parser.add_argument("--only", default=None, help="Nur Benchmarks deren Name diesen Text enthält")
+    parser.add_argument("--history", default=HISTORY_FILE, help="Pfad der JSON-History")
+    parser.add_argument("--no-history", action="store_true", help="Ergebnisse nicht speichern")
+    args = parser.parse_args()
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Unbekannte Größe(n): {', '.join(unknown)} — erlaubt: {', '.join(SIZES)}")
+
+    regressions = []
+    for size in sizes:
+        db_path = ensure_db(size, args.seed)
+        ctx = {"db_path": db_path, "size": size, "scratch_dir": DATA_DIR}
+        print(f"\n📊 {size} Leads")
+        results = []
+        for suite in SUITES:
+            results.extend(run_suite(suite, ctx, args.rounds, args.max_seconds, only=args.only))
+
+        if not args.no_history:
+            history = load_history(args.history)
+            entry = append_history(size, results, args.history)
+            regressions.extend(f"[{size}] {r}" for r in find_regressions(entry, history))
+
+    if regressions:
+        print("\n⚠️  Regressionen gegenüber dem letzten Lauf:")
+        for r in regressions:
+            print(f"   {r}")
+        sys.exit(1)
+    print("\n✅ Keine Regressionen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Synthetischer Lead-Generator für Benchmarks
+Erzeugt deterministisch (Seed) eine SQLite-DB mit dem echten Schema:
+leads, meddpicc_scores, activities, tasks.
+
+Verteilungen:
+- Region + Tier: gemessen an bitwise_leads.db (Stand Feb 2026)
+- Stage: Funnel einer laufenden Pipeline (die echte DB ist fast nur
+  'prospecting', damit hätten die Alert-Pfade nichts zu tun)
+- MEDDPICC + Aktivitäten: korreliert mit der Stage
+
+Usage:
+  python3 -m benchmarks.synthetic --leads 100000 --out /tmp/bench_100k.db
+  python3 -m benchmarks.synthetic --leads 10000 --from-db bitwise_leads.db
+"""
+
+import os
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# ── Schema (identisch mit bitwise_leads.db) ───────────────────────────────────
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company TEXT NOT NULL,
+    region TEXT NOT NULL,
+    tier INTEGER NOT NULL,
+    aum_estimate_millions REAL DEFAULT 0,
+    contact_person TEXT NOT NULL,
+    title TEXT NOT NULL,
+    email TEXT,
+    linkedin TEXT,
+    stage TEXT DEFAULT 'prospecting',
+    pain_points TEXT,
+    use_case TEXT,
+    expected_deal_size_millions REAL DEFAULT 0,
+    expected_yield REAL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    employee_count TEXT, industry TEXT, sub_region TEXT, company_type TEXT,
+    funding_stage TEXT, year_founded INTEGER, tech_stack TEXT, staking_readiness TEXT,
+    data_enriched BOOLEAN DEFAULT 0, enriched_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lead_id INTEGER NOT NULL,
+    activity_type TEXT NOT NULL,
+    notes TEXT,
+    outcome TEXT,
+    next_steps TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (lead_id) REFERENCES leads (id)
+);
+CREATE TABLE IF NOT EXISTS meddpicc_scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lead_id INTEGER UNIQUE NOT NULL,
+    metrics INTEGER DEFAULT 0,
+    economic_buyer INTEGER DEFAULT 0,
+    decision_process INTEGER DEFAULT 0,
+    decision_criteria INTEGER DEFAULT 0,
+    paper_process INTEGER DEFAULT 0,
+    pain INTEGER DEFAULT 0,
+    champion INTEGER DEFAULT 0,
+    competition INTEGER DEFAULT 0,
+    total_score INTEGER DEFAULT 0,
+    qualification_status TEXT DEFAULT 'UNQUALIFIED',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (lead_id) REFERENCES leads (id)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'todo',
+    priority TEXT DEFAULT 'P2',
+    category TEXT DEFAULT 'OUTREACH',
+    target_company TEXT,
+    target_contact TEXT,
+    due_date TEXT,
+    linkedin_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# ── Verteilungen ──────────────────────────────────────────────────────────────
+REGION_WEIGHTS = {'DE': 0.983, 'CH': 0.009, 'NORDICS': 0.005, 'UK': 0.002, 'UAE': 0.001}
+TIER_WEIGHTS = {4: 0.711, 1: 0.110, 3: 0.091, 2: 0.088}
+STAGE_WEIGHTS = {
+    'prospecting': 0.70, 'discovery': 0.12, 'solutioning': 0.07, 'validation': 0.04,
+    'negotiation': 0.02, 'closed_won': 0.02, 'closed_lost': 0.03,
+}
+INDUSTRY_WEIGHTS = {
+    'Other': 0.723, 'Venture Capital': 0.080, 'Banking': 0.054, 'Exchange/Trading': 0.044,
+    'Infrastructure': 0.031, 'Web3/Application': 0.030, 'Wallet Provider': 0.019,
+    'Custody': 0.011, 'Network Foundation': 0.008,
+}
+
+# MEDDPICC-Spanne (0-80) und Aktivitäten pro Lead je Stage
+STAGE_MEDDPICC = {
+    'prospecting': (0, 20), 'discovery': (15, 45), 'solutioning': (30, 60),
+    'validation': (45, 70), 'negotiation': (55, 80), 'closed_won': (60, 80), 'closed_lost': (10, 50),
+}
+STAGE_ACTIVITIES = {
+    'prospecting': (0, 2), 'discovery': (1, 5), 'solutioning': (3, 8),
+    'validation': (4, 10), 'negotiation': (6, 14), 'closed_won': (6, 14), 'closed_lost': (2, 8),
+}
+STAGE_DEAL_SIZE = {
+    'prospecting': (0, 5), 'discovery': (1, 20), 'solutioning': (5, 50),
+    'validation': (5, 80), 'negotiation': (10, 120), 'closed_won': (5, 100), 'closed_lost': (1, 40),
+}
+
+COMPANY_PREFIX = ["Nord", "Süd", "Alpen", "Rhein", "Main", "Helvetia", "Baltic", "Gulf", "Thames",
+                  "Hanse", "Isar", "Elbe", "Fjord", "Desert", "Lakeside", "Crown", "Atlas", "Vega"]
+COMPANY_CORE = ["bank", "Capital", "Asset Management", "Invest", "Vermögen", "Custody", "Digital Assets",
+                "Family Office", "Privatbank", "Trust", "Securities", "Ventures", "Kapital", "Partners"]
+COMPANY_SUFFIX = ["AG", "GmbH", "SA", "Ltd", "plc", "AB", "ASA", "LLC", "KGaA", "SE", ""]
+FIRST_NAMES = ["Anna", "Lukas", "Sophie", "Maximilian", "Laura", "Jonas", "Mia", "Felix", "Lea", "Paul",
+               "Oliver", "Emma", "Noah", "Hannah", "Elias", "Sara", "Omar", "Fatima", "Erik", "Ingrid"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+              "Hoffmann", "Keller", "Huber", "Smith", "Jones", "Andersson", "Nilsen", "Al-Mansouri"]
+TITLES = ["CIO", "CEO", "CFO", "Head of Digital Assets", "Portfolio Manager", "Managing Director",
+          "Head of Alternatives", "Director", "VP Treasury", "Head of Innovation"]
+ACTIVITY_TYPES = ["email", "call", "meeting", "demo", "proposal", "linkedin", "other"]
+OUTCOMES = ["positive", "neutral", "negative", "scheduled", "no_response"]
+TASK_STATUS = ["todo", "todo", "in_progress", "done"]
+TASK_CATEGORIES = ["OUTREACH", "FOLLOW_UP", "RESEARCH", "MEETING"]
+
+FMT = '%Y-%m-%d %H:%M:%S'
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def load_distributions(db_path: str) -> Dict[str, Dict]:
+    """Liest Region/Tier/Industry-Verteilung aus einer echten DB"""
+    conn = sqlite3.connect(db_path)
+    try:
+        def dist(col):
+            rows = conn.execute(f"SELECT {col}, COUNT(*) FROM leads WHERE {col} IS NOT NULL GROUP BY 1").fetchall()
+            total = sum(c for _, c in rows) or 1
+            return {k: c / total for k, c in rows}
+        return {'region': dist('region'), 'tier': dist('tier'), 'industry': dist('industry')}
+    finally:
+        conn.close()
+
+
+def _choices(rng: random.Random, weights: Dict, k: int) -> List:
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def generate(
+    db_path: str,
+    n_leads: int,
+    seed: int = 42,
+    now: Optional[datetime] = None,
+    distributions: Optional[Dict[str, Dict]] = None,
+    batch_size: int = 50_000,
+) -> Dict[str, int]:
+    """
+    Schreibt n_leads Leads + MEDDPICC + Activities + Tasks nach db_path.
+    Gleicher Seed → identische Daten (Timestamps relativ zu `now`).
+    Returns: Row-Counts pro Tabelle
+    """
+    rng = random.Random(seed)
+    # Kanonisch wie CURRENT_TIMESTAMP: UTC ohne TZ-Suffix
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    dists = distributions or {}
+    region_w = dists.get('region') or REGION_WEIGHTS
+    tier_w = dists.get('tier') or TIER_WEIGHTS
+    industry_w = dists.get('industry') or INDUSTRY_WEIGHTS
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    counts = {'leads': 0, 'meddpicc_scores': 0, 'activities': 0, 'tasks': 0}
+    lead_id = 0
+    for start in range(0, n_leads, batch_size):
+        k = min(batch_size, n_leads - start)
+        regions = _choices(rng, region_w, k)
+        tiers = _choices(rng, tier_w, k)
+        stages = _choices(rng, STAGE_WEIGHTS, k)
+        industries = _choices(rng, industry_w, k)
+
+        leads, scores, activities, tasks = [], [], [], []
+        for region, tier, stage, industry in zip(regions, tiers, stages, industries):
+            lead_id += 1
+            company = f"{rng.choice(COMPANY_PREFIX)} {rng.choice(COMPANY_CORE)} {rng.choice(COMPANY_SUFFIX)}".strip()
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            contact = f"{first} {last}"
+            domain = company.lower().replace(" ", "").replace("ü", "ue").replace("ö", "oe")[:20]
+            created = now - timedelta(days=rng.randint(1, 365), seconds=rng.randint(0, 86399))
+            updated = min(now, created + timedelta(days=rng.randint(0, 120)))
+            lo, hi = STAGE_DEAL_SIZE[stage]
+            deal_size = round(rng.uniform(lo, hi), 1) if stage != 'prospecting' or rng.random() < 0.1 else 0.0
+            leads.append((
+                lead_id, company, region, tier, round(rng.uniform(10, 50_000), 0), contact,
+                rng.choice(TITLES), f"{first.lower()}.{last.lower()}{lead_id}@{domain}.com",
+                f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{lead_id}",
+                stage, deal_size, industry, created.strftime(FMT), updated.strftime(FMT),
+            ))
+
+            lo, hi = STAGE_MEDDPICC[stage]
+            total = rng.randint(lo, hi)
+            parts = [0] * 8
+            for _ in range(total):
+                i = rng.randrange(8)
+                while parts[i] >= 10:
+                    i = (i + 1) % 8
+                parts[i] += 1
+            qual = 'QUALIFIED' if total >= 60 else 'PROBABLE' if total >= 40 else 'POSSIBLE' if total >= 20 else 'UNQUALIFIED'
+            scores.append((lead_id, *parts, total, qual, updated.strftime(FMT)))
+
+            lo, hi = STAGE_ACTIVITIES[stage]
+            span = max(1, (now - created).days)
+            for _ in range(rng.randint(lo, hi)):
+                ts = created + timedelta(days=rng.randint(0, span), seconds=rng.randint(0, 86399))
+                activities.append((
+                    lead_id, rng.choice(ACTIVITY_TYPES), "Synthetic activity",
+                    rng.choice(OUTCOMES), "", min(ts, now).strftime(FMT),
+                ))
+
+            if rng.random() < 0.2:
+                tasks.append((
+                    f"Follow-up {company}", "Synthetic task", rng.choice(TASK_STATUS),
+                    rng.choice(["P1", "P2", "P3"]), rng.choice(TASK_CATEGORIES), company, contact,
+                    (now + timedelta(days=rng.randint(-10, 30))).strftime('%Y-%m-%d'),
+                    None, created.strftime(FMT),
+                ))
+
+        conn.executemany("""
+            INSERT INTO leads (id, company, region, tier, aum_estimate_millions, contact_person, title,
+                               email, linkedin, stage, expected_deal_size_millions, industry,
+                               created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, leads)
+        conn.executemany("""
+            INSERT INTO meddpicc_scores (lead_id, metrics, economic_buyer, decision_process,
+                                         decision_criteria, paper_process, pain, champion, competition,
+                                         total_score, qualification_status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, scores)
+        conn.executemany("""
+            INSERT INTO activities (lead_id, activity_type, notes, outcome, next_steps, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, activities)
+        conn.executemany("""
+            INSERT INTO tasks (title, description, status, priority, category, target_company,
+                               target_contact, due_date, linkedin_url, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, tasks)
+        conn.commit()
+        counts['leads'] += len(leads)
+        counts['meddpicc_scores'] += len(scores)
+        counts['activities'] += len(activities)
+        counts['tasks'] += len(tasks)
+
+    conn.close()
+    return counts
+
+
+def synthetic_csv_rows(n_rows: int, seed: int = 7, dup_rate: float = 0.1):
+    """
+    Header + Rows im Apollo-Format für csv_importer.import_rows.
+    dup_rate: Anteil Zeilen, die eine frühere Zeile wiederholen (Dedup-Pfad)
+    """
+    rng = random.Random(seed)
+    headers = ["First Name", "Last Name", "Title", "Company", "Email", "LinkedIn Url", "City", "Industry"]
+    cities = ["Frankfurt", "Zürich", "London", "Dubai", "Stockholm", "München", "Genf", "Oslo"]
+    rows = []
+    for i in range(n_rows):
+        if rows and rng.random() < dup_rate:
+            rows.append(list(rng.choice(rows)))
+            continue
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANY_PREFIX)} {rng.choice(COMPANY_CORE)} {rng.choice(COMPANY_SUFFIX)} {i}".strip()
+        rows.append([
+            first, last, rng.choice(TITLES), company,
+            f"{first.lower()}.{last.lower()}.{i}@example.com",
+            f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{i}",
+            rng.choice(cities), rng.choice(list(INDUSTRY_WEIGHTS)),
+        ])
+    return headers, rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetische Lead-DB für Benchmarks")
+    parser.add_argument("--leads", default="10k", help="Anzahl Leads (10k, 100k, 1m oder Zahl)")
+    parser.add_argument("--out", default=None, help="Ziel-DB (default: /tmp/bench_<n>.db)")
+    parser.add_argument("--seed", type=int, default=42, help="Random Seed")
+    parser.add_argument("--from-db", default=None, help="Region/Tier/Industry-Verteilung aus echter DB lesen")
+    args = parser.parse_args()
+
+    n = SIZES.get(args.leads.lower()) or int(args.leads)
+    out = args.out or f"/tmp/bench_{args.leads.lower()}.db"
+    dists = load_distributions(args.from_db) if args.from_db else None
+
+    started = datetime.now()
+    counts = generate(out, n, seed=args.seed, distributions=dists)
+    print(f"✅ {out}: " + ", ".join(f"{t}={c:,}" for t, c in counts.items()))
+    print(f"⏱ {(datetime.now() - started).total_seconds():.1f}s")
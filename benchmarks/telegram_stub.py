@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Lokaler Telegram Bot API Stub für Tests und Durchsatz-Benchmarks
+Versteht sendMessage (HTTP/1.1 Keep-Alive), prüft das 4096-Zeichen-Limit
+und kann 429 (retry_after) bzw. 5xx injizieren. getUpdates mit Long Polling
+liefert per push_update() eingestellte Nachrichten aus (Bot-Benchmarks).
+
+    stub = TelegramStub(rate_limit_every=10).start()
+    os.environ["TELEGRAM_API_BASE"] = stub.url
+    ...
+    stub.messages / stub.connections / stub.stop()
+    stub.push_update(chat_id, "/help"); stub.wait_for(lambda m: ..., timeout=5)
+
+Standalone (manuell gegen outbox.py / Bot testen):
+  python3 -m benchmarks.telegram_stub --port 8081
+  TELEGRAM_API_BASE=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=test python3 alert_service.py stale
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class TelegramStub:
+    def __init__(self, port: int = 0, latency: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: int = 1, error_every: int = 0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.error_every = error_every
+        self.messages: List[Dict] = []
+        self.updates: List[Dict] = []
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "TelegramStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def push_update(self, chat_id, text: str) -> int:
+        """Eingehende Nachricht einstellen (wie ein User im Chat) → update_id"""
+        with self._changed:
+            update_id = len(self.updates) + 1
+            self.updates.append({"update_id": update_id, "message": {
+                "message_id": update_id, "date": int(time.time()), "text": text,
+                "chat": {"id": chat_id, "type": "private"}, "from": {"id": chat_id}}})
+            self._changed.notify_all()
+        return update_id
+
+    def wait_for(self, predicate, timeout: float = 10.0) -> Dict:
+        """Erste gesendete Nachricht mit predicate(payload) — wartet bis timeout"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                for payload in self.messages:
+                    if predicate(payload):
+                        return payload
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Keine passende Nachricht vom Bot")
+                self._changed.wait(remaining)
+
+    def _get_updates(self, params: Dict):
+        """Long Polling: wartet bis zu `timeout` Sekunden auf Updates ab `offset`"""
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        deadline = time.monotonic() + float(params.get("timeout") or 0)
+        with self._changed:
+            while True:
+                pending = [u for u in self.updates if u["update_id"] >= offset][:limit]
+                remaining = deadline - time.monotonic()
+                if pending or remaining <= 0:
+                    return 200, {"ok": True, "result": pending}
+                self._changed.wait(remaining)
+
+    def _respond(self, method: str, payload: Dict):
+        """→ (HTTP-Status, JSON)"""
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            return 429, {"ok": False, "error_code": 429,
+                         "description": f"Too Many Requests: retry after {self.retry_after}",
+                         "parameters": {"retry_after": self.retry_after}}
+        if self.error_every and n % self.error_every == 0:
+            return 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+        if method == "getUpdates":
+            return self._get_updates(payload)
+        if method != "sendMessage":
+            return 200, {"ok": True, "result": True}
+        text = payload.get("text", "")
+        if not text or len(text) > 4096:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}
+        with self._changed:
+            self.messages.append(payload)
+            message_id = len(self.messages)
+            self._changed.notify_all()
+        return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": payload.get("chat_id")},
+                                            "date": int(time.time()), "text": text}}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-Alive
+            disable_nagle_algorithm = True  # Header + Body sonst 40ms Delayed-ACK pro Request
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                params = dict(urllib.parse.parse_qsl(query))
+                self._reply(*stub._respond(path.rsplit("/", 1)[-1], params))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                method = self.path.rsplit("/", 1)[-1]
+                self._reply(*stub._respond(method, payload))
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telegram Bot API Stub")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Sekunden pro Request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="jede N-te Anfrage → 429")
+    args = parser.parse_args()
+
+    stub = TelegramStub(args.port, args.latency, args.rate_limit_every).start()
+    print(f"🧪 Telegram Stub auf {stub.url} (Ctrl+C zum Beenden)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   {stub.requests} Requests, {len(stub.messages)} Nachrichten, {stub.connections} Verbindungen")
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Bot Command Daemon für EMEA Sales Alerts
+Hält AlertService, SQLite-Connection und den Alert-Snapshot warm und
+beantwortet /next, /hot, /stale, /help über einen Unix Socket —
+bot_handler.py ist nur noch ein schlanker Client (kein Import von
+alert_service, kein DB-Open pro Command).
+
+- Snapshot-Cache: wird neu geladen, sobald ein anderer Prozess committed hat
+  (PRAGMA data_version) oder nach SNAPSHOT_TTL_SECONDS (Inaktivitäts-Tage)
+- Nachgeladen wird im Leerlauf (service_actions), nicht erst beim nächsten Command
+- Antworten werden pro Snapshot gecacht (gleicher Command → gleicher Text)
+- Protokoll: Client schickt eine Zeile (Command), Daemon antwortet mit dem
+  Text und schließt; leere Antwort = unbekannter Command
+- Der Daemon sendet nichts selbst — die Antwort geht über OpenClaw zurück
+
+Usage:
+  python3 bot_daemon.py [--socket /tmp/pipo_bot_daemon.sock] [--db bitwise_leads.db]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from typing import Optional
+
+from alert_service import DB_PATH, AlertService, AlertSnapshot, render_command
+
+# Configuration
+BOT_DAEMON_SOCKET = os.environ.get("BOT_DAEMON_SOCKET", "/tmp/pipo_bot_daemon.sock")
+SNAPSHOT_TTL_SECONDS = 60
+MAX_COMMAND_BYTES = 4096
+
+
+class WarmState:
+    """Warme Service-Instanz + Snapshot-Cache (nur aus dem Server-Thread benutzt)"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.service = AlertService(db_path, persistent=True)
+        self._snapshot: Optional[AlertSnapshot] = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._responses = {}
+        self.refresh()
+
+    def _data_version(self) -> int:
+        """Ändert sich, sobald eine andere Connection etwas committed hat"""
+        return self.service.get_connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def is_stale(self) -> bool:
+        return (self._snapshot is None
+                or time.monotonic() - self._loaded_at > SNAPSHOT_TTL_SECONDS
+                or self._data_version() != self._version)
+
+    def refresh(self):
+        self._version = self._data_version()
+        self._snapshot = self.service.snapshot()
+        self._loaded_at = time.monotonic()
+        self._responses = {}
+
+    def snapshot(self) -> AlertSnapshot:
+        if self.is_stale():
+            self.refresh()
+        return self._snapshot
+
+    def handle(self, command_text: str) -> str:
+        snapshot = self.snapshot()
+        command = command_text.strip().lower()
+        if command in self._responses:
+            return self._responses[command]
+        response = render_command(command, self.service, snapshot) or ""
+        if response:   # nur bekannte Commands cachen
+            self._responses[command] = response
+        return response
+
+
+class BotDaemon(socketserver.UnixStreamServer):
+    """Sequenzieller Server — Commands dauern Millisekunden, eine Connection reicht"""
+
+    def __init__(self, socket_path: str = BOT_DAEMON_SOCKET, db_path: str = DB_PATH):
+        self.socket_path = socket_path
+        self.state = WarmState(db_path)
+        self.commands = 0
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, CommandHandler)
+        os.chmod(socket_path, 0o600)
+
+    def service_actions(self):
+        """Leerlauf (alle ~0.5s): Snapshot nachladen, bevor der nächste Command kommt"""
+        if self.state.is_stale():
+            self.state.refresh()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        command = self.rfile.readline(MAX_COMMAND_BYTES).decode("utf-8", "replace").strip()
+        try:
+            response = self.server.state.handle(command)
+        except Exception as e:
+            response = f"❌ Fehler: {str(e)[:200]}"
+        self.server.commands += 1
+        self.wfile.write(response.encode("utf-8"))
+
+
+def _remove_stale_socket(path: str):
+    """Socket-Datei eines abgestürzten Daemons entfernen — aber keinen laufenden überschreiben"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Bot-Daemon läuft bereits auf {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warmer Command-Daemon für bot_handler.py")
+    parser.add_argument("--socket", default=BOT_DAEMON_SOCKET, help="Pfad des Unix Sockets")
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur SQLite DB")
+    args = parser.parse_args()
+
+    server = BotDaemon(args.socket, args.db)
+    # launchd/systemd stoppen per SIGTERM → sauber beenden, Socket-Datei aufräumen
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🤖 Bot-Daemon bereit auf {args.socket} ({len(server.state.snapshot().leads)} aktive Leads im Cache)")
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        print(f"Bot-Daemon gestoppt ({server.commands} Commands)")
+    finally:
+        server.server_close()
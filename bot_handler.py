@@ -1,55 +1,63 @@
 #!/usr/bin/env python3
 """
 Telegram Bot Command Handler für EMEA Sales Alerts
-Wird von OpenClaw aufgerufen wenn Commands empfangen werden
+Wird von OpenClaw aufgerufen wenn Commands empfangen werden.
+
+Schlanker Client: fragt den warmen bot_daemon.py über den Unix Socket
+(Millisekunden). Läuft kein Daemon, kommt die Antwort aus dem
+Response Cache (response_cache.py, ein SQLite-Lookup) oder wird im
+Prozess berechnet (Kaltstart: alert_service importieren, DB öffnen).
+Die Ausgabe geht über OpenClaw zurück — hier wird nichts selbst gesendet.
 """
 
-import sys
 import os
+import socket
+import sys
+
+BOT_DAEMON_SOCKET = os.environ.get("BOT_DAEMON_SOCKET", "/tmp/pipo_bot_daemon.sock")
+DAEMON_TIMEOUT = 5.0
+
 
-# Add leadtracker directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+def query_daemon(command_text: str, socket_path: str = BOT_DAEMON_SOCKET):
+    """Antwort des Daemons ('' = unbekannter Command) oder None wenn nicht erreichbar"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(DAEMON_TIMEOUT)
+            s.connect(socket_path)
+            s.sendall(command_text.strip().encode("utf-8") + b"\n")
+            chunks = []
+            while True:
+                data = s.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+        return b"".join(chunks).decode("utf-8")
+    except OSError:
+        return None
 
-from alert_service import cmd_next, cmd_hot, cmd_stale
 
 def handle_command(command_text: str) -> str:
     """
     Verarbeitet Telegram Commands und gibt Antwort zurück
-    
+
     Commands:
     /next - Zeigt wichtigste offene Task
     /hot - Top 5 Opportunities nach MEDDPICC
     /stale - Deals die schlummern (>7 Tage)
     /help - Hilfe anzeigen
     """
-    command = command_text.strip().lower()
-    
-    if command == "/next":
-        message, _ = cmd_next()
-        return message
-    
-    elif command == "/hot":
-        message, _ = cmd_hot()
-        return message
-    
-    elif command == "/stale":
-        message, _ = cmd_stale()
-        return message
-    
-    elif command in ["/help", "/start", "help"]:
-        return """🎯 *EMEA Sales Alert System*
-
-Verfügbare Commands:
-/next - Wichtigste nächste Aktivität
-/hot - Top 5 Opportunities (MEDDPICC)
-/stale - Schlummernde Deals (>7 Tage)
-/help - Diese Hilfe
+    response = query_daemon(command_text)
+    if response is not None:
+        return response or None  # Nicht behandelter Command
 
-Dashboard: https://pipo-bitwise-lead-tracker.streamlit.app
-"""
-    
-    else:
-        return None  # Nicht behandelter Command
+    # Fallback ohne Daemon: erst Response Cache (nur sqlite3), dann Kaltstart im Prozess
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from response_cache import cached_response
+    response = cached_response(command_text)
+    if response is not None:
+        return response
+    from alert_service import render_command
+    return render_command(command_text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Update-Journal für den Pipo Telegram Bot
+Macht Neustarts billig und sicher: jedes eingehende Update wird persistiert,
+BEVOR es bestätigt wird (getUpdates-Offset bzw. Webhook-200), und erst nach
+dem Handler als erledigt markiert.
+
+- bot_updates: ein Eintrag pro update_id (Payload + Status), PRIMARY KEY =
+  Idempotenz — Doppelzustellungen und Replays nach dem Offset landen im IGNORE
+- bot_state:   getUpdates-Offset; wird in derselben Transaktion wie die neuen
+  Updates fortgeschrieben (Offset nie vor dem Journal)
+- Status:      pending → processing → done | failed | skipped
+- Neustart:    processing (Absturz mitten im Handler) → pending, dann wird
+  alles Offene in update_id-Reihenfolge erneut verarbeitet
+
+Antworten des Handlers tragen den Outbox-dedupe_key "update:<id>:<gen>:<n>" —
+ein nach Absturz erneut verarbeitetes Update sendet schon eingereihte
+Nachrichten nicht noch einmal (und startet keine zweite Battle Card).
+Ein bewusstes Replay (--replay-failed) zählt generation hoch und antwortet neu.
+
+Usage:
+  python3 bot_updates.py status
+  python3 bot_updates.py failed
+  python3 bot_updates.py purge [--days 30]
+  python3 pipo_telegram_bot.py --replay-failed [update_id ...]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from outbox import OUTBOX_DB
+
+# Configuration — gleiche Datei wie die Outbox: was reinkam und was rausging liegt zusammen
+BOT_STATE_DB = os.environ.get("BOT_STATE_DB", OUTBOX_DB)
+PURGE_DAYS = 30
+
+
+class UpdateStore:
+    def __init__(self, db_path: str = BOT_STATE_DB):
+        self.db_path = db_path
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bot_updates (
+                    update_id INTEGER PRIMARY KEY,
+                    chat_id TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    generation INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    received_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bot_updates_status ON bot_updates(status, update_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bot_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+
+    # ── Eingang ──────────────────────────────────────────────────────────────
+
+    def offset(self) -> int:
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT value FROM bot_state WHERE key = 'offset'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def receive(self, updates: Iterable[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Neue Updates journalen + Offset fortschreiben, eine Transaktion.
+        → (nur die neuen Updates, Anzahl Duplikate)
+        """
+        fresh, duplicates, max_id = [], 0, None
+        now = time.time()
+        with self.get_connection() as conn:
+            for update in updates:
+                update_id = update["update_id"]
+                chat_id = (update.get("message") or {}).get("chat", {}).get("id")
+                cur = conn.execute("""
+                    INSERT OR IGNORE INTO bot_updates (update_id, chat_id, payload, received_at)
+                    VALUES (?, ?, ?, ?)
+                """, (update_id, str(chat_id) if chat_id is not None else None, json.dumps(update), now))
+                if cur.rowcount:
+                    fresh.append(update)
+                else:
+                    duplicates += 1
+                max_id = update_id if max_id is None else max(max_id, update_id)
+            if max_id is not None:
+                conn.execute("""
+                    INSERT INTO bot_state (key, value) VALUES ('offset', ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))
+                """, (max_id + 1,))
+            conn.commit()
+        return fresh, duplicates
+
+    # ── Verarbeitung ─────────────────────────────────────────────────────────
+
+    def start(self, update_id: int) -> int:
+        """→ processing; gibt die generation zurück (Teil der dedupe_keys)"""
+        with self.get_connection() as conn:
+            conn.execute("UPDATE bot_updates SET status = 'processing', attempts = attempts + 1 WHERE update_id = ?",
+                         (update_id,))
+            row = conn.execute("SELECT generation FROM bot_updates WHERE update_id = ?", (update_id,)).fetchone()
+            conn.commit()
+        return row["generation"] if row else 0
+
+    def finish(self, update_id: int, status: str = "done", error: Optional[str] = None):
+        """done | skipped (nicht autorisiert / kein Text) | failed (mit Fehlertext)"""
+        with self.get_connection() as conn:
+            conn.execute("UPDATE bot_updates SET status = ?, last_error = ?, finished_at = ? WHERE update_id = ?",
+                         (status, error, time.time(), update_id))
+            conn.commit()
+
+    def recover(self) -> List[Dict]:
+        """Nach Neustart: abgebrochene Updates wieder auf pending, alle offenen zurückgeben"""
+        with self.get_connection() as conn:
+            conn.execute("UPDATE bot_updates SET status = 'pending' WHERE status = 'processing'")
+            conn.commit()
+            rows = conn.execute(
+                "SELECT payload FROM bot_updates WHERE status = 'pending' ORDER BY update_id").fetchall()
+        return [json.loads(r["payload"]) for r in rows]
+
+    # ── Replay / Wartung ─────────────────────────────────────────────────────
+
+    def failed(self) -> List[sqlite3.Row]:
+        with self.get_connection() as conn:
+            return conn.execute("""
+                SELECT update_id, chat_id, attempts, last_error, payload FROM bot_updates
+                WHERE status = 'failed' ORDER BY update_id
+            """).fetchall()
+
+    def replay(self, update_ids: Optional[List[int]] = None) -> int:
+        """
+        failed → pending (alle oder nur update_ids), neue generation → Antworten
+        werden neu gesendet. Verarbeitet werden sie beim nächsten recover().
+        """
+        query = "UPDATE bot_updates SET status = 'pending', generation = generation + 1 WHERE status = 'failed'"
+        params: List = []
+        if update_ids:
+            query += f" AND update_id IN ({','.join('?' * len(update_ids))})"
+            params = list(update_ids)
+        with self.get_connection() as conn:
+            cur = conn.execute(query, params)
+            conn.commit()
+            return cur.rowcount
+
+    def status(self) -> Dict:
+        with self.get_connection() as conn:
+            counts = {r["status"]: r["n"] for r in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM bot_updates GROUP BY status")}
+        return {"offset": self.offset(), **counts}
+
+    def purge(self, days: int = PURGE_DAYS) -> int:
+        """Erledigte Einträge entfernen (Offset schützt vor erneuter Zustellung)"""
+        with self.get_connection() as conn:
+            cur = conn.execute("DELETE FROM bot_updates WHERE status IN ('done', 'skipped') AND finished_at < ?",
+                               (time.time() - days * 86400,))
+            conn.commit()
+            return cur.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update-Journal des Telegram Bots")
+    parser.add_argument("command", choices=["status", "failed", "purge"])
+    parser.add_argument("--db", default=BOT_STATE_DB, help="Pfad zur SQLite DB")
+    parser.add_argument("--days", type=int, default=PURGE_DAYS)
+    args = parser.parse_args()
+
+    store = UpdateStore(args.db)
+    if args.command == "status":
+        print(json.dumps(store.status(), indent=2))
+    elif args.command == "failed":
+        for row in store.failed():
+            text = (json.loads(row["payload"]).get("message") or {}).get("text", "")
+            print(f"{row['update_id']:>12}  chat {row['chat_id']}  {row['attempts']}x  {text[:40]!r}  → {row['last_error']}")
+    else:
+        print(f"{store.purge(args.days)} Einträge entfernt")
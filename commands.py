@@ -344,6 +344,90 @@ def regions():
     click.echo("-"*60)
     click.echo(f"TOTAL: {total_count} deals, €{total_value:.1f}M pipeline")
 
+@cli.command()
+@click.option('--trials', default=100_000, help='Number of Monte Carlo trials (default: 100000)')
+@click.option('--seed', default=42, help='Random seed (default: 42)')
+def forecast(trials, seed):
+    """Monte Carlo forecast: P10/P50/P90 closed value by region and quarter"""
+    from forecast import run_forecast, load_pipeline_sqlite
+
+    result = run_forecast(load_pipeline_sqlite(db.db_path), trials=trials, seed=seed)
+
+    click.echo("\n" + "="*60)
+    click.echo(f"PIPELINE FORECAST ({result.trials:,} trials)")
+    click.echo("="*60)
+
+    headers = ['Region'] + result.quarters + ['Total P10', 'Total P50', 'Total P90']
+    rows = []
+    for region, quarters in result.by_region_quarter.items():
+        total = result.by_region[region]
+        rows.append(
+            [region]
+            + [f"€{quarters[q]['p50']:.1f}M" for q in result.quarters]
+            + [f"€{total['p10']:.1f}M", f"€{total['p50']:.1f}M", f"€{total['p90']:.1f}M"]
+        )
+
+    click.echo(tabulate(rows, headers=headers, tablefmt='simple'))
+    click.echo("-"*60)
+    t = result.total
+    click.echo(f"TOTAL: P10 €{t['p10']:.1f}M | P50 €{t['p50']:.1f}M | P90 €{t['p90']:.1f}M "
+               f"({result.n_deals} deals, €{result.pipeline_value:.1f}M pipeline)")
+
+@cli.command()
+@click.option('--company', help='Seed leads: companies matching this name')
+@click.option('--ids', help='Seed leads: comma-separated lead IDs')
+@click.option('--region', type=click.Choice(['DE', 'CH', 'UK', 'UAE', 'NORDICS']),
+              help='Only return leads from this region')
+@click.option('--top', default=20, help='Number of results (default: 20)')
+def similar(company, ids, region, top):
+    """Lookalike leads: most similar to closed_won / high-MEDDPICC (or given) leads"""
+    from lookalike import LookalikeIndex, load_leads_sqlite, SEED_MIN_MEDDPICC
+
+    index = LookalikeIndex()
+    index.update(load_leads_sqlite(db.db_path))
+
+    if ids:
+        seeds, label = [int(x) for x in ids.split(',') if x.strip()], f"IDs {ids}"
+    elif company:
+        seeds, label = index.find_ids_by_company(company), company
+    else:
+        seeds, label = index.default_seed_ids(), f"closed_won / MEDDPICC >= {SEED_MIN_MEDDPICC}"
+
+    if not seeds:
+        click.echo(f"✗ No seed leads for {label}")
+        return
+
+    results = index.similar(seeds, top_k=top, region=region)
+
+    click.echo(f"\n{'='*60}")
+    click.echo(f"LOOKALIKES — similar to {label} ({len(seeds)} seeds)")
+    click.echo(f"{'='*60}")
+
+    headers = ['ID', 'Company', 'Region', 'Stage', 'MEDDPICC', 'Similarity']
+    rows = [[r['lead_id'], r['company'][:25], r['region'], r['stage'], r['meddpicc'], f"{r['similarity']:.3f}"]
+            for r in results]
+    click.echo(tabulate(rows, headers=headers, tablefmt='simple'))
+
+@cli.command()
+@click.option('--rebuild', is_flag=True, help='Re-cluster all leads from scratch')
+@click.option('--top', default=20, help='Number of accounts (default: 20)')
+def accounts(rebuild, top):
+    """Pipeline grouped by account (duplicate company names collapsed)"""
+    from entity_resolution import EntityResolver
+
+    resolver = EntityResolver(db.db_path)
+    stats = resolver.rebuild() if rebuild else resolver.resolve_pending()
+
+    click.echo(f"\n{'='*60}")
+    click.echo(f"PIPELINE BY ACCOUNT — {stats['accounts']:,} accounts")
+    click.echo(f"{'='*60}")
+
+    headers = ['Account', 'Leads', 'Pipeline (€M)', 'Max MEDDPICC', 'Variants']
+    rows = [[a['name'][:25], a['leads'], f"{a['pipeline_millions'] or 0:.1f}", a['max_meddpicc'],
+             (a['variants'] or '')[:40]]
+            for a in resolver.pipeline_by_account(top)]
+    click.echo(tabulate(rows, headers=headers, tablefmt='simple'))
+
 @cli.command()
 @click.option('--min-score', default=50, help='Minimum MEDDPICC score (default: 50)')
 def qualified(min_score):
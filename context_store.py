@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Chat-Kontext für den Pipo Telegram Bot ("zuletzt diskutierter Lead")
+Ersetzt das unbegrenzte Modul-Dict `_context`: überlebt Neustarts und
+bleibt auch bei vielen Chats klein.
+
+- Record:   kompakt — li_url, name, company + nur die Profil-/Lead-Felder,
+            die Folgebefehle brauchen (kein komplettes LinkedIn-Payload),
+            Strings gekürzt, JSON ≤ MAX_RECORD_BYTES (sonst fallen profile/db_lead weg)
+- SQLite:   chat_context in BOT_STATE_DB (neben Update-Journal und Outbox),
+            write-through bei set()
+- Speicher: LRU vor SQLite, höchstens MEMORY_CHATS Chats; ein Miss lädt aus der DB
+- TTL:      CONTEXT_TTL_SECONDS (30 Min.) ab letztem set(); abgelaufen = kein Kontext
+- Sweeper:  Hintergrund-Thread löscht abgelaufene Records (DB + Speicher)
+
+Usage:
+  python3 context_store.py status
+  python3 context_store.py show <chat_id>
+  python3 context_store.py sweep
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from bot_updates import BOT_STATE_DB
+
+# Configuration
+CONTEXT_TTL_SECONDS = int(os.environ.get("BOT_CONTEXT_TTL", "1800"))
+MEMORY_CHATS = 512
+MAX_RECORD_BYTES = 2048
+MAX_FIELD_CHARS = 200
+SWEEP_INTERVAL_SECONDS = 300
+
+# Was von Profil / DB-Lead im Kontext bleibt
+PROFILE_FIELDS = ("name", "headline", "current_title", "current_company", "location", "public_id")
+DB_LEAD_FIELDS = ("id", "company", "contact_person", "stage", "region")
+
+
+def _clip(value):
+    return value[:MAX_FIELD_CHARS] if isinstance(value, str) else value
+
+
+def _subset(data: Optional[Dict], fields) -> Optional[Dict]:
+    if not data:
+        return None
+    return {k: _clip(data[k]) for k in fields if data.get(k) not in (None, "")}
+
+
+def compact_record(li_url="", name="", company="", profile=None, db_lead=None, ts=None) -> Dict:
+    record = {
+        "li_url": _clip(li_url or ""), "name": _clip(name or ""), "company": _clip(company or ""),
+        "profile": _subset(profile, PROFILE_FIELDS), "db_lead": _subset(db_lead, DB_LEAD_FIELDS),
+        "ts": ts if ts is not None else time.time(),
+    }
+    for optional in ("profile", "db_lead"):
+        if len(json.dumps(record, ensure_ascii=False).encode()) <= MAX_RECORD_BYTES:
+            break
+        record[optional] = None
+    return record
+
+
+class ContextStore:
+    def __init__(self, db_path: str = BOT_STATE_DB, ttl: float = CONTEXT_TTL_SECONDS,
+                 memory_chats: int = MEMORY_CHATS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_chats = memory_chats
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_context (
+                    chat_id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_context_expires ON chat_context(expires_at)")
+            conn.commit()
+
+    # ── Lesen / Schreiben ────────────────────────────────────────────────────
+
+    def set(self, chat_id, **fields) -> Dict:
+        chat_id = str(chat_id)
+        record = compact_record(**fields)
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO chat_context (chat_id, payload, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (chat_id) DO UPDATE SET payload = excluded.payload, expires_at = excluded.expires_at
+            """, (chat_id, json.dumps(record, ensure_ascii=False), record["ts"] + self.ttl))
+            conn.commit()
+        with self._lock:
+            self._remember(chat_id, record)
+        return record
+
+    def get(self, chat_id) -> Optional[Dict]:
+        """Kontext oder None (nie gesetzt / älter als TTL)"""
+        chat_id = str(chat_id)
+        now = time.time()
+        with self._lock:
+            record = self._memory.get(chat_id)
+            if record is not None:
+                if now - record["ts"] < self.ttl:
+                    self._memory.move_to_end(chat_id)
+                    return record
+                del self._memory[chat_id]
+                return None
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT payload FROM chat_context WHERE chat_id = ? AND expires_at > ?",
+                               (chat_id, now)).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row["payload"])
+        if now - record["ts"] >= self.ttl:
+            return None
+        with self._lock:
+            self._remember(chat_id, record)
+        return record
+
+    def _remember(self, chat_id: str, record: Dict):
+        self._memory[chat_id] = record
+        self._memory.move_to_end(chat_id)
+        while len(self._memory) > self.memory_chats:
+            self._memory.popitem(last=False)
+
+    # ── Sweeper ──────────────────────────────────────────────────────────────
+
+    def sweep(self) -> int:
+        """Abgelaufene Records löschen (DB + Speicher)"""
+        now = time.time()
+        with self._lock:
+            for chat_id in [c for c, r in self._memory.items() if now - r["ts"] >= self.ttl]:
+                del self._memory[chat_id]
+        with self.get_connection() as conn:
+            cur = conn.execute("DELETE FROM chat_context WHERE expires_at <= ?", (now,))
+            conn.commit()
+            return cur.rowcount
+
+    def start_sweeper(self, interval: float = SWEEP_INTERVAL_SECONDS) -> threading.Thread:
+        if self._sweeper is None or not self._sweeper.is_alive():
+            self._stop.clear()
+
+            def loop():
+                while not self._stop.wait(interval):
+                    try:
+                        self.sweep()
+                    except sqlite3.Error:
+                        pass   # DB kurz gesperrt → nächste Runde
+            self._sweeper = threading.Thread(target=loop, name="context-sweeper", daemon=True)
+            self._sweeper.start()
+        return self._sweeper
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def status(self) -> Dict:
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT COUNT(*) AS n, SUM(expires_at > ?) AS live FROM chat_context",
+                               (time.time(),)).fetchone()
+        return {"records": row["n"], "live": row["live"] or 0, "in_memory": len(self._memory)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat-Kontext des Telegram Bots")
+    parser.add_argument("command", choices=["status", "show", "sweep"])
+    parser.add_argument("chat_id", nargs="?")
+    parser.add_argument("--db", default=BOT_STATE_DB, help="Pfad zur SQLite DB")
+    args = parser.parse_args()
+
+    store = ContextStore(args.db)
+    if args.command == "status":
+        print(json.dumps(store.status(), indent=2))
+    elif args.command == "show":
+        if not args.chat_id:
+            raise ValueError("show braucht eine chat_id")
+        print(json.dumps(store.get(args.chat_id), indent=2, ensure_ascii=False))
+    else:
+        print(f"{store.sweep()} abgelaufene Records entfernt")
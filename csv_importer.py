@@ -15,6 +15,8 @@ from datetime import datetime
 from typing import Optional, Dict, List, Tuple, Any
 from pathlib import Path
 
+from entity_resolution import EntityResolver
+
 try:
     import openpyxl
     HAS_OPENPYXL = True
@@ -203,6 +205,10 @@ def import_rows(
     for field, idx in col_map.items():
         print(f"   {field} → '{headers[idx]}'")
 
+    # Account-Index auf Stand bringen (nur neue/geänderte Leads)
+    resolver = EntityResolver(db_path)
+    resolver.resolve_pending()
+
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
 
@@ -239,6 +245,11 @@ def import_rows(
             # Deduplizierung
             fps = build_fingerprint(email, company)
             is_dup = any(fp in existing_fps for fp in fps)
+            matched = None
+            if not is_dup:
+                # Fuzzy: "Deutsche Bank AG" vs. "Deutsche Bank" / gleiche Firmen-Domain
+                matched = resolver.match(conn, company, email, linkedin or "", website)
+                is_dup = matched[0] is not None
             if is_dup:
                 stats["skipped_dup"] += 1
                 continue
@@ -274,7 +285,7 @@ def import_rows(
                 linkedin = None
 
             if not dry_run:
-                conn.execute("""
+                cur = conn.execute("""
                     INSERT INTO leads (
                         company, region, tier, contact_person, title, email, linkedin,
                         stage, industry, use_case, staking_readiness,
@@ -287,6 +298,7 @@ def import_rows(
                     "Unknown",
                     0.0, 0.0, 0.0
                 ))
+                resolver.assign(conn, cur.lastrowid, company, email, linkedin or "", website, matched=matched)
 
             # Fingerprints aktualisieren für diese Session
             for fp in fps:
@@ -2,9 +2,88 @@
 Database operations
 """
 import sqlite3
+from datetime import datetime, timezone
 from typing import Optional, List
 from models import Lead, MEDDPICCScore, Region, Tier, Stage
 
+# Kanonisches Timestamp-Format (UTC, wie CURRENT_TIMESTAMP) — sortier- und
+# vergleichbar als String, julianday()/datetime() lesen es ohne Parsing-Fallbacks.
+# Gespeichert wird immer UTC: SQL-Writer nutzen CURRENT_TIMESTAMP, Python-Writer
+# to_db_timestamp(). Die Trigger normalisieren nur das Format (Offsets → UTC);
+# ein String ohne Offset gilt als UTC, lokale Zeit also nie als nackten String schreiben.
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# (Tabelle, Spalte) die beim Schreiben normalisiert werden
+TIMESTAMP_COLUMNS = [
+    ('leads', 'created_at'),
+    ('leads', 'updated_at'),
+    ('activities', 'created_at'),
+    ('meddpicc_scores', 'updated_at'),
+]
+
+# Indexe für Alert-/Briefing-Queries (Inaktivität, letzte Activity pro Lead)
+TIMESTAMP_INDEXES = [
+    ('activities', 'idx_activities_lead_created', 'activities(lead_id, created_at)'),
+    ('leads', 'idx_leads_stage_updated', 'leads(stage, updated_at)'),
+    ('meddpicc_scores', 'idx_meddpicc_total', 'meddpicc_scores(total_score)'),
+]
+
+
+def to_db_timestamp(value=None) -> str:
+    """
+    Für Python-Writer: → 'YYYY-MM-DD HH:MM:SS' in UTC (None = jetzt).
+    datetime ohne TZ (datetime.now()) gilt als lokale Zeit und wird umgerechnet;
+    ISO-Strings ohne Offset gelten wie in der DB als UTC.
+    """
+    if value is None:
+        value = datetime.now(timezone.utc)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def ensure_timestamp_normalization(conn: sqlite3.Connection):
+    """
+    Installiert Trigger, die Timestamps beim INSERT/UPDATE ins kanonische
+    Format bringen (egal welcher Writer), normalisiert Altbestände einmalig
+    und legt die Indexe für Inaktivitäts-Filter an. Idempotent.
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    triggers = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    columns = {t: {r[1] for r in conn.execute(f"PRAGMA table_info({t})")} for t in tables}
+
+    for table, column in TIMESTAMP_COLUMNS:
+        if column not in columns.get(table, set()):
+            continue
+        name = f"trg_{table}_{column}_canonical"
+        if f"{name}_insert" in triggers:
+            continue
+        # datetime() rechnet TZ-Offsets nach UTC um; NULL / unparsebar bleibt unverändert
+        condition = f"NEW.{column} IS NOT NULL AND datetime(NEW.{column}) IS NOT NULL " \
+                    f"AND NEW.{column} != datetime(NEW.{column})"
+        for event in ('INSERT', f'UPDATE OF {column}'):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {name}_{event.split()[0].lower()}
+                AFTER {event} ON {table}
+                WHEN {condition}
+                BEGIN
+                    UPDATE {table} SET {column} = datetime(NEW.{column}) WHERE rowid = NEW.rowid;
+                END
+            """)
+        conn.execute(f"""
+            UPDATE {table} SET {column} = datetime({column})
+            WHERE {column} IS NOT NULL AND datetime({column}) IS NOT NULL AND {column} != datetime({column})
+        """)
+
+    for table, index, definition in TIMESTAMP_INDEXES:
+        column = definition[definition.index('(') + 1:].split(',')[0].strip(' )')
+        if column in columns.get(table, set()):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {definition}")
+    conn.commit()
+
+
 class Database:
     def __init__(self, db_path: str = "bitwise_leads.db"):
         self.db_path = db_path
@@ -76,6 +155,7 @@ class Database:
                 )
             """)
             
+            ensure_timestamp_normalization(conn)
             conn.commit()
     
     def create_lead(self, lead: Lead) -> int:
@@ -106,7 +186,8 @@ class Database:
     
     def update_lead_stage(self, lead_id: int, stage: str):
         with self.get_connection() as conn:
-            conn.execute("UPDATE leads SET stage = ? WHERE id = ?", (stage, lead_id))
+            conn.execute("UPDATE leads SET stage = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                         (stage, lead_id))
             conn.commit()
     
     def set_meddpicc_score(self, lead_id: int, score: MEDDPICCScore):
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Entity Resolution für Bitwise Lead Tracker
+Fasst Leads derselben Firma zu Accounts zusammen — auch wenn die Quellen
+den Namen unterschiedlich schreiben ("Deutsche Bank AG", "Deutsche Bank",
+"DB Private Bank").
+
+- Normalisierung: Umlaute, Satzzeichen, Rechtsformen (AG, GmbH, Ltd, ...)
+- Blocking: Namens-Tokens, Akronym, Domain (Website / Email / LinkedIn Company)
+  → verglichen wird nur innerhalb eines Blocks, nie O(n²)
+- Scorer: Jaro-Winkler + Trigram-Jaccard auf dem Namenskern, Containment- und Akronym-Regel;
+  unterschiedliche Zahlen-Tokens ("Fund 1" ↔ "Fund 2") sind nie dieselbe Firma
+- Clustering: Union-Find (Full Rebuild) bzw. Key-Index (inkrementell)
+- Ergebnis: lead_accounts (lead_id → account_id) + accounts
+
+Usage:
+  python3 entity_resolution.py --rebuild     → Alle Leads neu clustern
+  python3 entity_resolution.py               → Nur neue/geänderte Leads zuordnen
+  python3 entity_resolution.py --accounts    → Pipeline nach Account
+  python3 entity_resolution.py --match "DB Private Bank"
+"""
+
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+
+MATCH_THRESHOLD = 0.90      # Ab hier gelten zwei Namen als gleiche Firma
+MAX_BLOCK_SIZE = 500        # Größere Blöcke sind zu unspezifisch (z.B. "capital")
+MAX_MATCH_BLOCK_SIZE = 50   # Inkrementell (pro Zeile): größere Blöcke nur exakt/per Domain
+
+LEGAL_SUFFIXES = {
+    'ag', 'gmbh', 'mbh', 'se', 'sa', 'sas', 'sarl', 'spa', 'nv', 'bv', 'ltd', 'limited', 'plc',
+    'llc', 'llp', 'lp', 'inc', 'corp', 'corporation', 'co', 'kg', 'kgaa', 'ohg', 'eg', 'ev',
+    'ab', 'asa', 'as', 'oy', 'oyj', 'aps', 'group', 'gruppe', 'holding', 'holdings', 'the',
+    'fzco', 'fze', 'dmcc', 'pjsc', 'psc',
+}
+# Tokens die allein nichts über die Firma aussagen → kein Blocking-Key
+GENERIC_TOKENS = {
+    'bank', 'capital', 'asset', 'assets', 'management', 'partners', 'invest', 'investment',
+    'investments', 'fund', 'funds', 'digital', 'crypto', 'finance', 'financial', 'global',
+    'international', 'private', 'trust', 'ventures', 'securities', 'services', 'solutions',
+    'family', 'office', 'wealth', 'advisors', 'and', 'und', 'de', 'of', 'la', 'le',
+}
+FREE_MAIL_DOMAINS = {
+    'gmail.com', 'googlemail.com', 'outlook.com', 'hotmail.com', 'yahoo.com', 'icloud.com',
+    'gmx.de', 'gmx.net', 'web.de', 't-online.de', 'protonmail.com', 'proton.me', 'me.com',
+    'live.com', 'aol.com', 'example.com',
+}
+LINKEDIN_COMPANY_RE = re.compile(r'linkedin\.com/company/([^/?#\s]+)', re.IGNORECASE)
+DOMAIN_RE = re.compile(r'^(?:https?://)?(?:www\.)?([^/:?#\s]+)', re.IGNORECASE)
+
+
+# ============================================
+# Normalisierung + Blocking Keys
+# ============================================
+
+def normalize_company(name: str) -> str:
+    """'Deutsche Bank AG' → 'deutsche bank', 'Bär & Cie.' → 'baer cie'"""
+    if not name:
+        return ''
+    text = name.lower()
+    for src, dst in (('ä', 'ae'), ('ö', 'oe'), ('ü', 'ue'), ('ß', 'ss')):
+        text = text.replace(src, dst)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    tokens = text.split()
+    # Rechtsformen nur am Ende entfernen, mind. ein Token bleibt
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == 'the':
+        tokens.pop(0)
+    return ' '.join(tokens)
+
+
+def extract_domain(website: str = '', email: str = '', linkedin: str = '') -> str:
+    """Firmen-Domain aus Website, Email oder LinkedIn-Company-URL"""
+    if website:
+        m = DOMAIN_RE.match(website.strip())
+        if m and '.' in m.group(1) and 'linkedin.com' not in m.group(1).lower():
+            return m.group(1).lower()
+    if email and '@' in email:
+        domain = email.rsplit('@', 1)[1].strip().lower()
+        if domain and domain not in FREE_MAIL_DOMAINS:
+            return domain
+    if linkedin:
+        m = LINKEDIN_COMPANY_RE.search(linkedin)
+        if m:
+            return f"linkedin:{m.group(1).lower().rstrip('/')}"
+    return ''
+
+
+def acronym(norm_name: str) -> str:
+    tokens = norm_name.split()
+    return ''.join(t[0] for t in tokens) if len(tokens) >= 2 else ''
+
+
+def blocking_keys(norm_name: str, domain: str = '') -> Set[str]:
+    """
+    Keys unter denen ein Name verglichen wird:
+    - tok:<erstes nicht-generisches Token>
+    - acr:<Akronym> bzw. acr:<kurzes erstes Token> ("db private bank" ↔ "deutsche bank")
+    - dom:<domain>
+    """
+    keys = set()
+    tokens = norm_name.split()
+    specific = [t for t in tokens if t not in GENERIC_TOKENS and len(t) > 1]
+    if specific:
+        keys.add(f"tok:{specific[0]}")
+    elif tokens:
+        keys.add(f"tok:{tokens[0]}")
+    acr = acronym(norm_name)
+    if len(acr) >= 2:
+        keys.add(f"acr:{acr}")
+    if tokens and 2 <= len(tokens[0]) <= 4 and len(tokens) >= 2:
+        keys.add(f"acr:{tokens[0]}")
+    if domain:
+        keys.add(f"dom:{domain}")
+    return keys
+
+
+# ============================================
+# Similarity
+# ============================================
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    if a == b:
+        return 1.0
+    la, lb = len(a), len(b)
+    if not la or not lb:
+        return 0.0
+    window = max(la, lb) // 2 - 1
+    a_match = [False] * la
+    b_match = [False] * lb
+    matches = 0
+    for i, ch in enumerate(a):
+        lo, hi = max(0, i - window), min(lb, i + window + 1)
+        for j in range(lo, hi):
+            if not b_match[j] and b[j] == ch:
+                a_match[i] = b_match[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    transpositions, k = 0, 0
+    for i in range(la):
+        if a_match[i]:
+            while not b_match[k]:
+                k += 1
+            if a[i] != b[k]:
+                transpositions += 1
+            k += 1
+    m = float(matches)
+    jaro = (m / la + m / lb + (m - transpositions / 2) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def _trigrams(s: str) -> Set[str]:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def trigram_jaccard(a: str, b: str) -> float:
+    ta, tb = _trigrams(a), _trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+
+
+def _numbers(norm_name: str) -> Set[str]:
+    return {t for t in norm_name.split() if t.isdigit()}
+
+
+def _core(norm_name: str) -> str:
+    """Name ohne generische Tokens: 'white star capital' → 'white star'"""
+    return ' '.join(t for t in norm_name.split() if t not in GENERIC_TOKENS) or norm_name
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    Ähnlichkeit zweier normalisierter Firmennamen (0-1).
+    Verglichen wird der Kern ohne generische Tokens — sonst sehen sich
+    'logos capital' und 'lotus capital' allein wegen 'capital' ähnlich.
+    Containment- und Akronym-Regel heben den Score für typische Varianten.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if _numbers(a) != _numbers(b):
+        # "alpen bank 17" ↔ "alpen bank 1234": Nummern sind Teil der Identität
+        return 0.0
+    ca, cb = _core(a), _core(b)
+    score = 0.0
+    if ca != cb:
+        # hohe JW nur zählen wenn auch Trigramme überlappen
+        score = min(jaro_winkler(ca, cb), 0.3 + trigram_jaccard(ca, cb))
+
+    # Ein Name enthält den anderen, Rest nur generisch:
+    # "bank julius baer" ↔ "julius baer", "sygnum bank" ↔ "sygnum" (nicht "alpen capital" ↔ "alpen trust")
+    ta, tb = a.split(), b.split()
+    short, long_ = (set(ta), set(tb)) if len(ta) <= len(tb) else (set(tb), set(ta))
+    specific = short - GENERIC_TOKENS
+    if specific and short <= long_ and not (long_ - short - GENERIC_TOKENS):
+        if len(specific) >= 2 or max(len(t) for t in specific) >= 5:
+            score = max(score, 0.93)
+
+    # Akronym-Regel: "db private bank" ↔ "deutsche bank"
+    for abbr, full in ((ta, tb), (tb, ta)):
+        if len(abbr) >= 2 and len(full) >= 2 and abbr[0] == acronym(' '.join(full)):
+            # Rest nur generisch und teils im vollen Namen: nicht "vc gw capital" ↔ "vang capital"
+            rest = set(abbr[1:])
+            if rest <= GENERIC_TOKENS and rest & set(full):
+                score = max(score, 0.92)
+    return score
+
+
+def _similar_enough(a: str, b: str, dom_a: str = '', dom_b: str = '') -> bool:
+    if dom_a and dom_b:
+        # Gleiche Domain = gleiche Firma, unterschiedliche Domain = verschiedene
+        return dom_a == dom_b
+    return name_similarity(a, b) >= MATCH_THRESHOLD
+
+
+# ============================================
+# Union-Find
+# ============================================
+
+class UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: str, b: str):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+# ============================================
+# Resolver
+# ============================================
+
+class EntityResolver:
+    """
+    Pflegt lead_accounts / accounts / account_keys in SQLite.
+    rebuild() clustert alles neu, resolve_pending() ordnet nur Leads ohne
+    (oder mit geändertem) Account zu.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.init_tables()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_tables(self):
+        with self.get_connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS accounts (
+                    account_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    norm_name TEXT NOT NULL,
+                    domain TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE TABLE IF NOT EXISTS lead_accounts (
+                    lead_id INTEGER PRIMARY KEY,
+                    account_id INTEGER NOT NULL,
+                    norm_name TEXT NOT NULL,
+                    domain TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_lead_accounts_account ON lead_accounts(account_id);
+                CREATE TABLE IF NOT EXISTS account_keys (
+                    block_key TEXT NOT NULL,
+                    norm_name TEXT NOT NULL,
+                    account_id INTEGER NOT NULL,
+                    domain TEXT,
+                    PRIMARY KEY (block_key, norm_name, account_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_account_keys_account ON account_keys(account_id);
+            """)
+
+    def _load_leads(self, conn, pending_only: bool) -> List[sqlite3.Row]:
+        query = """
+            SELECT l.id, l.company, l.email, l.linkedin, la.norm_name as known_norm
+            FROM leads l
+            LEFT JOIN lead_accounts la ON la.lead_id = l.id
+        """
+        rows = conn.execute(query).fetchall()
+        if not pending_only:
+            return rows
+        return [r for r in rows if r['known_norm'] is None or r['known_norm'] != normalize_company(r['company'])]
+
+    # ── Full Rebuild ──────────────────────────────────────────────────────────
+
+    def rebuild(self) -> Dict[str, int]:
+        """Clustert alle Leads neu (Blocking + Union-Find über eindeutige Namen)"""
+        with self.get_connection() as conn:
+            leads = self._load_leads(conn, pending_only=False)
+
+            # Eindeutige Namen: identische normalisierte Namen sind trivial gleich
+            name_domains: Dict[str, Set[str]] = defaultdict(set)
+            display: Dict[str, str] = {}
+            lead_info = []
+            for r in leads:
+                norm = normalize_company(r['company'])
+                if not norm:
+                    continue
+                domain = extract_domain(email=r['email'] or '', linkedin=r['linkedin'] or '')
+                lead_info.append((r['id'], norm, domain))
+                if domain:
+                    name_domains[norm].add(domain)
+                display.setdefault(norm, r['company'])
+
+            uf = UnionFind()
+            blocks: Dict[str, List[str]] = defaultdict(list)
+            for norm in display:
+                uf.find(norm)
+                domain = next(iter(name_domains[norm]), '') if len(name_domains[norm]) == 1 else ''
+                for key in blocking_keys(norm, domain):
+                    blocks[key].append(norm)
+
+            comparisons = 0
+            for key, names in blocks.items():
+                if len(names) < 2:
+                    continue
+                if key.startswith('dom:'):
+                    # Gleiche Domain → gleiche Firma, ohne Namensvergleich
+                    for other in names[1:]:
+                        uf.union(names[0], other)
+                    continue
+                if len(names) > MAX_BLOCK_SIZE:
+                    continue
+                for i in range(len(names)):
+                    for j in range(i + 1, len(names)):
+                        a, b = names[i], names[j]
+                        if uf.find(a) == uf.find(b):
+                            continue
+                        comparisons += 1
+                        da = name_domains[a] if len(name_domains[a]) == 1 else set()
+                        db = name_domains[b] if len(name_domains[b]) == 1 else set()
+                        if _similar_enough(a, b, next(iter(da), ''), next(iter(db), '')):
+                            uf.union(a, b)
+
+            # Cluster → Accounts
+            conn.execute("DELETE FROM lead_accounts")
+            conn.execute("DELETE FROM account_keys")
+            conn.execute("DELETE FROM accounts")
+            root_account: Dict[str, int] = {}
+            for norm in sorted(display):
+                root = uf.find(norm)
+                if root not in root_account:
+                    domain = next(iter(name_domains[root]), '')
+                    cur = conn.execute(
+                        "INSERT INTO accounts (name, norm_name, domain) VALUES (?, ?, ?)",
+                        (display[root], root, domain or None))
+                    root_account[root] = cur.lastrowid
+
+            conn.executemany(
+                "INSERT INTO lead_accounts (lead_id, account_id, norm_name, domain) VALUES (?, ?, ?, ?)",
+                [(lead_id, root_account[uf.find(norm)], norm, domain or None)
+                 for lead_id, norm, domain in lead_info])
+            conn.executemany(
+                "INSERT OR IGNORE INTO account_keys (block_key, norm_name, account_id, domain) VALUES (?, ?, ?, ?)",
+                [(key, norm, root_account[uf.find(norm)], next(iter(name_domains[norm]), None))
+                 for norm in display
+                 for key in blocking_keys(norm, next(iter(name_domains[norm]), ''))])
+            conn.commit()
+
+        return {'leads': len(lead_info), 'names': len(display),
+                'accounts': len(root_account), 'comparisons': comparisons}
+
+    # ── Inkrementell ──────────────────────────────────────────────────────────
+
+    def match(self, conn, company: str, email: str = '', linkedin: str = '',
+              website: str = '') -> Tuple[Optional[int], str, str]:
+        """
+        Sucht den Account zu einem Firmennamen über den Key-Index.
+        Erst Domain und exakter Name (Index-Lookup), dann fuzzy — aber nur in
+        Blöcken bis MAX_MATCH_BLOCK_SIZE; der Vergleich läuft pro Importzeile.
+        Returns: (account_id oder None, norm_name, domain)
+        """
+        norm = normalize_company(company)
+        domain = extract_domain(website=website, email=email, linkedin=linkedin)
+        if not norm:
+            return None, norm, domain
+
+        keys = blocking_keys(norm, domain)
+        name_keys = [k for k in keys if not k.startswith('dom:')]
+        placeholders = ','.join('?' * len(keys))
+        row = conn.execute(f"""
+            SELECT account_id FROM account_keys
+            WHERE block_key IN ({placeholders}) AND (norm_name = ? OR block_key = ?)
+            ORDER BY block_key LIKE 'dom:%' DESC
+            LIMIT 1
+        """, (*keys, norm, f"dom:{domain}")).fetchone()
+        if row is not None:
+            return row['account_id'], norm, domain
+
+        small = [k for k in name_keys if conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM account_keys WHERE block_key = ? LIMIT ?)",
+            (k, MAX_MATCH_BLOCK_SIZE + 1)).fetchone()[0] <= MAX_MATCH_BLOCK_SIZE]
+        if not small:
+            return None, norm, domain
+        candidates = conn.execute(f"""
+            SELECT norm_name, account_id, domain FROM account_keys
+            WHERE block_key IN ({','.join('?' * len(small))})
+        """, tuple(small)).fetchall()
+
+        best, best_score = None, 0.0
+        for c in candidates:
+            if _similar_enough(norm, c['norm_name'], domain, c['domain'] or ''):
+                score = name_similarity(norm, c['norm_name'])
+                if score > best_score:
+                    best, best_score = c['account_id'], score
+        return best, norm, domain
+
+    def assign(self, conn, lead_id: int, company: str, email: str = '', linkedin: str = '',
+               website: str = '', matched: Optional[Tuple[Optional[int], str, str]] = None) -> Optional[int]:
+        """
+        Ordnet einen Lead einem (ggf. neuen) Account zu und pflegt den Key-Index.
+        matched: Ergebnis eines match() auf derselben Connection (spart den zweiten Lookup)
+        """
+        account_id, norm, domain = matched or self.match(conn, company, email, linkedin, website)
+        if not norm:
+            return None
+        if account_id is None:
+            cur = conn.execute(
+                "INSERT INTO accounts (name, norm_name, domain) VALUES (?, ?, ?)",
+                (company, norm, domain or None))
+            account_id = cur.lastrowid
+        conn.execute(
+            "INSERT OR REPLACE INTO lead_accounts (lead_id, account_id, norm_name, domain) VALUES (?, ?, ?, ?)",
+            (lead_id, account_id, norm, domain or None))
+        conn.executemany(
+            "INSERT OR IGNORE INTO account_keys (block_key, norm_name, account_id, domain) VALUES (?, ?, ?, ?)",
+            [(key, norm, account_id, domain or None) for key in blocking_keys(norm, domain)])
+        return account_id
+
+    def resolve_pending(self) -> Dict[str, int]:
+        """Ordnet nur neue Leads bzw. Leads mit geändertem Firmennamen zu"""
+        with self.get_connection() as conn:
+            pending = self._load_leads(conn, pending_only=True)
+            for r in pending:
+                self.assign(conn, r['id'], r['company'], r['email'] or '', r['linkedin'] or '')
+            conn.commit()
+            accounts = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        return {'assigned': len(pending), 'accounts': accounts}
+
+    # ── Aggregate ─────────────────────────────────────────────────────────────
+
+    def pipeline_by_account(self, limit: int = 20) -> List[Dict]:
+        """Pipeline gruppiert nach Account (aktive Leads)"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT
+                    a.account_id,
+                    a.name,
+                    COUNT(l.id) as leads,
+                    GROUP_CONCAT(DISTINCT l.company) as variants,
+                    SUM(l.expected_deal_size_millions) as pipeline_millions,
+                    MAX(COALESCE(m.total_score, 0)) as max_meddpicc
+                FROM accounts a
+                JOIN lead_accounts la ON la.account_id = a.account_id
+                JOIN leads l ON l.id = la.lead_id
+                LEFT JOIN meddpicc_scores m ON m.lead_id = l.id
+                WHERE l.stage NOT IN ('closed_won', 'closed_lost')
+                GROUP BY a.account_id
+                ORDER BY pipeline_millions DESC, leads DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Company Entity Resolution")
+    parser.add_argument("--db", default=DB_PATH, help="DB Pfad")
+    parser.add_argument("--rebuild", action="store_true", help="Alle Leads neu clustern")
+    parser.add_argument("--accounts", action="store_true", help="Pipeline nach Account anzeigen")
+    parser.add_argument("--match", default=None, help="Account für einen Firmennamen suchen")
+    parser.add_argument("--limit", type=int, default=20, help="Anzahl Accounts")
+    args = parser.parse_args()
+
+    resolver = EntityResolver(args.db)
+    started = datetime.now()
+
+    if args.match:
+        resolver.resolve_pending()
+        with resolver.get_connection() as conn:
+            account_id, norm, _ = resolver.match(conn, args.match)
+            if account_id:
+                acc = conn.execute("SELECT name FROM accounts WHERE account_id = ?", (account_id,)).fetchone()
+                variants = conn.execute(
+                    "SELECT DISTINCT l.company FROM lead_accounts la JOIN leads l ON l.id = la.lead_id "
+                    "WHERE la.account_id = ?", (account_id,)).fetchall()
+                print(f"✅ '{args.match}' → Account #{account_id} {acc['name']}")
+                print("   Varianten: " + ", ".join(v[0] for v in variants))
+            else:
+                print(f"❌ Kein Account für '{args.match}' ('{norm}')")
+    elif args.accounts:
+        resolver.resolve_pending()
+        print(f"{'Account':<40} {'Leads':>6} {'Pipeline':>10} {'MEDDPICC':>9}")
+        print("-" * 68)
+        for a in resolver.pipeline_by_account(args.limit):
+            print(f"{a['name'][:40]:<40} {a['leads']:>6} €{(a['pipeline_millions'] or 0):>8.1f}M {a['max_meddpicc']:>9}")
+    else:
+        stats = resolver.rebuild() if args.rebuild else resolver.resolve_pending()
+        print("✅ " + ", ".join(f"{k}={v:,}" for k, v in stats.items()))
+
+    print(f"⏱ {(datetime.now() - started).total_seconds():.2f}s")
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Pipeline Forecast Engine für Bitwise EMEA
+Monte-Carlo-Simulation über die aktive Pipeline:
+- Close-Wahrscheinlichkeit aus Stage + MEDDPICC total_score
+- Close-Quartal aus Stage (erwartete Restlaufzeit, mit Jitter)
+- Deal Size mit Unsicherheit (lognormal)
+Ergebnis: P10/P50/P90 Closed Value nach Region und Quartal.
+
+Usage:
+  python3 forecast.py                 → Forecast aus SQLite (DB_PATH)
+  python3 forecast.py --trials 200000 → Mehr Trials
+  python3 forecast.py --json          → Rohdaten als JSON
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from dataclasses import dataclass, field, asdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Iterable, Any
+
+import numpy as np
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+FORECAST_CACHE_FILE = os.environ.get("FORECAST_CACHE_FILE", "/tmp/pipo_forecast_cache.json")
+
+DEFAULT_TRIALS = 100_000
+HORIZON_QUARTERS = 4           # Aktuelles Quartal + 3 folgende
+CHUNK_CELLS = 4_000_000        # Max. Trials × Deals pro Chunk (~32MB float64)
+DEAL_SIZE_SIGMA = 0.25         # Lognormal-Streuung der Deal Size
+CLOSE_DATE_SIGMA = 0.35        # Lognormal-Streuung der Restlaufzeit
+
+# Basis-Winrate pro Stage (bei MEDDPICC 40/80)
+STAGE_WIN_PROB = {
+    'prospecting': 0.05,
+    'discovery': 0.10,
+    'solutioning': 0.25,
+    'validation': 0.45,
+    'negotiation': 0.70,
+}
+
+# Erwartete Tage bis Close pro Stage
+STAGE_DAYS_TO_CLOSE = {
+    'prospecting': 270,
+    'discovery': 180,
+    'solutioning': 120,
+    'validation': 75,
+    'negotiation': 30,
+}
+
+REGIONS = ['DE', 'CH', 'UK', 'UAE', 'NORDICS']
+MAX_WIN_PROB = 0.95
+
+# In-Process Cache: fingerprint → ForecastResult
+_CACHE: Dict[str, "ForecastResult"] = {}
+
+
+@dataclass
+class ForecastResult:
+    """P10/P50/P90 Closed Value (€M) nach Region und Quartal"""
+    fingerprint: str
+    as_of: str
+    trials: int
+    n_deals: int
+    pipeline_value: float        # Roh-Summe expected_deal_size_millions
+    expected_value: float        # Σ p(win) × deal size
+    quarters: List[str]
+    total: Dict[str, float] = field(default_factory=dict)
+    by_region: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    by_quarter: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    by_region_quarter: Dict[str, Dict[str, Dict[str, float]]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ForecastResult":
+        return cls(**data)
+
+
+# ============================================
+# Wahrscheinlichkeiten
+# ============================================
+
+def close_probability(stage: str, meddpicc: float) -> float:
+    """
+    Close-Wahrscheinlichkeit aus Stage-Basisrate und MEDDPICC.
+    MEDDPICC 0/80 → 0.5× Basisrate, 40/80 → 1.0×, 80/80 → 1.5×
+    """
+    base = STAGE_WIN_PROB.get((stage or '').lower(), 0.0)
+    factor = 0.5 + max(0.0, min(float(meddpicc or 0), 80.0)) / 80.0
+    return min(MAX_WIN_PROB, base * factor)
+
+
+def quarter_labels(as_of: date, n: int = HORIZON_QUARTERS) -> List[str]:
+    """Labels für die nächsten n Quartale ab as_of, z.B. ['Q1 2026', 'Q2 2026', ...]"""
+    q = (as_of.month - 1) // 3
+    labels = []
+    for i in range(n):
+        qi = q + i
+        labels.append(f"Q{qi % 4 + 1} {as_of.year + qi // 4}")
+    return labels
+
+
+# ============================================
+# Input-Normalisierung
+# ============================================
+
+def normalize_deals(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalisiert Lead-Records aus SQLite, Supabase oder DataFrame-Rows.
+    Akzeptiert 'meddpicc' oder 'total_score' sowie 'deal_size' oder
+    'expected_deal_size_millions'. Nur aktive Deals mit Deal Size > 0 zählen.
+    """
+    deals = []
+    for r in records:
+        stage = str(r.get('stage') or 'prospecting').lower()
+        if stage not in STAGE_WIN_PROB:
+            continue
+        size = r.get('deal_size')
+        if size is None:
+            size = r.get('expected_deal_size_millions')
+        try:
+            size = float(size or 0)
+        except (TypeError, ValueError):
+            size = 0.0
+        if size != size or size <= 0:  # NaN oder leer
+            continue
+        medd = r.get('meddpicc')
+        if medd is None:
+            medd = r.get('total_score')
+        try:
+            medd = int(medd or 0)
+        except (TypeError, ValueError):
+            medd = 0
+        deals.append({
+            'region': str(r.get('region') or 'DE').upper(),
+            'stage': stage,
+            'meddpicc': medd,
+            'deal_size': round(size, 4),
+        })
+    return deals
+
+
+def load_pipeline_sqlite(db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Lädt die aktive Pipeline aus SQLite"""
+    query = """
+    SELECT
+        l.region,
+        l.stage,
+        l.expected_deal_size_millions as deal_size,
+        COALESCE(
+            m.metrics + m.economic_buyer + m.decision_process + m.decision_criteria +
+            m.paper_process + m.pain + m.champion + m.competition,
+            0
+        ) as meddpicc
+    FROM leads l
+    LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+    WHERE l.stage NOT IN ('closed_won', 'closed_lost')
+      AND l.expected_deal_size_millions > 0
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(query).fetchall()
+    finally:
+        conn.close()
+    return normalize_deals(dict(r) for r in rows)
+
+
+# ============================================
+# Cache
+# ============================================
+
+def input_fingerprint(deals: List[Dict[str, Any]], trials: int, seed: int, as_of: date) -> str:
+    """Stabiler Hash über alle Inputs — ändert sich nur wenn sich die Pipeline ändert"""
+    payload = json.dumps({
+        'deals': sorted((d['region'], d['stage'], d['meddpicc'], d['deal_size']) for d in deals),
+        'trials': trials,
+        'seed': seed,
+        'as_of': as_of.isoformat(),
+        'params': [STAGE_WIN_PROB, STAGE_DAYS_TO_CLOSE, DEAL_SIZE_SIGMA, CLOSE_DATE_SIGMA],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _load_disk_cache() -> Dict[str, Any]:
+    try:
+        with open(FORECAST_CACHE_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_disk_cache(result: ForecastResult):
+    cache = _load_disk_cache()
+    cache[result.fingerprint] = result.to_dict()
+    # Nur die letzten 8 Forecasts behalten
+    if len(cache) > 8:
+        for key in sorted(cache, key=lambda k: cache[k].get('as_of', ''))[:-8]:
+            cache.pop(key, None)
+    try:
+        with open(FORECAST_CACHE_FILE, 'w') as f:
+            json.dump(cache, f)
+    except Exception:
+        pass
+
+
+# ============================================
+# Monte Carlo
+# ============================================
+
+def _percentiles(samples: np.ndarray) -> Dict[str, float]:
+    p10, p50, p90 = np.percentile(samples, [10, 50, 90])
+    return {'p10': round(float(p10), 1), 'p50': round(float(p50), 1), 'p90': round(float(p90), 1)}
+
+
+def simulate(
+    deals: List[Dict[str, Any]],
+    trials: int = DEFAULT_TRIALS,
+    seed: int = 42,
+    as_of: Optional[date] = None,
+) -> ForecastResult:
+    """
+    Vektorisierte Monte-Carlo-Simulation.
+
+    Pro Chunk wird eine (Trials × Deals) Win-Matrix gezogen:
+    1. won = U(0,1) < p(win)
+    2. nur für gewonnene Zellen: value = deal_size × lognormal(σ)
+    3. close_day = days_to_close × lognormal(σ) → Quartals-Bucket
+    Die Werte werden per bincount auf (Trial × Region×Quartal) aggregiert.
+    """
+    as_of = as_of or date.today()
+    fingerprint = input_fingerprint(deals, trials, seed, as_of)
+    labels = quarter_labels(as_of)
+    n = len(deals)
+
+    probs = np.array([close_probability(d['stage'], d['meddpicc']) for d in deals], dtype=np.float64)
+    probs32 = probs.astype(np.float32)
+    sizes = np.array([d['deal_size'] for d in deals], dtype=np.float64)
+    days_to_close = np.array([STAGE_DAYS_TO_CLOSE[d['stage']] for d in deals], dtype=np.float64)
+
+    regions = sorted(set(REGIONS) | {d['region'] for d in deals})
+    region_idx = np.array([regions.index(d['region']) for d in deals], dtype=np.int64)
+    n_groups = len(regions) * HORIZON_QUARTERS
+
+    # Tage bis Quartalsende (as_of-Quartal = Bucket 0)
+    q_start_month = ((as_of.month - 1) // 3) * 3 + 1
+    q_start = date(as_of.year, q_start_month, 1)
+    days_into_quarter = (as_of - q_start).days
+
+    group_sums = np.zeros((trials, n_groups), dtype=np.float64)
+    if n:
+        rng = np.random.default_rng(seed)
+        chunk = max(1, CHUNK_CELLS // n)
+        for start in range(0, trials, chunk):
+            t = min(chunk, trials - start)
+            won = rng.random((t, n), dtype=np.float32) < probs32
+            # Deal Size + Close-Datum nur für gewonnene Zellen ziehen (sparse)
+            trial_i, deal_i = np.nonzero(won)
+            k = len(deal_i)
+            values = sizes[deal_i] * rng.lognormal(0.0, DEAL_SIZE_SIGMA, k)
+            close_day = days_to_close[deal_i] * rng.lognormal(0.0, CLOSE_DATE_SIGMA, k)
+            # ~91.25 Tage pro Quartal, relativ zum Quartalsanfang
+            q_offset = ((close_day + days_into_quarter) // 91.25).astype(np.int64)
+            in_horizon = q_offset < HORIZON_QUARTERS
+            flat = trial_i * n_groups + region_idx[deal_i] * HORIZON_QUARTERS + q_offset
+            sums = np.bincount(flat[in_horizon], weights=values[in_horizon], minlength=t * n_groups)
+            group_sums[start:start + t] = sums.reshape(t, n_groups)
+
+    cube = group_sums.reshape(trials, len(regions), HORIZON_QUARTERS)
+
+    by_region_quarter = {}
+    by_region = {}
+    for ri, region in enumerate(regions):
+        if not (region_idx == ri).any():
+            continue
+        by_region_quarter[region] = {labels[qi]: _percentiles(cube[:, ri, qi]) for qi in range(HORIZON_QUARTERS)}
+        by_region[region] = _percentiles(cube[:, ri, :].sum(axis=1))
+    by_quarter = {labels[qi]: _percentiles(cube[:, :, qi].sum(axis=1)) for qi in range(HORIZON_QUARTERS)}
+
+    return ForecastResult(
+        fingerprint=fingerprint,
+        as_of=as_of.isoformat(),
+        trials=trials,
+        n_deals=n,
+        pipeline_value=round(float(sizes.sum()), 1),
+        expected_value=round(float((probs * sizes).sum()), 1),
+        quarters=labels,
+        total=_percentiles(cube.sum(axis=(1, 2))),
+        by_region=by_region,
+        by_quarter=by_quarter,
+        by_region_quarter=by_region_quarter,
+    )
+
+
+def run_forecast(
+    records: Iterable[Dict[str, Any]],
+    trials: int = DEFAULT_TRIALS,
+    seed: int = 42,
+    as_of: Optional[date] = None,
+    use_cache: bool = True,
+) -> ForecastResult:
+    """
+    Forecast mit Cache: Neuberechnung nur wenn sich die Inputs ändern.
+    Reihenfolge: In-Process Cache → Disk Cache → Simulation
+    """
+    deals = normalize_deals(records)
+    as_of = as_of or date.today()
+    fingerprint = input_fingerprint(deals, trials, seed, as_of)
+
+    if use_cache:
+        if fingerprint in _CACHE:
+            return _CACHE[fingerprint]
+        cached = _load_disk_cache().get(fingerprint)
+        if cached:
+            result = ForecastResult.from_dict(cached)
+            _CACHE[fingerprint] = result
+            return result
+
+    result = simulate(deals, trials=trials, seed=seed, as_of=as_of)
+    if use_cache:
+        _CACHE[fingerprint] = result
+        _save_disk_cache(result)
+    return result
+
+
+# ============================================
+# Formatting
+# ============================================
+
+def format_forecast_telegram(result: ForecastResult) -> str:
+    """Formatiert den Forecast für Telegram (HTML)"""
+    if not result.n_deals:
+        return "📈 <b>Pipeline Forecast</b>\n\nKeine aktiven Deals mit Deal Size — kein Forecast möglich."
+
+    lines = [
+        f"📈 <b>Pipeline Forecast</b> ({result.trials:,} Simulationen)",
+        f"<i>{result.n_deals} Deals · Pipeline €{result.pipeline_value:.0f}M · Erwartet €{result.expected_value:.0f}M</i>",
+        "",
+        f"🎯 <b>Gesamt ({result.quarters[0]}–{result.quarters[-1]})</b>",
+        f"   P10 €{result.total['p10']:.0f}M · <b>P50 €{result.total['p50']:.0f}M</b> · P90 €{result.total['p90']:.0f}M",
+        "",
+        "🗓 <b>Nach Quartal (P50)</b>",
+    ]
+    for q in result.quarters:
+        pct = result.by_quarter[q]
+        lines.append(f"   {q}: €{pct['p50']:.0f}M <i>(P10 €{pct['p10']:.0f}M – P90 €{pct['p90']:.0f}M)</i>")
+    lines.append("")
+    lines.append("🌍 <b>Nach Region (P50)</b>")
+    for region, pct in sorted(result.by_region.items(), key=lambda x: -x[1]['p50']):
+        lines.append(f"   {region}: €{pct['p50']:.0f}M <i>(P10 €{pct['p10']:.0f}M – P90 €{pct['p90']:.0f}M)</i>")
+    return "\n".join(lines)
+
+
+def format_forecast_text(result: ForecastResult) -> str:
+    """Plain-Text Tabelle für CLI"""
+    lines = [
+        "=" * 60,
+        f"PIPELINE FORECAST — {result.as_of} ({result.trials:,} trials)",
+        "=" * 60,
+        f"Deals: {result.n_deals} | Pipeline: €{result.pipeline_value:.1f}M | Expected: €{result.expected_value:.1f}M",
+        "",
+        f"{'Region':<10}" + "".join(f"{q:>16}" for q in result.quarters) + f"{'Total':>16}",
+    ]
+    for region, quarters in result.by_region_quarter.items():
+        row = f"{region:<10}"
+        for q in result.quarters:
+            row += f"{quarters[q]['p50']:>16.1f}"
+        row += f"{result.by_region[region]['p50']:>16.1f}"
+        lines.append(row)
+    lines.append("-" * 60)
+    for q in result.quarters:
+        pct = result.by_quarter[q]
+        lines.append(f"{q}: P10 €{pct['p10']:.1f}M | P50 €{pct['p50']:.1f}M | P90 €{pct['p90']:.1f}M")
+    t = result.total
+    lines.append(f"TOTAL: P10 €{t['p10']:.1f}M | P50 €{t['p50']:.1f}M | P90 €{t['p90']:.1f}M")
+    lines.append("(Werte: P50 Closed Value in €M)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte-Carlo Pipeline Forecast")
+    parser.add_argument("--db", default=DB_PATH, help="DB Pfad")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help="Anzahl Simulationen")
+    parser.add_argument("--seed", type=int, default=42, help="Random Seed")
+    parser.add_argument("--no-cache", action="store_true", help="Cache ignorieren")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    result = run_forecast(load_pipeline_sqlite(args.db), trials=args.trials,
+                          seed=args.seed, use_cache=not args.no_cache)
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(format_forecast_text(result))
+        print(f"\n⏱ {(datetime.now() - started).total_seconds():.2f}s (fingerprint {result.fingerprint})")
@@ -51,7 +51,7 @@ def days_since(ts_str):
     except:
         return 999
 
-def score_lead(lead, meddpicc_map):
+def score_components(lead, meddpicc_map, days=None):
     """
     Prioritäts-Algorithmus:
     - Tier          (35%): Tier 1 = 35, Tier 2 = 20, Tier 3 = 8
@@ -59,13 +59,15 @@ def score_lead(lead, meddpicc_map):
     - MEDDPICC      (20%): score / 64 * 20
     - Inaktivität   (15%): 1-7 Tage = 15, 8-30 = 10, >30 = 5, >90 = 1
     - Deal Size      (5%): >1M = 5, >0.5M = 3, sonst 1
+
+    Returns: dict mit Punkten pro Komponente + total (ohne Begründungstext)
     """
     tier      = lead.get("tier") or 3
     region    = lead.get("region") or "EUROPE"
     deal_size = float(lead.get("expected_deal_size_millions") or 0)
-    days      = days_since(lead.get("updated_at"))
-    lead_id   = lead.get("id")
-    medd      = meddpicc_map.get(lead_id, {}).get("total_score", 0) or 0
+    if days is None:
+        days  = days_since(lead.get("updated_at"))
+    medd      = meddpicc_map.get(lead.get("id"), {}).get("total_score", 0) or 0
 
     tier_pts   = TIER_SCORE.get(tier, 5)
     region_pts = REGION_SCORE.get(region, 5)
@@ -80,9 +82,19 @@ def score_lead(lead, meddpicc_map):
     elif deal_size >= 0.5: deal_pts = 3
     else:                  deal_pts = 1
 
-    total = tier_pts + region_pts + medd_pts + inact_pts + deal_pts
+    return {
+        "tier": tier_pts, "region": region_pts, "meddpicc": medd_pts,
+        "inactivity": inact_pts, "deal": deal_pts,
+        "total": tier_pts + region_pts + medd_pts + inact_pts + deal_pts,
+    }
+
+def format_reasons(lead, meddpicc_map, days):
+    """Begründungstext — nur für Leads die tatsächlich ausgegeben werden"""
+    tier      = lead.get("tier") or 3
+    region    = lead.get("region") or "EUROPE"
+    deal_size = float(lead.get("expected_deal_size_millions") or 0)
+    medd      = meddpicc_map.get(lead.get("id"), {}).get("total_score", 0) or 0
 
-    # Begründung
     reasons = []
     if tier == 1:    reasons.append("C-Suite Kontakt")
     if region in ("DE","CH"): reasons.append(f"Kernmarkt {region}")
@@ -90,7 +102,12 @@ def score_lead(lead, meddpicc_map):
     if days >= 14:   reasons.append(f"{days} Tage kein Kontakt")
     if deal_size >= 0.5: reasons.append(f"€{deal_size}M Deal")
 
-    return total, " | ".join(reasons) if reasons else "Standard Prospecting"
+    return " | ".join(reasons) if reasons else "Standard Prospecting"
+
+def score_lead(lead, meddpicc_map):
+    """Score + Begründung für einen einzelnen Lead: (total, reasons_str)"""
+    days = days_since(lead.get("updated_at"))
+    return score_components(lead, meddpicc_map, days)["total"], format_reasons(lead, meddpicc_map, days)
 
 def suggest_action(lead, days):
     stage = lead.get("stage", "prospecting")
@@ -136,25 +153,28 @@ def main():
     scores_raw = fetch("meddpicc_scores?select=lead_id,total_score,qualification_status")
     meddpicc_map = {s["lead_id"]: s for s in scores_raw}
 
-    # Score all leads
+    # Score all leads (nur Zahlen — Texte erst für die Top N)
     scored = []
     for lead in leads:
-        score, reason = score_lead(lead, meddpicc_map)
         days = days_since(lead.get("updated_at"))
-        scored.append({
-            "score": score,
-            "reason": reason,
+        scored.append((score_components(lead, meddpicc_map, days), days, lead))
+
+    # Sort and take top N
+    scored.sort(key=lambda x: x[0]["total"], reverse=True)
+    top = []
+    for components, days, lead in scored[:n]:
+        m = meddpicc_map.get(lead["id"], {})
+        top.append({
+            "score": components["total"],
+            "score_breakdown": components,
+            "reason": format_reasons(lead, meddpicc_map, days),
             "days_inactive": days,
             "suggested_action": suggest_action(lead, days),
-            "meddpicc": meddpicc_map.get(lead["id"], {}).get("total_score", 0) or 0,
-            "qualification": meddpicc_map.get(lead["id"], {}).get("qualification_status", "UNQUALIFIED") or "UNQUALIFIED",
+            "meddpicc": m.get("total_score", 0) or 0,
+            "qualification": m.get("qualification_status", "UNQUALIFIED") or "UNQUALIFIED",
             **lead,
         })
 
-    # Sort and take top N
-    scored.sort(key=lambda x: x["score"], reverse=True)
-    top = scored[:n]
-
     # Output
     result = {
         "generated_at": datetime.now().isoformat(),
@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from database import Database
+from entity_resolution import EntityResolver
 from models import Lead, MEDDPICCScore, Region, Tier, Stage
 
 def determine_region(website, linkedin, company_name):
@@ -48,9 +49,13 @@ def import_prospects(csv_path, db_path='bitwise_leads.db'):
     """Import prospects from CSV to database"""
     
     db = Database(db_path)
+    resolver = EntityResolver(db_path)
+    resolver.resolve_pending()
+    conn = resolver.get_connection()
     
     imported = 0
     skipped = 0
+    duplicates = 0
     
     with open(csv_path, 'r', encoding='utf-8', errors='ignore') as f:
         reader = csv.DictReader(f)
@@ -71,6 +76,12 @@ def import_prospects(csv_path, db_path='bitwise_leads.db'):
                     skipped += 1
                     continue
                 
+                # Skip accounts already in the tracker (fuzzy name / domain match)
+                account_id, _, _ = resolver.match(conn, company, linkedin=linkedin, website=website)
+                if account_id is not None:
+                    duplicates += 1
+                    continue
+                
                 # Determine region
                 region_str = determine_region(website, linkedin, company)
                 region = Region(region_str)
@@ -102,6 +113,9 @@ def import_prospects(csv_path, db_path='bitwise_leads.db'):
                 score = MEDDPICCScore(lead_id=lead_id)
                 db.set_meddpicc_score(lead_id, score)
                 
+                resolver.assign(conn, lead_id, company, linkedin=linkedin, website=website)
+                conn.commit()
+                
                 imported += 1
                 
                 if imported % 50 == 0:
@@ -117,7 +131,10 @@ def import_prospects(csv_path, db_path='bitwise_leads.db'):
     print(f"{'='*60}")
     print(f"Imported: {imported}")
     print(f"Skipped: {skipped}")
-    print(f"Total in CSV: {imported + skipped}")
+    print(f"Duplicates: {duplicates}")
+    print(f"Total in CSV: {imported + skipped + duplicates}")
+    
+    conn.close()
     
     return imported
 
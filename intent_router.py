@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Zweistufiger Intent-Router für den Pipo Telegram Bot
+Stufe 1 lokal (Mikrosekunden), Claude Haiku nur für den Rest:
+
+1. Regex:  kompilierte Muster für eindeutige Formulierungen
+           (LinkedIn-URL, "haben wir X?", "wer ist CTO bei X", "top 10 leads", ...)
+           inkl. Parameter → Konfidenz 1.0
+2. TF-IDF: winziger Centroid-Klassifikator (Wort-Uni-/Bigramme, Kosinus),
+           trainiert auf Seed-Beispielen + den von Claude gelabelten Nachrichten
+           aus `intent_log` (das LLM lernt den lokalen Router an). Übernommen
+           wird nur, wenn Score UND Abstand zum Zweitplatzierten über der
+           Schwelle liegen und die Parameter ohne Raten vollständig sind
+3. sonst → claude_route_intent (wie bisher)
+
+Jede Entscheidung landet in `intent_log` (Quelle, Konfidenz, Latenz) →
+`stats` zeigt LLM-Call-Rate und p95-Routing-Latenz, `eval` spielt die
+geloggten Nachrichten gegen den aktuellen lokalen Router (vorher/nachher).
+
+Usage:
+  python3 intent_router.py route "haben wir Sygnum?"
+  python3 intent_router.py stats [--days 7]
+  python3 intent_router.py eval
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import statistics
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bot_updates import BOT_STATE_DB
+
+# Configuration
+MIN_SCORE = 0.50    # Kosinus zum besten Centroid ("was denkst du über X?" → help liegt bei 0.43)
+MIN_MARGIN = 0.25   # Abstand zum Zweitplatzierten
+DEFAULT_ROLE = "Managing Director CIO CFO"
+
+LINKEDIN_URL = re.compile(r'https?://(?:www\.)?linkedin\.com/in/[^\s\]>]+', re.IGNORECASE)
+_ADD = re.compile(r'^/add\b|hinzuf(?:ü|ue)gen|\bf(?:ü|ue)ge?\b.*\bhinzu\b|eintragen|anlegen|add lead|in db aufnehmen')
+_STRATEGY = re.compile(r'strategie|strategy|battle\s*card|battlecard')
+_TOKEN = re.compile(r'[a-zäöüß0-9]+')
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+@dataclass
+class Route:
+    action: str
+    params: Dict = field(default_factory=dict)
+    confidence: float = 1.0
+    source: str = "regex"   # regex | local | claude | none
+
+    def as_intent(self) -> Dict:
+        """Gleiches Format wie claude_route_intent"""
+        return {"action": self.action, "params": self.params}
+
+
+def _clean(value: str) -> str:
+    return value.strip().strip("?!.,:;\"'").strip()
+
+
+# ============================================
+# Stufe 1: Regex
+# ============================================
+
+def _m(pattern: str):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# (action, Muster, Parameter aus dem Match) — Reihenfolge = Priorität
+_RULES = [
+    ("db_check", _m(r'^(?:haben wir|in db|in der datenbank)[?:,\s]+(?!.*\bbei\b)(.+?)(?:\s+(?:schon|drin|in (?:der )?db))*\s*\??$'),
+     lambda m: {"query": _clean(m.group(1))}),
+    # "ist X ...?" nur mit ausdrücklichem DB-Bezug — sonst ist es eine normale Frage ("ist das sinnvoll?")
+    ("db_check", _m(r'^ist\s+(?!.*\bbei\b)(.+?)(?:\s+(?:schon|drin))*\s+in (?:der )?(?:db|datenbank)\s*\??$'),
+     lambda m: {"query": _clean(m.group(1))}),
+    ("find_contacts", _m(r'^(?:wer ist (?:der |die |das )?|finde (?:den |die |das )?|suche (?:den |die |das )?|zeig (?:mir )?(?:den |die )?)'
+                         r'(.+?)\s+(?:bei|at|@|von|from)\s+(.+?)\??$'),
+     lambda m: {"role": _clean(m.group(1)), "company": _clean(m.group(2))}),
+    ("find_contacts", _m(r'^(?:finde |suche |zeig (?:mir )?)?(?:die )?entscheider(?:innen)?\s+(?:bei|at|@|von)\s+(.+?)\??$'),
+     lambda m: {"role": DEFAULT_ROLE, "company": _clean(m.group(1))}),
+    ("top_leads", _m(r'^(?:zeig(?: mir)?(?: die)?\s+)?top\s*(\d+)?(?:\s+leads?)?\s*\??$|^(?:zeig(?: mir)?|liste)(?: die)?\s+(?:top\s*)?(\d+)?\s*(?:besten |wichtigsten )?leads\??$'),
+     lambda m: {"n": int(m.group(1) or m.group(2) or 5)}),
+    ("forecast", _m(r'^(?:forecast|prognose|pipeline[- ]?forecast|wie viel closen wir)\b.*$'),
+     lambda m: {}),
+    ("similar", _m(r'^(?:(?:zeig |finde )?(?:mir )?(?:ähnliche|aehnliche) leads|lookalikes?)(?:\s+(?:zu|wie|like|für)\s+(.+?))?\s*\??$'),
+     lambda m: {"company": _clean(m.group(1) or "")}),
+    ("battle_card", _m(r'^(?:battle\s*card|battlecard|strategie|strategy)(?:\s+(?:für|fuer|for|von|zu))?\s*(.*?)\s*$'),
+     lambda m: {"company": _clean(m.group(1))}),
+    ("status", _m(r'^(?:status|wie (?:läuft|laeuft|steht)(?: es)?)(?:\s+(?:von|für|fuer|bei|mit))?\s+(?!(?:es|da|das|dort|denen|dem deal)\b)(.+?)\??$'),
+     lambda m: {"company_or_url": _clean(m.group(1))}),
+    ("help", _m(r'^(?:help|hilfe|\?|was kannst du\??|befehle)$'),
+     lambda m: {}),
+]
+
+
+def regex_route(text: str) -> Optional[Route]:
+    text = text.strip()
+    lower = text.lower()
+    li = LINKEDIN_URL.search(text)
+    if _ADD.search(lower):
+        return Route("add_lead", {"want_strategy": bool(_STRATEGY.search(lower))})
+    if li:
+        url = li.group(0).rstrip("/.,!?")
+        if lower.startswith("status"):
+            return Route("status", {"company_or_url": url})
+        return Route("linkedin_lookup", {"li_url": url})
+    for action, pattern, params in _RULES:
+        m = pattern.match(text)
+        if m:
+            return Route(action, params(m))
+    return None
+
+
+# ============================================
+# Stufe 2: TF-IDF Centroid-Klassifikator
+# ============================================
+
+# Seed-Beispiele (werden um Claude-gelabelte Nachrichten aus intent_log ergänzt)
+SEED_EXAMPLES = {
+    "top_leads": ["zeig mir die top leads", "was sind unsere besten leads", "top leads bitte",
+                  "welche leads sind gerade am wichtigsten", "beste opportunities", "wer steht oben auf der liste",
+                  "show me the top leads", "priorisierte leads"],
+    "forecast": ["wie sieht der forecast aus", "was closen wir dieses quartal", "pipeline prognose",
+                 "wie viel umsatz erwarten wir", "forecast bitte", "wie viel closen wir",
+                 "what is the forecast", "erwarteter abschluss dieses quartal"],
+    "similar": ["ähnliche leads finden", "welche firmen sind ähnlich", "lookalikes bitte",
+                "wer ist wie unsere closed won kunden", "finde vergleichbare firmen", "similar leads"],
+    "help": ["was kannst du", "welche befehle gibt es", "hilfe bitte", "wie funktionierst du",
+             "help me", "was geht alles"],
+    "status": ["wie steht es mit dem deal", "wie läuft es da", "was ist der stand", "status update bitte",
+               "wo stehen wir bei dem lead", "was ist bei denen los", "aktueller stand"],
+    "battle_card": ["mach mir eine battle card", "strategie bitte", "erstelle eine battle card",
+                    "wie gehen wir den lead an", "gib mir eine strategie", "battle card generieren"],
+}
+
+# Ohne diese Parameter übernimmt der lokale Router nicht (nicht raten → Claude)
+_REQUIRED = {"linkedin_lookup": ("li_url",), "find_contacts": ("company",), "db_check": ("query",)}
+# Firma aus dem Kontext ist ok (Dispatcher nutzt ctx), aber nur wenn es einen gibt
+_NEEDS_COMPANY = {"status", "battle_card"}
+
+
+def tokenize(text: str) -> List[str]:
+    words = _TOKEN.findall(text.lower().translate(_UMLAUTS))
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfIntentClassifier:
+    """Sparse TF-IDF (Dicts), ein L2-normierter Centroid pro Intent"""
+
+    def __init__(self):
+        self.idf: Dict[str, float] = {}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return {t: v / norm for t, v in vec.items()} if norm else {}
+
+    def _vector(self, tokens: List[str]) -> Dict[str, float]:
+        counts = Counter(t for t in tokens if t in self.idf)
+        return self._normalize({t: (1 + math.log(c)) * self.idf[t] for t, c in counts.items()})
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "TfidfIntentClassifier":
+        docs = [(tokenize(text), action) for text, action in examples]
+        df = Counter(t for tokens, _ in docs for t in set(tokens))
+        n = len(docs)
+        self.idf = {t: math.log((1 + n) / (1 + c)) + 1 for t, c in df.items()}
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for tokens, action in docs:
+            for t, v in self._vector(tokens).items():
+                sums[action][t] += v
+        self.centroids = {action: self._normalize(vec) for action, vec in sums.items()}
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        """→ (action, score, margin zum Zweitplatzierten)"""
+        vec = self._vector(tokenize(text))
+        if not vec:
+            return None, 0.0, 0.0
+        scores = sorted(((sum(v * centroid.get(t, 0.0) for t, v in vec.items()), action)
+                         for action, centroid in self.centroids.items()), reverse=True)
+        best, action = scores[0]
+        second = scores[1][0] if len(scores) > 1 else 0.0
+        return action, best, best - second
+
+
+# ============================================
+# Router + Log
+# ============================================
+
+class IntentRouter:
+    def __init__(self, db_path: str = BOT_STATE_DB, min_score: float = MIN_SCORE, min_margin: float = MIN_MARGIN):
+        self.db_path = db_path
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.init_table()
+        self.classifier = TfidfIntentClassifier().fit(self.training_examples())
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS intent_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    action TEXT,
+                    params TEXT,
+                    source TEXT NOT NULL,
+                    confidence REAL,
+                    latency_ms REAL NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_intent_log_created ON intent_log(created_at)")
+            conn.commit()
+
+    def training_examples(self) -> List[Tuple[str, str]]:
+        """Seeds + Nachrichten, die Claude eindeutig zugeordnet hat"""
+        examples = [(text, action) for action, texts in SEED_EXAMPLES.items() for text in texts]
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT text, action FROM intent_log
+                WHERE source = 'claude' AND action IS NOT NULL AND action != 'unknown'
+                ORDER BY id DESC LIMIT 5000
+            """).fetchall()
+        return examples + [(r["text"], r["action"]) for r in rows]
+
+    def route(self, text: str, has_context: bool = False) -> Optional[Route]:
+        """Lokale Entscheidung oder None (→ Claude)"""
+        route = regex_route(text)
+        if route is not None:
+            return route
+        action, score, margin = self.classifier.predict(text)
+        if action is None or score < self.min_score or margin < self.min_margin:
+            return None
+        if action in _REQUIRED or (action in _NEEDS_COMPANY and not has_context):
+            return None
+        params = {}
+        if action == "top_leads":
+            n = re.search(r'\b(\d{1,2})\b', text)
+            params["n"] = int(n.group(1)) if n else 5
+        return Route(action, params, round(score, 3), "local")
+
+    def record(self, text: str, route: Optional[Route], latency_ms: float):
+        """Routing-Entscheidung loggen (Quelle 'none' = weder lokal noch Claude)"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO intent_log (text, action, params, source, confidence, latency_ms, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (text[:500], route.action if route else None, json.dumps(route.params) if route else None,
+                  route.source if route else "none", route.confidence if route else None, latency_ms, time.time()))
+            conn.commit()
+
+    # ── Auswertung ───────────────────────────────────────────────────────────
+
+    def stats(self, days: float = 7) -> Dict:
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT source, latency_ms FROM intent_log WHERE created_at >= ?",
+                                (time.time() - days * 86400,)).fetchall()
+        if not rows:
+            return {"messages": 0}
+        latencies = [r["latency_ms"] for r in rows]
+        by_source = Counter(r["source"] for r in rows)
+        llm_calls = by_source["claude"] + by_source["none"]   # 'none' = Claude versucht, ohne Ergebnis
+        return {
+            "messages": len(rows),
+            "by_source": dict(by_source),
+            "llm_call_rate": round(llm_calls / len(rows), 3),
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p95_ms": round(_percentile(latencies, 95), 3),
+        }
+
+    def evaluate(self) -> Dict:
+        """
+        Geloggte Nachrichten gegen den aktuellen lokalen Router:
+        vorher = jede Freitext-Nachricht geht an Claude (gemessene Claude-Latenz),
+        nachher = lokal wenn möglich, sonst lokal + Claude. Übereinstimmung mit Claude-Labels.
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT text, action, source, latency_ms FROM intent_log").fetchall()
+        claude_ms = [r["latency_ms"] for r in rows if r["source"] in ("claude", "none")]
+        if not rows:
+            return {"messages": 0}
+        typical_claude = statistics.median(claude_ms) if claude_ms else 0.0
+        before, after, llm_after, agree, labeled = [], [], 0, 0, 0
+        for r in rows:
+            llm = r["latency_ms"] if r["source"] in ("claude", "none") else typical_claude
+            t0 = time.perf_counter()
+            route = self.route(r["text"], has_context=True)
+            local_ms = (time.perf_counter() - t0) * 1000
+            before.append(llm)
+            if route is None:
+                llm_after += 1
+                after.append(local_ms + llm)
+            else:
+                after.append(local_ms)
+                if r["source"] == "claude" and r["action"] not in (None, "unknown"):
+                    labeled += 1
+                    agree += route.action == r["action"]
+        return {
+            "messages": len(rows),
+            "before": {"llm_call_rate": 1.0, "p95_ms": round(_percentile(before, 95), 3)},
+            "after": {"llm_call_rate": round(llm_after / len(rows), 3), "p95_ms": round(_percentile(after, 95), 3)},
+            "agreement_with_claude": round(agree / labeled, 3) if labeled else None,
+        }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zweistufiger Intent-Router")
+    parser.add_argument("command", choices=["route", "stats", "eval"])
+    parser.add_argument("text", nargs="?", default="")
+    parser.add_argument("--db", default=BOT_STATE_DB, help="Pfad zur SQLite DB")
+    parser.add_argument("--days", type=float, default=7)
+    args = parser.parse_args()
+
+    router = IntentRouter(args.db)
+    if args.command == "route":
+        t0 = time.perf_counter()
+        route = router.route(args.text, has_context=True)
+        elapsed_us = (time.perf_counter() - t0) * 1e6
+        print(f"{route} ({elapsed_us:.0f}µs)" if route else f"→ Claude ({elapsed_us:.0f}µs)")
+    elif args.command == "stats":
+        print(json.dumps(router.stats(args.days), indent=2))
+    else:
+        print(json.dumps(router.evaluate(), indent=2))
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Lokaler Lead-Index für den Pipo Telegram Bot
+"Haben wir den schon?" ohne HTTP-Roundtrip: Firmen, Personen und
+LinkedIn-Vanity-Slugs im Prozess, Antworten in Mikrosekunden, gerankt.
+
+- Exakt:  Hash-Maps auf normalisierte Schlüssel
+          (Firma: entity_resolution.normalize_company, Person: Umlaute/Titel,
+          LinkedIn: Vanity-Slug + Slug ohne Nummern-/Hash-Suffix)
+- Fuzzy:  Trigram-Postings → Kandidaten mit den meisten gemeinsamen
+          Trigrammen, bewertet mit entity_resolution.name_similarity (Firma)
+          bzw. Jaro-Winkler/Trigram (Person). Kein Scan über alle Leads.
+- Refresh: Change Feed über updated_at — fetch_changes(watermark) liefert alle
+          Leads mit updated_at >= Watermark, upsert() ersetzt nur diese.
+          Gelöschte Leads verschwinden beim periodischen Full Rebuild.
+
+Usage:
+  python3 lead_index.py --company "Sygnum"
+  python3 lead_index.py --name "Oliver Müller" [--with-company "Hanse Capital"]
+  python3 lead_index.py --linkedin https://www.linkedin.com/in/oliver-mueller-1
+"""
+
+import argparse
+import heapq
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Set
+
+from entity_resolution import (DB_PATH, GENERIC_TOKENS, jaro_winkler, name_similarity,
+                               normalize_company, trigram_jaccard)
+
+# Configuration
+MIN_COMPANY_SCORE = 0.80
+MIN_NAME_SCORE = 0.85
+MAX_CANDIDATES = 8          # Fuzzy: so viele Kandidaten (nach Trigram-Overlap) werden bewertet
+MIN_JACCARD = 0.25          # Trigram-Jaccard, ab der ein Kandidat überhaupt bewertet wird
+MAX_POSTING = 2000          # Trigramme in mehr Schlüsseln sind zu unspezifisch für die Kandidatensuche
+COMPANY_BONUS = 0.05        # find_by_name: Firma passt auch
+SAME_COMPANY_SCORE = 0.90   # find_by_name: ab hier gilt die Firma als dieselbe (wie entity_resolution)
+SIMILARITY_CACHE = 65536    # memoisierte Paar-Scores (wiederholte Anfragen)
+
+# Felder, die der Bot von einem Lead braucht
+LEAD_FIELDS = ("id", "company", "contact_person", "title", "stage", "region", "linkedin", "email",
+               "updated_at", "expected_deal_size_millions")
+
+VANITY_RE = re.compile(r'linkedin\.com/in/([^/?#\s]+)', re.IGNORECASE)
+VANITY_SUFFIX_RE = re.compile(r'-(?:\d+|[0-9a-f]{6,})$')
+PERSON_TITLES = {'dr', 'prof', 'mag', 'dipl', 'ing', 'mba', 'cfa', 'phd', 'msc', 'bsc', 'herr', 'frau', 'mr', 'mrs', 'ms'}
+
+
+@dataclass
+class Match:
+    lead: Dict
+    score: float
+    matched_on: str   # linkedin | company | name
+
+
+# ============================================
+# Normalisierung
+# ============================================
+
+def _ascii(text: str) -> str:
+    text = text.lower()
+    for src, dst in (('ä', 'ae'), ('ö', 'oe'), ('ü', 'ue'), ('ß', 'ss')):
+        text = text.replace(src, dst)
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+
+
+def normalize_person(name: str) -> str:
+    """'Dr. Oliver Müller' → 'oliver mueller'"""
+    tokens = re.sub(r'[^a-z0-9]+', ' ', _ascii(name or '')).split()
+    return ' '.join(t for t in tokens if t not in PERSON_TITLES)
+
+
+def vanity_slug(url: str) -> str:
+    """'https://www.linkedin.com/in/Oliver-M%C3%BCller-1/' → 'oliver-mueller-1'"""
+    m = VANITY_RE.search(url or '')
+    if not m:
+        return ''
+    return _ascii(urllib.parse.unquote(m.group(1))).strip('/').strip()
+
+
+def vanity_base(slug: str) -> str:
+    """Slug ohne LinkedIn-Suffix: 'oliver-mueller-1a2b3c4d' → 'oliver-mueller'"""
+    return VANITY_SUFFIX_RE.sub('', slug)
+
+
+def trigrams(s: str) -> Set[str]:
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+@lru_cache(maxsize=SIMILARITY_CACHE)
+def _person_similarity(a: str, b: str) -> float:
+    """Pro Token des Suchnamens das beste Jaro-Winkler im Kandidaten, gemittelt
+    ("olivr muller" ↔ "oliver mueller" hoch, "oliver schmidt" ↔ "oliver mueller" nicht)"""
+    if a == b:
+        return 1.0
+    ta, tb = a.split(), b.split()
+    score = sum(max(jaro_winkler(x, y) for y in tb) for x in ta) / len(ta)
+    return score if len(ta) == len(tb) else score * 0.95
+
+
+@lru_cache(maxsize=SIMILARITY_CACHE)
+def _company_similarity(query: str, name: str) -> float:
+    score = name_similarity(query, name)
+    # Nur mit spezifischem Token — "capital" allein soll nicht jede "X Capital" treffen
+    if len(query) >= 4 and set(query.split()) - GENERIC_TOKENS:
+        # Tippfehler im generischen Teil ("hanse captal") sieht name_similarity nicht (Kern ohne "capital")
+        score = max(score, min(jaro_winkler(query, name), 0.3 + trigram_jaccard(query, name)))
+        # Teilstring wie früher ilike *x*
+        if f" {query} " in f" {name} ":
+            score = max(score, 0.90)
+        elif name.startswith(query):
+            score = max(score, 0.85)
+    return score
+
+
+# ============================================
+# Trigram-Postings
+# ============================================
+
+class _FuzzyMap:
+    """Schlüssel → Lead-IDs (exakt) + Trigramm → Schlüssel (Kandidatensuche)"""
+
+    def __init__(self):
+        self.ids: Dict[str, Set[int]] = {}
+        self.grams: Dict[str, Set[str]] = {}
+        self.sizes: Dict[str, int] = {}   # Schlüssel → Anzahl Trigramme
+
+    def add(self, key: str, lead_id: int):
+        if not key:
+            return
+        ids = self.ids.get(key)
+        if ids is None:
+            ids = self.ids[key] = set()
+            grams = trigrams(key)
+            self.sizes[key] = len(grams)
+            for gram in grams:
+                self.grams.setdefault(gram, set()).add(key)
+        ids.add(lead_id)
+
+    def discard(self, key: str, lead_id: int):
+        ids = self.ids.get(key)
+        if ids is None:
+            return
+        ids.discard(lead_id)
+        if not ids:
+            del self.ids[key]
+            del self.sizes[key]
+            for gram in trigrams(key):
+                keys = self.grams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.grams[gram]
+
+    def candidates(self, query: str, limit: int = MAX_CANDIDATES) -> List[str]:
+        """Schlüssel mit der höchsten Trigram-Jaccard (aus den Postings gezählt, ≥ MIN_JACCARD)"""
+        grams = trigrams(query)
+        overlap = Counter()
+        for gram in grams:
+            keys = self.grams.get(gram)
+            if keys and len(keys) <= MAX_POSTING:
+                overlap.update(keys)
+        scored = []
+        for key, n in overlap.items():
+            jaccard = n / (len(grams) + self.sizes[key] - n)
+            if jaccard >= MIN_JACCARD:
+                scored.append((jaccard, key))
+        return [key for _, key in heapq.nlargest(limit, scored)]
+
+
+# ============================================
+# Index
+# ============================================
+
+class LeadIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.leads: Dict[int, Dict] = {}
+        self.company_keys: Dict[int, str] = {}   # lead_id → normalisierte Firma
+        self.companies = _FuzzyMap()
+        self.persons = _FuzzyMap()
+        self.vanity: Dict[str, Set[int]] = {}
+        self.vanity_base: Dict[str, Set[int]] = {}
+        self.watermark = ""          # größtes gesehenes updated_at
+        self.rebuilt_at = 0.0
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self.leads)
+
+    @property
+    def ready(self) -> bool:
+        return self.rebuilt_at > 0
+
+    # ── Pflege ───────────────────────────────────────────────────────────────
+
+    def _keys(self, lead: Dict):
+        slug = vanity_slug(lead.get("linkedin") or "")
+        return (normalize_company(lead.get("company") or ""), normalize_person(lead.get("contact_person") or ""),
+                slug, vanity_base(slug))
+
+    def _unindex(self, lead: Dict):
+        company, person, slug, base = self._keys(lead)
+        self.companies.discard(company, lead["id"])
+        self.persons.discard(person, lead["id"])
+        for mapping, key in ((self.vanity, slug), (self.vanity_base, base)):
+            ids = mapping.get(key)
+            if ids is not None:
+                ids.discard(lead["id"])
+                if not ids:
+                    del mapping[key]
+
+    def upsert(self, leads: Iterable[Dict]) -> int:
+        """Neue/geänderte Leads (ganze Records) übernehmen → Anzahl"""
+        n = 0
+        with self._lock:
+            for raw in leads:
+                lead = {k: raw.get(k) for k in LEAD_FIELDS}
+                old = self.leads.get(lead["id"])
+                if old is not None:
+                    self._unindex(old)
+                self.leads[lead["id"]] = lead
+                company, person, slug, base = self._keys(lead)
+                self.companies.add(company, lead["id"])
+                self.company_keys[lead["id"]] = company
+                self.persons.add(person, lead["id"])
+                if slug:
+                    self.vanity.setdefault(slug, set()).add(lead["id"])
+                    self.vanity_base.setdefault(base, set()).add(lead["id"])
+                if lead.get("updated_at") and str(lead["updated_at"]) > self.watermark:
+                    self.watermark = str(lead["updated_at"])
+                n += 1
+        return n
+
+    def remove(self, lead_id: int):
+        with self._lock:
+            lead = self.leads.pop(lead_id, None)
+            if lead is not None:
+                self._unindex(lead)
+                del self.company_keys[lead_id]
+
+    def rebuild(self, leads: Iterable[Dict]):
+        """Full Rebuild (nimmt auch gelöschte Leads raus); Lookups laufen solange auf dem alten Stand"""
+        fresh = LeadIndex()
+        fresh.upsert(leads)
+        with self._lock:
+            self.leads, self.company_keys = fresh.leads, fresh.company_keys
+            self.companies, self.persons = fresh.companies, fresh.persons
+            self.vanity, self.vanity_base, self.watermark = fresh.vanity, fresh.vanity_base, fresh.watermark
+            self.rebuilt_at = self.refreshed_at = time.time()
+
+    def refresh(self, fetch_changes: Callable[[str], List[Dict]]) -> int:
+        """Delta über den Change Feed: alle Leads mit updated_at >= watermark"""
+        changed = fetch_changes(self.watermark)
+        n = self.upsert(changed)
+        self.refreshed_at = time.time()
+        return n
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    def _ranked(self, ids: Iterable[int], score: float, matched_on: str) -> List[Match]:
+        leads = sorted((self.leads[i] for i in ids), key=lambda l: str(l.get("updated_at") or ""), reverse=True)
+        return [Match(lead, score, matched_on) for lead in leads]
+
+    def find_by_linkedin(self, li_url: str) -> List[Match]:
+        slug = vanity_slug(li_url)
+        if not slug:
+            return []
+        with self._lock:
+            if slug in self.vanity:
+                return self._ranked(self.vanity[slug], 1.0, "linkedin")
+            base = vanity_base(slug)
+            return self._ranked(self.vanity_base.get(base, ()), 0.9, "linkedin")
+
+    def find_by_company(self, company: str, limit: int = 5) -> List[Match]:
+        query = normalize_company(company)
+        if not query:
+            return []
+        with self._lock:
+            matches = self._ranked(self.companies.ids.get(query, ()), 1.0, "company")
+            if len(matches) < limit:
+                scored = []
+                for key in self.companies.candidates(query):
+                    if key != query:
+                        score = _company_similarity(query, key)
+                        if score >= MIN_COMPANY_SCORE:
+                            scored.append((score, key))
+                for score, key in sorted(scored, reverse=True):
+                    matches.extend(self._ranked(self.companies.ids[key], round(score, 3), "company"))
+                    if len(matches) >= limit:
+                        break
+        return matches[:limit]
+
+    def _same_companies(self, company: str) -> Set[str]:
+        """Normalisierte Firmennamen, die als dieselbe Firma gelten (exakt + Kandidaten)"""
+        query = normalize_company(company)
+        same = {query} if query in self.companies.ids else set()
+        same.update(k for k in self.companies.candidates(query) if name_similarity(query, k) >= SAME_COMPANY_SCORE)
+        return same
+
+    def find_by_name(self, name: str, company: str = "", limit: int = 5) -> List[Match]:
+        query = normalize_person(name)
+        if not query:
+            return []
+        with self._lock:
+            companies = self._same_companies(company) if company else set()
+            keys = [query] if query in self.persons.ids else []
+            # Fuzzy nur ohne exakten Treffer — oder wenn der exakte Name nicht bei der gesuchten Firma ist
+            if not keys or (companies and not any(self.company_keys[i] in companies for i in self.persons.ids[query])):
+                keys += [k for k in self.persons.candidates(query) if k != query]
+            scored = []
+            for key in keys:
+                score = _person_similarity(query, key)
+                if score < MIN_NAME_SCORE:
+                    continue
+                for lead_id in self.persons.ids[key]:
+                    lead_score = score
+                    if self.company_keys[lead_id] in companies:
+                        lead_score += COMPANY_BONUS
+                    scored.append((round(lead_score, 3), str(self.leads[lead_id].get("updated_at") or ""), lead_id))
+            return [Match(self.leads[lead_id], score, "name") for score, _, lead_id in heapq.nlargest(limit, scored)]
+
+
+# ============================================
+# Datenquellen
+# ============================================
+
+def load_leads_sqlite(db_path: str = DB_PATH, since: str = "") -> List[Dict]:
+    """Leads aus SQLite (Change Feed: updated_at >= since)"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(f"SELECT {', '.join(LEAD_FIELDS)} FROM leads WHERE updated_at >= ? ORDER BY updated_at, id",
+                            (since,)).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def _print(matches: List[Match]):
+    if not matches:
+        print("Kein Treffer")
+    for m in matches:
+        l = m.lead
+        print(f"{m.score:.2f}  #{l['id']:<6} {l['company']:<32} {l.get('contact_person') or '—':<24} {l.get('stage') or ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler Lead-Index (Firma / Person / LinkedIn)")
+    parser.add_argument("--company")
+    parser.add_argument("--name")
+    parser.add_argument("--with-company", default="")
+    parser.add_argument("--linkedin")
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur SQLite DB")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = LeadIndex()
+    index.rebuild(load_leads_sqlite(args.db))
+    print(f"{len(index)} Leads indexiert in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    t0 = time.perf_counter()
+    if args.company:
+        result = index.find_by_company(args.company)
+    elif args.name:
+        result = index.find_by_name(args.name, args.with_company)
+    elif args.linkedin:
+        result = index.find_by_linkedin(args.linkedin)
+    else:
+        raise ValueError("--company, --name oder --linkedin angeben")
+    elapsed_us = (time.perf_counter() - t0) * 1e6
+    _print(result)
+    print(f"({elapsed_us:.0f}µs)")
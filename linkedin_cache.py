@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Cache (Profile, Firmen, Suchen, Posts) für Bot und Battle Cards
+Jeder LinkedIn-Aufruf kostet ~1 s und Rate Limit — dasselbe Profil eine
+Minute später noch einmal zu holen ist unnötig. Bot (pipo_telegram_bot.py)
+und Battle-Card-Recherche (pipo_battlecard.py) teilen sich eine SQLite-Datei.
+
+- Schlüssel:  (resource, key) — key = URN-ID oder public_id (klein, URL-dekodiert),
+              bei Suchen die normalisierten Suchbegriffe. Profile werden unter
+              URN UND public_id abgelegt (Bot sucht per public_id, Battle Card per URN)
+- TTL:        pro Ressource (Profil 7 Tage, Posts 1 Tag, ...)
+- Negativ:    bestätigt leere Antworten (Profil weg, Suche ohne Treffer) werden mit
+              NEGATIVE_TTL gecacht; Fehler/Exceptions nie. linkedin-api liefert bei
+              429 oder abgelaufenem li_at ebenfalls nur {} / [] — der Aufrufer prüft
+              dann session_valid() und wirft LinkedInUnavailable statt leer zu antworten
+- Payload:    JSON, zlib-komprimiert (Rohprofile mit Experience/Skills sind groß)
+- Statistik:  Hits, Misses, negative Hits und gesparte API-Calls pro Ressource
+
+Usage:
+  python3 linkedin_cache.py stats
+  python3 linkedin_cache.py purge
+  python3 linkedin_cache.py clear [--resource profile]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+# Neben der Lead-DB statt /tmp: gecachte Profile sollen einen Reboot überleben (wie outbox.py)
+LINKEDIN_CACHE_DB = os.environ.get("LINKEDIN_CACHE_DB",
+                                   os.path.join(os.path.dirname(DB_PATH), "pipo_linkedin_cache.db"))
+DAY = 86400
+TTL_SECONDS = {
+    "profile": 7 * DAY,
+    "connections": 7 * DAY,
+    "posts": 1 * DAY,
+    "company": 7 * DAY,
+    "company_posts": 1 * DAY,
+    "people_search": 3 * DAY,
+    "company_search": 7 * DAY,
+}
+DEFAULT_TTL_SECONDS = 1 * DAY
+NEGATIVE_TTL_SECONDS = 6 * 3600   # kurz: ein falsches "nicht gefunden" soll nicht lange hängen
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class LinkedInUnavailable(Exception):
+    """Kein LinkedIn-Client (Cookie fehlt/abgelaufen) — Miss ohne Cache-Eintrag"""
+
+
+def cache_key(key: str) -> str:
+    """'Oliver-M%C3%BCller-1/ ' → 'oliver-müller-1'"""
+    return _WHITESPACE.sub(" ", urllib.parse.unquote(str(key))).strip().strip("/").lower()
+
+
+class LinkedInCache:
+    def __init__(self, db_path: str = LINKEDIN_CACHE_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.session = {"hits": 0, "negative_hits": 0, "misses": 0}   # nur dieser Prozess
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS linkedin_cache (
+                    resource TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (resource, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_linkedin_cache_expires ON linkedin_cache(expires_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS linkedin_cache_stats (
+                    resource TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    negative_hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.commit()
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+
+    def get(self, resource: str, key: str) -> Tuple[bool, Any]:
+        """→ (gefunden, payload); gefunden=True auch für negative Einträge (payload leer)"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT payload, negative FROM linkedin_cache WHERE resource = ? AND key = ? AND expires_at > ?
+            """, (resource, cache_key(key), time.time())).fetchone()
+            column = "misses" if row is None else "negative_hits" if row["negative"] else "hits"
+            conn.execute(f"""
+                INSERT INTO linkedin_cache_stats (resource, {column}) VALUES (?, 1)
+                ON CONFLICT (resource) DO UPDATE SET {column} = {column} + 1
+            """, (resource,))
+            conn.commit()
+        with self._lock:
+            self.session[column] += 1
+        if row is None:
+            return False, None
+        return True, json.loads(zlib.decompress(row["payload"]))
+
+    def put(self, resource: str, keys, payload: Any):
+        """Unter einem oder mehreren Schlüsseln ablegen (leer → negativer Eintrag)"""
+        keys = [keys] if isinstance(keys, str) else [k for k in keys if k]
+        negative = not payload
+        now = time.time()
+        ttl = NEGATIVE_TTL_SECONDS if negative else TTL_SECONDS.get(resource, DEFAULT_TTL_SECONDS)
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False, default=str).encode(), 6)
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO linkedin_cache (resource, key, payload, negative, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (resource, key) DO UPDATE SET
+                    payload = excluded.payload, negative = excluded.negative,
+                    created_at = excluded.created_at, expires_at = excluded.expires_at
+            """, [(resource, cache_key(k), blob, int(negative), now, now + ttl) for k in keys])
+            conn.commit()
+
+    def fetch(self, resource: str, key: str, request: Callable[[], Any],
+              aliases: Optional[Callable[[Any], list]] = None) -> Any:
+        """
+        Cache-Treffer oder request() (genau ein API-Call) und ablegen.
+        aliases(payload) → weitere Schlüssel (z.B. public_id zu einer URN).
+        Eine leere Antwort von request() gilt als bestätigter Miss (negativer Eintrag) —
+        kann request() das nicht bestätigen, muss es LinkedInUnavailable werfen.
+        Exceptions (auch LinkedInUnavailable) gehen durch und werden nicht gecacht.
+        """
+        found, payload = self.get(resource, key)
+        self._local.hit = found
+        if found:
+            return payload
+        payload = request()
+        self.put(resource, [key] + (aliases(payload) if aliases and payload else []), payload)
+        return payload
+
+    def last_was_hit(self) -> bool:
+        """Ob der letzte fetch() dieses Threads aus dem Cache kam"""
+        return getattr(self._local, "hit", False)
+
+    # ── Wartung ──────────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict:
+        """Pro Ressource: Hit-Ratio und gesparte API-Calls (jeder Treffer = ein Aufruf weniger)"""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT * FROM linkedin_cache_stats ORDER BY resource").fetchall()
+            entries = dict(conn.execute(
+                "SELECT resource, COUNT(*) FROM linkedin_cache WHERE expires_at > ? GROUP BY resource",
+                (time.time(),)).fetchall())
+            size = conn.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM linkedin_cache").fetchone()[0]
+        result = {}
+        for r in rows:
+            saved = r["hits"] + r["negative_hits"]
+            total = saved + r["misses"]
+            result[r["resource"]] = {
+                "hits": r["hits"], "negative_hits": r["negative_hits"], "misses": r["misses"],
+                "hit_ratio": round(saved / total, 3) if total else 0.0,
+                "api_calls_saved": saved, "entries": entries.get(r["resource"], 0),
+            }
+        saved = sum(s["api_calls_saved"] for s in result.values())
+        total = saved + sum(s["misses"] for s in result.values())
+        result["total"] = {"hit_ratio": round(saved / total, 3) if total else 0.0,
+                           "api_calls_saved": saved, "payload_kb": round(size / 1024, 1)}
+        return result
+
+    def purge(self) -> int:
+        with self.get_connection() as conn:
+            cur = conn.execute("DELETE FROM linkedin_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            return cur.rowcount
+
+    def clear(self, resource: Optional[str] = None) -> int:
+        with self.get_connection() as conn:
+            if resource:
+                cur = conn.execute("DELETE FROM linkedin_cache WHERE resource = ?", (resource,))
+            else:
+                cur = conn.execute("DELETE FROM linkedin_cache")
+            conn.commit()
+            return cur.rowcount
+
+
+def session_valid(api) -> bool:
+    """Login/li_at des linkedin-api-Clients noch gültig und nicht gedrosselt (/me → 200)?"""
+    try:
+        resp = api.client.session.get("https://www.linkedin.com/voyager/api/me",
+                                      allow_redirects=False, timeout=10)
+        return resp.status_code == 200
+    except Exception:
+        return False
+
+
+def profile_aliases(profile: Dict) -> list:
+    """Rohprofil (linkedin-api get_profile) → URN-ID + public_id als zusätzliche Schlüssel"""
+    return [str(v) for v in (profile.get("profile_id"), profile.get("urn_id"), profile.get("public_id")) if v]
+
+
+_cache: Optional[LinkedInCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_linkedin_cache() -> LinkedInCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LinkedInCache()
+        return _cache
+
+
+def format_stats(stats: Dict) -> str:
+    """stats()["total"] oder LinkedInCache.session → eine Zeile fürs Log"""
+    if "misses" in stats:
+        saved = stats["hits"] + stats["negative_hits"]
+        total = saved + stats["misses"]
+        stats = {"hit_ratio": saved / total if total else 0.0, "api_calls_saved": saved}
+    return (f"LinkedIn Cache: Hit-Ratio {stats.get('hit_ratio', 0):.0%}, "
+            f"{stats.get('api_calls_saved', 0)} API-Calls gespart")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LinkedIn Cache")
+    parser.add_argument("command", choices=["stats", "purge", "clear"])
+    parser.add_argument("--db", default=LINKEDIN_CACHE_DB, help="Pfad zur SQLite DB")
+    parser.add_argument("--resource", default=None)
+    args = parser.parse_args()
+
+    cache = LinkedInCache(args.db)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(json.dumps(stats, indent=2))
+        print(format_stats(stats["total"]))
+    elif args.command == "purge":
+        print(f"{cache.purge()} abgelaufene Einträge entfernt")
+    else:
+        print(f"{cache.clear(args.resource)} Einträge entfernt")
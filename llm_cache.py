@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache (Claude Haiku) für Bot und Dashboard
+Gleiche Frage → gleiche Antwort ohne Netzwerk: Intent-Routing, Quick-Analyse
+eines LinkedIn-Profils und die pipo_chat Quick Actions schicken immer
+wieder dieselben Prompts.
+
+- Schlüssel:  sha256(model, sha256(system), normalisierter Input)
+              Normalisierung: Unicode NFKC, casefold, Whitespace zusammengefasst
+              → "Top  Leads" und "top leads" treffen denselben Eintrag.
+              Geänderter System-Prompt (z.B. neue Live-Zahlen im pipo_chat) = neuer Schlüssel
+- TTL:        pro Namespace (intent / quick_analysis / chat), abgelaufen = Miss
+- LRU:        last_used wird bei Treffern fortgeschrieben (gesammelt, kein Write
+              pro Lookup); über MAX_ENTRIES fliegen die am längsten unbenutzten Einträge
+- Speicher:   kleines In-Memory-LRU vor SQLite → Wiederholungen im selben
+              Prozess ohne DB-Zugriff (Mikrosekunden)
+- Zähler:     Hits/Misses pro Namespace, persistiert in llm_cache_stats
+
+Leere Antworten und Fehler werden nicht gecacht.
+
+Usage:
+  python3 llm_cache.py stats
+  python3 llm_cache.py purge     → abgelaufene Einträge löschen
+  python3 llm_cache.py clear [--namespace intent]
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+# Neben der Lead-DB statt /tmp: der Cache soll einen Reboot überleben (wie outbox.py)
+LLM_CACHE_DB = os.environ.get("LLM_CACHE_DB", os.path.join(os.path.dirname(DB_PATH), "pipo_llm_cache.db"))
+MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+MEMORY_ENTRIES = 256
+TOUCH_FLUSH_EVERY = 50   # Treffer: last_used/Hits gesammelt zurückschreiben
+
+# TTL pro Namespace (Sekunden)
+TTL_SECONDS = {
+    "intent": 30 * 86400,          # Routing hängt nur an Nachricht + Kontext
+    "quick_analysis": 3 * 86400,   # Profil/Stage können sich ändern
+    "chat": 3600,                  # pipo_chat: Live-Zahlen stecken im System-Prompt
+}
+DEFAULT_TTL_SECONDS = 86400
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def cache_key(model: str, system: str, text: str) -> str:
+    system_hash = hashlib.sha256((system or "").encode()).hexdigest()
+    return hashlib.sha256(f"{model}\0{system_hash}\0{normalize(text)}".encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path: str = LLM_CACHE_DB, max_entries: int = MAX_ENTRIES,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()   # key → (response, expires_at)
+        self._hits: Dict[str, int] = {}      # noch nicht persistiert
+        self._misses: Dict[str, int] = {}
+        self._touched: Dict[str, tuple] = {}  # key → (last_used, Treffer) aus dem In-Memory-LRU
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache_stats (
+                    namespace TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.commit()
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+
+    def get(self, namespace: str, model: str, system: str, text: str) -> Optional[str]:
+        key = cache_key(model, system, text)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self._hit(namespace, key, now)
+                return entry[0]
+            self._memory.pop(key, None)
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT response, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                               (key, now)).fetchone()
+        with self._lock:
+            if row is None:
+                self._count(self._misses, namespace)
+                return None
+            self._hit(namespace, key, now)
+            self._remember(key, row["response"], row["expires_at"])
+            return row["response"]
+
+    def put(self, namespace: str, model: str, system: str, text: str, response: str, ttl: Optional[float] = None):
+        key = cache_key(model, system, text)
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else TTL_SECONDS.get(namespace, DEFAULT_TTL_SECONDS))
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO llm_cache (key, namespace, model, response, created_at, expires_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    response = excluded.response, expires_at = excluded.expires_at, last_used = excluded.last_used
+            """, (key, namespace, model, response, now, expires_at, now))
+            self._evict(conn)
+            conn.commit()
+        with self._lock:
+            self._remember(key, response, expires_at)
+            self._flush_locked()
+
+    def cached(self, namespace: str, model: str, system: str, text: str,
+               compute: Callable[[], Optional[str]], ttl: Optional[float] = None) -> Optional[str]:
+        """Treffer zurückgeben oder compute() aufrufen und speichern (leer/None wird nicht gecacht)"""
+        response = self.get(namespace, model, system, text)
+        if response is not None:
+            return response
+        response = compute()
+        if response:
+            self.put(namespace, model, system, text, response, ttl)
+        return response
+
+    # ── Intern ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _count(counter: Dict[str, int], namespace: str):
+        counter[namespace] = counter.get(namespace, 0) + 1
+
+    def _hit(self, namespace: str, key: str, now: float):
+        """Treffer zählen; last_used/hits gehen gesammelt in die DB (kein Write pro Lookup)"""
+        self._count(self._hits, namespace)
+        self._touched[key] = (now, self._touched.get(key, (0, 0))[1] + 1)
+        if sum(self._hits.values()) >= TOUCH_FLUSH_EVERY:
+            self._flush_locked()
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn):
+        """LRU: über max_entries die am längsten unbenutzten Einträge löschen"""
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used LIMIT ?
+                )
+            """, (count - self.max_entries,))
+
+    def _flush_locked(self):
+        """Gesammelte Zähler + last_used der In-Memory-Treffer schreiben (Lock gehalten)"""
+        if not (self._hits or self._misses or self._touched):
+            return
+        hits, misses, touched = self._hits, self._misses, self._touched
+        self._hits, self._misses, self._touched = {}, {}, {}
+        with self.get_connection() as conn:
+            for namespace in set(hits) | set(misses):
+                conn.execute("""
+                    INSERT INTO llm_cache_stats (namespace, hits, misses) VALUES (?, ?, ?)
+                    ON CONFLICT (namespace) DO UPDATE SET
+                        hits = hits + excluded.hits, misses = misses + excluded.misses
+                """, (namespace, hits.get(namespace, 0), misses.get(namespace, 0)))
+            conn.executemany("UPDATE llm_cache SET last_used = MAX(last_used, ?), hits = hits + ? WHERE key = ?",
+                             [(ts, n, key) for key, (ts, n) in touched.items()])
+            conn.commit()
+
+    # ── Wartung ──────────────────────────────────────────────────────────────
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def stats(self) -> Dict:
+        self.flush()
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT namespace, hits, misses FROM llm_cache_stats ORDER BY namespace").fetchall()
+            entries = dict(conn.execute("SELECT namespace, COUNT(*) FROM llm_cache GROUP BY namespace").fetchall())
+        result = {}
+        for r in rows:
+            total = r["hits"] + r["misses"]
+            result[r["namespace"]] = {
+                "hits": r["hits"], "misses": r["misses"],
+                "hit_ratio": round(r["hits"] / total, 3) if total else 0.0,
+                "entries": entries.get(r["namespace"], 0),
+            }
+        return result
+
+    def purge(self) -> int:
+        with self.get_connection() as conn:
+            cur = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            return cur.rowcount
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        with self._lock:
+            self._memory.clear()
+        with self.get_connection() as conn:
+            if namespace:
+                cur = conn.execute("DELETE FROM llm_cache WHERE namespace = ?", (namespace,))
+            else:
+                cur = conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+            return cur.rowcount
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Prozessweite Instanz (In-Memory-LRU wird geteilt)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+            atexit.register(_cache.flush)
+        return _cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM Response Cache")
+    parser.add_argument("command", choices=["stats", "purge", "clear"])
+    parser.add_argument("--db", default=LLM_CACHE_DB, help="Pfad zur SQLite DB")
+    parser.add_argument("--namespace", default=None)
+    args = parser.parse_args()
+
+    cache = LLMCache(args.db)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.command == "purge":
+        print(f"{cache.purge()} abgelaufene Einträge entfernt")
+    else:
+        print(f"{cache.clear(args.namespace)} Einträge entfernt")
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Lookalike-Lead Finder für Bitwise EMEA
+Ähnlichkeitsindex über Prospects: "welche Leads sehen aus wie unsere
+Closed-Won / High-MEDDPICC Deals?"
+
+- Features: gehashte Tokens (Feature Hashing) aus Industry, Title,
+  Company Type, Region, Tier, AUM-Bucket und Use-Case-Text, TF-IDF gewichtet
+- Index: Sparse-Matrix (CSR) in numpy, Cosine Top-K vektorisiert
+- Inkrementell: nur Leads mit geänderten Feature-Inputs werden neu gehasht
+- Persistenz: .npz (LOOKALIKE_INDEX_PATH)
+
+Usage:
+  python3 lookalike.py                       → Top 20 ähnlich zu Closed Won / MEDDPICC ≥ 60
+  python3 lookalike.py --company "Tangany"   → Top 20 ähnlich zu einer Firma
+  python3 lookalike.py --ids 12,57 --top 50  → Seeds per Lead-ID
+"""
+
+import os
+import re
+import math
+import zlib
+import sqlite3
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+INDEX_PATH = os.environ.get("LOOKALIKE_INDEX_PATH", "/tmp/pipo_lookalike.npz")
+
+N_FEATURES = 2 ** 18
+SEED_MIN_MEDDPICC = 60
+
+# Gewicht pro Feld (Text-Felder werden auf ihre Token-Anzahl normalisiert)
+FIELD_WEIGHTS = {
+    'industry': 2.0,
+    'company_type': 1.5,
+    'title': 1.5,
+    'region': 1.0,
+    'tier': 1.0,
+    'aum': 1.0,
+    'use_case': 1.0,
+}
+FEATURE_FIELDS = ('industry', 'company_type', 'title', 'region', 'tier', 'aum_estimate_millions', 'use_case')
+
+STOPWORDS = {
+    'and', 'the', 'for', 'of', 'und', 'der', 'die', 'das', 'für', 'von', 'mit', 'source',
+    'head', 'eth', 'staking',
+}
+TOKEN_RE = re.compile(r"[a-zäöüß0-9]{3,}")
+
+
+# ============================================
+# Features
+# ============================================
+
+def _hash(token: str) -> int:
+    return zlib.crc32(token.encode()) % N_FEATURES
+
+
+def _text_tokens(text: str) -> List[str]:
+    tokens = [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+    return list(dict.fromkeys(tokens))[:40]
+
+
+def _aum_bucket(aum: Any) -> str:
+    try:
+        aum = float(aum or 0)
+    except (TypeError, ValueError):
+        aum = 0.0
+    if aum <= 0:
+        return 'unknown'
+    return str(int(math.log10(aum)))  # 0: <10M, 1: <100M, 2: <1B, ...
+
+
+def lead_features(lead: Dict[str, Any]) -> Dict[int, float]:
+    """Gehashter Feature-Vektor (Index → Gewicht) eines Leads"""
+    features: Dict[int, float] = {}
+
+    def add(token: str, weight: float):
+        idx = _hash(token)
+        features[idx] = features.get(idx, 0.0) + weight
+
+    for field in ('industry', 'company_type', 'region'):
+        value = str(lead.get(field) or '').strip().lower()
+        if value and value not in ('other', 'unknown', 'none'):
+            add(f"{field}={value}", FIELD_WEIGHTS[field])
+    if lead.get('tier'):
+        add(f"tier={int(lead['tier'])}", FIELD_WEIGHTS['tier'])
+    add(f"aum={_aum_bucket(lead.get('aum_estimate_millions'))}", FIELD_WEIGHTS['aum'])
+
+    # Use-Case ohne Import-Tag ("| Source: apollo_xyz")
+    use_case = re.sub(r'\|\s*source:.*$', '', str(lead.get('use_case') or ''), flags=re.IGNORECASE)
+    for field, text in (('title', lead.get('title')), ('use_case', use_case)):
+        tokens = _text_tokens(text)
+        if tokens:
+            w = FIELD_WEIGHTS[field] / math.sqrt(len(tokens))
+            for tok in tokens:
+                add(f"{field}:{tok}", w)
+    return features
+
+
+def feature_fingerprint(lead: Dict[str, Any]) -> str:
+    """Hash der Feature-Inputs — ändert sich nur wenn ein Feature-Feld sich ändert"""
+    key = "|".join(str(lead.get(f) or '') for f in FEATURE_FIELDS)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+# ============================================
+# Index
+# ============================================
+
+class LookalikeIndex:
+    """
+    Sparse TF-IDF Index über alle Leads.
+    update() hält den Index inkrementell aktuell, similar() beantwortet
+    Top-K Cosine-Queries gegen eine Menge von Seed-Leads.
+    """
+
+    def __init__(self, path: Optional[str] = INDEX_PATH):
+        self.path = path
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.fingerprints: List[str] = []
+        self.meta: Dict[str, np.ndarray] = {
+            'company': np.zeros(0, dtype=str),
+            'stage': np.zeros(0, dtype=str),
+            'region': np.zeros(0, dtype=str),
+            'meddpicc': np.zeros(0, dtype=np.int32),
+        }
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float32)
+        self._prepared = False
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ── Persistenz ────────────────────────────────────────────────────────────
+
+    def load(self):
+        try:
+            with np.load(self.path) as z:
+                self.ids = z['ids']
+                self.fingerprints = z['fingerprints'].tolist()
+                self.meta = {k: z[f'meta_{k}'] for k in self.meta}
+                self.indptr, self.indices, self.data = z['indptr'], z['indices'], z['data']
+        except Exception:
+            # Kaputter/alter Index → beim nächsten update() neu aufbauen
+            self.__init__(path=None)
+        self._prepared = False
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + '.tmp.npz'
+        np.savez(
+            tmp, ids=self.ids, fingerprints=np.array(self.fingerprints, dtype=str),
+            indptr=self.indptr, indices=self.indices, data=self.data,
+            **{f'meta_{k}': v for k, v in self.meta.items()},
+        )
+        os.replace(tmp, self.path)
+
+    # ── Inkrementeller Rebuild ────────────────────────────────────────────────
+
+    def update(self, records: Iterable[Dict[str, Any]], save: bool = True) -> Dict[str, int]:
+        """
+        Synchronisiert den Index mit den aktuellen Leads.
+        Unveränderte Leads behalten ihre Feature-Zeile; nur neue/geänderte
+        werden gehasht, gelöschte fallen raus.
+        Returns: {'added': n, 'changed': n, 'removed': n, 'total': n}
+        """
+        old_pos = {int(lead_id): i for i, lead_id in enumerate(self.ids)}
+        stats = {'added': 0, 'changed': 0, 'removed': 0}
+
+        ids, fps, rows = [], [], []
+        meta = {k: [] for k in self.meta}
+        for r in records:
+            lead_id = int(r['id'])
+            fp = feature_fingerprint(r)
+            pos = old_pos.pop(lead_id, None)
+            if pos is not None and self.fingerprints[pos] == fp:
+                start, end = self.indptr[pos], self.indptr[pos + 1]
+                rows.append((self.indices[start:end], self.data[start:end]))
+            else:
+                stats['added' if pos is None else 'changed'] += 1
+                feats = lead_features(r)
+                rows.append((np.fromiter(feats.keys(), dtype=np.int32, count=len(feats)),
+                             np.fromiter(feats.values(), dtype=np.float32, count=len(feats))))
+            ids.append(lead_id)
+            fps.append(fp)
+            meta['company'].append(str(r.get('company') or ''))
+            meta['stage'].append(str(r.get('stage') or 'prospecting'))
+            meta['region'].append(str(r.get('region') or ''))
+            meta['meddpicc'].append(int(r.get('meddpicc') or r.get('total_score') or 0))
+        stats['removed'] = len(old_pos)
+
+        lengths = np.array([len(idx) for idx, _ in rows], dtype=np.int64)
+        self.ids = np.array(ids, dtype=np.int64)
+        self.fingerprints = fps
+        self.meta = {
+            'company': np.array(meta['company'], dtype=str),
+            'stage': np.array(meta['stage'], dtype=str),
+            'region': np.array(meta['region'], dtype=str),
+            'meddpicc': np.array(meta['meddpicc'], dtype=np.int32),
+        }
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.indices = np.concatenate([idx for idx, _ in rows]).astype(np.int32) if rows else np.zeros(0, np.int32)
+        self.data = np.concatenate([d for _, d in rows]).astype(np.float32) if rows else np.zeros(0, np.float32)
+        self._prepared = False
+
+        if save and (stats['added'] or stats['changed'] or stats['removed']):
+            self.save()
+        stats['total'] = len(self.ids)
+        return stats
+
+    # ── Query ────────────────────────────────────────────────────────────────
+
+    def _prepare(self):
+        """TF-IDF Gewichte + Zeilennormen (einmal pro Index-Stand)"""
+        n = len(self.ids)
+        self._row_of = np.repeat(np.arange(n), np.diff(self.indptr))
+        doc_freq = np.bincount(self.indices, minlength=N_FEATURES)
+        idf = (np.log((1 + n) / (1 + doc_freq)) + 1).astype(np.float32)
+        self._weighted = self.data * idf[self.indices]
+        norms = np.sqrt(np.bincount(self._row_of, weights=self._weighted ** 2, minlength=n))
+        self._norms = np.where(norms > 0, norms, 1.0)
+        self._pos = {int(lead_id): i for i, lead_id in enumerate(self.ids)}
+        self._prepared = True
+
+    def default_seed_ids(self, min_meddpicc: int = SEED_MIN_MEDDPICC) -> List[int]:
+        """Closed Won + High-MEDDPICC Leads"""
+        mask = (self.meta['stage'] == 'closed_won') | (self.meta['meddpicc'] >= min_meddpicc)
+        return self.ids[mask].tolist()
+
+    def similar(
+        self,
+        seed_ids: Optional[List[int]] = None,
+        top_k: int = 20,
+        region: Optional[str] = None,
+        include_closed: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-K Leads mit höchster Cosine-Similarity zum Seed-Centroid.
+        Seeds selbst und (default) closed Leads werden ausgeschlossen.
+        """
+        if not len(self.ids):
+            return []
+        if not self._prepared:
+            self._prepare()
+        if seed_ids is None:
+            seed_ids = self.default_seed_ids()
+        seed_pos = [self._pos[i] for i in seed_ids if i in self._pos]
+        if not seed_pos:
+            return []
+
+        # Centroid der normierten Seed-Vektoren (dense, N_FEATURES)
+        is_seed = np.zeros(len(self.ids), dtype=bool)
+        is_seed[seed_pos] = True
+        nnz = is_seed[self._row_of]
+        query = np.bincount(
+            self.indices[nnz],
+            weights=self._weighted[nnz] / self._norms[self._row_of[nnz]],
+            minlength=N_FEATURES,
+        )
+        q_norm = float(np.linalg.norm(query)) or 1.0
+
+        dots = np.bincount(self._row_of, weights=self._weighted * query[self.indices], minlength=len(self.ids))
+        scores = dots / (self._norms * q_norm)
+
+        mask = ~is_seed
+        if not include_closed:
+            mask &= ~np.isin(self.meta['stage'], ['closed_won', 'closed_lost'])
+        if region:
+            mask &= self.meta['region'] == region.upper()
+        scores = np.where(mask, scores, -1.0)
+
+        k = min(top_k, int(mask.sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                'lead_id': int(self.ids[i]),
+                'company': str(self.meta['company'][i]),
+                'region': str(self.meta['region'][i]),
+                'stage': str(self.meta['stage'][i]),
+                'meddpicc': int(self.meta['meddpicc'][i]),
+                'similarity': round(float(scores[i]), 3),
+            }
+            for i in top
+        ]
+
+    def find_ids_by_company(self, company: str) -> List[int]:
+        """Lead-IDs deren Firmenname den Suchtext enthält (für Seeds per Name)"""
+        needle = company.lower().strip()
+        return [int(self.ids[i]) for i, c in enumerate(self.meta['company']) if needle in c.lower()]
+
+
+# ============================================
+# Datenquellen
+# ============================================
+
+def load_leads_sqlite(db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Alle Leads inkl. MEDDPICC total aus SQLite"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("""
+            SELECT
+                l.id, l.company, l.region, l.tier, l.title, l.industry, l.company_type,
+                l.aum_estimate_millions, l.use_case, l.stage,
+                COALESCE(
+                    m.metrics + m.economic_buyer + m.decision_process + m.decision_criteria +
+                    m.paper_process + m.pain + m.champion + m.competition,
+                    0
+                ) as meddpicc
+            FROM leads l
+            LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
+        """).fetchall()
+    finally:
+        conn.close()
+    return [dict(r) for r in rows]
+
+
+def format_similar_telegram(results: List[Dict[str, Any]], seed_label: str) -> str:
+    """Formatiert Lookalikes für Telegram (HTML)"""
+    if not results:
+        return f"🧬 Keine Lookalikes gefunden ({seed_label})."
+    lines = [f"🧬 <b>Lookalikes</b> — ähnlich zu {seed_label}\n"]
+    for i, r in enumerate(results, 1):
+        lines.append(
+            f"{i}. <b>{r['company']}</b> · {r['region']} · {r['stage']}\n"
+            f"   Ähnlichkeit {r['similarity']:.2f} · MEDDPICC {r['meddpicc']}/80"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lookalike-Leads finden")
+    parser.add_argument("--db", default=DB_PATH, help="DB Pfad")
+    parser.add_argument("--index", default=INDEX_PATH, help="Index-Datei (.npz)")
+    parser.add_argument("--company", default=None, help="Seeds: Leads dieser Firma")
+    parser.add_argument("--ids", default=None, help="Seeds: Komma-Liste von Lead-IDs")
+    parser.add_argument("--region", default=None, help="Nur Ergebnisse aus dieser Region")
+    parser.add_argument("--top", type=int, default=20, help="Anzahl Ergebnisse")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    index = LookalikeIndex(args.index)
+    stats = index.update(load_leads_sqlite(args.db))
+    print(f"📇 Index: {stats['total']:,} Leads (+{stats['added']} neu, "
+          f"{stats['changed']} geändert, -{stats['removed']} entfernt)")
+
+    if args.ids:
+        seeds, label = [int(x) for x in args.ids.split(",") if x.strip()], f"IDs {args.ids}"
+    elif args.company:
+        seeds, label = index.find_ids_by_company(args.company), args.company
+    else:
+        seeds, label = index.default_seed_ids(), f"Closed Won / MEDDPICC ≥ {SEED_MIN_MEDDPICC}"
+
+    if not seeds:
+        print(f"❌ Keine Seed-Leads für {label}")
+    else:
+        q_started = datetime.now()
+        results = index.similar(seeds, top_k=args.top, region=args.region)
+        q_ms = (datetime.now() - q_started).total_seconds() * 1000
+        print(f"\n🧬 Top {len(results)} ähnlich zu {label} ({len(seeds)} Seeds, Query {q_ms:.1f}ms)\n")
+        for i, r in enumerate(results, 1):
+            print(f"{i:>3}. {r['similarity']:.3f}  {r['company'][:40]:<40} {r['region']:<8} "
+                  f"{r['stage']:<12} MEDDPICC {r['meddpicc']}")
+    print(f"\n⏱ {(datetime.now() - started).total_seconds():.2f}s")
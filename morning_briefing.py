@@ -7,19 +7,51 @@ Generiert jeden Morgen eine kuratierte Top 5 Liste basierend auf:
 - Activity Recency
 - Region/Strategic Priority
 - Stage Progression
+
+Zwei Phasen, damit der Versand um 9:00 nicht vom Scoring abhängt:
+- precompute: scort die Pipeline und materialisiert Top-N, Gründe, Actions,
+  Stats und den fertigen Text in `briefing_cache` (off-peak / nach Datenänderungen;
+  nur wenn sich seit dem letzten Lauf Daten geändert haben oder ein neuer Tag ist)
+- send: liest die Zeile für heute und sendet sie (O(1)); fehlt sie oder ist
+  sie veraltet, wird einmal nachgerechnet
+
+`briefing_history` speichert pro Tag die Rangliste (Top HISTORY_DEPTH mit
+Score und Stage); "Δ seit gestern" vergleicht zwei gespeicherte Listen
+(Neueinsteiger, Raus, Rang-Wechsel, Stage-Wechsel) — ohne gestern neu zu scoren.
+
+Regional-Modus: ein Scoring-Durchlauf, danach partitioniert (Top N pro
+Region); Formatieren und Senden laufen pro Region parallel in einem
+begrenzten Thread-Pool.
+
+Usage:
+  python3 morning_briefing.py precompute [--force]
+  python3 morning_briefing.py [send]
+  python3 morning_briefing.py preview | status
+  python3 morning_briefing.py regions [all|DE,CH] [--preview]
 """
 
 import sqlite3
 import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from database import ensure_timestamp_normalization, to_db_timestamp
+from models import Region
+from outbox import get_outbox
+from response_cache import current_version, ensure_response_cache
+from scoring import STAGE_WEIGHTS, REGION_PRIORITY, ScoreBreakdown, priority_breakdown
 
 # Configuration
 DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "671208506")
-STATE_FILE = "/tmp/morning_briefing_state.json"
+BRIEFING_TOP_N = 5
+HISTORY_DEPTH = 25   # so viele Ränge pro Tag in briefing_history (für "jetzt #7" bei Drop-outs)
+BRIEFING_REGIONS = [r.value for r in Region]
+REGION_WORKERS = int(os.environ.get("BRIEFING_WORKERS", "5"))
 
 @dataclass
 class ScoredLead:
@@ -39,6 +71,29 @@ class ScoredLead:
     priority_score: float  # Berechneter Score 0-100
     reason: str  # Warum dieser Lead in Top 5
     suggested_action: str
+    breakdown: Optional[ScoreBreakdown] = None  # Komponenten des Priority Scores
+
+@dataclass
+class HistoryEntry:
+    """Ein Rang aus briefing_history"""
+    lead_id: int
+    rank: int
+    company: str
+    priority_score: float
+    stage: str
+
+@dataclass
+class BriefingDelta:
+    """Top-N heute vs. letzter gespeicherter Tag"""
+    since: str                                    # Datum des Vergleichstags
+    entrants: List[HistoryEntry] = field(default_factory=list)   # neu in den Top N (heutiger Rang)
+    dropouts: List[Tuple[HistoryEntry, Optional[int]]] = field(default_factory=list)  # (gestern, Rang heute)
+    movers: List[Tuple[HistoryEntry, int]] = field(default_factory=list)  # (heute, Rang gestern), nur Überholungen
+    stage_changes: List[Tuple[HistoryEntry, str]] = field(default_factory=list)  # (heute, Stage gestern)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.entrants or self.dropouts or self.movers or self.stage_changes)
 
 class SmartMorningBriefing:
     """
@@ -52,25 +107,9 @@ class SmartMorningBriefing:
     - Strategic Value (5%): Regionale/Strategische Priorität
     """
     
-    # Stage Gewichtung (spätere Stages = höher)
-    STAGE_WEIGHTS = {
-        'negotiation': 1.0,
-        'validation': 0.9,
-        'solutioning': 0.8,
-        'discovery': 0.6,
-        'prospecting': 0.4,
-        'closed_won': 0.0,
-        'closed_lost': 0.0
-    }
-    
-    # Regionale Prioritäten (kann angepasst werden)
-    REGION_PRIORITY = {
-        'UAE': 1.1,    # High priority market
-        'DE': 1.0,     # Core market
-        'CH': 1.0,     # Core market
-        'UK': 0.95,    # Secondary
-        'NORDICS': 0.9 # Secondary
-    }
+    # Gewichtungen: siehe scoring.py
+    STAGE_WEIGHTS = STAGE_WEIGHTS
+    REGION_PRIORITY = REGION_PRIORITY
     
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
@@ -80,6 +119,42 @@ class SmartMorningBriefing:
         conn.row_factory = sqlite3.Row
         return conn
     
+    def init_tables(self):
+        """
+        Schema-Setup für Precompute/Send: Timestamp-Trigger + Backfill,
+        data_version-Trigger, briefing_cache, briefing_history. Idempotent.
+        Aufgerufen vom Send-/Precompute-Pfad (main, CLI) — preview/status
+        installieren keine Trigger und backfillen nichts.
+        """
+        with self.get_connection() as conn:
+            ensure_timestamp_normalization(conn)
+            # data_version-Zähler (Trigger) → Precompute nur nach Datenänderungen
+            ensure_response_cache(conn)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS briefing_cache (
+                    briefing_date TEXT PRIMARY KEY,
+                    data_version INTEGER NOT NULL,
+                    computed_at TIMESTAMP NOT NULL,
+                    compute_ms REAL NOT NULL,
+                    top_leads TEXT NOT NULL,
+                    stats TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    sent_at TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS briefing_history (
+                    briefing_date TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    lead_id INTEGER NOT NULL,
+                    company TEXT NOT NULL,
+                    priority_score REAL NOT NULL,
+                    stage TEXT NOT NULL,
+                    PRIMARY KEY (briefing_date, rank)
+                )
+            """)
+            conn.commit()
+    
     def calculate_priority_score(
         self, 
         meddpicc: int, 
@@ -93,62 +168,8 @@ class SmartMorningBriefing:
         
         Returns: (score, reason)
         """
-        # 1. MEDDPICC Score (40% weight, max 40 points)
-        meddpicc_component = (meddpicc / 80) * 40
-        
-        # 2. Deal Size (25% weight, max 25 points)
-        # Normalisiert: €50M = max points, logarithmic scale
-        if deal_size >= 50:
-            deal_component = 25
-        elif deal_size >= 20:
-            deal_component = 20
-        elif deal_size >= 10:
-            deal_component = 15
-        elif deal_size >= 5:
-            deal_component = 10
-        else:
-            deal_component = min(5, deal_size) if deal_size else 0
-        
-        # 3. Activity Recency (20% weight)
-        # Urgency peaks at 7-14 days, then decays
-        if days_inactive <= 2:
-            activity_component = 5  # Recently active, low urgency
-        elif days_inactive <= 5:
-            activity_component = 15  # Getting stale
-        elif days_inactive <= 10:
-            activity_component = 20  # Peak urgency
-        elif days_inactive <= 21:
-            activity_component = 15  # Still urgent but decaying
-        else:
-            activity_component = 10  # Very stale, might be dead
-        
-        # 4. Stage Urgency (10% weight)
-        stage_weight = self.STAGE_WEIGHTS.get(stage.lower(), 0.5)
-        stage_component = stage_weight * 10
-        
-        # 5. Strategic Value (5% weight)
-        region_multiplier = self.REGION_PRIORITY.get(region.upper(), 0.9)
-        strategic_component = 5 * region_multiplier
-        
-        # Total Score
-        total_score = (
-            meddpicc_component + 
-            deal_component + 
-            activity_component + 
-            stage_component + 
-            strategic_component
-        )
-        
-        # Determine primary reason
-        components = [
-            ("MEDDPICC", meddpicc_component),
-            ("Deal Size", deal_component),
-            ("Inaktivität", activity_component),
-            ("Stage", stage_component)
-        ]
-        primary_reason = max(components, key=lambda x: x[1])[0]
-        
-        return round(total_score, 1), primary_reason
+        breakdown = priority_breakdown(meddpicc, deal_size, days_inactive, stage, region)
+        return breakdown.total, breakdown.primary_reason
     
     def get_suggested_action(self, stage: str, days_inactive: int, meddpicc: int) -> str:
         """Schlägt nächste Action basierend auf Kontext vor"""
@@ -196,6 +217,30 @@ class SmartMorningBriefing:
         """
         Holt und scored alle relevanten Leads, gibt Top 5 zurück
         """
+        return self.get_top_leads(5)
+    
+    def get_top_leads(self, limit: int = BRIEFING_TOP_N) -> List[ScoredLead]:
+        """
+        Holt und scored alle relevanten Leads, gibt die Top N zurück
+        """
+        return self.rank_leads()[:limit]
+    
+    def get_top_leads_by_region(self, limit: int = BRIEFING_TOP_N,
+                                regions: Optional[List[str]] = None) -> Dict[str, List[ScoredLead]]:
+        """
+        Top N pro Region aus EINEM Scoring-Durchlauf (partitioniert wie
+        ROW_NUMBER() OVER (PARTITION BY region ORDER BY priority_score)).
+        Reihenfolge der Keys = regions.
+        """
+        partitions: Dict[str, List[ScoredLead]] = {r: [] for r in (regions or BRIEFING_REGIONS)}
+        for lead in self.rank_leads():
+            bucket = partitions.get(lead.region)
+            if bucket is not None and len(bucket) < limit:
+                bucket.append(lead)
+        return partitions
+    
+    def rank_leads(self) -> List[ScoredLead]:
+        """Alle relevanten Leads gescored, nach Priority Score absteigend"""
         query = """
         SELECT
             l.id,
@@ -227,10 +272,15 @@ class SmartMorningBriefing:
                 ELSE 'UNQUALIFIED'
             END as qualification,
             COALESCE(l.updated_at, l.created_at) as last_activity_date,
+            CAST(COALESCE(julianday('now') - julianday(COALESCE(l.updated_at, l.created_at)), 999)
+                 AS INTEGER) as days_inactive,
             'DB Update' as last_activity_type
         FROM leads l
         LEFT JOIN meddpicc_scores m ON l.id = m.lead_id
         WHERE l.stage NOT IN ('closed_won', 'closed_lost')
+          -- Skip if very stale (> 30 Tage, probably dead deal) unless high MEDDPICC
+          AND (COALESCE(l.updated_at, l.created_at) > datetime('now', '-31 days')
+               OR meddpicc_total >= 50)
         ORDER BY l.id DESC
         """
         
@@ -240,22 +290,11 @@ class SmartMorningBriefing:
         scored_leads = []
         
         for row in rows:
-            # Parse last activity
-            last_activity = self._parse_datetime(row['last_activity_date'])
-            days_inactive = (datetime.now() - last_activity).days if last_activity else 999
-            
-            # Skip if very stale (probably dead deal) unless high MEDDPICC
-            if days_inactive > 30 and row['meddpicc_total'] < 50:
-                continue
-            
-            # Calculate priority score
-            priority_score, reason = self.calculate_priority_score(
-                meddpicc=row['meddpicc_total'],
-                deal_size=row['expected_deal_size_millions'] or 0,
-                days_inactive=days_inactive,
-                stage=row['stage'],
-                region=row['region']
-            )
+            days_inactive = row['days_inactive']
+            # Komponenten-Vektor direkt rechnen — billiger als jeder Lookup;
+            # materialisiert wird nur das fertige Briefing (briefing_cache)
+            breakdown = priority_breakdown(row['meddpicc_total'], row['expected_deal_size_millions'] or 0,
+                                           days_inactive, row['stage'], row['region'])
             
             # Get suggested action
             suggested_action = self.get_suggested_action(
@@ -277,32 +316,20 @@ class SmartMorningBriefing:
                 deal_size=row['expected_deal_size_millions'] or 0,
                 days_inactive=days_inactive,
                 last_activity_type=row['last_activity_type'],
-                priority_score=priority_score,
-                reason=reason,
-                suggested_action=suggested_action
+                priority_score=breakdown.total,
+                reason=breakdown.primary_reason,
+                suggested_action=suggested_action,
+                breakdown=breakdown
             ))
         
-        # Sort by priority score and return top 5
+        # Sort by priority score
         scored_leads.sort(key=lambda x: x.priority_score, reverse=True)
-        return scored_leads[:5]
-    
-    def _parse_datetime(self, value) -> Optional[datetime]:
-        """Parst verschiedene Datetime-Formate"""
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        try:
-            return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
-        except:
-            try:
-                return datetime.strptime(str(value), '%Y-%m-%d %H:%M:%S')
-            except:
-                return None
+        return scored_leads
     
-    def format_morning_briefing(self, top_5: List[ScoredLead]) -> str:
+    def format_morning_briefing(self, top_5: List[ScoredLead], delta: Optional[BriefingDelta] = None,
+                                region: Optional[str] = None) -> str:
         """
-        Formatiert die Morning Briefing Nachricht für Telegram
+        Formatiert die Morning Briefing Nachricht für Telegram (region → regionales Briefing)
         """
         today = datetime.now().strftime("%A, %d.%m.%Y")
         
@@ -320,7 +347,7 @@ class SmartMorningBriefing:
         header_quote = quotes.get(weekday, "🎯 Guten Morgen!")
         
         message = f"{header_quote}\n\n"
-        message += f"📊 *Deine Top 5 für {today}*\n"
+        message += f"📊 *Deine Top 5{f' {region}' if region else ''} für {today}*\n"
         message += "_Intelligent priorisiert nach Score, Deal-Size & Aktivität_\n\n"
         message += "═══════════════════\n\n"
         
@@ -352,15 +379,21 @@ class SmartMorningBriefing:
             if lead.linkedin:
                 message += f"   🔗 [LinkedIn]({lead.linkedin})\n"
             
-            message += f"   _Priorität: {lead.priority_score}/100 ({lead.reason})_\n\n"
+            message += f"   _Priorität: {lead.priority_score}/100 ({lead.reason})_\n"
+            if lead.breakdown:
+                message += f"   _Warum: {lead.breakdown.format_compact()}_\n"
+            message += "\n"
             message += "──────────────────\n\n"
         
+        if delta is not None:
+            message += self.format_delta(delta)
+        
         # Summary Stats
         total_pipeline = sum(l.deal_size for l in top_5 if l.deal_size)
         avg_meddpicc = sum(l.meddpicc_score for l in top_5) / len(top_5) if top_5 else 0
         
         message += "═══════════════════\n\n"
-        message += f"📈 *Zusammenfassung Top 5:*\n"
+        message += f"📈 *Zusammenfassung Top 5{f' {region}' if region else ''}:*\n"
         message += f"   Gesamt-Pipeline: €{total_pipeline:.0f}M\n"
         message += f"   Ø MEDDPICC: {avg_meddpicc:.0f}/80\n"
         message += f"   Dringendste: {top_5[0].company if top_5 else 'N/A'}\n\n"
@@ -374,48 +407,281 @@ class SmartMorningBriefing:
         
         return message
     
-    def check_and_send(self) -> bool:
+    def format_briefing(self, top_leads: List[ScoredLead], delta: Optional[BriefingDelta] = None,
+                        region: Optional[str] = None) -> str:
+        """Briefing-Text inkl. Fallback ohne Prioritäten"""
+        if top_leads:
+            return self.format_morning_briefing(top_leads, delta, region)
+        message = f"🌅 *Guten Morgen{f' {region}' if region else ''}!*\n\n"
+        message += "Heute keine dringenden Prioritäten. Zeit für:\n"
+        message += "• Neue Prospecting-Listen durchgehen\n"
+        message += "• LinkedIn Outreach\n"
+        message += "• Bestehende Beziehungen pflegen\n\n"
+        message += "🌐 [Dashboard öffnen](https://pipo-bitwise-lead-tracker.streamlit.app)"
+        return message
+    
+    # ============================================
+    # Historie + "Δ seit gestern"
+    # ============================================
+    
+    def save_history(self, conn, briefing_date: str, ranked: List[ScoredLead]):
+        """Rangliste des Tages ersetzen (Precompute kann mehrfach pro Tag laufen)"""
+        conn.execute("DELETE FROM briefing_history WHERE briefing_date = ?", (briefing_date,))
+        conn.executemany("""
+            INSERT INTO briefing_history (briefing_date, rank, lead_id, company, priority_score, stage)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(briefing_date, rank, l.lead_id, l.company, l.priority_score, l.stage)
+              for rank, l in enumerate(ranked, 1)])
+    
+    def load_history(self, conn, before: str) -> Tuple[Optional[str], List[HistoryEntry]]:
+        """Letzter gespeicherter Tag vor `before` (Wochenenden/Lücken egal) → (Datum, Ränge)"""
+        row = conn.execute("SELECT MAX(briefing_date) FROM briefing_history WHERE briefing_date < ?",
+                           (before,)).fetchone()
+        since = row[0]
+        if since is None:
+            return None, []
+        rows = conn.execute("""
+            SELECT lead_id, rank, company, priority_score, stage FROM briefing_history
+            WHERE briefing_date = ? ORDER BY rank
+        """, (since,)).fetchall()
+        return since, [HistoryEntry(*r) for r in rows]
+    
+    def diff_rankings(self, since: str, previous: List[HistoryEntry], current: List[HistoryEntry],
+                      top_n: int = BRIEFING_TOP_N) -> BriefingDelta:
         """
-        Hauptfunktion: Holt Top 5 und sendet Briefing
+        Vergleicht zwei gespeicherte Ranglisten (O(N), kein Re-Scoring):
+        Entrants/Drop-outs/Movers bezogen auf die Top N, Stage-Wechsel für
+        alle Leads, die an beiden Tagen in der Liste (HISTORY_DEPTH) stehen.
         """
-        print(f"[{datetime.now()}] Generating Morning Briefing...")
+        prev_by_lead = {e.lead_id: e for e in previous}
+        curr_by_lead = {e.lead_id: e for e in current}
+        prev_top = {e.lead_id for e in previous if e.rank <= top_n}
+        curr_top = {e.lead_id for e in current if e.rank <= top_n}
         
-        top_5 = self.get_top_5_leads()
+        # Movers: nur echte Überholungen — rückt ein Lead nur nach, weil ein anderer
+        # raus ist oder neu einsteigt, bleibt seine Reihenfolge unter den gebliebenen gleich
+        stayed = prev_top & curr_top
+        prev_order = [e.lead_id for e in previous if e.lead_id in stayed]
+        curr_order = [e.lead_id for e in current if e.lead_id in stayed]
+        overtaken = {lead_id for lead_id, before in zip(curr_order, prev_order) if lead_id != before}
         
-        if not top_5:
-            message = "🌅 *Guten Morgen!*\n\n"
-            message += "Heute keine dringenden Prioritäten. Zeit für:\n"
-            message += "• Neue Prospecting-Listen durchgehen\n"
-            message += "• LinkedIn Outreach\n"
-            message += "• Bestehende Beziehungen pflegen\n\n"
-            message += "🌐 [Dashboard öffnen](https://pipo-bitwise-lead-tracker.streamlit.app)"
-        else:
-            message = self.format_morning_briefing(top_5)
+        delta = BriefingDelta(since=since)
+        for e in current:
+            if e.rank > top_n:
+                break
+            if e.lead_id not in prev_top:
+                delta.entrants.append(e)
+            elif e.lead_id in overtaken:
+                delta.movers.append((e, prev_by_lead[e.lead_id].rank))
+        for e in previous:
+            if e.rank <= top_n and e.lead_id not in curr_top:
+                now = curr_by_lead.get(e.lead_id)
+                delta.dropouts.append((e, now.rank if now else None))
+        for e in current:
+            before = prev_by_lead.get(e.lead_id)
+            if before is not None and before.stage != e.stage:
+                delta.stage_changes.append((e, before.stage))
+        return delta
+    
+    def format_delta(self, delta: BriefingDelta) -> str:
+        """Kompakter Abschnitt für das Briefing"""
+        yesterday = (datetime.strptime(self._today(), "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        label = "gestern" if delta.since == yesterday else datetime.strptime(delta.since, "%Y-%m-%d").strftime("%d.%m.")
+        message = f"🔄 *Δ seit {label}:*"
+        if not delta.has_changes:
+            return message + " keine Veränderung\n\n"
+        message += "\n"
+        if delta.entrants:
+            message += "   🆕 " + ", ".join(f"{e.company} (#{e.rank})" for e in delta.entrants) + "\n"
+        if delta.dropouts:
+            message += "   ⬇️ Raus: " + ", ".join(
+                f"{e.company} ({f'jetzt #{now}' if now else 'nicht mehr gelistet'})" for e, now in delta.dropouts
+            ) + "\n"
+        if delta.movers:
+            message += "   ↕️ " + ", ".join(f"{e.company} #{before}→#{e.rank}" for e, before in delta.movers) + "\n"
+        if delta.stage_changes:
+            message += "   📍 " + ", ".join(f"{e.company} {before}→{e.stage}" for e, before in delta.stage_changes[:5])
+            if len(delta.stage_changes) > 5:
+                message += f" _+{len(delta.stage_changes) - 5}_"
+            message += "\n"
+        return message + "\n"
+    
+    # ============================================
+    # Phase 1: Precompute → briefing_cache
+    # ============================================
+    
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime("%Y-%m-%d")
+    
+    def _cached_row(self, conn, briefing_date: str):
+        """Eintrag des Tages + ob er zur aktuellen data_version passt (None ohne init_tables())"""
+        tables = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('briefing_cache', 'data_version')")}
+        if len(tables) < 2:
+            return None
+        return conn.execute("""
+            SELECT b.*, b.data_version = v.version AS is_current
+            FROM briefing_cache b, data_version v
+            WHERE b.briefing_date = ? AND v.id = 1
+        """, (briefing_date,)).fetchone()
+    
+    def precompute(self, force: bool = False) -> Dict:
+        """
+        Scort die Pipeline und speichert das heutige Briefing. Ohne force wird
+        nichts gerechnet, wenn der Eintrag für heute zur aktuellen Daten-Version passt.
+        Die Version wird VOR dem Scoring gelesen — ein Write währenddessen macht
+        den Eintrag sofort veraltet statt ihn fälschlich als aktuell zu markieren.
+        """
+        today = self._today()
+        with self.get_connection() as conn:
+            row = self._cached_row(conn, today)
+            if row is not None and row['is_current'] and not force:
+                return {'briefing_date': today, 'recomputed': False, 'data_version': row['data_version']}
+            version = current_version(conn)
         
-        # Save state
-        self._save_state(top_5)
+        start = time.perf_counter()
+        ranked = self.get_top_leads(HISTORY_DEPTH)
+        top_leads = ranked[:BRIEFING_TOP_N]
+        with self.get_connection() as conn:
+            since, previous = self.load_history(conn, today)
+        delta = None
+        if since is not None:
+            current = [HistoryEntry(l.lead_id, rank, l.company, l.priority_score, l.stage)
+                       for rank, l in enumerate(ranked, 1)]
+            delta = self.diff_rankings(since, previous, current)
+        message = self.format_briefing(top_leads, delta)
+        stats = {
+            'total_pipeline': sum(l.deal_size for l in top_leads if l.deal_size),
+            'avg_meddpicc': round(sum(l.meddpicc_score for l in top_leads) / len(top_leads), 1) if top_leads else 0,
+            'most_urgent': top_leads[0].company if top_leads else None,
+        }
+        compute_ms = (time.perf_counter() - start) * 1000
+        
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO briefing_cache
+                    (briefing_date, data_version, computed_at, compute_ms, top_leads, stats, message, sent_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT (briefing_date) DO UPDATE SET
+                    data_version = excluded.data_version, computed_at = excluded.computed_at,
+                    compute_ms = excluded.compute_ms, top_leads = excluded.top_leads,
+                    stats = excluded.stats, message = excluded.message
+            """, (today, version, to_db_timestamp(), compute_ms,
+                  json.dumps([asdict(l) for l in top_leads]), json.dumps(stats), message))
+            self.save_history(conn, today, ranked)
+            conn.commit()
+        return {'briefing_date': today, 'recomputed': True, 'data_version': version,
+                'compute_ms': round(compute_ms, 1), 'top_leads': len(top_leads)}
+    
+    def cached_top_leads(self, briefing_date: Optional[str] = None) -> List[ScoredLead]:
+        """Materialisierte Top-N eines Tages (leer wenn nicht vorberechnet)"""
+        with self.get_connection() as conn:
+            row = self._cached_row(conn, briefing_date or self._today())
+        if row is None:
+            return []
+        leads = []
+        for d in json.loads(row['top_leads']):
+            breakdown = d.pop('breakdown')
+            leads.append(ScoredLead(**d, breakdown=ScoreBreakdown(**breakdown) if breakdown else None))
+        return leads
+    
+    # ============================================
+    # Phase 2: Send (liest nur briefing_cache)
+    # ============================================
+    
+    def check_and_send(self) -> bool:
+        """
+        Hauptfunktion: sendet das vorberechnete Briefing für heute.
+        Fehlt es oder haben sich die Daten seitdem geändert → einmal nachrechnen.
+        """
+        print(f"[{datetime.now()}] Sending Morning Briefing...")
+        today = self._today()
+        
+        with self.get_connection() as conn:
+            row = self._cached_row(conn, today)
+        if row is None or not row['is_current']:
+            print(f"   {'Kein Precompute' if row is None else 'Daten geändert seit Precompute'} — rechne nach")
+            self.precompute()
+            with self.get_connection() as conn:
+                row = self._cached_row(conn, today)
         
         # Send via Telegram
-        return self._send_telegram(message)
+        success = self._send_telegram(row['message'])
+        if success:
+            with self.get_connection() as conn:
+                conn.execute("UPDATE briefing_cache SET sent_at = ? WHERE briefing_date = ?",
+                             (to_db_timestamp(), today))
+                conn.commit()
+        return success
     
-    def _save_state(self, top_5: List[ScoredLead]):
-        """Speichert den aktuellen Zustand für Tracking"""
-        state = {
-            'last_run': datetime.now().isoformat(),
-            'top_5': [
-                {
-                    'company': l.company,
-                    'score': l.priority_score,
-                    'meddpicc': l.meddpicc_score
-                }
-                for l in top_5
-            ]
+    def status(self) -> Dict:
+        with self.get_connection() as conn:
+            row = self._cached_row(conn, self._today())
+        if row is None:
+            return {'briefing_date': self._today(), 'precomputed': False}
+        return {
+            'briefing_date': row['briefing_date'],
+            'precomputed': True,
+            'current': bool(row['is_current']),
+            'computed_at': row['computed_at'],
+            'compute_ms': round(row['compute_ms'], 1),
+            'sent_at': row['sent_at'],
         }
-        with open(STATE_FILE, 'w') as f:
-            json.dump(state, f)
+    
+    # ============================================
+    # Regional: Top N pro Region, parallel
+    # ============================================
+    
+    def send_regional(self, regions: Optional[List[str]] = None, workers: int = REGION_WORKERS,
+                      dry_run: bool = False) -> Dict[str, bool]:
+        """
+        Ein Briefing pro Region. Scoring einmal (partitioniert), Formatieren +
+        Senden pro Region in einem Thread-Pool — die Laufzeit ist ≈ die
+        langsamste Region (OpenClaw-Subprozess / Outbox), nicht die Summe.
+        dry_run: nur ausgeben.
+        """
+        regions = regions or BRIEFING_REGIONS
+        print(f"[{datetime.now()}] Regionale Briefings: {', '.join(regions)}")
+        start = time.perf_counter()
+        partitions = self.get_top_leads_by_region(BRIEFING_TOP_N, regions)
+        print(f"   Scoring: {(time.perf_counter() - start) * 1000:.0f}ms — "
+              + ", ".join(f"{r} {len(leads)}" for r, leads in partitions.items()))
+        
+        def run_region(region: str) -> Tuple[bool, float]:
+            t0 = time.perf_counter()
+            message = self.format_briefing(partitions[region], region=region)
+            if dry_run:
+                print(f"\n── {region} ──\n{message}\n", flush=True)
+                ok = True
+            else:
+                ok = self._send_telegram(message)
+            return ok, time.perf_counter() - t0
+        
+        results: Dict[str, bool] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(regions))),
+                                thread_name_prefix="briefing") as pool:
+            futures = {pool.submit(run_region, r): r for r in regions}
+            for done, future in enumerate(as_completed(futures), 1):
+                region = futures[future]
+                try:
+                    ok, elapsed = future.result()
+                except Exception as e:
+                    ok, elapsed = False, 0.0
+                    print(f"   ❌ {region}: {e}", flush=True)
+                results[region] = ok
+                print(f"   {'✅' if ok else '❌'} {region} ({elapsed:.1f}s)  [{done}/{len(regions)}]", flush=True)
+        print(f"   Fertig in {time.perf_counter() - start:.1f}s")
+        return results
     
     def _send_telegram(self, message: str) -> bool:
-        """Sendet Nachricht via OpenClaw"""
+        """Sendet Nachricht via Telegram Outbox, ohne Bot-Token via OpenClaw"""
+        if os.environ.get("TELEGRAM_BOT_TOKEN"):
+            status = get_outbox().send(TELEGRAM_CHAT_ID, message, parse_mode="Markdown")
+            if status != "failed":
+                print(f"✅ Morning Briefing {'sent' if status == 'sent' else 'queued'} via Telegram outbox")
+                return True
+            print(f"⚠️ Telegram outbox failed — trying OpenClaw")
         try:
             import subprocess
             result = subprocess.run(
@@ -443,6 +709,7 @@ class SmartMorningBriefing:
 def main():
     """Entry point für Cron"""
     briefing = SmartMorningBriefing()
+    briefing.init_tables()
     success = briefing.check_and_send()
     return 0 if success else 1
 
@@ -450,10 +717,29 @@ def main():
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == "preview":
+    command = sys.argv[1] if len(sys.argv) > 1 else "send"
+    if command == "preview":
         # Preview mode - don't send, just print
         briefing = SmartMorningBriefing()
         print(briefing.preview())
+    elif command == "precompute":
+        # Off-peak / nach Datenänderungen: Top-N materialisieren (no-op ohne Änderungen)
+        briefing = SmartMorningBriefing()
+        briefing.init_tables()
+        print(briefing.precompute(force="--force" in sys.argv[2:]))
+    elif command == "status":
+        print(json.dumps(SmartMorningBriefing().status(), indent=2))
+    elif command == "regions":
+        # Ein Briefing pro Region, parallel: regions [all|DE,CH] [--preview]
+        args = [a for a in sys.argv[2:] if not a.startswith("--")]
+        selected = None
+        if args and args[0].lower() != "all":
+            selected = [r.strip().upper() for r in args[0].split(",") if r.strip()]
+            unknown = [r for r in selected if r not in BRIEFING_REGIONS]
+            if unknown:
+                raise ValueError(f"Unbekannte Region(en): {', '.join(unknown)} (erlaubt: {', '.join(BRIEFING_REGIONS)})")
+        results = SmartMorningBriefing().send_regional(selected, dry_run="--preview" in sys.argv[2:])
+        exit(0 if all(results.values()) else 1)
     else:
         # Normal mode - send briefing
         exit(main())
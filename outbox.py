@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Telegram Outbox für Bitwise Lead Tracker
+Ein Versandweg für alle Telegram-Nachrichten (Alerts, Morning Briefing,
+Battle Cards, Bot-Antworten):
+
+- SQLite-Queue (`outbox`): Nachrichten sind nach enqueue() persistiert,
+  pro Chat FIFO — ein Teil in Backoff blockiert die folgenden
+- Token Buckets global (~30 msg/s erlaubt Telegram pro Bot) und pro Chat (~1 msg/s)
+- Nachrichten > 4096 Zeichen werden an Absatz-/Zeilengrenzen gesplittet
+- Retry mit exponentiellem Backoff, bei 429 nach `retry_after`; 4xx (außer 429)
+  ist endgültig — Ausnahme: Markdown/HTML-Parse-Fehler → einmal als Plain Text
+- Versand über eine Keep-Alive-Verbindung (http.client) statt einer neuen
+  HTTPS-Verbindung pro Nachricht
+- Optionaler dedupe_key (z.B. "update:<update_id>:<n>" vom Bot): dieselbe
+  Nachricht wird nur einmal eingereiht, auch wenn ein Update nach einem
+  Absturz erneut verarbeitet wird
+
+Nur stdlib — importierbar aus Bot und Cron-Skripten.
+TELEGRAM_API_BASE zeigt für Tests/Benchmarks auf den lokalen Stub
+(benchmarks/telegram_stub.py).
+
+Usage:
+  python3 outbox.py run            → Worker: Queue dauerhaft abarbeiten
+  python3 outbox.py drain          → einmal abarbeiten (z.B. per Cron)
+  python3 outbox.py status
+  python3 outbox.py retry-failed   → endgültig fehlgeschlagene erneut einreihen
+"""
+
+import http.client
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+# Configuration
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+# Neben der Lead-DB statt /tmp: Queue, Update-Journal und Offset (bot_updates.py)
+# müssen einen Reboot überleben, sonst verarbeitet der Bot redelivered Updates doppelt
+OUTBOX_DB = os.environ.get("OUTBOX_DB", os.path.join(os.path.dirname(DB_PATH), "pipo_outbox.db"))
+
+MAX_MESSAGE_LENGTH = 4096
+GLOBAL_RATE, GLOBAL_BURST = 25.0, 25     # msg/s über alle Chats
+CHAT_RATE, CHAT_BURST = 1.0, 3           # msg/s pro Chat
+MAX_ATTEMPTS = 6
+BACKOFF_BASE, BACKOFF_MAX = 1.0, 300.0   # Sekunden
+CLAIM_TIMEOUT = 120.0                    # 'sending' ohne Ergebnis → wieder pending (Prozess abgestürzt)
+SEND_WAIT_SECONDS = 15.0                 # send(): so lange synchron zustellen, danach bleibt es gequeued
+
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Teilt an Absatz-, dann Zeilen-, dann Wortgrenzen; hart nur wenn nötig"""
+    parts = []
+    while len(text) > limit:
+        cut = -1
+        for sep in ("\n\n", "\n", " "):
+            cut = text.rfind(sep, 0, limit)
+            if cut >= limit // 2:
+                break
+        if cut < limit // 2:
+            cut = limit
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip("\n ")
+    parts.append(text)
+    return [p for p in parts if p.strip()]
+
+
+class TokenBucket:
+    """rate Tokens/s, maximal capacity auf Vorrat"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Sekunden bis ein Token verfügbar ist (0 = sofort)"""
+        self._refill(time.monotonic())
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> bool:
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def block(self, seconds: float):
+        """Nach 429: Bucket für `seconds` leeren"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+# ============================================
+# Bot API Client (Keep-Alive)
+# ============================================
+
+class TelegramClient:
+    """Eine persistente HTTP(S)-Verbindung zur Bot API, Reconnect bei Abbruch"""
+
+    def __init__(self, token: Optional[str] = None, api_base: str = TELEGRAM_API_BASE, timeout: float = 15):
+        self.token = token if token is not None else os.environ.get("TELEGRAM_BOT_TOKEN", "")
+        parsed = urllib.parse.urlsplit(api_base)
+        self._conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        self.host = parsed.netloc
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._conn = None
+        self.connections_opened = 0
+
+    def call(self, method: str, payload: Dict) -> Tuple[int, Dict]:
+        """POST /bot<token>/<method> → (HTTP-Status, JSON-Antwort)"""
+        body = json.dumps(payload).encode("utf-8")
+        path = f"{self.prefix}/bot{self.token}/{method}"
+        for _ in range(2):
+            reused = self._conn is not None
+            if not reused:
+                self._conn = self._conn_cls(self.host, timeout=self.timeout)
+                self.connections_opened += 1
+            try:
+                self._conn.request("POST", path, body, {"Content-Type": "application/json"})
+                resp = self._conn.getresponse()
+                data = resp.read()
+                if resp.getheader("Connection", "").lower() == "close":
+                    self.close()
+                try:
+                    return resp.status, json.loads(data or b"{}")
+                except ValueError:
+                    return resp.status, {"ok": False, "description": data[:200].decode("utf-8", "replace")}
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Server hat die Keep-Alive-Verbindung geschlossen → einmal frisch verbinden
+                self.close()
+                if not reused:
+                    raise
+            except Exception:
+                self.close()
+                raise
+        raise ConnectionError("Telegram API nicht erreichbar")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ============================================
+# Outbox
+# ============================================
+
+class Outbox:
+    def __init__(self, db_path: str = OUTBOX_DB, client: Optional[TelegramClient] = None,
+                 global_rate: float = GLOBAL_RATE, global_burst: float = GLOBAL_BURST,
+                 chat_rate: float = CHAT_RATE, chat_burst: float = CHAT_BURST):
+        self.db_path = db_path
+        self.client = client or TelegramClient()
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate, self.chat_burst = chat_rate, chat_burst
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        # Eine Keep-Alive-Verbindung + Buckets pro Outbox, geteilt von parallelen Workern
+        # (pipo_battlecard --regions, Bot-Handler-Threads). Der Lock schützt nur Bucket,
+        # Claim und HTTP-Call — gewartet (Rate Limit, Backoff) wird ohne ihn, damit ein
+        # gedrosselter Chat die anderen nicht blockiert.
+        self._send_lock = threading.Lock()
+        self.init_table()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")   # WAL: kein fsync pro Commit, trotzdem crash-sicher
+        return conn
+
+    def init_table(self):
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")   # Bot + Cron schreiben parallel
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chat_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    parse_mode TEXT,
+                    reply_markup TEXT,
+                    disable_preview INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    claimed_at REAL,
+                    message_id INTEGER,
+                    last_error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sent_at TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_chat ON outbox(status, chat_id, id)")
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(outbox)")}
+            if "dedupe_key" not in columns:   # Migration bestehender Queues
+                conn.execute("ALTER TABLE outbox ADD COLUMN dedupe_key TEXT")
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_outbox_dedupe ON outbox(dedupe_key)
+                WHERE dedupe_key IS NOT NULL
+            """)
+            conn.commit()
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return self.chat_buckets[chat_id]
+
+    # ── Einreihen ────────────────────────────────────────────────────────────
+
+    def enqueue(self, chat_id, text: str, parse_mode: Optional[str] = None,
+                reply_markup: Optional[Dict] = None, disable_preview: bool = True,
+                dedupe_key: Optional[str] = None) -> List[int]:
+        """
+        Persistiert die Nachricht (ggf. gesplittet); reply_markup hängt am letzten Teil.
+        Mit dedupe_key: schon eingereiht → [] (nichts Neues)
+        """
+        parts = split_message(text)
+        ids = []
+        with self.get_connection() as conn:
+            for i, part in enumerate(parts):
+                markup = json.dumps(reply_markup) if reply_markup and i == len(parts) - 1 else None
+                cur = conn.execute("""
+                    INSERT OR IGNORE INTO outbox (chat_id, text, parse_mode, reply_markup, disable_preview, dedupe_key)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (str(chat_id), part, parse_mode, markup, int(disable_preview),
+                      f"{dedupe_key}#{i}" if dedupe_key else None))
+                if cur.rowcount:
+                    ids.append(cur.lastrowid)
+            conn.commit()
+        return ids
+
+    # ── Zustellen ────────────────────────────────────────────────────────────
+
+    def _heads(self, conn, chat_id: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Älteste offene Nachricht pro Chat (FIFO), unabhängig davon ob schon fällig.
+        Hat ein anderer Worker die älteste gerade in 'sending', bleibt der Chat aus —
+        sonst überholt die nächste Nachricht eine, die noch in retry landen kann.
+        """
+        query = """
+            SELECT o.* FROM outbox o
+            WHERE o.status = 'pending'
+              AND o.id = (SELECT MIN(id) FROM outbox WHERE status IN ('pending', 'sending') AND chat_id = o.chat_id)
+        """
+        params = []
+        if chat_id is not None:
+            query += " AND o.chat_id = ?"
+            params.append(str(chat_id))
+        return conn.execute(query + " ORDER BY o.next_attempt_at, o.id", params).fetchall()
+
+    def _claim(self, conn, row_id: int) -> bool:
+        """
+        Markiert als 'sending' — verhindert Doppelversand wenn zwei Prozesse drainen.
+        Nur solange die Zeile noch der Kopf ihres Chats ist (kein älterer Eintrag offen).
+        """
+        cur = conn.execute("""
+            UPDATE outbox SET status = 'sending', claimed_at = ?
+            WHERE id = ? AND status = 'pending'
+              AND NOT EXISTS (SELECT 1 FROM outbox o WHERE o.chat_id = outbox.chat_id
+                              AND o.status IN ('pending', 'sending') AND o.id < outbox.id)
+        """, (time.time(), row_id))
+        conn.commit()
+        return cur.rowcount == 1
+
+    def _deliver(self, conn, row) -> str:
+        """Ein Versuch → 'sent' | 'retry' | 'failed'"""
+        payload = {
+            "chat_id": row["chat_id"],
+            "text": row["text"],
+            "disable_web_page_preview": bool(row["disable_preview"]),
+        }
+        if row["parse_mode"]:
+            payload["parse_mode"] = row["parse_mode"]
+        if row["reply_markup"]:
+            payload["reply_markup"] = json.loads(row["reply_markup"])
+
+        attempts = row["attempts"] + 1
+        try:
+            status, resp = self.client.call("sendMessage", payload)
+        except Exception as e:
+            status, resp = 0, {"description": f"{type(e).__name__}: {e}"}
+
+        if status == 200 and resp.get("ok"):
+            conn.execute("""
+                UPDATE outbox SET status = 'sent', attempts = ?, message_id = ?, sent_at = CURRENT_TIMESTAMP,
+                                  last_error = NULL
+                WHERE id = ?
+            """, (attempts, (resp.get("result") or {}).get("message_id"), row["id"]))
+            conn.commit()
+            return "sent"
+
+        error = f"{status} {resp.get('description', '')}".strip()
+        retry_after = (resp.get("parameters") or {}).get("retry_after")
+        if status == 400 and row["parse_mode"] and "parse entities" in error:
+            # Kaputtes Markdown/HTML → lieber als Plain Text zustellen als gar nicht
+            conn.execute("UPDATE outbox SET status = 'pending', parse_mode = NULL, last_error = ? WHERE id = ?",
+                         (error, row["id"]))
+            conn.commit()
+            return "retry"
+        transient = status in (0, 429) or status >= 500
+        if transient and attempts < MAX_ATTEMPTS:
+            delay = float(retry_after) if retry_after else \
+                min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            if status == 429:
+                self._chat_bucket(row["chat_id"]).block(delay)
+            conn.execute("""
+                UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE id = ?
+            """, (attempts, time.time() + delay, error, row["id"]))
+            conn.commit()
+            return "retry"
+
+        conn.execute("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                     (attempts, error, row["id"]))
+        conn.commit()
+        print(f"❌ Outbox: Nachricht #{row['id']} an {row['chat_id']} endgültig fehlgeschlagen: {error}")
+        return "failed"
+
+    def drain(self, max_seconds: Optional[float] = None, chat_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Stellt offene Nachrichten zu (alle Chats oder nur chat_id).
+        Ohne max_seconds: bis nichts mehr sofort fällig ist; mit max_seconds
+        wird auch auf Backoff/Rate-Limits gewartet, bis die Zeit abgelaufen ist.
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        stats = {"sent": 0, "retry": 0, "failed": 0}
+        with self.get_connection() as conn:
+            conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND claimed_at < ?",
+                         (time.time() - CLAIM_TIMEOUT,))
+            conn.commit()
+            while True:
+                heads = self._heads(conn, chat_id)
+                if not heads:
+                    break
+                now = time.time()
+                waits = []
+                progressed = False
+                for row in heads:
+                    if row["next_attempt_at"] > now:
+                        waits.append(row["next_attempt_at"] - now)
+                        continue
+                    with self._send_lock:
+                        bucket = self._chat_bucket(row["chat_id"])
+                        wait = max(bucket.wait_time(), self.global_bucket.wait_time())
+                        if wait > 0:
+                            waits.append(wait)
+                            continue
+                        if not self._claim(conn, row["id"]):
+                            continue
+                        bucket.take()
+                        self.global_bucket.take()
+                        stats[self._deliver(conn, row)] += 1
+                    progressed = True
+                if progressed:
+                    continue
+                if not waits or deadline is None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(min(waits), remaining))
+        return stats
+
+    def send(self, chat_id, text: str, parse_mode: Optional[str] = None,
+             reply_markup: Optional[Dict] = None, disable_preview: bool = True,
+             wait: float = SEND_WAIT_SECONDS, dedupe_key: Optional[str] = None) -> str:
+        """
+        Einreihen + synchron zustellen (max. `wait` Sekunden).
+        → 'sent' | 'queued' (persistiert, wird später zugestellt) | 'failed'
+          | 'duplicate' (dedupe_key war schon eingereiht — nichts gesendet)
+        """
+        ids = self.enqueue(chat_id, text, parse_mode, reply_markup, disable_preview, dedupe_key)
+        if dedupe_key and not ids:
+            return "duplicate"
+        self.drain(max_seconds=wait, chat_id=str(chat_id))
+        with self.get_connection() as conn:
+            statuses = {r["status"] for r in conn.execute(
+                f"SELECT status FROM outbox WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        if "failed" in statuses:
+            return "failed"
+        return "sent" if statuses == {"sent"} else "queued"
+
+    def status(self) -> Dict[str, int]:
+        with self.get_connection() as conn:
+            return {r["status"]: r["n"] for r in conn.execute(
+                "SELECT status, COUNT(*) as n FROM outbox GROUP BY status")}
+
+    def retry_failed(self) -> int:
+        with self.get_connection() as conn:
+            cur = conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 WHERE status = 'failed'")
+            conn.commit()
+            return cur.rowcount
+
+    def purge_sent(self, days: int = 7) -> int:
+        with self.get_connection() as conn:
+            cur = conn.execute("DELETE FROM outbox WHERE status = 'sent' AND sent_at < datetime('now', ?)",
+                               (f"-{int(days)} days",))
+            conn.commit()
+            return cur.rowcount
+
+
+# Eine Outbox (und damit eine Keep-Alive-Verbindung) pro Prozess
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+    return _outbox
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    outbox = get_outbox()
+    if command == "run":
+        print(f"📤 Outbox Worker läuft ({OUTBOX_DB})")
+        try:
+            while True:
+                stats = outbox.drain(max_seconds=5)
+                if any(stats.values()):
+                    print(f"[{time.strftime('%H:%M:%S')}] {stats}")
+                else:
+                    time.sleep(1)
+        except KeyboardInterrupt:
+            print("Outbox Worker gestoppt")
+    elif command == "drain":
+        print(outbox.drain(max_seconds=60))
+        print(f"purged: {outbox.purge_sent()}")
+    elif command == "retry-failed":
+        print(f"{outbox.retry_failed()} Nachrichten erneut eingereiht")
+    elif command == "status":
+        for key, value in sorted(outbox.status().items()):
+            print(f"{key}: {value}")
+    else:
+        print("Usage: python outbox.py [run|drain|status|retry-failed]")
@@ -12,14 +12,20 @@ Usage:
   python3 pipo_battlecard.py              # Top 5, alle Regionen
   python3 pipo_battlecard.py --top 10     # Top 10
   python3 pipo_battlecard.py --region DE  # Nur DACH
+  python3 pipo_battlecard.py --regions all  # Top 5 pro Region, Regionen parallel
+  python3 pipo_battlecard.py --regions DE,CH --workers 2
   python3 pipo_battlecard.py --dry-run    # Nur Terminal, kein Telegram
   python3 pipo_battlecard.py --lead "Deutsche Bank"  # Nur ein spezifischer Lead
 """
 
-import os, sys, json, time, argparse, urllib.request, urllib.parse, urllib.error
+import os, sys, json, time, argparse, threading, urllib.request, urllib.parse, urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+from linkedin_cache import LinkedInUnavailable, format_stats, get_linkedin_cache, profile_aliases, session_valid
+from outbox import get_outbox
+
 # ── Config ──────────────────────────────────────────────────────────────────
 SUPABASE_URL   = os.environ.get("SUPABASE_URL",  "https://cxrhqzggukuqxpsausrd.supabase.co")
 SUPABASE_KEY   = os.environ.get("SUPABASE_KEY",  "")
@@ -29,6 +35,8 @@ TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT  = os.environ.get("TELEGRAM_CHAT_ID", "")
 DASHBOARD_URL  = "https://pipo-bitwise-lead-tracker.streamlit.app"
 BATTLECARD_DIR = Path.home() / ".openclaw/workspace/leads/battlecards"
+REGIONS        = ["DE", "CH", "UK", "UAE", "NORDICS"]
+REGION_WORKERS = int(os.environ.get("BATTLECARD_WORKERS", "5"))   # parallele Regionen (--regions)
 
 # LinkedIn Navigator (optional — pip install linkedin-api + .env konfigurieren)
 # li_at holen: Chrome → linkedin.com → F12 → Application → Cookies → li_at → Wert kopieren
@@ -37,6 +45,7 @@ LINKEDIN_PASSWORD = os.environ.get("LINKEDIN_PASSWORD", "")
 LINKEDIN_LI_AT    = os.environ.get("LINKEDIN_LI_AT", "")
 LINKEDIN_LI_A     = os.environ.get("LINKEDIN_LI_A",  "")  # Enterprise: Sales Navigator session
 _LI_API_CLIENT    = None
+_LI_LOCK          = threading.Lock()   # Client nur einmal anlegen, auch bei parallelen Regionen
 
 # ── Colors ──────────────────────────────────────────────────────────────────
 G = "\033[92m"; Y = "\033[93m"; R = "\033[91m"; B = "\033[94m"; X = "\033[0m"; BOLD = "\033[1m"
@@ -106,6 +115,10 @@ def exa_search(query, num_results=5, start_date=None, include_domains=None, excl
 
 def _linkedin_api():
     """Gibt gecachten LinkedIn API Client zurück oder None wenn nicht verfügbar."""
+    with _LI_LOCK:
+        return _linkedin_api_locked()
+
+def _linkedin_api_locked():
     global _LI_API_CLIENT
     if _LI_API_CLIENT:
         return _LI_API_CLIENT
@@ -143,6 +156,27 @@ def _linkedin_api():
         return None
 
 
+def _li_cached(resource, key, request, aliases=None):
+    """
+    LinkedIn-Aufruf über den gemeinsamen Cache (linkedin_cache.py, auch vom Bot genutzt).
+    request(api) läuft nur bei einem Miss — erst dann wird der Client angelegt.
+    Ohne Zugangsdaten/Client oder leere Antwort bei ungültiger Session → LinkedInUnavailable.
+    """
+    if not LINKEDIN_EMAIL and not LINKEDIN_LI_AT:
+        raise LinkedInUnavailable()
+
+    def call():
+        api = _linkedin_api()
+        if not api:
+            raise LinkedInUnavailable()
+        payload = request(api)
+        if not payload and not session_valid(api):
+            # 429 / abgelaufenes li_at kommt als {} / [] zurück — kein "nicht gefunden" cachen
+            raise LinkedInUnavailable()
+        return payload
+    return get_linkedin_cache().fetch(resource, key, call, aliases)
+
+
 def linkedin_enrich_contact(contact_name, company):
     """
     Sucht eine Person auf LinkedIn und gibt angereichertes Profil zurück.
@@ -150,11 +184,12 @@ def linkedin_enrich_contact(contact_name, company):
     distance='DISTANCE_1' → 1st degree connection (warmer Kontakt!)
     distance='DISTANCE_2' → 2nd degree (mutual connections möglich)
     """
-    api = _linkedin_api()
-    if not api or not contact_name:
+    if not contact_name:
         return None
     try:
-        results = api.search_people(keywords=f"{contact_name} {company}", limit=5)
+        keywords = f"{contact_name} {company}"
+        results = _li_cached("people_search", keywords,
+                             lambda api: api.search_people(keywords=keywords, limit=5))
         if not results:
             return None
 
@@ -178,7 +213,8 @@ def linkedin_enrich_contact(contact_name, company):
         profile = {}
         try:
             if urn_id:
-                profile = api.get_profile(urn_id=urn_id) or {}
+                profile = _li_cached("profile", urn_id, lambda api: api.get_profile(urn_id=urn_id),
+                                     aliases=profile_aliases) or {}
         except Exception:
             pass
 
@@ -198,7 +234,8 @@ def linkedin_enrich_contact(contact_name, company):
         recent_posts = []
         try:
             if urn_id:
-                posts = api.get_profile_posts(urn_id=urn_id, post_count=5) or []
+                posts = _li_cached("posts", urn_id,
+                                   lambda api: api.get_profile_posts(urn_id=urn_id, post_count=5)) or []
                 for p in posts[:3]:
                     text = ""
                     try:
@@ -219,7 +256,7 @@ def linkedin_enrich_contact(contact_name, company):
         mutual = []
         try:
             if urn_id:
-                conns = api.get_profile_connections(urn_id) or []
+                conns = _li_cached("connections", urn_id, lambda api: api.get_profile_connections(urn_id)) or []
                 for c in conns[:8]:
                     cname  = c.get("name", "")
                     ctitle = str(c.get("jobtitle") or c.get("headline", ""))[:60]
@@ -252,6 +289,8 @@ def linkedin_enrich_contact(contact_name, company):
             "mutual_connections": mutual,
             "recent_posts":       recent_posts,
         }
+    except LinkedInUnavailable:
+        return None
     except Exception as e:
         print(f"{Y}  [LinkedIn] Kontaktsuche Fehler: {e}{X}")
         return None
@@ -262,10 +301,11 @@ def linkedin_find_decision_makers(company_urn, company_name, top_roles=None):
     Sales Navigator-ähnliche Suche: C-Level / VP / Head-of bei einer Firma.
     Nutzt search_people(keyword_title=..., keyword_company=...) — kein Sales Navigator Abo nötig.
     Gibt Liste zurück sortiert nach Degree (1st → 2nd → 3rd+).
+    Gecachte Suchen brauchen keine Rate-Limit-Pause.
     """
-    api = _linkedin_api()
-    if not api:
+    if not LINKEDIN_EMAIL and not LINKEDIN_LI_AT:
         return []
+    cache = get_linkedin_cache()
     if top_roles is None:
         top_roles = [
             "Managing Director", "CIO", "CFO", "CTO",
@@ -276,11 +316,12 @@ def linkedin_find_decision_makers(company_urn, company_name, top_roles=None):
     seen_names = set()
     for role in top_roles[:4]:  # max 4 Suchen → Rate Limit schonen
         try:
-            results = api.search_people(
-                keyword_title=role,
-                keyword_company=company_name,
-                limit=3,
-            ) or []
+            results = _li_cached("people_search", f"title:{role} company:{company_name}",
+                                 lambda api: api.search_people(
+                                     keyword_title=role,
+                                     keyword_company=company_name,
+                                     limit=3,
+                                 )) or []
             for r in results:
                 name     = (r.get("name") or "").strip()
                 jobtitle = r.get("jobtitle", "")
@@ -300,9 +341,12 @@ def linkedin_find_decision_makers(company_urn, company_name, top_roles=None):
                     "public_id":  pub_id,
                     "profile_url": f"https://linkedin.com/in/{pub_id}" if pub_id else "",
                 })
+        except LinkedInUnavailable:
+            return []
         except Exception:
             pass
-        time.sleep(0.5)
+        if not cache.last_was_hit():
+            time.sleep(0.5)
     prio = {"DISTANCE_1": 0, "DISTANCE_2": 1, "DISTANCE_3": 2}
     found.sort(key=lambda x: prio.get(x["distance"], 3))
     return found[:8]
@@ -313,11 +357,11 @@ def linkedin_get_company_news(company_public_id):
     Holt aktuelle LinkedIn Company Updates als Conversation Starter.
     company_public_id: z.B. "deutsche-digital-assets" (aus get_company URL).
     """
-    api = _linkedin_api()
-    if not api or not company_public_id:
+    if not company_public_id:
         return []
     try:
-        updates = api.get_company_updates(public_id=str(company_public_id), max_results=5) or []
+        updates = _li_cached("company_posts", str(company_public_id),
+                             lambda api: api.get_company_updates(public_id=str(company_public_id), max_results=5)) or []
         news = []
         for u in updates[:5]:
             text = ""
@@ -339,6 +383,8 @@ def linkedin_get_company_news(company_public_id):
                     "author":    "",
                 })
         return news
+    except LinkedInUnavailable:
+        return []
     except Exception as e:
         print(f"{Y}  [LinkedIn] Company News Fehler: {e}{X}")
         return []
@@ -346,11 +392,9 @@ def linkedin_get_company_news(company_public_id):
 
 def linkedin_get_company(company_name):
     """Holt LinkedIn-Firmendaten. Felder: urn_id, name, headline (Branche+HQ), subline (Follower)."""
-    api = _linkedin_api()
-    if not api:
-        return None
     try:
-        results = api.search_companies(keywords=company_name, limit=5)
+        results = _li_cached("company_search", company_name,
+                             lambda api: api.search_companies(keywords=company_name, limit=5))
         if not results:
             return None
 
@@ -369,7 +413,7 @@ def linkedin_get_company(company_name):
         co = {}
         if co_urn:
             try:
-                co = api.get_company(co_urn) or {}
+                co = _li_cached("company", co_urn, lambda api: api.get_company(co_urn)) or {}
             except Exception:
                 pass
 
@@ -395,6 +439,8 @@ def linkedin_get_company(company_name):
             "url":            f"https://linkedin.com/company/{co_urn}" if co_urn else "",
             "specialties":    (co.get("specialities") or [])[:5],
         }
+    except LinkedInUnavailable:
+        return None
     except Exception as e:
         print(f"{Y}  [LinkedIn] Firmensuche Fehler: {e}{X}")
         return None
@@ -485,7 +531,6 @@ def deep_research(lead):
 
     # ── LinkedIn Navigator Enrichment (falls Zugangsdaten gesetzt) ──────────────
     if LINKEDIN_EMAIL or LINKEDIN_LI_AT:
-        print(f"    → LinkedIn enrichment...", end="", flush=True)
         li_count = 0
 
         if contact:
@@ -543,7 +588,7 @@ def deep_research(lead):
                     research["company_updates"] = cn
                     li_count += 1
 
-        print(f" {G}✓{X} ({li_count} LinkedIn Quellen)")
+        log(f"    → LinkedIn enrichment {company}: {G}✓{X} ({li_count} LinkedIn Quellen)")
 
     return research
 
@@ -784,7 +829,8 @@ def days_since(ts_str):
         return max(0, (datetime.now(timezone.utc) - ts).days)
     except: return 999
 
-def load_top_leads(region=None, top_n=5, company_filter=None):
+def load_scored_leads(regions=None, company_filter=None):
+    """Aktive Leads (optional nur diese Regionen) mit Priority Score, absteigend sortiert"""
     print(f"{B}Loading leads from Supabase...{X}")
     all_leads, offset, page = [], 0, 1000
     while True:
@@ -794,7 +840,8 @@ def load_top_leads(region=None, top_n=5, company_filter=None):
             "&stage=neq.closed_won&stage=neq.closed_lost"
             f"&limit={page}&offset={offset}"
         )
-        if region: params += f"&region=eq.{region}"
+        if regions and len(regions) == 1: params += f"&region=eq.{regions[0]}"
+        elif regions: params += f"&region=in.({','.join(regions)})"
         if company_filter: params += f"&company=ilike.*{urllib.parse.quote(company_filter)}*"
         chunk = sb_get("leads", params)
         if not chunk: break
@@ -833,10 +880,30 @@ def load_top_leads(region=None, top_n=5, company_filter=None):
         })
 
     scored.sort(key=lambda x: x["priority_score"], reverse=True)
+    return scored, len(all_leads)
+
+def load_top_leads(region=None, top_n=5, company_filter=None):
+    scored, total = load_scored_leads([region] if region else None, company_filter)
     result = scored[:top_n]
-    print(f"  → {G}{len(result)} Leads geladen{X} (aus {len(all_leads)} aktiven)\n")
+    print(f"  → {G}{len(result)} Leads geladen{X} (aus {total} aktiven)\n")
     return result
 
+def load_top_leads_by_region(regions, top_n=5, company_filter=None):
+    """
+    Partitioniert: ein Supabase-Durchlauf für alle Regionen, dann Top N pro
+    Region (wie ROW_NUMBER() OVER (PARTITION BY region ORDER BY score)).
+    → {region: [leads]} in der Reihenfolge von `regions`
+    """
+    scored, total = load_scored_leads(regions, company_filter)
+    partitions = {r: [] for r in regions}
+    for lead in scored:
+        bucket = partitions.get(lead.get("region"))
+        if bucket is not None and len(bucket) < top_n:
+            bucket.append(lead)
+    print(f"  → {G}{sum(len(v) for v in partitions.values())} Leads geladen{X} (aus {total} aktiven): "
+          + ", ".join(f"{r} {len(v)}" for r, v in partitions.items()) + "\n")
+    return partitions
+
 # ── Save Battle Card as Markdown ──────────────────────────────────────────────
 def save_battlecard(lead, bc, research):
     today = datetime.now().strftime("%Y-%m-%d")
@@ -982,27 +1049,14 @@ def save_battlecard(lead, bc, research):
 
 # ── Telegram ──────────────────────────────────────────────────────────────────
 def tg_send(text, parse_mode="HTML", disable_preview=True):
+    """Über die Telegram Outbox (Rate Limit pro Chat, Split > 4096, Retry)"""
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT:
         print(f"\n{Y}[TELEGRAM DRY]{X}\n{text[:500]}\n")
         return True
-    try:
-        payload = json.dumps({
-            "chat_id": TELEGRAM_CHAT,
-            "text": text[:4096],
-            "parse_mode": parse_mode,
-            "disable_web_page_preview": disable_preview
-        }).encode()
-        req = urllib.request.Request(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            data=payload, method="POST",
-            headers={"Content-Type": "application/json"}
-        )
-        with urllib.request.urlopen(req, timeout=15) as r:
-            resp = json.loads(r.read())
-        return resp.get("ok", False)
-    except Exception as e:
-        print(f"{R}Telegram Error: {e}{X}")
-        return False
+    status = get_outbox().send(TELEGRAM_CHAT, text, parse_mode=parse_mode, disable_preview=disable_preview)
+    if status == "failed":
+        print(f"{R}Telegram Error: Outbox-Versand fehlgeschlagen{X}")
+    return status != "failed"
 
 def format_telegram_card(rank, lead, bc):
     """Kompaktes Telegram-Format pro Lead."""
@@ -1064,6 +1118,29 @@ def format_telegram_card(rank, lead, bc):
 
     return msg
 
+# ── Per Lead Pipeline ─────────────────────────────────────────────────────────
+_PRINT_LOCK = threading.Lock()
+
+def log(line):
+    """Ganze Zeilen ausgeben — parallele Regionen dürfen sich nicht mitten in der Zeile mischen"""
+    with _PRINT_LOCK:
+        print(line, flush=True)
+
+def process_lead(lead, tag):
+    """Research (Exa) → Battle Card (Claude) → Markdown. tag z.B. '2/5' oder 'DE 2/5'."""
+    company = lead["company"]
+    t0 = time.time()
+    research = deep_research(lead)
+    total_results = sum(len(v) for v in research.values())
+    t1 = time.time()
+    log(f"  [{tag}] {BOLD}{company}{X} → Research (Exa): {total_results} Ergebnisse ({t1-t0:.1f}s)")
+
+    bc = generate_battlecard(lead, research)
+    t2 = time.time()
+    card_path = save_battlecard(lead, bc, research)
+    log(f"  [{tag}] {BOLD}{company}{X} → Battle Card (Claude) {G}✓{X} ({t2-t1:.1f}s) → {card_path}")
+    return lead, bc, card_path
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 def run(top_n=5, region=None, dry_run=False, company_filter=None):
     today_str = datetime.now().strftime("%A, %d. %b %Y")
@@ -1106,27 +1183,8 @@ Deep Research für <b>{len(leads)} Leads</b>:
 
     # ── Per Lead ───────────────────────────────────────────────────────────────
     for i, lead in enumerate(leads, 1):
-        company = lead["company"]
-        print(f"  [{i}/{len(leads)}] {BOLD}{company}{X}")
-        print(f"    → Research (Exa)...", end="", flush=True)
-        t0 = time.time()
-
-        research = deep_research(lead)
-
-        total_results = sum(len(v) for v in research.values())
-        t1 = time.time()
-        print(f" {total_results} Ergebnisse ({t1-t0:.1f}s)")
-        print(f"    → Battle Card (Claude)...", end="", flush=True)
-
-        bc = generate_battlecard(lead, research)
-        t2 = time.time()
-        print(f" {G}✓{X} ({t2-t1:.1f}s)")
-
-        # Save markdown
-        card_path = save_battlecard(lead, bc, research)
+        _, bc, card_path = process_lead(lead, f"{i}/{len(leads)}")
         card_paths.append(card_path)
-        print(f"    → Saved: {card_path}")
-
         all_cards.append((lead, bc))
 
         # Send Telegram card
@@ -1136,10 +1194,6 @@ Deep Research für <b>{len(leads)} Leads</b>:
         else:
             print(f"\n{BOLD}LEAD {i}:{X}\n{tg_msg}\n")
 
-        # Rate limiting
-        if i < len(leads):
-            time.sleep(1)
-
     # ── Summary ────────────────────────────────────────────────────────────────
     footer = f"""{'━'*30}
 ✅ <b>{len(leads)} Battle Cards fertig</b>
@@ -1164,20 +1218,134 @@ Nächste Schritte:
     print(f"  📁 {BATTLECARD_DIR}/{datetime.now().strftime('%Y-%m-%d')}/")
     print(f"{'='*60}{X}\n")
 
+# ── Regionen parallel ─────────────────────────────────────────────────────────
+def run_region(region, leads):
+    """Alle Leads einer Region nacheinander (läuft in einem Worker-Thread)"""
+    t0 = time.time()
+    cards = [process_lead(lead, f"{region} {i}/{len(leads)}") for i, lead in enumerate(leads, 1)]
+    return cards, time.time() - t0
+
+def parse_regions(value):
+    """'all' → REGIONS, sonst 'DE,CH' → ['DE', 'CH']"""
+    if value.strip().lower() == "all":
+        return list(REGIONS)
+    regions = [r.strip().upper() for r in value.split(",") if r.strip()]
+    if not regions:
+        raise ValueError(f"--regions braucht 'all' oder z.B. DE,CH: {value!r}")
+    return regions
+
+def run_regions(regions, top_n=5, dry_run=False, company_filter=None, workers=REGION_WORKERS):
+    """
+    Top N pro Region, Regionen parallel in einem begrenzten Thread-Pool.
+    Die Leads kommen aus einem partitionierten Supabase-Durchlauf; Exa- und
+    Claude-Calls der Regionen überlappen sich, die Laufzeit ist ≈ die langsamste
+    Region statt der Summe. Telegram: jede Region geht als Block raus, sobald
+    sie fertig ist (Outbox hält das Rate Limit pro Chat ein).
+    """
+    today_str = datetime.now().strftime("%A, %d. %b %Y")
+    print(f"\n{BOLD}{'='*60}")
+    print(f"  🤖 PIPO BATTLE CARD SYSTEM — {len(regions)} Regionen parallel")
+    print(f"  {today_str}")
+    print(f"{'='*60}{X}\n")
+
+    if not EXA_KEY:
+        print(f"{R}❌ EXA_API_KEY nicht gesetzt — Research nicht möglich{X}")
+    if not ANTHROPIC_KEY:
+        print(f"{R}❌ ANTHROPIC_API_KEY nicht gesetzt — Battle Card nicht möglich{X}")
+
+    partitions = load_top_leads_by_region(regions, top_n=top_n, company_filter=company_filter)
+    partitions = {r: leads for r, leads in partitions.items() if leads}
+    if not partitions:
+        print(f"{R}Keine Leads gefunden.{X}")
+        return
+
+    total = sum(len(v) for v in partitions.values())
+    header = f"""🤖 <b>PIPO BATTLE CARDS — {today_str}</b>
+<a href="{DASHBOARD_URL}">📊 Dashboard</a>
+
+Deep Research für <b>{total} Leads</b> in {len(partitions)} Regionen:
+{chr(10).join(f"• {r}: {len(v)} Leads" for r, v in partitions.items())}
+
+{'━'*30}"""
+    if not dry_run:
+        tg_send(header)
+    else:
+        print(f"\n{BOLD}HEADER:{X}\n{header}\n")
+
+    t0 = time.time()
+    timings, done, failed = {}, 0, []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(partitions))),
+                            thread_name_prefix="region") as pool:
+        futures = {pool.submit(run_region, r, leads): r for r, leads in partitions.items()}
+        for future in as_completed(futures):
+            region = futures[future]
+            done += 1
+            try:
+                cards, elapsed = future.result()
+            except Exception as e:
+                failed.append(region)
+                log(f"{R}  ✗ {region} fehlgeschlagen: {str(e)[:200]}{X}  [{done}/{len(futures)} Regionen]")
+                continue
+            timings[region] = elapsed
+            log(f"{G}  ✓ {region}: {len(cards)} Battle Cards ({elapsed:.1f}s){X}  [{done}/{len(futures)} Regionen]")
+
+            # Region als Block senden — Karten einer Region bleiben zusammen
+            block = [f"📍 <b>{region}</b> — Top {len(cards)}"]
+            block += [format_telegram_card(i, lead, bc) for i, (lead, bc, _) in enumerate(cards, 1)]
+            for msg in block:
+                if not dry_run:
+                    tg_send(msg)
+                else:
+                    log(f"\n{BOLD}{region}:{X}\n{msg}\n")
+
+    wall = time.time() - t0
+    timing_str = " · ".join(f"{r} {timings[r]:.0f}s" for r in partitions if r in timings)
+    footer = f"""{'━'*30}
+✅ <b>{sum(len(partitions[r]) for r in timings)} Battle Cards fertig</b> ({wall:.0f}s)
+⏱ {timing_str}{f"{chr(10)}❌ Fehlgeschlagen: {', '.join(failed)}" if failed else ""}
+
+Lokal gespeichert:
+<code>{BATTLECARD_DIR}/{datetime.now().strftime('%Y-%m-%d')}/</code>
+
+<a href="{DASHBOARD_URL}">📊 Dashboard</a> · Powered by Pipo 🤖"""
+    if not dry_run:
+        tg_send(footer)
+    else:
+        print(f"\n{BOLD}FOOTER:{X}\n{footer}")
+
+    print(f"\n{G}{BOLD}{'='*60}")
+    print(f"  ✅ {len(timings)}/{len(partitions)} Regionen in {wall:.1f}s "
+          f"(sequenziell wären es ~{sum(timings.values()):.1f}s)")
+    print(f"  📁 {BATTLECARD_DIR}/{datetime.now().strftime('%Y-%m-%d')}/")
+    print(f"{'='*60}{X}\n")
+
 def main():
     parser = argparse.ArgumentParser(description="Pipo Battle Card System")
-    parser.add_argument("--top",     type=int, default=5,   help="Anzahl Leads (default: 5)")
+    parser.add_argument("--top",     type=int, default=5,   help="Anzahl Leads (default: 5, mit --regions pro Region)")
     parser.add_argument("--region",  help="Nur eine Region (z.B. DE, CH, UAE)")
+    parser.add_argument("--regions", help="Top N pro Region, parallel: 'all' oder z.B. DE,CH,UK")
+    parser.add_argument("--workers", type=int, default=REGION_WORKERS, help="Parallele Regionen (default: 5)")
     parser.add_argument("--lead",    help="Nur ein spezifisches Unternehmen")
     parser.add_argument("--dry-run", action="store_true",    help="Kein Telegram — nur Terminal")
     args = parser.parse_args()
 
-    run(
-        top_n=args.top,
-        region=args.region,
-        dry_run=args.dry_run,
-        company_filter=args.lead
-    )
+    if args.regions:
+        run_regions(
+            regions=parse_regions(args.regions),
+            top_n=args.top,
+            dry_run=args.dry_run,
+            company_filter=args.lead,
+            workers=args.workers
+        )
+    else:
+        run(
+            top_n=args.top,
+            region=args.region,
+            dry_run=args.dry_run,
+            company_filter=args.lead
+        )
+    if LINKEDIN_EMAIL or LINKEDIN_LI_AT:
+        print(f"{B}  {format_stats(get_linkedin_cache().session)}{X}")
 
 if __name__ == "__main__":
     main()
@@ -10,43 +10,94 @@ Unterstützte Befehle / natürliche Sprache:
   /status [company]     → MEDDPICC + Stage + letzte Aktivität
   /card [company]       → Battle Card generieren (ruft pipo_battlecard.py)
   /add [url] [company]  → Lead in Supabase anlegen
+  /forecast             → Monte-Carlo Forecast (P10/P50/P90)
+  /similar [company]    → Lookalike-Leads (ähnlich zu Closed Won / Firma)
   /help                 → Alle Befehle
 
 Beispiel:
   "haben wir sie? https://www.linkedin.com/in/beritfuss/"
   → Pipo antwortet: DB-Status, LinkedIn-Daten, Vorschlag zum Hinzufügen
 
+Bot-Kern (asyncio):
+  - Long Polling, Dispatch und Versand laufen im Event Loop; blockierende
+    Aufrufe (urllib, linkedin-api, Outbox) gehen in Thread-Executoren
+  - Pro Chat eine Queue → Antworten pro Chat in Reihenfolge, Chats parallel
+  - Battle Cards laufen als Hintergrund-Job — /top, /help usw. warten nicht
+    minutenlang auf pipo_battlecard.py
+
+Crash-sicher (bot_updates.py): jedes Update wird in SQLite journalt, bevor
+der Offset weiterläuft bzw. der Webhook bestätigt; erledigt erst nach dem
+Handler. Antworten tragen einen dedupe_key pro Update → ein Neustart
+verarbeitet Offenes erneut, ohne doppelt zu senden oder doppelt anzulegen.
+Fehlgeschlagene Updates gezielt neu verarbeiten (antwortet neu):
+  python3 pipo_telegram_bot.py --replay-failed [update_id ...]
+
+Webhook statt Long Polling (optional):
+  Telegram ruft https://<öffentlich>/telegram auf (Reverse Proxy / Tunnel auf
+  BOT_WEBHOOK_HOST:BOT_WEBHOOK_PORT). Der lokale Server prüft den Secret Token,
+  bestätigt sofort mit 200 und reicht das Update an die Chat-Queues weiter;
+  doppelt zugestellte Updates (gleiche update_id) werden verworfen.
+
 Starten:
   . ./.env && python3 pipo_telegram_bot.py
+  . ./.env && python3 pipo_telegram_bot.py --webhook https://bot.example.com/telegram
 
 Als macOS Service (automatisch beim Login):
   python3 pipo_telegram_bot.py --install   # installiert launchd plist
   python3 pipo_telegram_bot.py --uninstall
 """
 
-import os, sys, json, time, re, urllib.request, urllib.parse, argparse, subprocess
+import os, sys, json, time, re, urllib.request, urllib.parse, argparse, subprocess, threading, asyncio
+import hmac, secrets, contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+from bot_updates import UpdateStore
+from context_store import ContextStore
+from intent_router import IntentRouter, Route
+from lead_index import LEAD_FIELDS, LeadIndex
+from linkedin_cache import LinkedInUnavailable, get_linkedin_cache, profile_aliases
+from llm_cache import get_llm_cache
+from outbox import TELEGRAM_API_BASE, TelegramClient, get_outbox
+from scoring import priority_breakdown
+
 # ── Config ────────────────────────────────────────────────────────────────────
 SUPABASE_URL   = os.environ.get("SUPABASE_URL",  "https://cxrhqzggukuqxpsausrd.supabase.co")
 SUPABASE_KEY   = os.environ.get("SUPABASE_KEY",  "")
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT  = os.environ.get("TELEGRAM_CHAT_ID", "")
+ALLOWED_CHATS  = {c.strip() for c in os.environ.get("BOT_ALLOWED_CHATS", TELEGRAM_CHAT).split(",") if c.strip()}
 LINKEDIN_LI_AT = os.environ.get("LINKEDIN_LI_AT", "")
 LINKEDIN_LI_A  = os.environ.get("LINKEDIN_LI_A",  "")  # Enterprise: Sales Navigator session cookie
 ANTHROPIC_KEY  = os.environ.get("ANTHROPIC_API_KEY", "")
+CLAUDE_MODEL   = "claude-haiku-4-5-20251001"
 EXA_KEY        = os.environ.get("EXA_API_KEY", "")
 LEADTRACKER    = Path(__file__).parent
 DASHBOARD_URL  = "https://pipo-bitwise-lead-tracker.streamlit.app"
 
 POLL_INTERVAL  = 2   # Sekunden zwischen getUpdates-Aufrufen
+LEAD_INDEX_REFRESH = 60    # Sekunden, danach Delta-Refresh des Lead-Index (updated_at)
+LEAD_INDEX_REBUILD = 3600  # Sekunden, danach Full Rebuild (entfernt gelöschte Leads)
+HANDLER_WORKERS = int(os.environ.get("BOT_HANDLER_WORKERS", "8"))  # Threads für blockierende Handler
+JOB_WORKERS     = 2  # parallele Battle Cards (Hintergrund-Jobs)
+POLL_BACKOFF_MAX = 30  # Sekunden, Backoff nach getUpdates-Fehlern (1, 2, 4, ...)
+
+WEBHOOK_HOST    = os.environ.get("BOT_WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT    = int(os.environ.get("BOT_WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH    = "/telegram"
+WEBHOOK_SECRET  = os.environ.get("BOT_WEBHOOK_SECRET", "")  # leer → pro Start zufällig erzeugt
+MAX_WEBHOOK_BODY = 1 << 20
 LOG_FILE       = Path("/tmp/pipo_bot.log")
 
 # ── Kontext-Gedächtnis pro Chat ───────────────────────────────────────────────
-# Merkt sich den zuletzt diskutierten Lead pro chat_id
-# { chat_id: {"li_url": ..., "name": ..., "company": ..., "profile": ..., "db_lead": ...} }
-_context: dict = {}
+# Merkt sich den zuletzt diskutierten Lead pro chat_id (context_store.py: SQLite + LRU,
+# kompakte Records, TTL 30 Min., überlebt Neustarts)
+# { "li_url": ..., "name": ..., "company": ..., "profile": {...}, "db_lead": {...}, "ts": ... }
+_context_store: "ContextStore | None" = None
+
+# Lokaler Intent-Router (lazy: legt intent_log in BOT_STATE_DB an, trainiert beim Start)
+_intent_router: "IntentRouter | None" = None
 
 # ── Utils ─────────────────────────────────────────────────────────────────────
 def log(msg):
@@ -106,30 +157,61 @@ def sb_patch(path, params, data):
         return json.loads(r.read())
 
 # ── Telegram ──────────────────────────────────────────────────────────────────
+class UpdateContext:
+    """Update, das gerade verarbeitet wird → fortlaufende dedupe_keys pro Antwort"""
+
+    def __init__(self, update_id, generation, prefix=""):
+        self.update_id, self.generation, self.prefix, self.seq = update_id, generation, prefix, 0
+
+    def next_key(self):
+        key = f"update:{self.update_id}:{self.generation}:{self.prefix}{self.seq}"
+        self.seq += 1
+        return key
+
+    def child(self):
+        """Eigener Key-Bereich für einen Worker-Task — deterministisch auch bei parallelen Tasks"""
+        child = UpdateContext(self.update_id, self.generation, f"{self.prefix}{self.seq}.")
+        self.seq += 1
+        return child
+
+_update_ctx = contextvars.ContextVar("update_ctx", default=None)
+
+def submit_with_update(pool, fn, *args):
+    """pool.submit mit Update-Kontext: tg_send im Worker-Thread bekommt ebenfalls dedupe_keys"""
+    parent = _update_ctx.get()
+    child = parent.child() if parent else None
+
+    def run():
+        _update_ctx.set(child)
+        return fn(*args)
+    return pool.submit(contextvars.copy_context().run, run)
+
 def tg_send(chat_id, text, parse_mode="HTML", reply_markup=None):
-    payload = {
-        "chat_id": chat_id,
-        "text": text[:4096],
-        "parse_mode": parse_mode,
-        "disable_web_page_preview": True,
-    }
-    if reply_markup:
-        payload["reply_markup"] = reply_markup
+    """Über die Telegram Outbox (Keep-Alive, Rate Limit, Split > 4096, Retry).
+    Innerhalb eines Updates bekommt die n-te Antwort den Key update:<id>:<gen>:<n>
+    (in Worker-Tasks update:<id>:<gen>:<task>.<n>) — bei erneuter Verarbeitung
+    → 'duplicate', nichts wird doppelt gesendet."""
+    ctx = _update_ctx.get()
+    dedupe_key = ctx.next_key() if ctx else None
+    status = get_outbox().send(chat_id, text, parse_mode=parse_mode, reply_markup=reply_markup,
+                               dedupe_key=dedupe_key)
+    if status == "failed":
+        log(f"tg_send error: Outbox-Versand an {chat_id} fehlgeschlagen")
+    return status
+
+def tg_api(method, payload):
+    """Einzelner Bot-API-Call (setWebhook / deleteWebhook) → JSON-Antwort"""
+    client = TelegramClient(TELEGRAM_TOKEN, TELEGRAM_API_BASE)
     try:
-        body = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-            data=body, method="POST",
-            headers={"Content-Type": "application/json"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as r:
-            return json.loads(r.read())
+        return client.call(method, payload)[1]
     except Exception as e:
-        log(f"tg_send error: {e}")
-        return None
+        log(f"{method} error: {e}")
+        return {"ok": False, "description": str(e)}
+    finally:
+        client.close()
 
 def tg_get_updates(offset=0):
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates?offset={offset}&timeout=30&limit=10"
+    url = f"{TELEGRAM_API_BASE}/bot{TELEGRAM_TOKEN}/getUpdates?offset={offset}&timeout=30&limit=10"
     try:
         req = urllib.request.Request(url)
         with urllib.request.urlopen(req, timeout=35) as r:
@@ -142,6 +224,10 @@ def tg_get_updates(offset=0):
 _li_api = None
 
 _li_cookie_expired = False  # Flag, damit wir die Warnung nur 1x senden
+_li_lock = threading.Lock()  # Handler laufen parallel — Login nur einmal
+
+# Unabhängige Teil-Abfragen eines Handlers (Supabase, LinkedIn) parallel
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="io")
 
 def _setup_li_session(sess):
     """Setzt alle LinkedIn Cookies und holt JSESSIONID für CSRF. Unterstützt Enterprise + Standard."""
@@ -175,6 +261,16 @@ def _check_li_at_valid(sess):
         return False
 
 def get_linkedin_api():
+    with _li_lock:
+        return _get_linkedin_api_locked()
+
+def _reset_linkedin_api():
+    """Client verwerfen → nächster get_linkedin_api() prüft die Cookies neu (und warnt)"""
+    global _li_api
+    with _li_lock:
+        _li_api = None
+
+def _get_linkedin_api_locked():
     global _li_api, _li_cookie_expired
     if _li_api:
         return _li_api
@@ -209,9 +305,13 @@ def get_linkedin_api():
         return None
 
 def linkedin_get_profile_from_url(li_url):
-    """Holt LinkedIn-Profildaten für eine gegebene Profil-URL."""
-    api = get_linkedin_api()
-    if not api:
+    """
+    Holt LinkedIn-Profildaten für eine gegebene Profil-URL.
+    Rohprofil über den LinkedIn-Cache (linkedin_cache.py, geteilt mit pipo_battlecard.py):
+    Treffer ohne Login/Cookie-Check. "nicht gefunden" wird nur negativ gecacht, wenn
+    die Session gültig ist — sonst (429, abgelaufenes li_at) LinkedInUnavailable.
+    """
+    if not LINKEDIN_LI_AT:
         return None
     try:
         # Vanity name aus URL extrahieren
@@ -220,10 +320,21 @@ def linkedin_get_profile_from_url(li_url):
             return None
         public_id = match.group(1).rstrip("/")
 
-        raw = api.get_profile(public_id=public_id)
-        profile = raw if isinstance(raw, dict) else {}
+        def fetch():
+            api = get_linkedin_api()
+            if not api:
+                raise LinkedInUnavailable()
+            raw = api.get_profile(public_id=public_id)
+            if not raw and not _check_li_at_valid(api.client.session):
+                _reset_linkedin_api()
+                raise LinkedInUnavailable()
+            return raw if isinstance(raw, dict) else {}
+
+        cache = get_linkedin_cache()
+        profile = cache.fetch("profile", public_id, fetch, aliases=profile_aliases)
         if not profile:
-            log(f"get_profile returned empty/None for {public_id}: {type(raw)}")
+            source = "negative cache" if cache.last_was_hit() else "API"
+            log(f"get_profile returned empty/None for {public_id} ({source}): {type(profile)}")
             return None
 
         exps = profile.get("experience", [])
@@ -246,23 +357,78 @@ def linkedin_get_profile_from_url(li_url):
             "connections":    profile.get("connections", 0),
             "profile_url":    f"https://linkedin.com/in/{public_id}",
         }
+    except LinkedInUnavailable:
+        log(f"LinkedIn nicht verfügbar (Session/Rate Limit) — {li_url} nicht gecacht")
+        return None
     except Exception as e:
         log(f"LinkedIn profile error: {e}")
         return None
 
 # ── DB Lookup ─────────────────────────────────────────────────────────────────
+# Firma / Person / LinkedIn-Slug aus dem lokalen Lead-Index (lead_index.py): einmal voll
+# geladen, danach Delta über updated_at im Hintergrund. REST nur solange der Index fehlt.
+_lead_index = LeadIndex()
+_lead_index_loading = threading.Lock()
+_lead_index_failed_at = 0.0   # erster Load fehlgeschlagen → bis LEAD_INDEX_REFRESH nur REST
+
+def _fetch_lead_changes(since=""):
+    """Change Feed: alle Leads mit updated_at >= since (leer = alle), paginiert"""
+    since_filter = f"&updated_at=gte.{urllib.parse.quote(since)}" if since else ""
+    leads, offset = [], 0
+    while True:
+        page = sb_get("leads", f"select={','.join(LEAD_FIELDS)}{since_filter}"
+                               f"&order=updated_at,id&limit=1000&offset={offset}")
+        leads.extend(page)
+        if len(page) < 1000:
+            return leads
+        offset += 1000
+
+def _refresh_lead_index(full):
+    global _lead_index_failed_at
+    try:
+        if full:
+            _lead_index.rebuild(_fetch_lead_changes())
+            log(f"Lead-Index: {len(_lead_index)} Leads geladen")
+        else:
+            _lead_index.refresh(_fetch_lead_changes)
+    except Exception as e:
+        log(f"lead_index refresh error: {e}")
+        _lead_index_failed_at = _lead_index.refreshed_at = time.time()
+    finally:
+        _lead_index_loading.release()
+
+def get_lead_index():
+    """Lead-Index oder None (erster Load fehlgeschlagen → REST-Fallback). Delta-Refresh läuft im Hintergrund."""
+    if not _lead_index.ready:
+        if time.time() - _lead_index_failed_at < LEAD_INDEX_REFRESH:
+            return None
+        _lead_index_loading.acquire()
+        if _lead_index.ready:
+            _lead_index_loading.release()
+        else:
+            _refresh_lead_index(full=True)
+        return _lead_index if _lead_index.ready else None
+    now = time.time()
+    if now - _lead_index.refreshed_at > LEAD_INDEX_REFRESH and _lead_index_loading.acquire(blocking=False):
+        _io_pool.submit(_refresh_lead_index, now - _lead_index.rebuilt_at > LEAD_INDEX_REBUILD)
+    return _lead_index
+
 def db_find_by_linkedin(li_url):
-    """Sucht Lead nach LinkedIn URL."""
+    """Sucht Lead nach LinkedIn URL (Vanity-Slug)."""
+    index = get_lead_index()
+    if index is not None:
+        matches = index.find_by_linkedin(li_url)
+        return matches[0].lead if matches else None
     try:
         encoded = urllib.parse.quote(li_url, safe="")
-        results = sb_get("leads", f"select=id,company,contact_person,title,stage,region,updated_at&linkedin=eq.{encoded}&limit=1")
+        results = sb_get("leads", f"select=id,company,contact_person,title,stage,region,updated_at,expected_deal_size_millions&linkedin=eq.{encoded}&limit=1")
         if results:
             return results[0]
         # Auch mit vanity name
         match = re.search(r'linkedin\.com/in/([^/?#]+)', li_url)
         if match:
             vanity = match.group(1).rstrip("/")
-            results = sb_get("leads", f"select=id,company,contact_person,title,stage,region,updated_at&linkedin=ilike.*{urllib.parse.quote(vanity)}*&limit=1")
+            results = sb_get("leads", f"select=id,company,contact_person,title,stage,region,updated_at,expected_deal_size_millions&linkedin=ilike.*{urllib.parse.quote(vanity)}*&limit=1")
             if results:
                 return results[0]
     except Exception as e:
@@ -270,7 +436,11 @@ def db_find_by_linkedin(li_url):
     return None
 
 def db_find_by_name(name, company=""):
-    """Sucht Lead nach Name (und optional Firma)."""
+    """Sucht Lead nach Name (und optional Firma) — bester Treffer."""
+    index = get_lead_index()
+    if index is not None:
+        matches = index.find_by_name(name, company)
+        return matches[0].lead if matches else None
     try:
         first = name.split()[0] if name else ""
         last  = name.split()[-1] if len(name.split()) > 1 else ""
@@ -286,7 +456,10 @@ def db_find_by_name(name, company=""):
     return None
 
 def db_find_by_company(company):
-    """Sucht Lead nach Firmenname."""
+    """Sucht Leads nach Firmenname (gerankt, exakte Treffer zuerst)."""
+    index = get_lead_index()
+    if index is not None:
+        return [m.lead for m in index.find_by_company(company)]
     try:
         results = sb_get("leads", f"select=id,company,contact_person,title,stage,region,linkedin,email,updated_at,expected_deal_size_millions&company=ilike.*{urllib.parse.quote(company)}*&limit=5")
         return results
@@ -303,11 +476,12 @@ def db_get_meddpicc(lead_id):
 def db_get_top_leads(n=5):
     """Holt Top N Leads nach Priority Score."""
     try:
-        leads = sb_get("leads",
+        leads_f = submit_with_update(_io_pool, sb_get, "leads",
             f"select=id,company,contact_person,title,stage,region,tier,updated_at,expected_deal_size_millions"
             f"&stage=neq.closed_won&stage=neq.closed_lost&limit=500"
         )
         scores_raw = sb_get("meddpicc_scores", "select=lead_id,total_score,qualification_status&limit=50000")
+        leads = leads_f.result()
         meddpicc = {s["lead_id"]: s for s in scores_raw}
 
         TIER_SCORE   = {1: 35, 2: 20, 3: 8, 4: 2}
@@ -334,10 +508,54 @@ def db_get_top_leads(n=5):
         log(f"db_get_top_leads error: {e}")
     return []
 
+def db_get_pipeline():
+    """Aktive Pipeline (Deals mit Deal Size) + MEDDPICC für den Forecast."""
+    try:
+        leads, offset = [], 0
+        while True:
+            page = sb_get("leads",
+                f"select=id,region,stage,expected_deal_size_millions"
+                f"&stage=neq.closed_won&stage=neq.closed_lost&expected_deal_size_millions=gt.0"
+                f"&order=id&limit=1000&offset={offset}"
+            )
+            leads.extend(page)
+            if len(page) < 1000:
+                break
+            offset += 1000
+        scores_raw = sb_get("meddpicc_scores", "select=lead_id,total_score&limit=50000")
+        meddpicc = {s["lead_id"]: s.get("total_score") or 0 for s in scores_raw}
+        return [{**l, "meddpicc": meddpicc.get(l["id"], 0)} for l in leads]
+    except Exception as e:
+        log(f"db_get_pipeline error: {e}")
+    return []
+
+def db_get_index_leads():
+    """Alle Leads mit Lookalike-Features + MEDDPICC (paginiert)."""
+    try:
+        leads, offset = [], 0
+        while True:
+            page = sb_get("leads",
+                f"select=id,company,region,tier,title,industry,company_type,aum_estimate_millions,use_case,stage"
+                f"&order=id&limit=1000&offset={offset}"
+            )
+            leads.extend(page)
+            if len(page) < 1000:
+                break
+            offset += 1000
+        scores_raw = sb_get("meddpicc_scores", "select=lead_id,total_score&limit=50000")
+        meddpicc = {s["lead_id"]: s.get("total_score") or 0 for s in scores_raw}
+        return [{**l, "meddpicc": meddpicc.get(l["id"], 0)} for l in leads]
+    except Exception as e:
+        log(f"db_get_index_leads error: {e}")
+    return []
+
 def db_create_lead(data):
     """Legt neuen Lead in Supabase an."""
     try:
-        return sb_post("leads", data)
+        created = sb_post("leads", data)
+        if isinstance(created, list) and _lead_index.ready:
+            _lead_index.upsert(l for l in created if "id" in l)   # sofort auffindbar, nicht erst nach dem Delta
+        return created
     except Exception as e:
         log(f"db_create_lead error: {e}")
     return None
@@ -367,19 +585,22 @@ Antworte in 2-3 Sätzen:
 2. Warum? (konkret, kein Buzzword)
 3. Empfehlung: Hinzufügen / Ignorieren / Weiter prüfen"""
 
-        payload = json.dumps({
-            "model": "claude-haiku-4-5-20251001",
-            "max_tokens": 200,
-            "messages": [{"role": "user", "content": prompt}]
-        }).encode()
-        req = urllib.request.Request(
-            "https://api.anthropic.com/v1/messages",
-            data=payload, method="POST",
-            headers={"x-api-key": ANTHROPIC_KEY, "anthropic-version": "2023-06-01", "content-type": "application/json"}
-        )
-        with urllib.request.urlopen(req, timeout=20) as r:
-            resp = json.loads(r.read())
-        return resp["content"][0]["text"].strip()
+        def ask():
+            payload = json.dumps({
+                "model": CLAUDE_MODEL,
+                "max_tokens": 200,
+                "messages": [{"role": "user", "content": prompt}]
+            }).encode()
+            req = urllib.request.Request(
+                "https://api.anthropic.com/v1/messages",
+                data=payload, method="POST",
+                headers={"x-api-key": ANTHROPIC_KEY, "anthropic-version": "2023-06-01", "content-type": "application/json"}
+            )
+            with urllib.request.urlopen(req, timeout=20) as r:
+                resp = json.loads(r.read())
+            return resp["content"][0]["text"].strip()
+
+        return get_llm_cache().cached("quick_analysis", CLAUDE_MODEL, "", prompt, ask) or ""
     except Exception as e:
         log(f"claude_quick_analysis error: {e}")
     return ""
@@ -396,6 +617,8 @@ Aktionen und Parameter:
 - status           → {company_or_url?}
 - find_contacts    → {role, company}
 - top_leads        → {n?}
+- forecast         → {}
+- similar          → {company?}
 - help             → {}
 - unknown          → {}
 
@@ -406,6 +629,8 @@ Regeln:
 - "status/wie läuft/wie steht/was ist bei" → status
 - "wer ist/finde/entscheider/suche" + Firma → find_contacts
 - "top leads/top N/zeig leads" → top_leads
+- "forecast/prognose/wie viel closen wir" → forecast
+- "ähnliche leads/lookalikes/wer ist wie [firma]" → similar
 - bare LinkedIn-URL → linkedin_lookup
 - Firma ohne Befehl → status
 - Parameter weglassen wenn unbekannt (nicht raten)
@@ -419,13 +644,15 @@ def claude_route_intent(text: str, ctx: dict) -> dict | None:
     ctx_str = ""
     if ctx:
         ctx_str = f"Letzter Lead: {ctx.get('name','')} @ {ctx.get('company','')} URL={ctx.get('li_url','')}"
-    payload = json.dumps({
-        "model": "claude-haiku-4-5-20251001",
-        "max_tokens": 120,
-        "system": _INTENT_SYSTEM,
-        "messages": [{"role": "user", "content": f"Kontext: {ctx_str}\nNachricht: {text}"}]
-    }).encode()
-    try:
+    content = f"Kontext: {ctx_str}\nNachricht: {text}"
+
+    def ask():
+        payload = json.dumps({
+            "model": CLAUDE_MODEL,
+            "max_tokens": 120,
+            "system": _INTENT_SYSTEM,
+            "messages": [{"role": "user", "content": content}]
+        }).encode()
         req = urllib.request.Request(
             "https://api.anthropic.com/v1/messages",
             data=payload, method="POST",
@@ -435,7 +662,11 @@ def claude_route_intent(text: str, ctx: dict) -> dict | None:
         with urllib.request.urlopen(req, timeout=8) as r:
             raw = json.loads(r.read())["content"][0]["text"].strip()
         raw = re.sub(r'^```(?:json)?\s*|\s*```$', '', raw)
-        result = json.loads(raw)
+        json.loads(raw)   # nur gültiges JSON landet im Cache
+        return raw
+
+    try:
+        result = json.loads(get_llm_cache().cached("intent", CLAUDE_MODEL, _INTENT_SYSTEM, content, ask))
         log(f"claude_route: {result}")
         return result
     except Exception as e:
@@ -443,33 +674,40 @@ def claude_route_intent(text: str, ctx: dict) -> dict | None:
         return None
 
 
+def get_intent_router() -> IntentRouter:
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter()
+    return _intent_router
+
+
 # ── Command Handlers ──────────────────────────────────────────────────────────
 
+def get_context_store() -> ContextStore:
+    global _context_store
+    if _context_store is None:
+        _context_store = ContextStore()
+    return _context_store
+
 def set_context(chat_id, li_url="", name="", company="", profile=None, db_lead=None):
-    """Speichert letzten Lead-Kontext für diesen Chat."""
-    _context[str(chat_id)] = {
-        "li_url": li_url, "name": name, "company": company,
-        "profile": profile, "db_lead": db_lead, "ts": time.time()
-    }
+    """Speichert letzten Lead-Kontext für diesen Chat (kompakt, persistent)."""
+    get_context_store().set(chat_id, li_url=li_url, name=name, company=company,
+                            profile=profile, db_lead=db_lead)
 
 def get_context(chat_id):
     """Gibt Kontext zurück falls < 30 Minuten alt."""
-    ctx = _context.get(str(chat_id))
-    if ctx and (time.time() - ctx.get("ts", 0)) < 1800:
-        return ctx
-    return None
+    return get_context_store().get(chat_id)
 
 
 def handle_linkedin_lookup(chat_id, text, li_url):
     """Hauptfeature: LinkedIn URL → DB-Check + Profil + AI-Einschätzung."""
     tg_send(chat_id, f"🔍 Prüfe <code>{li_url}</code>...")
 
-    # 1. DB check
-    db_lead = db_find_by_linkedin(li_url)
-    is_in_db = db_lead is not None
-
-    # 2. LinkedIn Profil holen
+    # 1. DB check + 2. LinkedIn Profil — unabhängig, also parallel
+    db_f = submit_with_update(_io_pool, db_find_by_linkedin, li_url)
     profile = linkedin_get_profile_from_url(li_url)
+    db_lead = db_f.result()
+    is_in_db = db_lead is not None
 
     name    = profile.get("name", "?") if profile else "?"
     company = profile.get("current_company", "?") if profile else "?"
@@ -554,6 +792,38 @@ def handle_top_leads(chat_id, n=5):
     tg_send(chat_id, "\n".join(lines))
 
 
+def handle_forecast(chat_id):
+    """Monte-Carlo Forecast: P10/P50/P90 nach Region und Quartal."""
+    try:
+        from forecast import run_forecast, format_forecast_telegram
+    except ImportError:
+        tg_send(chat_id, "❌ Forecast benötigt numpy (<code>pip install numpy</code>).")
+        return
+    deals = db_get_pipeline()
+    result = run_forecast(deals)
+    tg_send(chat_id, format_forecast_telegram(result) + f"\n\n<a href='{DASHBOARD_URL}'>📊 Dashboard</a>")
+
+
+def handle_similar(chat_id, company=""):
+    """Lookalike-Leads: ähnlich zu einer Firma oder zu Closed Won / High-MEDDPICC."""
+    try:
+        from lookalike import LookalikeIndex, format_similar_telegram, SEED_MIN_MEDDPICC
+    except ImportError:
+        tg_send(chat_id, "❌ Lookalikes benötigen numpy (<code>pip install numpy</code>).")
+        return
+    index = LookalikeIndex()
+    index.update(db_get_index_leads())
+    if company:
+        seeds, label = index.find_ids_by_company(company), f"<b>{company}</b>"
+    else:
+        seeds, label = index.default_seed_ids(), f"Closed Won / MEDDPICC ≥ {SEED_MIN_MEDDPICC}"
+    if not seeds:
+        tg_send(chat_id, f"❌ Keine Seed-Leads für {label}.\nBeispiel: <code>/similar Tangany</code>")
+        return
+    results = index.similar(seeds, top_k=10)
+    tg_send(chat_id, format_similar_telegram(results, label) + f"\n\n<a href='{DASHBOARD_URL}'>📊 Dashboard</a>")
+
+
 def handle_status(chat_id, company_query):
     """Zeigt Status eines Leads. Akzeptiert Firmenname oder LinkedIn-URL."""
     # LinkedIn URL → nach linkedin-Feld suchen
@@ -577,6 +847,8 @@ def handle_status(chat_id, company_query):
     ql = m.get("qualification_status", "?")
     ql_e = {"QUALIFIED": "🟢", "PROBABLE": "🔵", "POSSIBLE": "🟡"}.get(ql, "⚪")
     days = days_since(l.get("updated_at"))
+    breakdown = priority_breakdown(score, float(l.get("expected_deal_size_millions") or 0),
+                                   days, l.get("stage") or "prospecting", l.get("region") or "DE")
 
     li_link = f'\n🔗 <a href="{l["linkedin"]}">LinkedIn</a>' if l.get("linkedin") else ""
     msg = f"""📋 <b>{l['company']}</b>
@@ -585,7 +857,9 @@ def handle_status(chat_id, company_query):
 📍 {l.get('region','?')}
 🎯 Stage: <b>{l.get('stage','?')}</b>
 📊 MEDDPICC {ql_e} <b>{score}/80</b>
-⏱ Zuletzt aktiv: <b>{days}d ago</b>{li_link}
+⏱ Zuletzt aktiv: <b>{days}d ago</b>
+🧮 Priorität <b>{breakdown.total}/100</b> ({breakdown.primary_reason})
+<i>{breakdown.format_compact()}</i>{li_link}
 
 <a href='{DASHBOARD_URL}'>📊 Dashboard</a>"""
     tg_send(chat_id, msg)
@@ -755,9 +1029,18 @@ def handle_find_contacts(chat_id, role, company):
         tg_send(chat_id, f"❌ LinkedIn Fehler: {str(e)[:200]}")
 
 
+_job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+
 def handle_battle_card(chat_id, company_query):
-    """Startet Battle Card Generierung für eine Firma."""
-    tg_send(chat_id, f"⚔️ Starte Battle Card für <b>{company_query}</b>...\n(~2 Minuten)")
+    """Startet Battle Card Generierung für eine Firma — als Hintergrund-Job.
+    Der Handler kehrt sofort zurück, die Chat-Queue läuft weiter; die
+    Fertig-Meldung kommt, wenn pipo_battlecard.py durch ist."""
+    if tg_send(chat_id, f"⚔️ Starte Battle Card für <b>{company_query}</b>...\n(~2 Minuten)") == "duplicate":
+        return   # Update wird erneut verarbeitet — Job lief schon beim ersten Versuch
+    submit_with_update(_job_pool, run_battle_card, chat_id, company_query)
+
+
+def run_battle_card(chat_id, company_query):
     env = LEADTRACKER / ".env"
     script = LEADTRACKER / "pipo_battlecard.py"
     cmd = f'. "{env}" && python3 "{script}" --lead "{company_query}"'
@@ -777,6 +1060,16 @@ def handle_battle_card(chat_id, company_query):
         tg_send(chat_id, f"❌ Fehler: {e}")
 
 
+def handle_db_check(chat_id, query):
+    """"haben wir X?" → Ja/Nein aus StakeStream"""
+    results = db_find_by_company(query)
+    if results:
+        l = results[0]
+        tg_send(chat_id, f"✅ <b>Ja</b> — <b>{l['company']}</b> ist in StakeStream.\n/status {query}")
+    else:
+        tg_send(chat_id, f"❌ <b>Nein</b> — '{query}' nicht in StakeStream.\n<code>/add [url] {query}</code>")
+
+
 def handle_help(chat_id):
     msg = """🤖 <b>Pipo Bot — Befehle</b>
 
@@ -786,6 +1079,8 @@ def handle_help(chat_id):
 
 <b>Explizite Befehle:</b>
 /top [n]                        — Top N Leads (default: 5)
+/forecast                       — Pipeline Forecast (P10/P50/P90)
+/similar [firma]                — Lookalike-Leads finden
 /status [firma]                 — Lead-Status + MEDDPICC
 /card [firma]                   — Battle Card generieren
 /add [url] [firma] [Region]     — Lead anlegen
@@ -809,10 +1104,84 @@ def handle_help(chat_id):
 # ── Intent Detection ──────────────────────────────────────────────────────────
 LINKEDIN_REGEX = re.compile(r'https?://(?:www\.)?linkedin\.com/in/[^\s\]>]+', re.IGNORECASE)
 
+def dispatch_intent(chat_id, text, intent: dict, ctx) -> bool:
+    """Führt einen Intent (lokal oder von Claude) aus. False → Regex-Fallback übernimmt."""
+    action = intent.get("action")
+    params = intent.get("params") or {}
+
+    if action == "linkedin_lookup":
+        li_url = params.get("li_url") or ""
+        if not li_url:
+            li_m = LINKEDIN_REGEX.search(text)
+            li_url = li_m.group(0).rstrip("/.,!?") if li_m else ""
+        if li_url:
+            handle_linkedin_lookup(chat_id, text, li_url)
+            return True
+
+    elif action == "add_lead":
+        handle_add_lead(chat_id, auto_strategy=params.get("want_strategy", False), parsed=params)
+        return True
+
+    elif action == "battle_card":
+        company = params.get("company", "")
+        if not company and ctx:
+            company = ctx.get("company", "")
+        if company:
+            handle_battle_card(chat_id, company)
+        else:
+            tg_send(chat_id, "❓ Für welche Firma?\n<code>/card Firmenname</code>")
+        return True
+
+    elif action == "status":
+        query = params.get("company_or_url", "")
+        if not query and ctx:
+            query = ctx.get("company", "")
+        if query:
+            handle_status(chat_id, query)
+        else:
+            tg_send(chat_id, "❓ Welche Firma? Beispiel: /status Tangany")
+        return True
+
+    elif action == "find_contacts":
+        role    = params.get("role", "Managing Director CIO CFO")
+        company = params.get("company", "")
+        if company:
+            handle_find_contacts(chat_id, role, company)
+            return True
+
+    elif action == "top_leads":
+        handle_top_leads(chat_id, params.get("n", 5))
+        return True
+
+    elif action == "forecast":
+        handle_forecast(chat_id)
+        return True
+
+    elif action == "similar":
+        company = params.get("company", "")
+        if not company and ctx:
+            company = ctx.get("company", "")
+        handle_similar(chat_id, company)
+        return True
+
+    elif action == "help":
+        handle_help(chat_id)
+        return True
+
+    elif action == "db_check":
+        query = params.get("query", "")
+        if query:
+            handle_db_check(chat_id, query)
+            return True
+
+    return False
+
+
 def process_message(chat_id, text):
     """Parst Nachricht und dispatcht an den richtigen Handler.
-    Strategie: Claude Haiku als Intent-Router (natürliche Sprache),
-    Regex-Fallback für explizite Befehle und wenn Claude nicht verfügbar.
+    Strategie: Slash-Befehle direkt, dann lokaler Intent-Router (intent_router.py,
+    Regex + TF-IDF), Claude Haiku nur für mehrdeutige Nachrichten,
+    Regex-Fallback wenn Claude nicht verfügbar.
     """
     text = text.strip()
     text_lower = text.lower()
@@ -828,6 +1197,12 @@ def process_message(chat_id, text):
         parts = text.split()
         handle_top_leads(chat_id, int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 5)
         return
+    if text_lower.startswith("/forecast"):
+        handle_forecast(chat_id)
+        return
+    if text_lower.startswith("/similar"):
+        handle_similar(chat_id, text[8:].strip())
+        return
     if text_lower in ("/help", "help", "hilfe", "?", "/start"):
         handle_help(chat_id)
         return
@@ -838,60 +1213,21 @@ def process_message(chat_id, text):
             handle_find_contacts(chat_id, m.group(1).strip(), m.group(2).strip())
             return
 
-    # ── Claude Intent-Router ─────────────────────────────────────────────────
+    # ── Intent-Router: lokal (Regex/TF-IDF), Claude nur für den Rest ──────────
     ctx = get_context(chat_id)
-    intent = claude_route_intent(text, ctx)
-
-    if intent and intent.get("action") not in (None, "unknown"):
-        action = intent["action"]
-        params = intent.get("params", {})
-
-        if action == "linkedin_lookup":
-            li_url = params.get("li_url") or ""
-            if not li_url:
-                li_m = LINKEDIN_REGEX.search(text)
-                li_url = li_m.group(0).rstrip("/.,!?") if li_m else ""
-            if li_url:
-                handle_linkedin_lookup(chat_id, text, li_url)
-                return
-
-        elif action == "add_lead":
-            handle_add_lead(chat_id, auto_strategy=params.get("want_strategy", False), parsed=params)
-            return
-
-        elif action == "battle_card":
-            company = params.get("company", "")
-            if not company and ctx:
-                company = ctx.get("company", "")
-            if company:
-                handle_battle_card(chat_id, company)
-            else:
-                tg_send(chat_id, "❓ Für welche Firma?\n<code>/card Firmenname</code>")
-            return
-
-        elif action == "status":
-            query = params.get("company_or_url", "")
-            if not query and ctx:
-                query = ctx.get("company", "")
-            if query:
-                handle_status(chat_id, query)
-            else:
-                tg_send(chat_id, "❓ Welche Firma? Beispiel: /status Tangany")
-            return
-
-        elif action == "find_contacts":
-            role    = params.get("role", "Managing Director CIO CFO")
-            company = params.get("company", "")
-            if company:
-                handle_find_contacts(chat_id, role, company)
-                return
-
-        elif action == "top_leads":
-            handle_top_leads(chat_id, params.get("n", 5))
-            return
-
-        elif action == "help":
-            handle_help(chat_id)
+    router = get_intent_router()
+    t0 = time.perf_counter()
+    route = router.route(text, has_context=bool(ctx and ctx.get("company")))
+    if route is None:
+        intent = claude_route_intent(text, ctx)
+        if intent and intent.get("action"):
+            route = Route(intent["action"], intent.get("params") or {}, None, "claude")
+    router.record(text, route, (time.perf_counter() - t0) * 1000)
+
+    # add_lead lokal erkannt → Argumente parst der Regex-Fallback unten
+    local_add = route is not None and route.action == "add_lead" and route.source != "claude"
+    if route is not None and route.action != "unknown" and not local_add:
+        if dispatch_intent(chat_id, text, route.as_intent(), ctx):
             return
 
     # ── Regex Fallback (wenn Claude unavailable oder action == unknown) ───────
@@ -900,7 +1236,7 @@ def process_message(chat_id, text):
     if li_match:
         # /add [url] darf nicht als Lookup landen
         want_strategy = any(w in text_lower for w in ["strategie", "strategy", "battle card", "battlecard"])
-        if (text_lower.startswith("/add") or
+        if (local_add or text_lower.startswith("/add") or
                 any(w in text_lower for w in ["hinzufügen", "hinzufuegen", "füge hinzu", "fueg hinzu", "eintragen"])):
             args = re.sub(r'\b(?:strategie|strategy|battle\s*card|battlecard)\b', '', text[text_lower.find(" ")+1:], flags=re.IGNORECASE)
             args = re.sub(r'^[\s+,&|]+', '', args).rstrip()
@@ -911,7 +1247,7 @@ def process_message(chat_id, text):
 
     # /add und hinzufügen (ohne URL)
     want_strategy = any(w in text_lower for w in ["strategie", "strategy", "battle card", "battlecard"])
-    if (text_lower.startswith("/add") or
+    if (local_add or text_lower.startswith("/add") or
             any(w in text_lower for w in ["hinzufügen", "hinzufuegen", "füge hinzu", "fueg hinzu", "add lead", "eintragen", "in db"])):
         args = ""
         for prefix in ("/add ", "add ", "hinzufügen ", "hinzufuegen ", "füge hinzu ", "fueg hinzu "):
@@ -942,13 +1278,7 @@ def process_message(chat_id, text):
     # "haben wir X?"
     m = re.search(r'(?:haben wir|sind wir|in db|in der datenbank)[?:,\s]+(.+)', text_lower)
     if m:
-        query = m.group(1).strip().rstrip("?").strip()
-        results = db_find_by_company(query)
-        if results:
-            l = results[0]
-            tg_send(chat_id, f"✅ <b>Ja</b> — <b>{l['company']}</b> ist in StakeStream.\n/status {query}")
-        else:
-            tg_send(chat_id, f"❌ <b>Nein</b> — '{query}' nicht in StakeStream.\n<code>/add [url] {query}</code>")
+        handle_db_check(chat_id, m.group(1).strip().rstrip("?").strip())
         return
 
     # Fallback
@@ -958,56 +1288,271 @@ def process_message(chat_id, text):
     tg_send(chat_id, f"🤔 Nicht verstanden.{ctx_hint}\n\n/help — alle Befehle")
 
 
-# ── Main Loop ─────────────────────────────────────────────────────────────────
-def run_bot():
-    log("=== Pipo Bot startet ===")
-    if not TELEGRAM_TOKEN:
-        log("FEHLER: TELEGRAM_BOT_TOKEN nicht gesetzt!")
-        sys.exit(1)
+# ── Async Bot Core ────────────────────────────────────────────────────────────
+class ChatDispatcher:
+    """
+    Eine asyncio.Queue + Worker-Task pro Chat: Nachrichten eines Chats werden
+    in Reihenfolge abgearbeitet, verschiedene Chats parallel. Der Worker
+    beendet sich, sobald seine Queue leer ist (keine Tasks für stille Chats).
+    handler: async def handler(chat_id, item)
+    """
 
-    # Test-Ping
-    tg_send(TELEGRAM_CHAT, "🤖 <b>Pipo Bot online</b>\n\nSchick mir eine LinkedIn URL oder /help für alle Befehle.")
-    log("Startup-Message gesendet")
+    def __init__(self, handler):
+        self.handler = handler
+        self._queues: dict = {}
+        self._tasks: set = set()
+
+    def submit(self, chat_id, item):
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+            task = asyncio.get_running_loop().create_task(self._worker(chat_id, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        queue.put_nowait(item)
+
+    async def _worker(self, chat_id, queue):
+        while True:
+            item = await queue.get()
+            try:
+                await self.handler(chat_id, item)
+            except Exception as e:
+                log(f"handler error ({chat_id}): {e}")
+            if queue.empty():
+                # kein await zwischen Prüfen und Entfernen → submit() sieht konsistenten Zustand
+                del self._queues[chat_id]
+                return
 
-    offset = 0
-    while True:
+    async def join(self):
+        """Wartet, bis alle Chat-Queues leer sind"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+
+class BotCore:
+    """Long Polling / Webhook → UpdateStore (Journal) → ChatDispatcher → process_message (Executor)"""
+
+    def __init__(self, workers=HANDLER_WORKERS, store=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="handler")
+        self.dispatcher = ChatDispatcher(self.handle)
+        self.store = store or UpdateStore()
+        self.offset = self.store.offset()
+        self.duplicates = 0
+
+    async def _to_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def send(self, chat_id, text, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, lambda: tg_send(chat_id, text, **kwargs))
+
+    async def handle(self, chat_id, item):
+        update_id, text = item
+        log(f"Message: {text[:80]}")
+        await self._to_thread(self.process_update, update_id, chat_id, text)
+
+    def process_update(self, update_id, chat_id, text):
+        """Handler-Thread: Antworten mit dedupe_key, danach done bzw. failed ins Journal"""
+        generation = self.store.start(update_id)
+        token = _update_ctx.set(UpdateContext(update_id, generation))
         try:
-            updates = tg_get_updates(offset)
+            process_message(chat_id, text)
+        except Exception as e:
+            log(f"process_message error: {e}")
+            tg_send(chat_id, f"❌ Fehler: {str(e)[:200]}")
+            self.store.finish(update_id, "failed", str(e)[:500])
+        else:
+            self.store.finish(update_id)
+        finally:
+            _update_ctx.reset(token)
+
+    def accept(self, update):
+        """Update → (chat_id, text) oder None (leer / nicht autorisiert)"""
+        msg = update.get("message", {})
+        if not msg:
+            return None
+        chat_id = msg.get("chat", {}).get("id")
+        text    = msg.get("text", "").strip()
+        if not text or not chat_id:
+            return None
+        # Nur von autorisierten Chats akzeptieren
+        if ALLOWED_CHATS and str(chat_id) not in ALLOWED_CHATS:
+            log(f"Unauthorized message from chat_id {chat_id}")
+            return None
+        return chat_id, text
+
+    def receive(self, updates):
+        """Journalen (+ Offset) — nur was hier neu ist, wird verarbeitet"""
+        fresh, duplicates = self.store.receive(updates)
+        self.duplicates += duplicates
+        if updates:
+            self.offset = max(self.offset, max(u["update_id"] for u in updates) + 1)
+        return fresh
+
+    def dispatch(self, update):
+        accepted = self.accept(update)
+        if accepted:
+            chat_id, text = accepted
+            self.dispatcher.submit(chat_id, (update["update_id"], text))
+        else:
+            self.store.finish(update["update_id"], "skipped")
+
+    def recover(self):
+        """Offenes aus dem Journal (Absturz, --replay-failed) erneut einreihen → Anzahl"""
+        pending = self.store.recover()
+        for update in pending:
+            self.dispatch(update)
+        if pending:
+            log(f"{len(pending)} offene Updates aus dem Journal wieder eingereiht")
+        return len(pending)
+
+    async def replay(self):
+        """Nur das Journal abarbeiten (ohne Polling) und warten, bis alles durch ist"""
+        count = self.recover()
+        await self.dispatcher.join()
+        self.executor.shutdown(wait=True)
+        return count
+
+    async def poll(self):
+        """Long Polling: der getUpdates-Call blockiert einen eigenen Thread, nie den Loop"""
+        loop = asyncio.get_running_loop()
+        backoff = 1
+        while True:
+            updates = await loop.run_in_executor(None, tg_get_updates, self.offset)
             if not updates.get("ok"):
-                time.sleep(5)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, POLL_BACKOFF_MAX)
                 continue
+            backoff = 1
+            for update in self.receive(updates.get("result", [])):
+                self.dispatch(update)
+
+    async def run(self, webhook_url=None, host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+        # Test-Ping
+        await self.send(TELEGRAM_CHAT, "🤖 <b>Pipo Bot online</b>\n\nSchick mir eine LinkedIn URL oder /help für alle Befehle.")
+        log("Startup-Message gesendet")
+        loop = asyncio.get_running_loop()
+        get_context_store().start_sweeper()
+        loop.run_in_executor(self.executor, get_lead_index)   # Lead-Index vorladen, nicht erst beim ersten Lookup
+        self.recover()
+        try:
+            if webhook_url:
+                secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+                server = WebhookServer(self, secret, host, port)
+                await server.start()
+                resp = await loop.run_in_executor(None, tg_api, "setWebhook", {
+                    "url": webhook_url, "secret_token": secret, "allowed_updates": ["message"]})
+                if not resp.get("ok"):
+                    raise RuntimeError(f"setWebhook fehlgeschlagen: {resp.get('description')}")
+                log(f"Webhook aktiv: {webhook_url} → {host}:{server.port}{WEBHOOK_PATH}")
+                await server.serve_forever()
+            else:
+                # Ein gesetzter Webhook blockiert getUpdates (409) — zurück auf Polling
+                await loop.run_in_executor(None, tg_api, "deleteWebhook", {})
+                await self.poll()
+        finally:
+            self.executor.shutdown(wait=False)
 
-            for update in updates.get("result", []):
-                offset = update["update_id"] + 1
-                msg = update.get("message", {})
-                if not msg:
-                    continue
-
-                chat_id  = msg.get("chat", {}).get("id")
-                text     = msg.get("text", "").strip()
-                from_id  = str(msg.get("from", {}).get("id", ""))
-
-                if not text or not chat_id:
-                    continue
-
-                # Nur von autorisiertem Chat akzeptieren
-                if TELEGRAM_CHAT and str(chat_id) != str(TELEGRAM_CHAT):
-                    log(f"Unauthorized message from chat_id {chat_id}")
-                    continue
-
-                log(f"Message: {text[:80]}")
-                try:
-                    process_message(chat_id, text)
-                except Exception as e:
-                    log(f"process_message error: {e}")
-                    tg_send(chat_id, f"❌ Fehler: {str(e)[:200]}")
-
-        except KeyboardInterrupt:
-            log("Bot gestoppt (KeyboardInterrupt)")
-            break
-        except Exception as e:
-            log(f"Main loop error: {e}")
-            time.sleep(5)
+
+class WebhookServer:
+    """
+    Minimaler HTTP/1.1-Server (asyncio, Keep-Alive) für Telegram-Webhooks.
+    Prüft X-Telegram-Bot-Api-Secret-Token, journalt das Update (BotCore.receive,
+    ein SQLite-Commit), antwortet 200 und gibt es erst danach an die Chat-Queue —
+    der Handler läuft nie im Request, Telegram wartet nur auf Journal + Ack.
+    Stirbt der Prozess vor dem Journal, gibt es kein 200 und Telegram stellt erneut zu.
+    """
+
+    def __init__(self, core, secret, host=WEBHOOK_HOST, port=WEBHOOK_PORT, path=WEBHOOK_PATH):
+        self.core = core
+        self.secret = secret.encode()
+        self.host, self.port, self.path = host, port, path
+        self.received = 0
+        self.rejected = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]   # port=0 → zugewiesener Port
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                method, path = (request_line.decode("latin-1").split() + ["", ""])[:2]
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_WEBHOOK_BODY:
+                    await self._respond(writer, 413, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                update = self._accept(method, path, headers, body)
+                if isinstance(update, int):
+                    self.rejected += 1
+                    await self._respond(writer, update)
+                else:
+                    fresh = self.core.receive([update]) if "update_id" in update else []
+                    await self._respond(writer, 200)   # journalt + bestätigt, dann verarbeiten
+                    self.received += 1
+                    for u in fresh:
+                        self.core.dispatch(u)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass   # Shutdown: offene Keep-Alive-Verbindungen still schließen
+        finally:
+            writer.close()
+
+    def _accept(self, method, path, headers, body):
+        """→ Update-dict oder HTTP-Fehlerstatus"""
+        if method != "POST" or path.split("?")[0] != self.path:
+            return 404
+        token = headers.get("x-telegram-bot-api-secret-token", "").encode()
+        if not hmac.compare_digest(token, self.secret):
+            return 401
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return 400
+        return update if isinstance(update, dict) else 400
+
+    @staticmethod
+    async def _respond(writer, status, close=False):
+        reason = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                  413: "Payload Too Large"}.get(status, "")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Length: 0\r\n"
+                     f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode())
+        await writer.drain()
+
+
+def run_bot(webhook_url=None, host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+    log("=== Pipo Bot startet ===")
+    if not TELEGRAM_TOKEN:
+        log("FEHLER: TELEGRAM_BOT_TOKEN nicht gesetzt!")
+        sys.exit(1)
+    try:
+        asyncio.run(BotCore().run(webhook_url, host, port))
+    except KeyboardInterrupt:
+        log("Bot gestoppt (KeyboardInterrupt)")
 
 
 # ── launchd Install / Uninstall ───────────────────────────────────────────────
@@ -1093,6 +1638,11 @@ def main():
     parser = argparse.ArgumentParser(description="Pipo Interactive Telegram Bot")
     parser.add_argument("--install",   action="store_true", help="Als macOS Service installieren")
     parser.add_argument("--uninstall", action="store_true", help="Service deinstallieren")
+    parser.add_argument("--webhook",   metavar="URL", help="Webhook statt Long Polling (öffentliche HTTPS-URL)")
+    parser.add_argument("--webhook-host", default=WEBHOOK_HOST, help="Lokale Adresse des Webhook-Servers")
+    parser.add_argument("--webhook-port", type=int, default=WEBHOOK_PORT, help="Lokaler Port des Webhook-Servers")
+    parser.add_argument("--replay-failed", nargs="*", type=int, metavar="UPDATE_ID",
+                        help="Fehlgeschlagene Updates (alle oder diese IDs) erneut verarbeiten und beenden")
     args = parser.parse_args()
 
     if args.install:
@@ -1101,8 +1651,15 @@ def main():
     if args.uninstall:
         uninstall_service()
         return
+    if args.replay_failed is not None:
+        core = BotCore()
+        requeued = core.store.replay(args.replay_failed)
+        processed = asyncio.run(core.replay())
+        print(f"✅ {requeued} fehlgeschlagene Updates neu eingereiht, {processed} verarbeitet")
+        print(json.dumps(core.store.status(), indent=2))
+        return
 
-    run_bot()
+    run_bot(args.webhook, args.webhook_host, args.webhook_port)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Response Cache für Bot-Commands (/next, /hot, /stale)
+Speichert die fertig gerenderten Antworten in SQLite, Schlüssel
+(command, params) + Daten-Version. Ein Treffer ist ein einziger
+Index-Lookup — ohne alert_service-Import und ohne Snapshot-Query.
+
+- data_version:  Zähler, den SQLite-Trigger auf leads / activities /
+                 meddpicc_scores bei jedem Schreibzugriff hochzählen
+                 (prozessübergreifend, egal welcher Writer)
+- Invalidierung: Eintrag gilt nur für die Version, mit der er gerendert wurde;
+                 zusätzlich TTL, weil "N Tage inaktiv" auch ohne Writes weiterläuft
+- Pre-Warming:   `run` rendert alle Commands neu, sobald ein Schreib-Burst
+                 vorbei ist (Debounce) oder die TTL bald abläuft
+
+Usage:
+  python3 response_cache.py install              → Tabellen + Trigger
+  python3 response_cache.py warm                 → alle Commands jetzt rendern
+  python3 response_cache.py run [--debounce 2]   → Pre-Warmer (Daemon)
+  python3 response_cache.py status
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# Configuration
+DB_PATH = os.environ.get("DB_PATH", "/Users/philippsandor/.openclaw/workspace/bitwise/leadtracker/bitwise_leads.db")
+RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+DEBOUNCE_SECONDS = 2.0      # so lange muss Ruhe sein, bevor neu gerendert wird
+MAX_DEBOUNCE_SECONDS = 30.0 # bei Dauer-Writes spätestens nach dieser Zeit
+POLL_INTERVAL_SECONDS = 0.5
+
+# Command → (AlertService-Formatter, Parameter); Parameter gehen in den Schlüssel ein
+CACHED_COMMANDS = {
+    '/next': ('format_next_activity', {}),
+    '/hot': ('format_hot_opportunities', {}),
+    '/stale': ('format_stale_deals', {}),
+}
+
+# Tabellen, deren Writes die gerenderten Antworten verändern
+VERSIONED_TABLES = ['leads', 'activities', 'meddpicc_scores']
+
+
+def cache_params(params: Dict) -> str:
+    """Kanonischer Schlüssel-Teil für die Parameter"""
+    return json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+
+# ============================================
+# Schema
+# ============================================
+
+def ensure_response_cache(conn: sqlite3.Connection):
+    """Zähler, Trigger und Cache-Tabelle anlegen. Idempotent."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in VERSIONED_TABLES:
+        if table not in tables:
+            continue
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS response_cache (
+            command TEXT NOT NULL,
+            params TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            rendered_at REAL NOT NULL,
+            render_ms REAL NOT NULL,
+            body TEXT NOT NULL,
+            PRIMARY KEY (command, params)
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> Optional[int]:
+    """Aktuelle Daten-Version, None wenn der Cache nicht installiert ist"""
+    try:
+        row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def cached_response(command_text: str, db_path: str = DB_PATH) -> Optional[str]:
+    """
+    Gültige gecachte Antwort oder None (Miss, veraltet, nicht installiert).
+    Nur stdlib — bot_handler.py nutzt das ohne alert_service zu importieren.
+    """
+    command = command_text.strip().lower()
+    if command not in CACHED_COMMANDS or not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("""
+            SELECT c.body FROM response_cache c, data_version v
+            WHERE c.command = ? AND c.params = ?
+              AND v.id = 1 AND c.version = v.version
+              AND c.rendered_at >= ?
+        """, (command, cache_params(CACHED_COMMANDS[command][1]),
+              time.time() - RESPONSE_CACHE_TTL_SECONDS)).fetchone()
+    except sqlite3.OperationalError:
+        return None   # Cache-Tabellen (noch) nicht installiert
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+# ============================================
+# Cache
+# ============================================
+
+class ResponseCache:
+    def __init__(self, db_path: str = DB_PATH, service=None):
+        self.db_path = db_path
+        self._service = service
+        with self.get_connection() as conn:
+            ensure_response_cache(conn)
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+    @property
+    def service(self):
+        """AlertService erst bei Bedarf — ein Cache-Treffer braucht ihn nicht"""
+        if self._service is None:
+            from alert_service import AlertService
+            self._service = AlertService(self.db_path)
+        return self._service
+
+    def version(self) -> int:
+        with self.get_connection() as conn:
+            return current_version(conn)
+
+    def get(self, command: str) -> Optional[str]:
+        return cached_response(command, self.db_path)
+
+    def _store(self, conn, command: str, version: int, body: str, render_ms: float):
+        conn.execute("""
+            INSERT OR REPLACE INTO response_cache (command, params, version, rendered_at, render_ms, body)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (command, cache_params(CACHED_COMMANDS[command][1]), version, time.time(), render_ms, body))
+
+    def warm(self, commands=None) -> int:
+        """
+        Rendert die Commands aus einem Snapshot neu. Die Version wird VOR dem
+        Snapshot gelesen: schreibt jemand dazwischen, gilt der Eintrag sofort
+        als veraltet (Miss statt falscher Antwort).
+        """
+        commands = list(commands or CACHED_COMMANDS)
+        version = self.version()
+        snapshot = self.service.snapshot()
+        with self.get_connection() as conn:
+            for command in commands:
+                formatter, params = CACHED_COMMANDS[command]
+                start = time.perf_counter()
+                body = getattr(self.service, formatter)(snapshot, **params)
+                self._store(conn, command, version, body, (time.perf_counter() - start) * 1000)
+            conn.commit()
+        return version
+
+    def render(self, command_text: str) -> Optional[str]:
+        """Gecachte Antwort oder neu rendern (und speichern). None = kein Cache-Command."""
+        command = command_text.strip().lower()
+        if command not in CACHED_COMMANDS:
+            return None
+        body = self.get(command)
+        if body is None:
+            self.warm([command])
+            body = self.get(command)
+        if body is None:   # parallel geschrieben — Antwort trotzdem liefern
+            formatter, params = CACHED_COMMANDS[command]
+            body = getattr(self.service, formatter)(**params)
+        return body
+
+    def oldest_entry_age(self) -> Optional[float]:
+        """Sekunden seit dem ältesten gültigen Eintrag, None = mindestens ein Command fehlt/veraltet"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT c.rendered_at FROM response_cache c, data_version v
+                WHERE v.id = 1 AND c.version = v.version
+            """).fetchall()
+        if len(rows) < len(CACHED_COMMANDS):
+            return None
+        return time.time() - min(r[0] for r in rows)
+
+    def status(self) -> Dict:
+        with self.get_connection() as conn:
+            version = current_version(conn)
+            rows = conn.execute("""
+                SELECT command, version, rendered_at, render_ms FROM response_cache ORDER BY command
+            """).fetchall()
+        now = time.time()
+        return {
+            'version': version,
+            'ttl_seconds': RESPONSE_CACHE_TTL_SECONDS,
+            'entries': [
+                {'command': command, 'valid': v == version and now - rendered_at <= RESPONSE_CACHE_TTL_SECONDS,
+                 'age_seconds': round(now - rendered_at, 1), 'render_ms': round(render_ms, 1)}
+                for command, v, rendered_at, render_ms in rows
+            ]
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(db_path: str = DB_PATH) -> ResponseCache:
+    """Ein ResponseCache pro DB und Prozess — Schema-Setup nur beim ersten Aufruf"""
+    with _caches_lock:
+        if db_path not in _caches:
+            _caches[db_path] = ResponseCache(db_path)
+    return _caches[db_path]
+
+
+# ============================================
+# Pre-Warmer
+# ============================================
+
+class Prewarmer:
+    """
+    Pollt data_version. Nach einem Schreib-Burst (Version seit debounce
+    Sekunden stabil, spätestens nach MAX_DEBOUNCE_SECONDS) oder wenn die
+    TTL zu 80% abgelaufen ist, werden alle Commands neu gerendert.
+    """
+
+    def __init__(self, cache: ResponseCache, debounce: float = DEBOUNCE_SECONDS):
+        self.cache = cache
+        self.debounce = debounce
+        self.warmed_version = None
+        self._seen_version = None
+        self._changed_at = None   # erster Write des laufenden Bursts
+        self._last_write = None
+        self.warm_count = 0
+
+    def tick(self, now: Optional[float] = None) -> bool:
+        """Ein Poll-Schritt. True = neu gerendert."""
+        now = time.monotonic() if now is None else now
+        version = self.cache.version()
+        if version != self._seen_version:
+            if self._changed_at is None:
+                self._changed_at = now
+            self._seen_version = version
+            self._last_write = now
+
+        if version != self.warmed_version:
+            quiet = now - self._last_write >= self.debounce
+            overdue = now - self._changed_at >= MAX_DEBOUNCE_SECONDS
+            if not (quiet or overdue or self.warmed_version is None):
+                return False
+        else:
+            age = self.cache.oldest_entry_age()
+            if age is not None and age < RESPONSE_CACHE_TTL_SECONDS * 0.8:
+                return False
+
+        self.warmed_version = self.cache.warm()
+        self._changed_at = None
+        self.warm_count += 1
+        return True
+
+    def run(self, interval: float = POLL_INTERVAL_SECONDS):
+        print(f"🔥 Response-Cache Pre-Warmer (Debounce {self.debounce}s, TTL {RESPONSE_CACHE_TTL_SECONDS}s)")
+        try:
+            while True:
+                if self.tick():
+                    print(f"   v{self.warmed_version} gerendert ({time.strftime('%H:%M:%S')})")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print(f"Pre-Warmer gestoppt ({self.warm_count} Warm-Läufe)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Response Cache für Bot-Commands")
+    parser.add_argument("command", choices=["install", "warm", "run", "status"])
+    parser.add_argument("--db", default=DB_PATH, help="Pfad zur SQLite DB")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help="Sekunden Ruhe nach einem Schreib-Burst vor dem Neu-Rendern")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.db)
+    if args.command == "install":
+        print(f"✅ Response Cache installiert (Version {cache.version()})")
+    elif args.command == "warm":
+        start = time.perf_counter()
+        version = cache.warm()
+        print(f"✅ {len(CACHED_COMMANDS)} Commands gerendert (v{version}, {(time.perf_counter() - start) * 1000:.0f}ms)")
+    elif args.command == "run":
+        Prewarmer(cache, args.debounce).run(args.interval)
+    else:
+        print(json.dumps(cache.status(), indent=2))
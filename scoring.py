@@ -0,0 +1,159 @@
+"""
+Lead Scoring für StakeStream
+Gemeinsame Scoring-Logik für Morning Briefing, Dashboard, Bot und Benchmarks —
+importierbar ohne Streamlit-Seiteneffekte (pandas nur für Daily Picks).
+
+Priority Score (0-100) = Summe aus fünf Komponenten:
+- MEDDPICC   (max 40): score / 80 × 40
+- Deal Size  (max 25): Buckets 50/20/10/5 M€
+- Activity   (max 20): Urgency peakt bei 6-10 Tagen Inaktivität
+- Stage      (max 10): spätere Stages = höher
+- Strategic  (max ~5): regionale Priorität
+"""
+
+from dataclasses import dataclass
+
+# Stage Gewichtung (spätere Stages = höher)
+STAGE_WEIGHTS = {
+    'negotiation': 1.0,
+    'validation': 0.9,
+    'solutioning': 0.8,
+    'discovery': 0.6,
+    'prospecting': 0.4,
+    'closed_won': 0.0,
+    'closed_lost': 0.0
+}
+
+# Regionale Prioritäten (kann angepasst werden)
+REGION_PRIORITY = {
+    'UAE': 1.1,    # High priority market
+    'DE': 1.0,     # Core market
+    'CH': 1.0,     # Core market
+    'UK': 0.95,    # Secondary
+    'NORDICS': 0.9 # Secondary
+}
+
+# Activity Recency: (max. Tage inaktiv, Punkte) — danach 10 Punkte
+ACTIVITY_BUCKETS = [(2, 5), (5, 15), (10, 20), (21, 15)]
+ACTIVITY_STALE_POINTS = 10
+
+
+@dataclass(frozen=True)
+class ScoreBreakdown:
+    """Komponenten-Vektor eines Priority Scores"""
+    meddpicc: float
+    deal: float
+    activity: float
+    stage: float
+    strategic: float
+
+    @property
+    def total(self) -> float:
+        return round(self.meddpicc + self.deal + self.activity + self.stage + self.strategic, 1)
+
+    @property
+    def primary_reason(self) -> str:
+        """Stärkste Komponente (Strategic zählt nicht als Grund)"""
+        components = [
+            ("MEDDPICC", self.meddpicc),
+            ("Deal Size", self.deal),
+            ("Inaktivität", self.activity),
+            ("Stage", self.stage)
+        ]
+        return max(components, key=lambda x: x[1])[0]
+
+    def format_compact(self) -> str:
+        """z.B. 'MEDDPICC 30 · Deal 20 · Aktivität 15 · Stage 6 · Region 5'"""
+        return (f"MEDDPICC {self.meddpicc:.0f} · Deal {self.deal:.0f} · "
+                f"Aktivität {self.activity:.0f} · Stage {self.stage:.0f} · Region {self.strategic:.0f}")
+
+
+# ============================================
+# Komponenten
+# ============================================
+
+def deal_points(deal_size: float) -> float:
+    """Deal Size (25% weight): €50M = max points, Buckets darunter"""
+    if deal_size >= 50:
+        return 25
+    if deal_size >= 20:
+        return 20
+    if deal_size >= 10:
+        return 15
+    if deal_size >= 5:
+        return 10
+    return min(5, deal_size) if deal_size else 0
+
+
+def activity_bucket(days_inactive: int) -> int:
+    """Index des Activity-Buckets — ändert sich nur an den Bucket-Grenzen"""
+    for i, (max_days, _) in enumerate(ACTIVITY_BUCKETS):
+        if days_inactive <= max_days:
+            return i
+    return len(ACTIVITY_BUCKETS)
+
+
+def activity_points(days_inactive: int) -> float:
+    """Activity Recency (20% weight): Urgency peakt bei 6-10 Tagen, dann Decay"""
+    bucket = activity_bucket(days_inactive)
+    return ACTIVITY_BUCKETS[bucket][1] if bucket < len(ACTIVITY_BUCKETS) else ACTIVITY_STALE_POINTS
+
+
+def priority_breakdown(
+    meddpicc: int,
+    deal_size: float,
+    days_inactive: int,
+    stage: str,
+    region: str
+) -> ScoreBreakdown:
+    """Berechnet alle fünf Komponenten des Priority Scores"""
+    return ScoreBreakdown(
+        meddpicc=(meddpicc / 80) * 40,
+        deal=deal_points(deal_size),
+        activity=activity_points(days_inactive),
+        stage=STAGE_WEIGHTS.get((stage or '').lower(), 0.5) * 10,
+        strategic=5 * REGION_PRIORITY.get((region or '').upper(), 0.9),
+    )
+
+
+# ============================================
+# Dashboard: Pipo's Daily Picks
+# ============================================
+
+def get_pipo_daily_picks(df, n=5):
+    """Pipo's daily top picks — same algorithm as morning_briefing.py"""
+    import pandas as pd
+
+    if df.empty:
+        return pd.DataFrame()
+
+    active = df[~df["stage"].isin(["closed_won", "closed_lost"])].copy()
+
+    def _breakdown(row):
+        return priority_breakdown(
+            meddpicc=int(row["meddpicc"]),
+            deal_size=float(row.get("deal_size") or 0),
+            days_inactive=int(row.get("days_inactive") or 0),
+            stage=str(row.get("stage") or "prospecting"),
+            region=str(row.get("region") or "DE"),
+        )
+
+    def _action(row):
+        stage = str(row.get("stage") or "prospecting").lower()
+        days = int(row.get("days_inactive") or 0)
+        meddpicc = int(row["meddpicc"])
+        if days > 10 and meddpicc >= 50:
+            return "🔥 Dringend reaktivieren"
+        return {
+            'prospecting':  "📧 Cold Email / LinkedIn",
+            'discovery':    "📞 Discovery Call buchen",
+            'solutioning':  "📊 Solution Presentation",
+            'validation':   "✅ POC Timeline",
+            'negotiation':  "🤝 Deal closing",
+        }.get(stage, "📞 Follow-up")
+
+    breakdowns = active.apply(_breakdown, axis=1) if not active.empty else pd.Series(dtype=object)
+    active["priority_score"] = [b.total for b in breakdowns]
+    active["score_breakdown"] = [b.format_compact() for b in breakdowns]
+    active["suggested_action"] = active.apply(_action, axis=1) if not active.empty else []
+    return active.nlargest(n, "priority_score")
@@ -4,7 +4,9 @@
 echo "Setting up EMEA Sales Alert Cron Jobs..."
 
 # Create cron entries
-CRON_JOBS="# EMEA Sales Morning Briefing - Daily at 9:00 CET (8:00 UTC)
+CRON_JOBS="# Morning Briefing Precompute - nachts alle 30 Min (rechnet nur nach Datenänderungen)
+*/30 0-7 * * * cd /Users/philippsandor/.openclaw/workspace/bitwise/leadtracker && /usr/bin/python3 morning_briefing.py precompute >> /tmp/morning_briefing.log 2>&1
+# EMEA Sales Morning Briefing - Daily at 9:00 CET (8:00 UTC), sendet nur den vorberechneten Stand
 0 8 * * * cd /Users/philippsandor/.openclaw/workspace/bitwise/leadtracker && /usr/bin/python3 morning_briefing.py >> /tmp/morning_briefing.log 2>&1
 # Sales Stale Check - Every 4 hours
 0 */4 * * * cd /Users/philippsandor/.openclaw/workspace/bitwise/leadtracker && /usr/bin/python3 alert_service.py stale >> /tmp/sales_alerts.log 2>&1
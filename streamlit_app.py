@@ -11,6 +11,11 @@ import plotly.graph_objects as go
 import os, json
 from datetime import datetime
 
+from forecast import run_forecast
+from scoring import get_pipo_daily_picks
+from lookalike import LookalikeIndex, SEED_MIN_MEDDPICC
+from llm_cache import get_llm_cache
+
 # ── Page Config ────────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="StakeStream | Bitwise EMEA",
@@ -253,60 +258,20 @@ def load_tasks():
     except:
         return pd.DataFrame()
 
-def get_pipo_daily_picks(df, n=5):
-    """Pipo's daily top picks — same algorithm as morning_briefing.py"""
+PIPELINE_TARGET_MILLIONS = float(os.environ.get("PIPELINE_TARGET_MILLIONS", 500))
+
+@st.cache_data(ttl=300)
+def load_forecast(df):
+    """Monte-Carlo Forecast (forecast.py) — rechnet nur neu wenn sich die Pipeline ändert"""
     if df.empty:
-        return pd.DataFrame()
+        return None
+    cols = ["region", "stage", "meddpicc", "deal_size"]
+    return run_forecast(df[cols].to_dict("records"))
 
-    STAGE_WEIGHTS = {
-        'negotiation': 1.0, 'validation': 0.9, 'solutioning': 0.8,
-        'discovery': 0.6, 'prospecting': 0.4, 'closed_won': 0.0, 'closed_lost': 0.0
-    }
-    REGION_PRIORITY = {'UAE': 1.1, 'DE': 1.0, 'CH': 1.0, 'UK': 0.95, 'NORDICS': 0.9}
-
-    active = df[~df["stage"].isin(["closed_won", "closed_lost"])].copy()
-
-    def _score(row):
-        meddpicc = int(row["meddpicc"])
-        deal_size = float(row.get("deal_size") or 0)
-        days = int(row.get("days_inactive") or 0)
-        stage = str(row.get("stage") or "prospecting").lower()
-        region = str(row.get("region") or "DE").upper()
-
-        meddpicc_c = (meddpicc / 80) * 40
-        if deal_size >= 50:   deal_c = 25
-        elif deal_size >= 20: deal_c = 20
-        elif deal_size >= 10: deal_c = 15
-        elif deal_size >= 5:  deal_c = 10
-        else: deal_c = min(5, deal_size) if deal_size else 2
-
-        if days <= 2:    act_c = 5
-        elif days <= 5:  act_c = 15
-        elif days <= 10: act_c = 20
-        elif days <= 21: act_c = 15
-        else:            act_c = 10
-
-        stage_c = STAGE_WEIGHTS.get(stage, 0.5) * 10
-        strat_c = REGION_PRIORITY.get(region, 0.9) * 5
-        return round(meddpicc_c + deal_c + act_c + stage_c + strat_c, 1)
-
-    def _action(row):
-        stage = str(row.get("stage") or "prospecting").lower()
-        days = int(row.get("days_inactive") or 0)
-        meddpicc = int(row["meddpicc"])
-        if days > 10 and meddpicc >= 50:
-            return "🔥 Dringend reaktivieren"
-        return {
-            'prospecting':  "📧 Cold Email / LinkedIn",
-            'discovery':    "📞 Discovery Call buchen",
-            'solutioning':  "📊 Solution Presentation",
-            'validation':   "✅ POC Timeline",
-            'negotiation':  "🤝 Deal closing",
-        }.get(stage, "📞 Follow-up")
-
-    active["priority_score"] = active.apply(_score, axis=1)
-    active["suggested_action"] = active.apply(_action, axis=1)
-    return active.nlargest(n, "priority_score")
+@st.cache_resource
+def get_lookalike_index():
+    """Ein Index pro Prozess — update() baut nur geänderte Leads neu"""
+    return LookalikeIndex()
 
 def pipo_chat(messages, df_stats):
     """Send message to Claude API as Pipo with Bitwise context."""
@@ -329,19 +294,19 @@ LIVE DATENBANK (heute):
 - Qualifiziert (MEDDPICC≥60): {df_stats.get('qualified', '?')}
 - Pipeline: €{df_stats.get('pipeline', 0):.0f}M
 - Inaktiv >7 Tage: {df_stats.get('stale', '?')}
-- Q1 Ziel: €500M Pipeline (aktuell: ~28%)
+- Ziel: €{PIPELINE_TARGET_MILLIONS:.0f}M Pipeline (aktuell: {df_stats.get('pipeline', 0) / PIPELINE_TARGET_MILLIONS * 100:.0f}%)
+- Forecast {df_stats.get('forecast_quarter', '?')} (Monte Carlo): P10 €{df_stats.get('forecast_p10', 0):.0f}M · P50 €{df_stats.get('forecast_p50', 0):.0f}M · P90 €{df_stats.get('forecast_p90', 0):.0f}M
 
 PHILIPPS FOKUS: ETH Staking für institutionelle EMEA-Kunden (DE > CH > UAE > UK > NORDICS)
 
 Antworte präzise, datenbasiert, kein Smalltalk. Auf Deutsch. Max. 300 Wörter außer bei Email-Drafts."""
 
-        resp = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=1024,
-            system=system,
-            messages=messages
-        )
-        return resp.content[0].text
+        model = "claude-haiku-4-5-20251001"
+        # Gleicher Verlauf + gleiche Live-Zahlen → Antwort aus dem LLM Cache (Quick Actions)
+        return get_llm_cache().cached(
+            "chat", model, system, json.dumps(messages, ensure_ascii=False),
+            lambda: client.messages.create(model=model, max_tokens=1024, system=system,
+                                           messages=messages).content[0].text)
     except ImportError:
         return "⚠️ 'anthropic' Package fehlt. Bitte requirements.txt updaten."
     except Exception as e:
@@ -359,6 +324,16 @@ SUPABASE_KEY = "dein-anon-key"
 
 df, stats = load_data()
 tasks_df = load_tasks()
+forecast = load_forecast(df)
+if forecast and forecast.n_deals:
+    q_now = forecast.quarters[0]
+    stats = {
+        **stats,
+        "forecast_quarter": q_now,
+        "forecast_p10": forecast.by_quarter[q_now]["p10"],
+        "forecast_p50": forecast.by_quarter[q_now]["p50"],
+        "forecast_p90": forecast.by_quarter[q_now]["p90"],
+    }
 
 # ── Sidebar ────────────────────────────────────────────────────────────────────
 with st.sidebar:
@@ -434,6 +409,50 @@ with tab1:
                     <div class="metric-lbl">{label}</div>
                 </div>""", unsafe_allow_html=True)
 
+        # ── Forecast ────────────────────────────────────────────
+        if forecast and forecast.n_deals:
+            st.markdown("---")
+            st.markdown(f"""
+            <div style="display:flex;align-items:center;gap:0.6rem;margin-bottom:0.75rem;">
+                <div style="font-family:'Cormorant Garamond',serif;font-size:1.2rem;color:#fff;font-weight:300;">
+                    📈 Pipeline Forecast
+                </div>
+                <div style="font-size:0.6rem;color:#6366f1;text-transform:uppercase;letter-spacing:0.12em;
+                             background:#1e1b4b;border:1px solid #3730a3;padding:2px 8px;border-radius:2px;">
+                    Monte Carlo · {forecast.trials:,} Trials
+                </div>
+            </div>
+            <div style="font-size:0.72rem;color:#4a6080;margin-bottom:1rem;">
+                Closed Value nach Stage-Winrate × MEDDPICC · {forecast.n_deals} Deals mit Deal Size ·
+                Erwartungswert €{forecast.expected_value:.0f}M
+            </div>
+            """, unsafe_allow_html=True)
+
+            q_now = forecast.quarters[0]
+            fc1, fc2, fc3, fc4 = st.columns(4)
+            forecast_cards = [
+                (fc1, f"€{forecast.by_quarter[q_now]['p10']:.0f}M", f"{q_now} · P10",  "#ef4444", "alert"),
+                (fc2, f"€{forecast.by_quarter[q_now]['p50']:.0f}M", f"{q_now} · P50",  "#22c55e", ""),
+                (fc3, f"€{forecast.by_quarter[q_now]['p90']:.0f}M", f"{q_now} · P90",  "#6366f1", "purple"),
+                (fc4, f"€{forecast.total['p50']:.0f}M", f"{forecast.quarters[0]}–{forecast.quarters[-1]} · P50", "#d4a660", "warn"),
+            ]
+            for col, val, label, color, cls in forecast_cards:
+                with col:
+                    st.markdown(f"""<div class="metric-card {cls}">
+                        <div class="metric-val" style="color:{color};">{val}</div>
+                        <div class="metric-lbl">{label}</div>
+                    </div>""", unsafe_allow_html=True)
+
+            fc_rows = []
+            for region, quarters in forecast.by_region_quarter.items():
+                row = {"Region": region}
+                for q in forecast.quarters:
+                    pct = quarters[q]
+                    row[q] = f"€{pct['p50']:.0f}M ({pct['p10']:.0f}–{pct['p90']:.0f})"
+                fc_rows.append(row)
+            with st.expander("Forecast nach Region × Quartal (P50, P10–P90)"):
+                st.dataframe(pd.DataFrame(fc_rows), use_container_width=True, hide_index=True)
+
         # ── Pipo's Daily Picks ──────────────────────────────────
         st.markdown("---")
         st.markdown("""
@@ -463,7 +482,8 @@ with tab1:
                 li_link = f"<a href='{p['linkedin']}' target='_blank' style='color:#6366f1;font-size:0.65rem;'>↗ LinkedIn</a>" if p.get("linkedin") else ""
                 with pick_cols[i]:
                     st.markdown(f"""
-                    <div style="background:#0f1c2e;border:1px solid rgba(34,197,94,0.18);
+                    <div title="Score {p.get('priority_score','?')}: {p.get('score_breakdown','')}"
+                         style="background:#0f1c2e;border:1px solid rgba(34,197,94,0.18);
                                 border-top:2px solid #22c55e;border-radius:4px;
                                 padding:0.875rem 0.75rem;height:100%;position:relative;">
                         <div style="font-size:0.65rem;color:#22c55e;letter-spacing:0.1em;
@@ -683,6 +703,32 @@ with tab3:
 
         st.markdown("<div style='margin:0.75rem 0;'></div>", unsafe_allow_html=True)
 
+        # ── Lookalikes ─────────────────────────────────────────
+        with st.expander("🧬 Lookalikes — Prospects ähnlich zu gewonnenen Deals", expanded=False):
+            la_index = get_lookalike_index()
+            la_index.update(df.to_dict("records"))
+            la_c1, la_c2 = st.columns([3, 1])
+            with la_c1:
+                la_seed = st.text_input("Ähnlich zu Firma (leer = Closed Won / MEDDPICC ≥ 60)",
+                                        key="lookalike_seed")
+            with la_c2:
+                la_top = st.number_input("Anzahl", min_value=5, max_value=50, value=10, step=5,
+                                         key="lookalike_top")
+            if la_seed.strip():
+                la_seeds, la_label = la_index.find_ids_by_company(la_seed), la_seed.strip()
+            else:
+                la_seeds, la_label = la_index.default_seed_ids(), f"Closed Won / MEDDPICC ≥ {SEED_MIN_MEDDPICC}"
+            la_results = la_index.similar(la_seeds, top_k=int(la_top),
+                                          region=sel_region if sel_region != "Alle" else None) if la_seeds else []
+            if not la_results:
+                st.info(f"Keine Lookalikes für {la_label} — Seed-Leads fehlen.")
+            else:
+                st.caption(f"{len(la_seeds)} Seeds · {la_label}")
+                st.dataframe(pd.DataFrame([{
+                    "Firma": r["company"], "Region": r["region"], "Stage": r["stage"],
+                    "MEDDPICC": r["meddpicc"], "Ähnlichkeit": r["similarity"],
+                } for r in la_results]), use_container_width=True, hide_index=True)
+
         # ── View Toggle: List / Kanban ──────────────────────────
         view_mode = st.radio("Ansicht", ["📋 Liste", "🗂️ Kanban"], horizontal=True, label_visibility="collapsed")
 